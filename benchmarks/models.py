@@ -0,0 +1,92 @@
+import typing
+
+from pydantic import BaseModel
+
+
+class SmallModel(BaseModel):
+    name: str
+    age: int
+
+
+class CartItem(BaseModel):
+    item_id: str
+    quantity: int
+
+
+class CartMetadata(BaseModel):
+    cart_id: str
+    order_start_time: str
+    restaurant_id: str
+
+
+class CartModel(BaseModel):
+    cart_information: typing.List[CartItem]
+    cart_metadata: CartMetadata
+
+
+class FifthLevel(BaseModel):
+    fifth_level_element: int
+
+
+class FourthLevel(BaseModel):
+    fourth_level_element: FifthLevel
+
+
+class ThirdLevel(BaseModel):
+    third_level_element: FourthLevel
+
+
+class SecondLevel(BaseModel):
+    second_level_element: ThirdLevel
+
+
+class ChildSection(BaseModel):
+    child_section_one: SecondLevel
+
+
+class HeavilyNestedModel(BaseModel):
+    nested_one: ChildSection
+    nested_two: ChildSection
+    nested_three: ChildSection
+
+
+class LargeCartModel(BaseModel):
+    cart_information: typing.List[CartItem]
+    cart_metadata: CartMetadata
+    notes: typing.Dict[str, str]
+
+
+def _nested() -> ChildSection:
+    return ChildSection.parse_obj(
+        {
+            "child_section_one": {
+                "second_level_element": {
+                    "third_level_element": {"fourth_level_element": {"fifth_level_element": 2}}
+                }
+            }
+        }
+    )
+
+
+def _metadata() -> CartMetadata:
+    return CartMetadata(
+        cart_id="testing-cart-id",
+        order_start_time="2019-01-01 00:00:00",
+        restaurant_id="fffb2e37-2727-43b2-8751-ef5a52520b31",
+    )
+
+
+# Deterministic instances, so runs on different commits compare like for like.
+SAMPLES: typing.Dict[str, BaseModel] = {
+    "small": SmallModel(name="test", age=1),
+    "cart": CartModel(
+        cart_information=[CartItem(item_id=f"{index:08x}", quantity=5) for index in range(5)],
+        cart_metadata=_metadata(),
+    ),
+    "nested": HeavilyNestedModel(nested_one=_nested(), nested_two=_nested(), nested_three=_nested()),
+    "large": LargeCartModel(
+        cart_information=[CartItem(item_id=f"{index:08x}", quantity=index % 7) for index in range(500)],
+        cart_metadata=_metadata(),
+        notes={f"note_{index}": "x" * 32 for index in range(200)},
+    ),
+}
@@ -0,0 +1,294 @@
+"""Benchmarks for the RidantCache hot paths.
+
+Examples:
+    python -m benchmarks.run                              # spawn redis-server, run everything
+    python -m benchmarks.run --target codec               # no network, client-side encode/decode only
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --max-regression 0.15
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import typing
+
+from loguru import logger
+from redis import ConnectionPool, Redis
+from redis.asyncio import ConnectionPool as AsyncConnectionPool
+
+from benchmarks.models import SAMPLES
+from ridant.asyncio.main import RidantCache as AsyncRidantCache
+from ridant.main import RidantCache
+
+ALLOCATION_SAMPLES = 50
+
+
+def _summarize(name: str, timings_ns: typing.List[int], allocations: typing.List[int]) -> dict:
+    _timings = sorted(timings_ns)
+    _quantiles = statistics.quantiles(_timings, n=100, method="inclusive")
+    return {
+        "name": name,
+        "iterations": len(_timings),
+        "ops_per_sec": len(_timings) / (sum(_timings) / 1e9),
+        "p50_us": _quantiles[49] / 1e3,
+        "p99_us": _quantiles[98] / 1e3,
+        "peak_alloc_bytes": statistics.median(allocations) if allocations else None,
+    }
+
+
+def _measure(name: str, operation: typing.Callable[[], typing.Any], iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        operation()
+
+    _timings = []
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            _started = time.perf_counter_ns()
+            operation()
+            _timings.append(time.perf_counter_ns() - _started)
+    finally:
+        gc.enable()
+
+    # Allocations are sampled separately, tracemalloc slows everything down.
+    _allocations = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(iterations, ALLOCATION_SAMPLES)):
+            tracemalloc.reset_peak()
+            _before = tracemalloc.get_traced_memory()[0]
+            operation()
+            _allocations.append(tracemalloc.get_traced_memory()[1] - _before)
+    finally:
+        tracemalloc.stop()
+    return _summarize(name, _timings, _allocations)
+
+
+def _measure_async(
+    name: str, operation: typing.Callable[[], typing.Awaitable], iterations: int, warmup: int, loop: asyncio.AbstractEventLoop
+) -> dict:
+    return _measure(name, lambda: loop.run_until_complete(operation()), iterations, warmup)
+
+
+def run_codec_benchmarks(iterations: int, warmup: int) -> typing.List[dict]:
+    """Everything RidantCache does for a read or write except the round trip itself."""
+    _cache = RidantCache(redis_connection_pool=ConnectionPool())
+    _trusted_cache = RidantCache(redis_connection_pool=ConnectionPool(), trusted_decode=True)
+    _results = []
+    for sample_name, sample in SAMPLES.items():
+        _model = type(sample)
+        _payload = _cache._dump_model(sample)
+        _trusted_payload = _trusted_cache._dump_model(sample)
+        _mapping = _cache._hash_mapping(sample)
+        _fetched_hash = {key.encode(): str(value).encode() for key, value in _mapping.items()}
+        _results.append(_measure(f"codec/string/{sample_name}/serialize", lambda: _cache._dump_model(sample), iterations, warmup))
+        _results.append(
+            _measure(f"codec/string/{sample_name}/deserialize", lambda: _cache._parse_fetched_item(_model, _payload), iterations, warmup)
+        )
+        _results.append(
+            _measure(
+                f"codec/string/{sample_name}/deserialize_trusted",
+                lambda: _trusted_cache._parse_fetched_item(_model, _trusted_payload),
+                iterations,
+                warmup,
+            )
+        )
+        _results.append(_measure(f"codec/hash/{sample_name}/serialize", lambda: _cache._hash_mapping(sample), iterations, warmup))
+        _results.append(
+            _measure(f"codec/hash/{sample_name}/deserialize", lambda: _cache._parse_fetched_hash(_model, _fetched_hash), iterations, warmup)
+        )
+    return _results
+
+
+def run_redis_benchmarks(host: str, port: int, iterations: int, warmup: int, flush: bool = False) -> typing.List[dict]:
+    """Time sync and async cache/find_one against a redis server.
+
+    Only a server spawned for the run (`flush=True`) is flushed afterwards, on any other one
+    just the keys the benchmarks wrote are removed.
+    """
+    _pool = ConnectionPool(host=host, port=port, db=0)
+    _cache = RidantCache(redis_connection_pool=_pool, redis_database_for_hash=1)
+    _loop = asyncio.new_event_loop()
+    _async_pool = AsyncConnectionPool(host=host, port=port, db=0)
+    _async_cache = AsyncRidantCache(redis_connection_pool=_async_pool, redis_database_for_hash=1)
+
+    _results = []
+    try:
+        for sample_name, sample in SAMPLES.items():
+            _model = type(sample)
+            for mode, hash_mode in (("string", False), ("hash", True)):
+                _cache.cache(sample, "bench", hash=hash_mode)
+                _results.append(
+                    _measure(f"sync/{mode}/{sample_name}/cache", lambda: _cache.cache(sample, "bench", hash=hash_mode), iterations, warmup)
+                )
+                _results.append(
+                    _measure(f"sync/{mode}/{sample_name}/find_one", lambda: _cache.find_one(_model, "bench", hash=hash_mode), iterations, warmup)
+                )
+                _results.append(
+                    _measure_async(
+                        f"async/{mode}/{sample_name}/cache",
+                        lambda: _async_cache.cache(sample, "bench", hash=hash_mode),
+                        iterations,
+                        warmup,
+                        _loop,
+                    )
+                )
+                _results.append(
+                    _measure_async(
+                        f"async/{mode}/{sample_name}/find_one",
+                        lambda: _async_cache.find_one(_model, "bench", hash=hash_mode),
+                        iterations,
+                        warmup,
+                        _loop,
+                    )
+                )
+    finally:
+        _loop.run_until_complete(_async_pool.disconnect())
+        _loop.close()
+        if flush:
+            Redis(connection_pool=_pool).flushall()
+        else:
+            _key_names = sorted({_cache._model_key(type(sample), "bench") for sample in SAMPLES.values()})
+            Redis(connection_pool=_pool).unlink(*_key_names)
+            _cache.redis_hashed.unlink(*_key_names)
+        _pool.disconnect()
+    return _results
+
+
+def _free_port() -> int:
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def spawn_redis_server(binary: str) -> typing.Iterator[int]:
+    _port = _free_port()
+    _process = subprocess.Popen(
+        [binary, "--port", str(_port), "--save", "", "--appendonly", "no", "--bind", "127.0.0.1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _client = Redis(host="127.0.0.1", port=_port)
+        for _ in range(100):
+            try:
+                _client.ping()
+                break
+            except Exception:
+                time.sleep(0.05)
+        else:
+            raise RuntimeError(f"redis-server did not start on port {_port}")
+        yield _port
+    finally:
+        _process.terminate()
+        _process.wait(timeout=10)
+
+
+def compare(results: typing.List[dict], baseline: dict, max_regression: float) -> typing.List[str]:
+    """Return a description of every benchmark that got slower than the baseline allows."""
+    _baseline = {result["name"]: result for result in baseline["results"]}
+    _regressions = []
+    for result in results:
+        _previous = _baseline.get(result["name"])
+        if _previous is None:
+            continue
+        if result["ops_per_sec"] < _previous["ops_per_sec"] * (1 - max_regression):
+            _regressions.append(
+                f"{result['name']}: {result['ops_per_sec']:.0f} ops/sec, baseline {_previous['ops_per_sec']:.0f} ops/sec"
+            )
+        if result["p99_us"] > _previous["p99_us"] * (1 + max_regression):
+            _regressions.append(f"{result['name']}: p99 {result['p99_us']:.1f}us, baseline {_previous['p99_us']:.1f}us")
+    return _regressions
+
+
+def _print_table(results: typing.List[dict], baseline: typing.Optional[dict]) -> None:
+    _baseline = {result["name"]: result for result in baseline["results"]} if baseline else {}
+    _width = max(len(result["name"]) for result in results)
+    print(f"{'benchmark':<{_width}}  {'ops/sec':>12}  {'p50 us':>10}  {'p99 us':>10}  {'peak alloc':>11}  {'vs baseline':>11}")
+    for result in results:
+        _change = ""
+        if result["name"] in _baseline:
+            _change = f"{result['ops_per_sec'] / _baseline[result['name']]['ops_per_sec'] - 1:+.1%}"
+        print(
+            f"{result['name']:<{_width}}  {result['ops_per_sec']:>12.0f}  {result['p50_us']:>10.1f}  "
+            f"{result['p99_us']:>10.1f}  {result['peak_alloc_bytes'] or 0:>11.0f}  {_change:>11}"
+        )
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    _parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _parser.add_argument("--target", choices=["all", "redis", "codec"], default="all")
+    _parser.add_argument("--iterations", type=int, default=2000)
+    _parser.add_argument("--warmup", type=int, default=200)
+    _parser.add_argument("--filter", default=None, help="only keep benchmarks whose name contains this string")
+    _parser.add_argument("--redis-host", default=None, help="use a running redis instead of spawning one")
+    _parser.add_argument("--redis-port", type=int, default=6379)
+    _parser.add_argument("--redis-server", default=shutil.which("redis-server"), help="redis-server binary to spawn")
+    _parser.add_argument("--save", default=None, help="write results to this JSON file")
+    _parser.add_argument("--compare", default=None, help="compare against results saved with --save")
+    _parser.add_argument("--max-regression", type=float, default=0.10, help="allowed slowdown before failing")
+    _args = _parser.parse_args(argv)
+
+    # ridant logs every call at DEBUG, which would dominate the timings.
+    logger.remove()
+
+    _results = []
+    if _args.target in ("all", "codec"):
+        _results.extend(run_codec_benchmarks(_args.iterations, _args.warmup))
+    if _args.target in ("all", "redis"):
+        if _args.redis_host is not None:
+            _results.extend(run_redis_benchmarks(_args.redis_host, _args.redis_port, _args.iterations, _args.warmup))
+        elif _args.redis_server is None:
+            print("redis-server not found, pass --redis-server or --redis-host", file=sys.stderr)
+            return 2
+        else:
+            with spawn_redis_server(_args.redis_server) as port:
+                _results.extend(run_redis_benchmarks("127.0.0.1", port, _args.iterations, _args.warmup, flush=True))
+
+    if _args.filter:
+        _results = [result for result in _results if _args.filter in result["name"]]
+
+    _baseline = None
+    if _args.compare:
+        with open(_args.compare) as baseline_file:
+            _baseline = json.load(baseline_file)
+
+    _print_table(_results, _baseline)
+
+    if _args.save:
+        with open(_args.save, "w") as output_file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "iterations": _args.iterations,
+                    "results": _results,
+                },
+                output_file,
+                indent=2,
+            )
+
+    if _baseline is not None:
+        _regressions = compare(_results, _baseline, _args.max_regression)
+        if _regressions:
+            print(f"\n{len(_regressions)} regression(s) beyond {_args.max_regression:.0%}:", file=sys.stderr)
+            for regression in _regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
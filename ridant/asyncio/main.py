@@ -1,12 +1,69 @@
 import typing
-from ridant.utils.convert_model_to_string_key import get_name_from_model
+from ridant.utils.model_registry import ModelMetadata, get_model_metadata
 from loguru import logger
 from redis.asyncio import Redis, ConnectionPool
+from redis.exceptions import ResponseError
+from redis.asyncio.cluster import RedisCluster
 from pydantic import BaseModel
 from collections.abc import Awaitable, Coroutine
 from ridant.main import RidantCache as SyncRidantCache
+from ridant.utils.caching_tools import chunked, escape_hash_string, escape_scan_pattern
+from ridant.utils.local_cache import LocalCache
+from ridant.utils.indexes import INDEX_SCRIPT, PATCH, PRUNE, RANGE_INDEX, IndexUpdate, indexed_values_below
+from ridant.utils.partial_update import (
+    APPEND,
+    HASH_UPDATE_SCRIPT,
+    INCREMENT,
+    JSON_UPDATE_SCRIPT,
+    MERGE,
+    SET,
+    Path,
+    decode_hash_reply,
+    decode_json_reply,
+    partial_update_arguments,
+    script_arguments,
+    split_path,
+)
+from ridant.utils.projection import (
+    PROJECTION_SCRIPT,
+    below_hash_leaf,
+    is_hash_leaf,
+    project_model,
+    projection_arguments,
+    split_field,
+)
+from ridant.utils.sharding import ConsistentHashRing, shard_name
+from ridant.utils.serializers import Serializer, get_serializer
+from ridant.utils.cluster import WRITE_HASH_SCRIPT, flatten_mapping_arguments
+from ridant.utils.compression import Compressor, ValueCompressor
+from ridant.utils.namespaces import GenerationCache, generation_key, is_reclaimable, reclaim_patterns
+from ridant.utils.purge import PurgeProgress, Throttle
+from ridant.utils.expiry import KEEP_TTL, TTL, hash_expiry, with_default_ttl
+from ridant.utils.pools import async_shared_pools
+from ridant.utils.snapshot import NO_TTL, SnapshotEntry, SnapshotReader, SnapshotStats, SnapshotWriter
+from ridant.utils.trusted_decode import MISS, VALIDATE
+from ridant.utils.write_behind import REPLACE_HASH, SET_VALUE, UNLINK, ErrorCallback, PendingWrite, WriteBehindBuffer
+from ridant.utils.coalescing import ReadCoalescer
+from ridant.utils.metrics import MetricsCollector, NETWORK, SERIALIZE, DESERIALIZE
+from ridant.utils.read_through import (
+    DELTA_PREFIX,
+    LOCK_PREFIX,
+    RELEASE_LOCK_SCRIPT,
+    AsyncSingleFlight,
+    KeyBuilder,
+    ReadThroughPolicy,
+    key_resolver,
+    should_recompute_early,
+)
 
+import asyncio
+import copy
+import functools
+import inspect
 import json
+import os
+import time
+import uuid
 
 if typing.TYPE_CHECKING:
     from odmantic import Model
@@ -24,12 +81,55 @@ class RidantCache(SyncRidantCache):
         default_hset_uid_key: typing.Optional[str] = None,
         use_different_db_for_hash: bool = False,
         redis_database_for_hash: typing.Optional[int] = None,
+        bulk_batch_size: int = 500,
+        local_cache: typing.Optional[LocalCache] = None,
+        invalidation_channel: typing.Optional[str] = None,
+        scan_count: int = 1000,
+        serializer: typing.Union[str, Serializer, None] = None,
+        compression: typing.Union[str, Compressor, None] = None,
+        compression_threshold: int = 1024,
+        hash_field_batch_size: int = 1000,
+        metrics: typing.Optional[MetricsCollector] = None,
+        coalesce_reads: bool = False,
+        coalesce_window: float = 0.0,
+        redis_cluster: typing.Optional[RedisCluster] = None,
+        hash_tag_groups: bool = False,
+        redis_shards: typing.Union[typing.Sequence[ConnectionPool], typing.Dict[str, ConnectionPool], None] = None,
+        shard_virtual_nodes: int = 160,
+        trusted_decode: bool = False,
+        schema_mismatch: str = VALIDATE,
+        versioned_namespaces: bool = False,
+        generation_ttl: float = 1.0,
+        ttls: typing.Optional[typing.Dict[typing.Union[type, str], typing.Optional[TTL]]] = None,
+        sliding_expiration: bool = False,
+        blocking_pool: bool = False,
+        max_connections: typing.Optional[int] = None,
+        pool_timeout: float = 20.0,
+        write_behind: bool = False,
+        write_behind_max_size: int = 10_000,
+        write_behind_batch_size: typing.Optional[int] = None,
+        write_behind_interval: float = 0.05,
+        on_write_behind_error: typing.Optional[ErrorCallback] = None,
         **kwargs,
     ) -> None:
-        if redis_connection_pool is None:
-            logger.warning(
-                "No redis connection pool provided, this is recommended. Using arguments provided (if any)"
-            )
+        if redis_shards and redis_cluster is not None:
+            raise ValueError("Use either redis_cluster or redis_shards, not both.")
+        if schema_mismatch not in (VALIDATE, MISS):
+            raise ValueError(f"schema_mismatch must be '{VALIDATE}' or '{MISS}', not '{schema_mismatch}'.")
+        self._shards: typing.Dict[str, Redis] = {}
+        self._shard_ring = None
+        if redis_shards:
+            if not isinstance(redis_shards, dict):
+                redis_shards = {shard_name(pool.connection_kwargs): pool for pool in redis_shards}
+            self._shards = {name: Redis(connection_pool=pool) for name, pool in redis_shards.items()}
+            self._shard_ring = ConsistentHashRing(self._shards, virtual_nodes=shard_virtual_nodes)
+            # Everything not tied to a key (pub/sub, scripts) goes through the first shard.
+            redis_connection_pool = next(iter(redis_shards.values()))
+
+        if redis_cluster is not None:
+            logger.debug("Using redis cluster client provided")
+        elif redis_connection_pool is None:
+            logger.debug("No redis connection pool provided, using the process's shared pool of the arguments provided (if any)")
             if redis_host is None:
                 logger.warning("No redis host provided, using default: localhost")
                 redis_host = "localhost"
@@ -38,26 +138,71 @@ class RidantCache(SyncRidantCache):
                 redis_port = 6379
             if redis_database is None:
                 logger.warning("No redis database provided, using default: 0")
-                redis_host = 0
+                redis_database = 0
 
             self.redis_host, self.redis_port, self.redis_database = (
                 redis_host,
                 redis_port,
                 redis_database,
             )
+            redis_connection_pool = async_shared_pools.get_pool(
+                host=redis_host,
+                port=redis_port,
+                db=redis_database,
+                blocking=blocking_pool,
+                max_connections=max_connections,
+                timeout=pool_timeout,
+            )
         else:
             logger.debug("Using redis connection pool provided")
 
         self.default_hset_uid_key = default_hset_uid_key
+        self.bulk_batch_size = bulk_batch_size
+        self.scan_count = scan_count
+        self.hash_field_batch_size = hash_field_batch_size
+        self._metrics = metrics
+        self.serializer = get_serializer(serializer)
+        self._value_compressor = (
+            ValueCompressor(compression, threshold=compression_threshold) if compression is not None else None
+        )
+        # Values are written with their model's schema fingerprint, and read without full validation while it matches.
+        self.trusted_decode = trusted_decode
+        self.schema_mismatch = schema_mismatch
+        self._local_cache = local_cache
+        self.invalidation_channel = invalidation_channel
+        self._invalidation_listener = None
+        self.hash_tag_groups = hash_tag_groups
+        self.is_cluster = redis_cluster is not None
+        # Key prefixes carry a per group generation, invalidating a group moves it to a new one.
+        self.versioned_namespaces = versioned_namespaces
+        self._generations = GenerationCache(ttl=generation_ttl)
+        self._background_tasks: typing.Set[asyncio.Task] = set()
+        # Default TTLs registered on this cache by group, in milliseconds, see set_ttl.
+        self._ttls: typing.Dict[str, typing.Optional[int]] = {}
+        for _model_or_group, _ttl in (ttls or {}).items():
+            self.set_ttl(_model_or_group, _ttl)
+        # find_one pushes the expiry of keys with a TTL back on every read.
+        self.sliding_expiration = sliding_expiration
+        # cache / delete (and their _by_group versions) only queue their write, a background task pipelines them.
+        self._write_behind = (
+            WriteBehindBuffer(
+                self._flush_writes,
+                max_size=write_behind_max_size,
+                batch_size=write_behind_batch_size or min(bulk_batch_size, write_behind_max_size),
+                interval=write_behind_interval,
+                on_error=on_write_behind_error,
+            )
+            if write_behind
+            else None
+        )
 
-        if redis_database_for_hash:
+        if redis_cluster is not None:
+            # A cluster only has database 0, hash mode goes through the same client.
+            self._redis_connection_hash_only = redis_cluster
+        elif redis_database_for_hash:
+            # A client given a pool ignores its db argument, hash mode needs a pool of its own database.
             self._redis_connection_hash_only = Redis(
-                connection_pool=redis_connection_pool,
-                port=redis_port,
-                host=redis_host,
-                db=redis_database_for_hash
-                if redis_database_for_hash
-                else redis_database,
+                connection_pool=async_shared_pools.pool_for_database(redis_connection_pool, redis_database_for_hash)
             )
             logger.debug(
                 f"Redis Hashed Connection Information: <host: {redis_host}, port: {redis_port}, db: {redis_database_for_hash if redis_database_for_hash else redis_database}>"
@@ -66,9 +211,22 @@ class RidantCache(SyncRidantCache):
             self._redis_connection_hash_only = None
             logger.debug(f"Redis Hashed Connection Information: <none>")
 
-        self._redis_connection = Redis(
-            connection_pool=redis_connection_pool,
+        self._redis_connection = (
+            redis_cluster if redis_cluster is not None else Redis(connection_pool=redis_connection_pool)
+        )
+        self._write_hash_script = (
+            self._redis_connection.register_script(WRITE_HASH_SCRIPT) if redis_cluster is not None else None
+        )
+        self._json_update_script = self._redis_connection.register_script(JSON_UPDATE_SCRIPT)
+        self._hash_update_script = self._redis_connection.register_script(HASH_UPDATE_SCRIPT)
+        self._index_script = self._redis_connection.register_script(INDEX_SCRIPT)
+        self._projection_script = self._redis_connection.register_script(PROJECTION_SCRIPT)
+        self._single_flight = AsyncSingleFlight()
+        # find_one / find_one_by_group GETs issued in the same loop iteration (or window) share one MGET.
+        self._read_coalescer = (
+            ReadCoalescer(self._mget, window=coalesce_window, max_batch_size=bulk_batch_size) if coalesce_reads else None
         )
+        self._release_lock_script = self._redis_connection.register_script(RELEASE_LOCK_SCRIPT)
         logger.debug(
             f"Redis Connection Information: <host: {redis_host}, port: {redis_port}, db: {redis_database}>"
         )
@@ -77,6 +235,165 @@ class RidantCache(SyncRidantCache):
     def redis(self) -> Redis:
         return self._redis_connection
 
+    async def _invalidate_local(self, *key_names_provided: str) -> Coroutine[None]:
+        if self._local_cache is not None:
+            self._local_cache.discard(*key_names_provided)
+        # Other clients may hold a local copy even when this one has none.
+        if self.invalidation_channel is not None:
+            await self.redis.publish(self.invalidation_channel, json.dumps(key_names_provided))
+
+    async def _listen_for_invalidations(self, pubsub) -> Coroutine[None]:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self._handle_invalidation_message(message)
+        finally:
+            await pubsub.reset()
+
+    async def start_invalidation_listener(self) -> Coroutine[None]:
+        if self.invalidation_channel is None:
+            raise ValueError("No invalidation channel provided.")
+        if self._invalidation_listener is not None:
+            return
+
+        _pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await _pubsub.subscribe(self.invalidation_channel)
+        self._invalidation_listener = asyncio.ensure_future(self._listen_for_invalidations(_pubsub))
+
+    async def stop_invalidation_listener(self) -> Coroutine[None]:
+        if self._invalidation_listener is None:
+            return
+        self._invalidation_listener.cancel()
+        try:
+            await self._invalidation_listener
+        except asyncio.CancelledError:
+            pass
+        self._invalidation_listener = None
+
+    async def flush(self) -> Coroutine[int]:
+        """Write the writes buffered so far (write_behind=True), returns how many were written."""
+        if self._write_behind is None:
+            return 0
+        return await self._write_behind.flush()
+
+    async def aclose(self) -> Coroutine[None]:
+        """Write what is buffered and stop the background tasks of the cache, buffering writes afterwards raises."""
+        if self._write_behind is not None:
+            await self._write_behind.aclose()
+        await self.stop_invalidation_listener()
+
+    def write_behind_stats(self) -> typing.Dict[str, int]:
+        if self._write_behind is None:
+            return {}
+        return self._write_behind.stats()
+
+    async def _write_later(self, write: PendingWrite) -> Coroutine[bool]:
+        # A key of the hash database is another key than the same name in the main one.
+        _hash_database = write.hash and self._redis_hashed_for(write.key_name) is not self._redis_for(write.key_name)
+        await self._write_behind.put((write.key_name, _hash_database), write)
+        return True
+
+    async def _flush_write_behind(self) -> Coroutine[None]:
+        # Writes that do not go through the buffer have to land after the buffered ones.
+        if self._write_behind is not None and len(self._write_behind):
+            await self._write_behind.flush()
+
+    async def _flush_writes(self, writes: typing.Dict[typing.Hashable, PendingWrite]) -> Coroutine[None]:
+        _clients: typing.Dict[int, typing.Tuple[Redis, typing.List[PendingWrite]]] = {}
+        for write in writes.values():
+            _redis = self._redis_hashed_for(write.key_name) if write.hash else self._redis_for(write.key_name)
+            _clients.setdefault(id(_redis), (_redis, []))[1].append(write)
+        await self._fan_out([self._flush_writes_on(_redis, _writes) for _redis, _writes in _clients.values()])
+        await self._invalidate_local(*(write.key_name for write in writes.values()))
+
+    async def _flush_writes_on(self, redis_instance: Redis, writes: typing.List[PendingWrite]) -> Coroutine[None]:
+        async with redis_instance.pipeline(transaction=not self.is_cluster) as pipe:
+            for write in writes:
+                if write.kind == SET_VALUE:
+                    pipe.set(write.key_name, write.value, **(write.arguments or {}))
+                elif write.kind == REPLACE_HASH and self.is_cluster:
+                    pipe.execute_command(
+                        "EVAL", WRITE_HASH_SCRIPT, 1, write.key_name, "1", write.ttl or 0, *flatten_mapping_arguments(write.value)
+                    )
+                elif write.kind == REPLACE_HASH:
+                    self._queue_hash_write(pipe, write.key_name, write.value, True, write.ttl)
+                else:
+                    pipe.unlink(write.key_name)
+                if write.index_update is not None:
+                    await self._queue_index_update(pipe, write.index_update)
+            await pipe.execute()
+
+    def _generation(self, group: str) -> int:
+        # Key names are built synchronously, every public method loads the generations it needs first.
+        _generation = self._generations.get(group, stale=True)
+        if _generation is None:
+            raise RuntimeError(f"The generation of '{group}' was not loaded before building its keys.")
+        return _generation
+
+    async def _load_generation(self, model_or_group: typing.Union[ModelPassed, str]) -> Coroutine[None]:
+        if not self.versioned_namespaces:
+            return
+        _group = model_or_group if isinstance(model_or_group, str) else get_model_metadata(model_or_group).group_name
+        if self._generations.get(_group) is None:
+            _key_name = generation_key(_group)
+            self._generations.set(_group, int(await self._redis_for(_key_name).get(_key_name) or 0))
+
+    async def invalidate(self, model: ModelPassed, reclaim: bool = True) -> Coroutine[int]:
+        return await self.invalidate_group(get_model_metadata(model).group_name, reclaim=reclaim)
+
+    async def invalidate_group(self, group: str, reclaim: bool = True) -> Coroutine[int]:
+        """See the sync `RidantCache.invalidate_group`, keys are reclaimed in a background task."""
+        if not self.versioned_namespaces:
+            raise ValueError("Invalidating a group needs versioned_namespaces=True.")
+        await self._flush_write_behind()
+        _key_name = generation_key(group)
+        _generation = self._generations.set(group, await self._redis_for(_key_name).incr(_key_name))
+        if reclaim:
+            _task = asyncio.ensure_future(self._reclaim_in_background(group, _generation))
+            # The loop only keeps weak references to tasks.
+            self._background_tasks.add(_task)
+            _task.add_done_callback(self._background_tasks.discard)
+        return _generation
+
+    async def reclaim(self, model: ModelPassed) -> Coroutine[int]:
+        return await self.reclaim_group(get_model_metadata(model).group_name)
+
+    async def reclaim_group(self, group: str, generation: typing.Optional[int] = None) -> Coroutine[int]:
+        if generation is None:
+            self._generations.discard(group)
+            await self._load_generation(group)
+            generation = self._generations.get(group, stale=True) or 0
+        _key_prefix = self._unversioned_group_prefix(group)
+        _patterns = reclaim_patterns(_key_prefix, generation)
+        if not _patterns:
+            return 0
+        _reclaimed = await self._fan_out(
+            [self._reclaim_on(redis_instance, _key_prefix, generation, _patterns) for redis_instance in self._scan_clients()]
+        )
+        return sum(_reclaimed)
+
+    async def _reclaim_in_background(self, group: str, generation: int) -> Coroutine[None]:
+        try:
+            _reclaimed = await self.reclaim_group(group, generation)
+            logger.debug(f"Reclaimed {_reclaimed} keys of '{group}' from before generation {generation}")
+        except Exception:
+            logger.exception(f"Unable to reclaim the keys of '{group}' from before generation {generation}")
+
+    async def _reclaim_on(
+        self, redis_instance: Redis, key_prefix: str, generation: int, patterns: typing.List[str]
+    ) -> Coroutine[int]:
+        _reclaimed = 0
+        for pattern in patterns:
+            _chunk = []
+            async for key in redis_instance.scan_iter(match=pattern, count=self.scan_count):
+                if is_reclaimable(self._decode_group_item(key), key_prefix, generation):
+                    _chunk.append(key)
+                if len(_chunk) >= self.bulk_batch_size:
+                    _reclaimed += await redis_instance.unlink(*_chunk)
+                    _chunk = []
+            if _chunk:
+                _reclaimed += await redis_instance.unlink(*_chunk)
+        return _reclaimed
 
     def _item_be_converted_to_dict(self, item: typing.Any) -> typing.TypeVar("item"):
         if isinstance(self._convert_object_to_safe_redis_type(item), dict):
@@ -89,16 +406,155 @@ class RidantCache(SyncRidantCache):
             return self._redis_connection_hash_only
         raise ValueError("Hashed redis client is not available.")
 
-    async def _get(self, key_name_provided: str) -> Coroutine[bytes]:
-        return await self.redis.get(key_name_provided)
+    async def _get(self, key_name_provided: str, ttl: typing.Optional[int] = None) -> Coroutine[bytes]:
+        if ttl is not None:
+            # Sliding expiration, GETEX cannot be coalesced into an MGET.
+            return await self._redis_for(key_name_provided).getex(key_name_provided, px=ttl)
+        if self._read_coalescer is not None:
+            return await self._read_coalescer.load(key_name_provided)
+        return await self._redis_for(key_name_provided).get(key_name_provided)
 
-    async def _hget(self, key_name_provided: str, attr: str) -> Coroutine[bytes]:
-        return await self.redis_hashed.hget(key_name_provided, attr)
+    def coalescing_stats(self) -> typing.Dict[str, int]:
+        if self._read_coalescer is None:
+            return {}
+        return self._read_coalescer.stats()
 
-    async def _get_all(
-        self, key_name_provided: str
-    ) -> Coroutine[typing.Iterator[typing.Any]]:
-        return await self.redis.scan_iter(key_name_provided)
+    async def _hget(self, key_name_provided: str, attr: str, ttl: typing.Optional[int] = None) -> Coroutine[bytes]:
+        _redis = self._redis_hashed_for(key_name_provided)
+        if ttl is not None:
+            return await self._read_and_expire(_redis, key_name_provided, ttl, "hget", attr)
+        return await _redis.hget(key_name_provided, attr)
+
+    async def _hgetall(
+        self, key_name_provided: str, ttl: typing.Optional[int] = None
+    ) -> Coroutine[typing.Dict[bytes, bytes]]:
+        _redis = self._redis_hashed_for(key_name_provided)
+        if ttl is not None:
+            return await self._read_and_expire(_redis, key_name_provided, ttl, "hgetall")
+        return await _redis.hgetall(key_name_provided)
+
+    @staticmethod
+    async def _read_and_expire(
+        redis_instance: Redis, key_name_provided: str, ttl: int, command: str, *args
+    ) -> Coroutine[typing.Any]:
+        async with redis_instance.pipeline(transaction=False) as pipe:
+            getattr(pipe, command)(key_name_provided, *args)
+            pipe.pexpire(key_name_provided, ttl)
+            return (await pipe.execute())[0]
+
+    def _get_all(
+        self, key_name_provided: str, count: typing.Optional[int] = None
+    ) -> typing.AsyncIterator[bytes]:
+        return self.redis.scan_iter(match=key_name_provided, count=count or self.scan_count)
+
+    async def _iter_scanned_values(
+        self, key_name_provided: str, count: typing.Optional[int] = None, batch_size: typing.Optional[int] = None
+    ) -> typing.AsyncIterator[bytes]:
+        if self._shard_ring is not None:
+            async for _fetched_item in self._iter_scanned_shard_values(key_name_provided, count=count, batch_size=batch_size):
+                yield _fetched_item
+            return
+
+        _batch_size = batch_size or self.bulk_batch_size
+        _chunk = []
+        async for key_name in self._get_all(key_name_provided, count=count):
+            _chunk.append(key_name)
+            if len(_chunk) >= _batch_size:
+                for _fetched_item in await self._mget(_chunk):
+                    if _fetched_item is not None:
+                        yield _fetched_item
+                _chunk = []
+        if _chunk:
+            for _fetched_item in await self._mget(_chunk):
+                if _fetched_item is not None:
+                    yield _fetched_item
+
+    async def _iter_scanned_hashes(
+        self, key_name_provided: str, count: typing.Optional[int] = None, batch_size: typing.Optional[int] = None
+    ) -> typing.AsyncIterator[typing.Dict[bytes, bytes]]:
+        _clients = list(self._shards.values()) if self._shard_ring is not None else [self.redis_hashed]
+        _batch_size = batch_size or self.bulk_batch_size
+        for _client in _clients:
+            # String-mode keys may share the database (always on shards), SCAN TYPE (redis 6+) skips them.
+            _chunk = []
+            async for key_name in _client.scan_iter(match=key_name_provided, count=count or self.scan_count, _type="hash"):
+                _chunk.append(key_name)
+                if len(_chunk) >= _batch_size:
+                    for _fetched_hash in await self._hgetall_many(_client, _chunk):
+                        yield _fetched_hash
+                    _chunk = []
+            if _chunk:
+                for _fetched_hash in await self._hgetall_many(_client, _chunk):
+                    yield _fetched_hash
+
+    @staticmethod
+    async def _hgetall_many(redis_instance: Redis, key_names_provided: typing.List[bytes]) -> Coroutine[typing.List[dict]]:
+        async with redis_instance.pipeline(transaction=False) as pipe:
+            for key_name in key_names_provided:
+                pipe.hgetall(key_name)
+            return await pipe.execute()
+
+    async def _scan_shard(
+        self, shard: Redis, key_name_provided: str, count: typing.Optional[int], batch_size: int
+    ) -> typing.AsyncIterator[typing.List[bytes]]:
+        _chunk = []
+        async for key_name in shard.scan_iter(match=key_name_provided, count=count or self.scan_count):
+            _chunk.append(key_name)
+            if len(_chunk) >= batch_size:
+                yield await shard.mget(_chunk)
+                _chunk = []
+        if _chunk:
+            yield await shard.mget(_chunk)
+
+    @staticmethod
+    async def _next_scanned_batch(batches: typing.AsyncIterator[typing.List[bytes]]) -> Coroutine[typing.Optional[typing.List[bytes]]]:
+        try:
+            return await batches.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    async def _iter_scanned_shard_values(
+        self, key_name_provided: str, count: typing.Optional[int] = None, batch_size: typing.Optional[int] = None
+    ) -> typing.AsyncIterator[bytes]:
+        # One SCAN cursor per shard, each round fetches the next batch of every shard concurrently.
+        _cursors = [
+            self._scan_shard(shard, key_name_provided, count, batch_size or self.bulk_batch_size)
+            for shard in self._shards.values()
+        ]
+        while _cursors:
+            _batches = await self._fan_out([self._next_scanned_batch(batches) for batches in _cursors])
+            _cursors = [batches for batches, batch in zip(_cursors, _batches) if batch is not None]
+            for _batch in _batches:
+                for _fetched_item in _batch or ():
+                    if _fetched_item is not None:
+                        yield _fetched_item
+
+    async def _fan_out(self, calls: typing.List[typing.Awaitable]) -> Coroutine[typing.List[typing.Any]]:
+        return list(await asyncio.gather(*calls))
+
+    async def _mget(self, key_names_provided: typing.List[str]) -> Coroutine[typing.List[bytes]]:
+        if self._shard_ring is not None:
+            _partitions = self._shard_partitions(key_names_provided)
+            _fetched = await self._fan_out(
+                [shard.mget([key_names_provided[index] for index in indexes]) for shard, indexes in _partitions]
+            )
+            return self._merge_shard_results(len(key_names_provided), _partitions, _fetched)
+        if self.is_cluster:
+            # Splits the keys per slot, one MGET per slot.
+            return await self.redis.mget_nonatomic(key_names_provided)
+        return await self.redis.mget(key_names_provided)
+
+    async def _queue_index_update(self, pipe: typing.Any, index_update: IndexUpdate) -> Coroutine[None]:
+        _keys, _arguments = index_update
+        if self.is_cluster:
+            # Cluster pipelines do not load scripts, EVAL sends the source along.
+            pipe.execute_command("EVAL", INDEX_SCRIPT, len(_keys), *_keys, *_arguments)
+        else:
+            await self._index_script(keys=_keys, args=_arguments, client=pipe)
+
+    async def _run_index_update(self, redis_instance: Redis, index_update: IndexUpdate) -> Coroutine[None]:
+        _keys, _arguments = index_update
+        await self._index_script(keys=_keys, args=_arguments, client=redis_instance)
 
     async def _hash_cache_attribute(
         self,
@@ -109,71 +565,221 @@ class RidantCache(SyncRidantCache):
         redis_instance: Redis = None,
         uid: typing.Optional[str] = None,
     ) -> typing.Any:
-        if redis_instance is None:
-            redis_instance = self.redis_hashed
-
         if model is None and key_name is not None:
             logger.debug(f"Using provided key name: '{key_name}' for hset")
-            return await redis_instance.hset(key_name, attr, value)
+            return await (redis_instance or self._redis_hashed_for(key_name)).hset(key_name, attr, value)
 
         if uid is None and self.default_hset_uid_key is None:
             raise ValueError("No uid provided and no default uid key provided")
         else:
 
-            _generated_key_name = [
-                get_name_from_model(model),
-                uid if uid is not None else self.default_hset_uid_key,
-            ]
-            _generated_key_name = ":".join(_generated_key_name)
+            _generated_key_name = self._model_key(
+                model, uid if uid is not None else self.default_hset_uid_key
+            )
 
-        return await redis_instance.hset(_generated_key_name, attr, value)
+        return await (redis_instance or self._redis_hashed_for(_generated_key_name)).hset(_generated_key_name, attr, value)
 
-    async def _hash_cache(
+    async def _write_hash(
         self,
         key_name_provided: str,
-        value_provided: typing.Union[BaseModel, typing.Any],
-        extra_redis_arguments: typing.Optional[dict] = {},
+        mapping: dict,
+        replace: bool = False,
+        index_update: typing.Optional[IndexUpdate] = None,
+        ttl: typing.Optional[int] = None,
     ) -> Coroutine[bool]:
-        _values = self._convert_object_to_safe_redis_type(val=value_provided)
+        if self._write_behind is not None:
+            if replace:
+                return await self._write_later(
+                    PendingWrite(REPLACE_HASH, key_name_provided, mapping, ttl=ttl, index_update=index_update, hash=True)
+                )
+            await self._flush_write_behind()
+        logger.debug(f"Caching {len(mapping)} fields to '{key_name_provided}' with hset")
+        _redis = self._redis_hashed_for(key_name_provided)
         try:
-            async with self.redis_hashed.pipeline() as pipe:
-                _determine_commands_for_pipe = self._determine_pipeline_commands_needed(_values)
-                for piped_command in _determine_commands_for_pipe:
-                    logger.debug(f"Piping command {piped_command[0]} with a value of {piped_command[1]}")
-                    await self._hash_cache_attribute(
-                        key_name=key_name_provided, attr=piped_command[0], value=piped_command[1], redis_instance=pipe
-                    )
-
-                logger.debug(f"Running pipeline with {len(_determine_commands_for_pipe)} ==> {iter(pipe.command_stack)} commands")
-                await pipe.execute()
+            if (
+                not replace
+                and index_update is None
+                and ttl in (None, KEEP_TTL)
+                and 0 < len(mapping) <= self.hash_field_batch_size
+            ):
+                await _redis.hset(key_name_provided, mapping=mapping)
+            elif self._write_hash_script is not None:
+                await self._write_hash_script(
+                    keys=[key_name_provided], args=["1" if replace else "0", ttl or 0] + flatten_mapping_arguments(mapping)
+                )
+                if index_update is not None:
+                    await self._run_index_update(_redis, index_update)
+            else:
+                # Replacing (or writing a very wide model) has to be atomic, so it goes through MULTI.
+                async with _redis.pipeline() as pipe:
+                    self._queue_hash_write(pipe, key_name_provided, mapping, replace, ttl)
+                    if index_update is not None:
+                        await self._queue_index_update(pipe, index_update)
+                    await pipe.execute()
         except Exception:
             logger.exception("Unable to cache with hset")
             raise ValueError("Unable to cache with hset")
+        await self._invalidate_local(key_name_provided)
+        return True
+
+    async def _hash_cache(
+        self,
+        key_name_provided: str,
+        value_provided: typing.Union[BaseModel, typing.Any],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        replace: bool = False,
+        ttl: typing.Optional[int] = None,
+    ) -> Coroutine[bool]:
+        return await self._write_hash(
+            key_name_provided,
+            self._hash_mapping(value_provided),
+            replace=replace,
+            ttl=hash_expiry(extra_redis_arguments, ttl),
+        )
 
     async def _cache(
         self,
         key_name_provided: str,
         value_provided: typing.Union[BaseModel, typing.Any],
         extra_redis_arguments: typing.Optional[dict] = {},
+        index_update: typing.Optional[IndexUpdate] = None,
     ) -> typing.Optional[typing.Coroutine]:
         if isinstance(value_provided, BaseModel):
-            value_provided = value_provided.json()
-        return await self.redis.set(
-            key_name_provided, value_provided, **extra_redis_arguments
-        )
+            value_provided = self._dump_model(value_provided)
+        if self._write_behind is not None:
+            if not any(extra_redis_arguments.get(option) for option in ("nx", "xx", "get")):
+                return await self._write_later(
+                    PendingWrite(SET_VALUE, key_name_provided, value_provided, extra_redis_arguments, index_update=index_update)
+                )
+            # Whether a conditional SET happens depends on the writes before it.
+            await self._flush_write_behind()
+        _redis = self._redis_for(key_name_provided)
+        if index_update is None:
+            _res = await _redis.set(key_name_provided, value_provided, **extra_redis_arguments)
+        elif extra_redis_arguments.get("nx") or extra_redis_arguments.get("xx"):
+            # A conditional SET may not happen, so the index follows only once it did.
+            _res = await _redis.set(key_name_provided, value_provided, **extra_redis_arguments)
+            if _res:
+                await self._run_index_update(_redis, index_update)
+        else:
+            async with _redis.pipeline(transaction=not self.is_cluster) as pipe:
+                pipe.set(key_name_provided, value_provided, **extra_redis_arguments)
+                await self._queue_index_update(pipe, index_update)
+                _res = (await pipe.execute())[0]
+        await self._invalidate_local(key_name_provided)
+        return _res
 
+    async def _cache_many(
+        self,
+        values_provided: typing.Dict[str, typing.Any],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        index_updates: typing.Optional[typing.Dict[str, IndexUpdate]] = None,
+    ) -> Coroutine[bool]:
+        await self._flush_write_behind()
+        if self._shard_ring is None:
+            _res = await self._cache_many_on(self.redis, values_provided, extra_redis_arguments, index_updates)
+        else:
+            _key_names = list(values_provided)
+            _res = all(
+                await self._fan_out(
+                    [
+                        self._cache_many_on(
+                            shard,
+                            {_key_names[index]: values_provided[_key_names[index]] for index in indexes},
+                            extra_redis_arguments,
+                            index_updates,
+                        )
+                        for shard, indexes in self._shard_partitions(_key_names)
+                    ]
+                )
+            )
+        await self._invalidate_local(*values_provided)
+        return _res
 
-    async def find_one_by_group(
-        self, group: str, uid: str
-    )-> Coroutine[typing.Optional[str]]:
-        _res = await self._get(
-            key_name_provided=self.generate_key_name(model=group, uid=uid)
-        )
-        if _res and isinstance(_res, bytes):
-            return _res.decode("utf-8")
-        elif _res is not None:
-            return _res
-        return None
+    async def _cache_many_on(
+        self,
+        redis_instance: Redis,
+        values_provided: typing.Dict[str, typing.Any],
+        extra_redis_arguments: dict,
+        index_updates: typing.Optional[typing.Dict[str, IndexUpdate]] = None,
+    ) -> Coroutine[bool]:
+        if index_updates:
+            # Each value is written together with its indexes.
+            async with redis_instance.pipeline(transaction=not self.is_cluster) as pipe:
+                for key_name, value in values_provided.items():
+                    pipe.set(key_name, value, **extra_redis_arguments)
+                    if key_name in index_updates:
+                        await self._queue_index_update(pipe, index_updates[key_name])
+                return all(await pipe.execute())
+
+        if not extra_redis_arguments:
+            if self.is_cluster:
+                return await redis_instance.mset_nonatomic(values_provided)
+            return await redis_instance.mset(values_provided)
+
+        # MSET has no expiry options, so every key gets its own SET in one round trip.
+        async with redis_instance.pipeline(transaction=False) as pipe:
+            for key_name, value in values_provided.items():
+                pipe.set(key_name, value, **extra_redis_arguments)
+            return all(await pipe.execute())
+
+
+    async def find_one_by_group(self, group: str, uid: str) -> Coroutine[typing.Optional[str]]:
+        await self._load_generation(group)
+        _key_name = self._group_key(group, uid)
+        _epoch = None
+        if self._local_cache is not None:
+            _local_item = self._local_cache.get(_key_name)
+            if _local_item is not None:
+                if self._metrics is not None:
+                    self._metrics.record_lookup("find_one_by_group", group, True)
+                return _local_item
+            _epoch = self._local_cache.epoch
+
+        if self._metrics is not None:
+            _started = time.perf_counter()
+        _res = await self._get(key_name_provided=_key_name)
+        if self._metrics is not None:
+            self._observe("find_one_by_group", group, NETWORK, _started, len(_res or b""))
+            self._metrics.record_lookup("find_one_by_group", group, _res is not None)
+        return self._remember_locally(_key_name, self._decode_group_item(_res), _res, _epoch, self._ttl_for(group))
+
+    async def find_many_by_group(
+        self, group: str, uids: typing.Iterable[str], batch_size: typing.Optional[int] = None
+    ) -> Coroutine[typing.List[typing.Optional[str]]]:
+        await self._load_generation(group)
+        _results = []
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _fetched = await self._mget([self._group_key(group, uid) for uid in _chunk])
+            if self._metrics is not None:
+                self._observe_many("find_many_by_group", group, _started, _fetched)
+            _results.extend(self._decode_group_item(item) for item in _fetched)
+        return _results
+
+    async def cache_many_by_group(
+        self,
+        group: str,
+        items: typing.Iterable[typing.Tuple[str, typing.Union[BaseModel, typing.Any]]],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        batch_size: typing.Optional[int] = None,
+    ) -> Coroutine[bool]:
+        await self._load_generation(group)
+        for _chunk in chunked(items, batch_size or self.bulk_batch_size):
+            _values = {}
+            for uid, value in _chunk:
+                value = self._convert_object_to_safe_redis_type(val=value)
+                if isinstance(value, dict):
+                    value = json.dumps(value)
+                _values[self._group_key(group, uid)] = value
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            await self._cache_many(_values, with_default_ttl(extra_redis_arguments, self._ttl_for(group)))
+            if self._metrics is not None:
+                self._observe("cache_many_by_group", group, NETWORK, _started)
+                self._metrics.observe_pipeline("cache_many_by_group", group, len(_values))
+        return True
 
 
     async def cache_by_group(
@@ -184,7 +790,10 @@ class RidantCache(SyncRidantCache):
         extra_redis_arguments: typing.Optional[dict] = {},
         hash: bool = False,
     ) -> Coroutine[bool]:
-        _generated_key_name = [group, uid]
+        await self._load_generation(group)
+        _key_name = self._group_key(group, uid)
+        if self._metrics is not None:
+            _started = time.perf_counter()
 
         if hash:
             logger.debug(f"hash argument provided, using hset instead of set")
@@ -193,18 +802,24 @@ class RidantCache(SyncRidantCache):
             if _can_item_be_hashsed == False:
                 raise TypeError("Item passed cannot be broken down and hashed.")
 
-            return await self._hash_cache(
-                key_name_provided=":".join(_generated_key_name),
+            _res = await self._hash_cache(
+                key_name_provided=_key_name,
                 value_provided=_can_item_be_hashsed,
                 extra_redis_arguments=extra_redis_arguments,
+                replace=True,
+                ttl=self._ttl_for(group),
             )
         else:
-            return await self._cache(
-                ":".join(_generated_key_name),
+            _res = await self._cache(
+                _key_name,
                 self._convert_object_to_safe_redis_type(val=value),
-                extra_redis_arguments,
+                with_default_ttl(extra_redis_arguments, self._ttl_for(group)),
             )
 
+        if self._metrics is not None:
+            self._observe("cache_by_group", group, NETWORK, _started)
+        return _res
+
     async def cache(
         self,
         model: ModelPassed,
@@ -212,60 +827,609 @@ class RidantCache(SyncRidantCache):
         extra_redis_arguments: typing.Optional[dict] = {},
         hash: bool = False,
     ) -> Coroutine[bool]:
-        _retrieve_model_name_for_cache = get_name_from_model(model)
-        _generated_key_name = [_retrieve_model_name_for_cache, uid]
+        await self._load_generation(model)
+        _key_name = self._model_key(model, uid)
+        if self._metrics is not None:
+            _group, _started = get_model_metadata(model).group_name, time.perf_counter()
 
+        _index_update = self._model_index_update(model, uid, hash=hash)
+        _ttl = self._model_ttl(model)
         if hash:
             logger.debug(f"hash argument provided, using hset instead of set")
-            return await self._hash_cache(
-                key_name_provided=":".join(_generated_key_name),
-                value_provided=model,
-                extra_redis_arguments=extra_redis_arguments,
+            _mapping = self._hash_mapping(model)
+            if self._metrics is not None:
+                _started = self._observe("cache", _group, SERIALIZE, _started)
+            _res = await self._write_hash(
+                _key_name,
+                _mapping,
+                replace=True,
+                index_update=_index_update,
+                ttl=hash_expiry(extra_redis_arguments, _ttl),
             )
         else:
-            return await self._cache(
-                ":".join(_generated_key_name), model.json(), extra_redis_arguments
+            _payload = self._dump_model(model)
+            if self._metrics is not None:
+                _started = self._observe("cache", _group, SERIALIZE, _started, len(_payload))
+            _res = await self._cache(
+                _key_name, _payload, with_default_ttl(extra_redis_arguments, _ttl), index_update=_index_update
             )
 
+        if self._metrics is not None:
+            self._observe("cache", _group, NETWORK, _started)
+        return _res
+
     async def find_one(
         self,
         model: ModelPassed,
         uid: str,
         specific_attribute: typing.Optional[str] = None,
+        hash: bool = False,
+        fields: typing.Optional[typing.Sequence[str]] = None,
     ) -> Coroutine[typing.Union[ModelPassed, typing.Any]]:
+        await self._load_generation(model)
+        if self._metrics is not None:
+            _group, _started = get_model_metadata(model).group_name, time.perf_counter()
+
+        if fields:
+            _res = await self._find_fields(model, uid, fields, hash=hash)
+            if self._metrics is not None:
+                self._observe("find_one", _group, NETWORK, _started)
+                self._metrics.record_lookup("find_one", _group, _res is not None)
+            return _res
 
         if specific_attribute:
             logger.debug("Attribute args provided, using hget")
-            return await self._hget(
-                key_name_provided=get_name_from_model(model) + ":" + uid,
+            _res = await self._hget(
+                key_name_provided=self._model_key(model, uid),
                 attr=specific_attribute,
+                ttl=self._sliding_ttl(model),
             )
+            if self._metrics is not None:
+                self._observe("find_one", _group, NETWORK, _started)
+                self._metrics.record_lookup("find_one", _group, _res is not None)
+            return _res
 
-        _retrieve_model_name_for_cache = get_name_from_model(model)
-        _generated_key_name = [_retrieve_model_name_for_cache, uid]
+        if hash:
+            logger.debug("hash argument provided, using hgetall instead of get")
+            _fetched_hash = await self._hgetall(self._model_key(model, uid), ttl=self._sliding_ttl(model))
+            if self._metrics is not None:
+                _started = self._observe("find_one", _group, NETWORK, _started)
+            _res = self._parse_fetched_hash(model, _fetched_hash)
+            if self._metrics is not None:
+                self._observe("find_one", _group, DESERIALIZE, _started)
+                self._metrics.record_lookup("find_one", _group, _res is not None)
+            return _res
 
-        _fetched_item = await self._get(":".join(_generated_key_name))
-        if _fetched_item is None:
-            return None
+        _key_name = self._model_key(model, uid)
+        _epoch = None
+        if self._local_cache is not None:
+            _local_item = self._local_cache.get(_key_name)
+            if _local_item is not None:
+                if self._metrics is not None:
+                    self._metrics.record_lookup("find_one", _group, True)
+                return copy.deepcopy(_local_item)
+            _epoch = self._local_cache.epoch
 
-        if not hasattr(model, "parse_raw"):
-            logger.warning(
-                "Older version of pydantic detected, using json.loads instead of parse_raw"
-            )
-            return model(**json.loads(_fetched_item.decode("utf-8")))
-        return model.parse_raw(_fetched_item)
+        _fetched_item = await self._get(_key_name, ttl=self._sliding_ttl(model))
+        if self._metrics is not None:
+            _started = self._observe("find_one", _group, NETWORK, _started, len(_fetched_item or b""))
+        _res = self._parse_fetched_item(model, _fetched_item)
+        if self._metrics is not None:
+            self._observe("find_one", _group, DESERIALIZE, _started)
+            self._metrics.record_lookup("find_one", _group, _res is not None)
+        return self._remember_locally(_key_name, _res, _fetched_item, _epoch, self._model_ttl(model))
 
-    async def find(self, model: ModelPassed) -> Awaitable[typing.Iterator[ModelPassed]]:
-        raise NotImplementedError
+    async def _find_fields(
+        self, model: ModelPassed, uid: str, fields: typing.Sequence[str], hash: bool = False
+    ) -> Coroutine[typing.Optional[typing.Dict[str, typing.Any]]]:
+        _key_name = self._model_key(model, uid)
+        _paths = [split_field(field) for field in fields]
+        if hash:
+            if all(is_hash_leaf(model, path) for path in _paths):
+                _values = await self._redis_hashed_for(_key_name).hmget(_key_name, [":".join(path) for path in _paths])
+                return self._project_hash_values(model, fields, _paths, _values)
+            return self._project_hash(model, fields, await self._hgetall(_key_name))
 
-    async def _clear_key(self, key_name_provided: str) -> Coroutine[bool]:
-        return await self.redis.delete(key_name_provided)
+        if self._local_cache is not None:
+            _local_item = self._local_cache.get(_key_name)
+            if _local_item is not None:
+                return copy.deepcopy(project_model(_local_item, fields))
+        _reply = await self._projection_script(
+            keys=[_key_name], args=projection_arguments(_paths), client=self._redis_for(_key_name)
+        )
+        return self._project_json(model, fields, _paths, _reply)
+
+    async def cache_many(
+        self,
+        items: typing.Iterable[typing.Tuple[ModelPassed, str]],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        batch_size: typing.Optional[int] = None,
+    ) -> Coroutine[bool]:
+        for _chunk in chunked(items, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _group, _started = get_model_metadata(_chunk[0][0]).group_name, time.perf_counter()
+            _values = {}
+            _ttls = {}
+            _index_updates = {}
+            for model, uid in _chunk:
+                await self._load_generation(model)
+                _key_name = self._model_key(model, uid)
+                _values[_key_name] = self._dump_model(model)
+                _ttls[_key_name] = self._model_ttl(model)
+                _index_update = self._model_index_update(model, uid)
+                if _index_update is not None:
+                    _index_updates[_key_name] = _index_update
+            if self._metrics is not None:
+                _started = self._observe("cache_many", _group, SERIALIZE, _started)
+                for _payload in _values.values():
+                    self._metrics.observe_payload("cache_many", _group, len(_payload))
+            # Keys sharing a TTL share a pipeline, usually the whole chunk.
+            _distinct_ttls = set(_ttls.values())
+            for _ttl in _distinct_ttls:
+                _batch = (
+                    _values
+                    if len(_distinct_ttls) == 1
+                    else {key: value for key, value in _values.items() if _ttls[key] == _ttl}
+                )
+                await self._cache_many(_batch, with_default_ttl(extra_redis_arguments, _ttl), _index_updates)
+            if self._metrics is not None:
+                self._observe("cache_many", _group, NETWORK, _started)
+                self._metrics.observe_pipeline("cache_many", _group, len(_values))
+        return True
+
+    async def find_many(
+        self,
+        model: ModelPassed,
+        uids: typing.Iterable[str],
+        batch_size: typing.Optional[int] = None,
+    ) -> Coroutine[typing.List[typing.Optional[ModelPassed]]]:
+        await self._load_generation(model)
+        _metadata = get_model_metadata(model)
+        _key_prefix = self._key_prefix(_metadata)
+        _results = []
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _fetched = await self._mget([_key_prefix + uid for uid in _chunk])
+            if self._metrics is not None:
+                _started = self._observe_many("find_many", _metadata.group_name, _started, _fetched)
+            _results.extend(self._parse_fetched_item(model, item) for item in _fetched)
+            if self._metrics is not None:
+                self._observe("find_many", _metadata.group_name, DESERIALIZE, _started)
+        return _results
+
+    async def find(
+        self,
+        model: ModelPassed,
+        count: typing.Optional[int] = None,
+        batch_size: typing.Optional[int] = None,
+        hash: bool = False,
+        **filters: typing.Any,
+    ) -> typing.AsyncIterator[ModelPassed]:
+        await self._load_generation(model)
+        if filters:
+            async for _item in self._find_indexed(model, filters, batch_size=batch_size, hash=hash):
+                yield _item
+            return
+
+        _pattern = escape_scan_pattern(self._key_prefix(get_model_metadata(model))) + "*"
+        if hash:
+            async for _fetched_hash in self._iter_scanned_hashes(_pattern, count=count, batch_size=batch_size):
+                _item = self._parse_fetched_hash(model, _fetched_hash)
+                # Expired between the SCAN and the HGETALL.
+                if _item is not None:
+                    yield _item
+            return
+        async for _fetched_item in self._iter_scanned_values(_pattern, count=count, batch_size=batch_size):
+            yield self._parse_fetched_item(model, _fetched_item)
 
-    async def delete(self, model: ModelPassed, uid: str) -> Coroutine[bool]:
-        return await self._clear_key(":".join([get_name_from_model(model), uid]))
+    async def _indexed_uids(
+        self, redis_instance: Redis, queries: typing.List[typing.Tuple[str, str, typing.Any]]
+    ) -> Coroutine[typing.List[str]]:
+        async with redis_instance.pipeline(transaction=False) as pipe:
+            for kind, index_key, bounds in queries:
+                if kind == RANGE_INDEX:
+                    pipe.zrangebyscore(index_key, *bounds)
+                else:
+                    pipe.smembers(index_key)
+            _matches = await pipe.execute()
+        # Range matches come in score order, set matches in uid order.
+        _uids = _matches[0] if isinstance(_matches[0], list) else sorted(_matches[0])
+        for _other in _matches[1:]:
+            _other = set(_other)
+            _uids = [uid for uid in _uids if uid in _other]
+        return [uid.decode("utf-8") for uid in _uids]
+
+    async def _find_indexed(
+        self,
+        model: ModelPassed,
+        filters: typing.Dict[str, typing.Any],
+        batch_size: typing.Optional[int] = None,
+        hash: bool = False,
+    ) -> typing.AsyncIterator[ModelPassed]:
+        _metadata = get_model_metadata(model)
+        _key_prefix = self._key_prefix(_metadata)
+        _queries = self._index_queries(model, filters, hash=hash)
+        # Each shard indexes the values it holds, so every shard is asked and reads back its own matches.
+        if self._shard_ring is not None:
+            _clients = list(self._shards.values())
+        else:
+            _clients = [self.redis_hashed if hash else self.redis]
+        _uids = await self._fan_out([self._indexed_uids(client, _queries) for client in _clients])
+
+        for _client, _client_uids in zip(_clients, _uids):
+            for _chunk in chunked(_client_uids, batch_size or self.bulk_batch_size):
+                _key_names = [_key_prefix + uid for uid in _chunk]
+                if hash:
+                    async with _client.pipeline(transaction=False) as pipe:
+                        for _key_name in _key_names:
+                            pipe.hgetall(_key_name)
+                        _found = [self._parse_fetched_hash(model, fetched) for fetched in await pipe.execute()]
+                else:
+                    if self.is_cluster:
+                        _fetched = await _client.mget_nonatomic(_key_names)
+                    else:
+                        _fetched = await _client.mget(_key_names)
+                    _found = [self._parse_fetched_item(model, fetched) for fetched in _fetched]
+
+                _stale = []
+                for uid, item in zip(_chunk, _found):
+                    if item is None:
+                        _stale.append(uid)
+                    else:
+                        yield item
+                if _stale:
+                    await self._prune_index_entries(_client, _metadata, _stale, hash=hash)
+
+    async def _prune_index_entries(
+        self, redis_instance: Redis, metadata: ModelMetadata, uids: typing.List[str], hash: bool = False
+    ) -> Coroutine[None]:
+        async with redis_instance.pipeline(transaction=False) as pipe:
+            for uid in uids:
+                await self._queue_index_update(pipe, self._index_update(metadata, uid, {}, mode=PRUNE, hash=hash))
+            await pipe.execute()
+
+    async def find_by_group(
+        self,
+        group: str,
+        count: typing.Optional[int] = None,
+        batch_size: typing.Optional[int] = None,
+    ) -> typing.AsyncIterator[str]:
+        await self._load_generation(group)
+        _pattern = escape_scan_pattern(self._group_key(group, "")) + "*"
+        async for _fetched_item in self._iter_scanned_values(_pattern, count=count, batch_size=batch_size):
+            yield self._decode_group_item(_fetched_item)
+
+    async def _clear_key(
+        self,
+        key_name_provided: str,
+        index_update: typing.Optional[IndexUpdate] = None,
+        redis_instance: typing.Optional[Redis] = None,
+    ) -> Coroutine[bool]:
+        _redis = redis_instance or self._redis_for(key_name_provided)
+        if index_update is None:
+            _res = await _redis.unlink(key_name_provided)
+        else:
+            async with _redis.pipeline(transaction=not self.is_cluster) as pipe:
+                pipe.unlink(key_name_provided)
+                await self._queue_index_update(pipe, index_update)
+                _res = (await pipe.execute())[0]
+        await self._invalidate_local(key_name_provided)
+        return _res
+
+    async def _delete_model(self, model: ModelPassed, uid: str, hash: bool = False) -> Coroutine[bool]:
+        _metadata = get_model_metadata(model)
+        _key_name = self._key_prefix(_metadata) + uid
+        _index_update = self._index_update(_metadata, uid, {}, hash=hash) if self._indexes_for(_metadata) else None
+        if self._write_behind is not None:
+            return await self._write_later(PendingWrite(UNLINK, _key_name, index_update=_index_update, hash=hash))
+        _redis = self._redis_hashed_for(_key_name) if hash else self._redis_for(_key_name)
+        return await self._clear_key(_key_name, _index_update, redis_instance=_redis)
+
+    async def delete(self, model: ModelPassed, uid: str, hash: bool = False) -> Coroutine[bool]:
+        await self._load_generation(model)
+        if self._metrics is None:
+            return await self._delete_model(model, uid, hash=hash)
+
+        _started = time.perf_counter()
+        _res = await self._delete_model(model, uid, hash=hash)
+        self._observe("delete", get_model_metadata(model).group_name, NETWORK, _started)
+        return _res
 
     async def delete_by_group(self, group: str, uid: str) -> Coroutine[bool]:
-        return await self._clear_key(self.generate_key_name(model=group, uid=uid))
+        await self._load_generation(group)
+        if self._write_behind is not None:
+            return await self._write_later(PendingWrite(UNLINK, self._group_key(group, uid)))
+        if self._metrics is None:
+            return await self._clear_key(self._group_key(group, uid))
+
+        _started = time.perf_counter()
+        _res = await self._clear_key(self._group_key(group, uid))
+        self._observe("delete_by_group", group, NETWORK, _started)
+        return _res
+
+    async def _clear_keys(
+        self,
+        key_names_provided: typing.List[str],
+        index_updates: typing.Optional[typing.List[IndexUpdate]] = None,
+        hash: bool = False,
+    ) -> Coroutine[int]:
+        await self._flush_write_behind()
+        if self._shard_ring is None:
+            _res = await self._clear_keys_on(
+                self.redis_hashed if hash else self.redis, key_names_provided, index_updates
+            )
+        else:
+            _res = sum(
+                await self._fan_out(
+                    [
+                        self._clear_keys_on(
+                            shard,
+                            [key_names_provided[index] for index in indexes],
+                            [index_updates[index] for index in indexes] if index_updates else None,
+                        )
+                        for shard, indexes in self._shard_partitions(key_names_provided)
+                    ]
+                )
+            )
+        await self._invalidate_local(*key_names_provided)
+        return _res
+
+    async def _clear_keys_on(
+        self,
+        redis_instance: Redis,
+        key_names_provided: typing.List[str],
+        index_updates: typing.Optional[typing.List[IndexUpdate]] = None,
+    ) -> Coroutine[int]:
+        if not index_updates:
+            return await redis_instance.unlink(*key_names_provided)
+        async with redis_instance.pipeline(transaction=not self.is_cluster) as pipe:
+            pipe.unlink(*key_names_provided)
+            for _index_update in index_updates:
+                await self._queue_index_update(pipe, _index_update)
+            return (await pipe.execute())[0]
+
+    async def delete_many(
+        self,
+        model: ModelPassed,
+        uids: typing.Iterable[str],
+        batch_size: typing.Optional[int] = None,
+        hash: bool = False,
+    ) -> Coroutine[int]:
+        await self._load_generation(model)
+        _metadata = get_model_metadata(model)
+        _key_prefix = self._key_prefix(_metadata)
+        _indexed = bool(self._indexes_for(_metadata))
+        _deleted = 0
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _deleted += await self._clear_keys(
+                [_key_prefix + uid for uid in _chunk],
+                [self._index_update(_metadata, uid, {}, hash=hash) for uid in _chunk] if _indexed else None,
+                hash=hash,
+            )
+            if self._metrics is not None:
+                self._observe("delete_many", _metadata.group_name, NETWORK, _started)
+                self._metrics.observe_pipeline("delete_many", _metadata.group_name, len(_chunk))
+        return _deleted
+
+    async def delete_many_by_group(
+        self, group: str, uids: typing.Iterable[str], batch_size: typing.Optional[int] = None
+    ) -> Coroutine[int]:
+        await self._load_generation(group)
+        _deleted = 0
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _deleted += await self._clear_keys([self._group_key(group, uid) for uid in _chunk])
+            if self._metrics is not None:
+                self._observe("delete_many_by_group", group, NETWORK, _started)
+                self._metrics.observe_pipeline("delete_many_by_group", group, len(_chunk))
+        return _deleted
+
+    async def purge(
+        self,
+        model: ModelPassed,
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        max_ops_per_second: typing.Optional[float] = None,
+        progress: typing.Optional[typing.Callable[[PurgeProgress], typing.Any]] = None,
+        cursor: typing.Optional[str] = None,
+        max_keys: typing.Optional[int] = None,
+    ) -> Coroutine[PurgeProgress]:
+        """See the sync `RidantCache.purge`, `progress` may return an awaitable."""
+        await self._load_generation(model)
+        _metadata = get_model_metadata(model)
+        _patterns = self._model_scan_patterns(_metadata, pattern)
+        return await self._purge(_metadata.group_name, _patterns, batch_size, max_ops_per_second, progress, cursor, max_keys)
+
+    async def purge_group(
+        self,
+        group: str,
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        max_ops_per_second: typing.Optional[float] = None,
+        progress: typing.Optional[typing.Callable[[PurgeProgress], typing.Any]] = None,
+        cursor: typing.Optional[str] = None,
+        max_keys: typing.Optional[int] = None,
+    ) -> Coroutine[PurgeProgress]:
+        """See the sync `RidantCache.purge_group`, `progress` may return an awaitable."""
+        await self._load_generation(group)
+        _patterns = [escape_scan_pattern(self._group_key(group, "")) + pattern]
+        return await self._purge(group, _patterns, batch_size, max_ops_per_second, progress, cursor, max_keys)
+
+    async def _purge(
+        self,
+        group: str,
+        patterns: typing.List[str],
+        batch_size: typing.Optional[int],
+        max_ops_per_second: typing.Optional[float],
+        progress: typing.Optional[typing.Callable[[PurgeProgress], typing.Any]],
+        cursor: typing.Optional[str],
+        max_keys: typing.Optional[int],
+    ) -> Coroutine[PurgeProgress]:
+        await self._flush_write_behind()
+        _targets = self._scan_targets()
+        _progress = PurgeProgress(patterns, list(_targets), cursor)
+        _throttle = Throttle(max_ops_per_second)
+        while not _progress.done and (max_keys is None or _progress.removed < max_keys):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _target, _cursor = _progress.next_target()
+            _redis, _node = _targets[_target]
+            _cursor, _keys = await self._scan_step(_redis, _node, _cursor, _progress.pattern, batch_size or self.scan_count)
+            _removed = await self._unlink(_redis, _keys) if _keys else 0
+            if _keys:
+                await self._invalidate_local(*(self._decode_group_item(key) for key in _keys))
+            _progress.advance(_target, _cursor, len(_keys), _removed)
+            if self._metrics is not None:
+                self._observe("purge", group, NETWORK, _started)
+                self._metrics.observe_pipeline("purge", group, len(_keys))
+            if progress is not None:
+                _res = progress(_progress)
+                if inspect.isawaitable(_res):
+                    await _res
+            _delay = _throttle.delay(1 + _removed)
+            if _delay:
+                await asyncio.sleep(_delay)
+        return _progress
+
+    @staticmethod
+    async def _scan_step(
+        redis_instance: Redis, node: typing.Any, cursor: int, pattern: str, count: int
+    ) -> Coroutine[typing.Tuple[int, typing.List[bytes]]]:
+        if node is None:
+            return await redis_instance.scan(cursor=cursor, match=pattern, count=count)
+        _cursors, _keys = await redis_instance.scan(cursor=cursor, match=pattern, count=count, target_nodes=node)
+        return _cursors[node.name], _keys
+
+    async def _unlink(self, redis_instance: Redis, key_names_provided: typing.List[bytes]) -> Coroutine[int]:
+        if not self.is_cluster:
+            return await redis_instance.unlink(*key_names_provided)
+        async with redis_instance.pipeline() as pipe:
+            for key_name in key_names_provided:
+                pipe.unlink(key_name)
+            return sum(await pipe.execute())
+
+    async def export_snapshot(
+        self,
+        model: ModelPassed,
+        path: typing.Union[str, os.PathLike],
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        raw: bool = False,
+        chunk_size: int = 1 << 20,
+    ) -> Coroutine[SnapshotStats]:
+        """See the sync `RidantCache.export_snapshot`."""
+        await self._load_generation(model)
+        _metadata = get_model_metadata(model)
+        _patterns = self._model_scan_patterns(_metadata, pattern)
+        return await self._export_snapshot(_metadata.group_name, _patterns, path, batch_size, raw, chunk_size)
+
+    async def export_group_snapshot(
+        self,
+        group: str,
+        path: typing.Union[str, os.PathLike],
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        raw: bool = False,
+        chunk_size: int = 1 << 20,
+    ) -> Coroutine[SnapshotStats]:
+        """See the sync `RidantCache.export_group_snapshot`."""
+        await self._load_generation(group)
+        _patterns = [escape_scan_pattern(self._group_key(group, "")) + pattern]
+        return await self._export_snapshot(group, _patterns, path, batch_size, raw, chunk_size)
+
+    async def _export_snapshot(
+        self,
+        group: str,
+        patterns: typing.List[str],
+        path: typing.Union[str, os.PathLike],
+        batch_size: typing.Optional[int],
+        raw: bool,
+        chunk_size: int,
+    ) -> Coroutine[SnapshotStats]:
+        _metadata = {"group": group, "patterns": patterns, "exported_at": int(time.time() * 1000), "raw": raw}
+        with SnapshotWriter(path, _metadata, chunk_size=chunk_size) as writer:
+            for _target, (_redis, _node) in self._scan_targets().items():
+                for _pattern in patterns:
+                    _cursor = None
+                    while _cursor != 0:
+                        _cursor, _keys = await self._scan_step(
+                            _redis, _node, _cursor or 0, _pattern, batch_size or self.scan_count
+                        )
+                        if _keys:
+                            await self._export_keys(writer, _redis, _keys, raw, _target == "redis_hashed")
+            if self.versioned_namespaces:
+                _key_name = generation_key(group)
+                await self._export_keys(writer, self._redis_for(_key_name), [_key_name.encode("utf-8")], raw, False)
+        return writer.stats
+
+    async def _export_keys(
+        self, writer: SnapshotWriter, redis_instance: Redis, key_names: typing.List[bytes], raw: bool, hash_database: bool
+    ) -> Coroutine[None]:
+        async with redis_instance.pipeline(transaction=False) as pipe:
+            for key_name in key_names:
+                pipe.pttl(key_name)
+                if raw:
+                    pipe.get(key_name)
+                else:
+                    pipe.dump(key_name)
+            _replies = await pipe.execute(raise_on_error=False)
+        _not_strings = []
+        for key_name, ttl, value in zip(key_names, _replies[::2], _replies[1::2]):
+            if isinstance(value, ResponseError) and raw:
+                _not_strings.append(key_name)
+            elif isinstance(value, Exception) or isinstance(ttl, Exception):
+                raise value if isinstance(value, Exception) else ttl
+            elif value is not None and ttl != -2:
+                writer.add(key_name, value, ttl if ttl >= 0 else NO_TTL, dumped=not raw, hash_database=hash_database)
+        if _not_strings:
+            await self._export_keys(writer, redis_instance, _not_strings, False, hash_database)
+
+    async def import_snapshot(
+        self,
+        path: typing.Union[str, os.PathLike],
+        workers: int = 1,
+        replace: bool = True,
+        expire_elapsed: bool = False,
+    ) -> Coroutine[SnapshotStats]:
+        """See the sync `RidantCache.import_snapshot`, `workers` chunks are restored concurrently."""
+        await self._flush_write_behind()
+        _stats = SnapshotStats()
+        with SnapshotReader(path) as reader:
+            _elapsed = int(time.time() * 1000) - reader.metadata["exported_at"] if expire_elapsed else 0
+            _chunks = iter(range(len(reader.chunks)))
+
+            async def _import_chunks() -> None:
+                # Each worker takes the next chunk until there are none left.
+                for index in _chunks:
+                    _restored, _skipped, _expired = await self._restore_entries(reader.read_chunk(index), replace, _elapsed)
+                    _stats.keys += _restored
+                    _stats.skipped += _skipped
+                    _stats.expired += _expired
+                    _stats.chunks += 1
+
+            await asyncio.gather(*(_import_chunks() for _ in range(max(1, workers))))
+            self._generations.discard(reader.metadata["group"])
+        _stats.bytes = os.path.getsize(path)
+        _stats.finished = time.monotonic()
+        return _stats
+
+    async def _restore_entries(
+        self, entries: typing.List[SnapshotEntry], replace: bool, elapsed_ms: int
+    ) -> Coroutine[typing.Tuple[int, int, int]]:
+        _batches, _expired = self._snapshot_batches(entries, elapsed_ms)
+        _restored = _skipped = 0
+        for _redis, items in _batches:
+            async with _redis.pipeline(transaction=False) as pipe:
+                for entry, ttl in items:
+                    self._queue_restore(pipe, entry, ttl, replace)
+                _counts = self._count_restored(await pipe.execute(raise_on_error=False))
+            _restored, _skipped = _restored + _counts[0], _skipped + _counts[1]
+        await self._invalidate_local(*(entry.key.decode("utf-8") for entry in entries))
+        return _restored, _skipped, _expired
 
     async def update(
         self,
@@ -277,24 +1441,272 @@ class RidantCache(SyncRidantCache):
         ],
         extra_redis_arguments: typing.Optional[dict] = {},
     ) -> Coroutine[bool]:
+        await self._load_generation(model)
+        if self._metrics is not None:
+            _started = time.perf_counter()
+            _res = await self._update(model, uid, attribute_to_update, attribute_value_to_be_updated_to, extra_redis_arguments)
+            self._observe("update", get_model_metadata(model).group_name, NETWORK, _started)
+            return _res
+        return await self._update(model, uid, attribute_to_update, attribute_value_to_be_updated_to, extra_redis_arguments)
+
+    async def _update(
+        self,
+        model: ModelPassed,
+        uid: str,
+        attribute_to_update: typing.Optional[str],
+        attribute_value_to_be_updated_to: typing.Optional[
+            typing.Union[str, int, bytes]
+        ],
+        extra_redis_arguments: typing.Optional[dict] = {},
+    ) -> Coroutine[bool]:
+        await self._flush_write_behind()
         if attribute_to_update and attribute_value_to_be_updated_to is not None:
             if isinstance(attribute_value_to_be_updated_to, (list, dict)):
-                logger.warning(
-                    f"Please avoid using lists or dicts, You will need to overwrite the entire key in order to update. Key: {attribute_to_update}, Value: {attribute_value_to_be_updated_to}"
+                # Lists become one JSON field and dicts flattened fields, the way cache(..., hash=True) writes them.
+                _res = await self._partial_update(
+                    "update", model, uid, SET, attribute_to_update, attribute_value_to_be_updated_to, hash=True
                 )
-                return await self._hash_cache(
-                    key_name_provided=get_name_from_model(model) + ":" + uid,
-                    value_provided=json.dumps(attribute_value_to_be_updated_to),
-                    extra_redis_arguments=extra_redis_arguments,
+                return _res is not None
+            _key_name = self._model_key(model, uid)
+            _index_update = self._attribute_index_update(model, uid, attribute_to_update, attribute_value_to_be_updated_to)
+            _stored_value = attribute_value_to_be_updated_to
+            if isinstance(_stored_value, str):
+                _stored_value = escape_hash_string(_stored_value)
+            if _index_update is None:
+                _res = await self._hash_cache_attribute(
+                    key_name=_key_name,
+                    attr=attribute_to_update,
+                    value=_stored_value,
+                    # extra_redis_arguments=extra_redis_arguments,
                 )
-            return await self._hash_cache_attribute(
-                key_name=get_name_from_model(model) + ":" + uid,
-                attr=attribute_to_update,
-                value=attribute_value_to_be_updated_to,
-                # extra_redis_arguments=extra_redis_arguments,
-            )
+            else:
+                async with self._redis_hashed_for(_key_name).pipeline(transaction=not self.is_cluster) as pipe:
+                    pipe.hset(_key_name, attribute_to_update, _stored_value)
+                    await self._queue_index_update(pipe, _index_update)
+                    _res = (await pipe.execute())[0]
+            await self._invalidate_local(_key_name)
+            return _res
         else:
             logger.warning("If you're not updating a specific attribute, use cache()")
-            return self.cache(
+            return await self.cache(
                 model=model, uid=uid, extra_redis_arguments=extra_redis_arguments
             )
+
+    async def update_field(
+        self, model: typing.Type[ModelPassed], uid: str, path: Path, value: typing.Any, hash: bool = False
+    ) -> Coroutine[typing.Any]:
+        return await self._partial_update("update_field", model, uid, SET, path, value, hash=hash)
+
+    async def merge_fields(
+        self, model: typing.Type[ModelPassed], uid: str, path: Path, values: dict, hash: bool = False
+    ) -> Coroutine[typing.Any]:
+        return await self._partial_update("merge_fields", model, uid, MERGE, path, values, hash=hash)
+
+    async def increment(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        path: Path,
+        amount: typing.Union[int, float] = 1,
+        hash: bool = False,
+    ) -> Coroutine[typing.Union[int, float, None]]:
+        return await self._partial_update("increment", model, uid, INCREMENT, path, amount, hash=hash)
+
+    async def append(
+        self, model: typing.Type[ModelPassed], uid: str, path: Path, *values: typing.Any, hash: bool = False
+    ) -> Coroutine[typing.Optional[list]]:
+        return await self._partial_update("append", model, uid, APPEND, path, values, hash=hash)
+
+    async def _partial_update(
+        self,
+        operation_name: str,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        operation: str,
+        path: Path,
+        value: typing.Any,
+        hash: bool = False,
+    ) -> Coroutine[typing.Any]:
+        await self._load_generation(model)
+        await self._flush_write_behind()
+        _key_name = self._model_key(model, uid)
+        _path = split_path(path)
+        if hash and below_hash_leaf(model, _path):
+            raise ValueError(
+                f"Unable to {operation} {_path} of '{_key_name}': hash mode stores the field it is in as one JSON value"
+            )
+        _arguments = script_arguments(operation, _path, partial_update_arguments(operation, _path, value, hash))
+        if self._metrics is not None:
+            _started = time.perf_counter()
+
+        try:
+            if hash:
+                _reply = await self._hash_update_script(
+                    keys=[_key_name], args=_arguments, client=self._redis_hashed_for(_key_name)
+                )
+            else:
+                _reply = await self._json_update_script(keys=[_key_name], args=_arguments, client=self._redis_for(_key_name))
+        except ResponseError as error:
+            logger.exception(f"Unable to {operation} {_path} of '{_key_name}'")
+            raise ValueError(f"Unable to {operation} {_path} of '{_key_name}': {error}")
+
+        if self._metrics is not None:
+            self._observe(operation_name, get_model_metadata(model).group_name, NETWORK, _started)
+        await self._invalidate_local(_key_name)
+        _res = decode_hash_reply(_path, operation, _reply) if hash else decode_json_reply(_reply)
+        _metadata = get_model_metadata(model)
+        if _res is not None and self._indexes_for(_metadata):
+            _values = indexed_values_below(_metadata.indexes, _path, _res)
+            if _values:
+                await self._run_index_update(
+                    self._redis_hashed_for(_key_name) if hash else self._redis_for(_key_name),
+                    self._index_update(_metadata, uid, _values, mode=PATCH, hash=hash),
+                )
+        return _res
+
+    def cached(
+        self,
+        model: typing.Type[ModelPassed],
+        key: KeyBuilder,
+        ttl: typing.Optional[float] = None,
+        lock_timeout: float = 10.0,
+        lock_wait: typing.Optional[float] = None,
+        lock_poll_interval: float = 0.05,
+        early_recompute: typing.Optional[float] = None,
+    ) -> typing.Callable[[typing.Callable[..., typing.Any]], typing.Callable[..., Coroutine[ModelPassed]]]:
+        """Read-through caching decorator, see the sync `RidantCache.cached`.
+
+        The decorated function may be a coroutine function or a plain function,
+        the wrapper is always a coroutine function.
+        """
+        _policy = ReadThroughPolicy(
+            ttl=ttl,
+            lock_timeout=lock_timeout,
+            lock_wait=lock_wait,
+            lock_poll_interval=lock_poll_interval,
+            early_recompute=early_recompute,
+        )
+
+        def _decorator(func: typing.Callable[..., typing.Any]) -> typing.Callable[..., Coroutine[ModelPassed]]:
+            _resolve_key = key_resolver(key, func)
+
+            async def _loader(args: tuple, kwargs: dict) -> typing.Any:
+                _res = func(*args, **kwargs)
+                if inspect.isawaitable(_res):
+                    _res = await _res
+                return _res
+
+            @functools.wraps(func)
+            async def _wrapper(*args, **kwargs) -> ModelPassed:
+                return await self._read_through(
+                    model, _resolve_key(args, kwargs), lambda: _loader(args, kwargs), _policy
+                )
+
+            return _wrapper
+
+        return _decorator
+
+    async def _acquire_lock(self, key_name_provided: str, timeout: float) -> Coroutine[typing.Optional[str]]:
+        _token = uuid.uuid4().hex
+        if await self._redis_for(key_name_provided).set(LOCK_PREFIX + key_name_provided, _token, nx=True, px=int(timeout * 1000)):
+            return _token
+        return None
+
+    async def _release_lock(self, key_name_provided: str, token: str) -> Coroutine[None]:
+        await self._release_lock_script(
+            keys=[LOCK_PREFIX + key_name_provided], args=[token], client=self._redis_for(key_name_provided)
+        )
+
+    async def _get_with_expiry(
+        self, key_name_provided: str
+    ) -> Coroutine[typing.Tuple[typing.Optional[bytes], int, typing.Optional[float]]]:
+        async with self._redis_for(key_name_provided).pipeline(transaction=False) as pipe:
+            pipe.get(key_name_provided)
+            pipe.pttl(key_name_provided)
+            pipe.get(DELTA_PREFIX + key_name_provided)
+            _fetched_item, _remaining_ms, _delta_ms = await pipe.execute()
+        return _fetched_item, _remaining_ms, float(_delta_ms) if _delta_ms is not None else None
+
+    async def _load_and_cache(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        loader: typing.Callable[[], typing.Awaitable],
+        policy: ReadThroughPolicy,
+    ) -> Coroutine[typing.Optional[ModelPassed]]:
+        _started = time.perf_counter()
+        _res = await loader()
+        if _res is None:
+            return None
+        if not isinstance(_res, model):
+            _res = model.parse_obj(_res)
+
+        await self.cache(_res, uid, extra_redis_arguments=policy.extra_redis_arguments)
+        if policy.early_recompute is not None:
+            _key_name = self._model_key(model, uid)
+            await self._redis_for(_key_name).set(
+                DELTA_PREFIX + _key_name,
+                (time.perf_counter() - _started) * 1000,
+                **policy.extra_redis_arguments,
+            )
+        return _res
+
+    async def _load_on_miss(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        loader: typing.Callable[[], typing.Awaitable],
+        policy: ReadThroughPolicy,
+    ) -> Coroutine[typing.Optional[ModelPassed]]:
+        _key_name = self._model_key(model, uid)
+        _deadline = time.monotonic() + policy.lock_wait
+        _waited = False
+        while True:
+            _token = await self._acquire_lock(_key_name, policy.lock_timeout)
+            if _token is not None:
+                try:
+                    # Whoever held the lock before us has most likely filled the key.
+                    _res = await self.find_one(model, uid) if _waited else None
+                    return _res if _res is not None else await self._load_and_cache(model, uid, loader, policy)
+                finally:
+                    await self._release_lock(_key_name, _token)
+
+            if time.monotonic() >= _deadline:
+                logger.warning(f"Gave up waiting for the lock on '{_key_name}', loading it anyway")
+                return await self._load_and_cache(model, uid, loader, policy)
+
+            await asyncio.sleep(policy.lock_poll_interval)
+            _waited = True
+            _res = await self.find_one(model, uid)
+            if _res is not None:
+                return _res
+
+    async def _read_through(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        loader: typing.Callable[[], typing.Awaitable],
+        policy: ReadThroughPolicy,
+    ) -> Coroutine[typing.Optional[ModelPassed]]:
+        await self._load_generation(model)
+        _key_name = self._model_key(model, uid)
+        if policy.early_recompute is None:
+            _res = await self.find_one(model, uid)
+            if _res is not None:
+                return _res
+        else:
+            _fetched_item, _remaining_ms, _delta_ms = await self._get_with_expiry(_key_name)
+            if _fetched_item is not None:
+                _res = self._parse_fetched_item(model, _fetched_item)
+                if not should_recompute_early(_remaining_ms, _delta_ms, policy.early_recompute):
+                    return _res
+                # Only the caller winning the lock refreshes, the rest keep serving the current value.
+                _token = await self._acquire_lock(_key_name, policy.lock_timeout)
+                if _token is None:
+                    return _res
+                try:
+                    return await self._load_and_cache(model, uid, loader, policy) or _res
+                finally:
+                    await self._release_lock(_key_name, _token)
+
+        return await self._single_flight.do(_key_name, lambda: self._load_on_miss(model, uid, loader, policy))
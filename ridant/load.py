@@ -0,0 +1,344 @@
+"""Bulk load (warm up) a cache from a JSONL file or any iterable of models.
+
+Examples:
+    python -m ridant.load app.models:Cart carts.jsonl --uid-field metadata.cart_id
+    python -m ridant.load app.models:Cart carts.jsonl --uid-field id --workers 4 --ttl 3600
+    zcat carts.jsonl.gz | python -m ridant.load app.models:Cart - --uid-field id --hash --hash-database 1
+"""
+import argparse
+import collections
+import importlib
+import os
+import sys
+import time
+import typing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from loguru import logger
+from pydantic import BaseModel
+
+from ridant.main import RidantCache
+from ridant.utils.caching_tools import chunked
+from ridant.utils.compression import ValueCompressor
+from ridant.utils.expiry import TTL, ttl_milliseconds, with_default_ttl
+from ridant.utils.hash_plans import flatten_model
+from ridant.utils.indexes import field_value
+from ridant.utils.model_registry import get_model_metadata
+from ridant.utils.serializers import Serializer, encode_model
+from ridant.utils.trusted_decode import add_fingerprint, schema_fingerprint, supports_trusted_decode
+
+# A record: a JSON line (str or bytes), a dict or a model instance.
+Record = typing.Union[str, bytes, dict, BaseModel]
+# What is written for a record: its uid, payload (or hash mapping) and the values of its indexed fields.
+EncodedRecord = typing.Tuple[str, typing.Union[bytes, dict], typing.Dict[str, typing.Any]]
+
+
+class LoadReport(object):
+    """Progress of a load, passed to the `progress` callback while it runs and returned at the end."""
+
+    __slots__ = ("read", "loaded", "failed", "batches", "started")
+
+    def __init__(self) -> None:
+        self.read = 0
+        self.loaded = 0
+        self.failed = 0
+        self.batches = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Records written per second."""
+        return self.loaded / max(self.elapsed, 1e-9)
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        _report = {name: getattr(self, name) for name in ("read", "loaded", "failed", "batches")}
+        _report.update(elapsed=self.elapsed, rate=self.rate)
+        return _report
+
+    def __repr__(self) -> str:
+        return f"<LoadReport loaded={self.loaded} failed={self.failed} rate={self.rate:.0f}/s>"
+
+
+class ModelEncoder(object):
+    """Validates records and encodes them the way `cache()` would, in this process or in a worker.
+
+    Picklable, so worker processes get their own copy; they keep compression stats of their own.
+    """
+
+    def __init__(
+        self,
+        model: typing.Type[BaseModel],
+        uid_field: str,
+        hash: bool,
+        serializer: Serializer,
+        trusted_decode: bool = False,
+        compressor: typing.Optional[ValueCompressor] = None,
+        index_fields: typing.Sequence[str] = (),
+    ) -> None:
+        self.model = model
+        self.uid_field = uid_field
+        self.hash = hash
+        self.serializer = serializer
+        self.trusted_decode = trusted_decode and supports_trusted_decode(model)
+        self.compressor = compressor
+        self.index_fields = list(index_fields)
+        self.group = get_model_metadata(model).group_name
+
+    @classmethod
+    def from_cache(cls, cache: RidantCache, model: typing.Type[BaseModel], uid_field: str, hash: bool) -> "ModelEncoder":
+        _metadata = get_model_metadata(model)
+        return cls(
+            model,
+            uid_field,
+            hash,
+            cache._serializer_for(model),
+            trusted_decode=cache.trusted_decode,
+            compressor=cache._value_compressor,
+            index_fields=cache._indexes_for(_metadata),
+        )
+
+    def __getstate__(self) -> dict:
+        _state = dict(self.__dict__)
+        if self.compressor is not None:
+            # Compression stats hold a lock, workers rebuild the compressor from its settings.
+            _state["compressor"] = (self.compressor.compressor.name, self.compressor.threshold)
+        return _state
+
+    def __setstate__(self, state: dict) -> None:
+        if state["compressor"] is not None:
+            state["compressor"] = ValueCompressor(*state["compressor"])
+        self.__dict__.update(state)
+
+    def parse(self, record: Record) -> BaseModel:
+        if isinstance(record, self.model):
+            return record
+        if isinstance(record, dict):
+            return self.model.parse_obj(record)
+        return self.model.parse_raw(record)
+
+    def encode(self, record: Record) -> EncodedRecord:
+        _model = self.parse(record)
+        _uid = field_value(_model, self.uid_field)
+        if _uid is None:
+            raise ValueError(f"The record has no '{self.uid_field}'.")
+        if self.hash:
+            _value = flatten_model(_model)
+        else:
+            _value = encode_model(_model, self.serializer)
+            if self.trusted_decode:
+                _value = add_fingerprint(schema_fingerprint(self.model), _value)
+            if self.compressor is not None:
+                _value = self.compressor.compress(_value, self.group)
+        return str(_uid), _value, {field: field_value(_model, field) for field in self.index_fields}
+
+    def encode_many(
+        self, records: typing.Sequence[typing.Tuple[int, Record]]
+    ) -> typing.Tuple[typing.List[EncodedRecord], typing.List[typing.Tuple[int, str]]]:
+        """Encode numbered records, returns what to write and the (number, error) of the invalid ones."""
+        _encoded, _failures = [], []
+        for number, record in records:
+            try:
+                _encoded.append(self.encode(record))
+            except Exception as error:
+                _failures.append((number, f"{error.__class__.__name__}: {error}"))
+        return _encoded, _failures
+
+
+_WORKER_ENCODER: typing.Optional[ModelEncoder] = None
+
+
+def _init_worker(encoder: ModelEncoder) -> None:
+    global _WORKER_ENCODER
+    _WORKER_ENCODER = encoder
+
+
+def _encode_in_worker(records: typing.Sequence[typing.Tuple[int, Record]]):
+    return _WORKER_ENCODER.encode_many(records)
+
+
+def read_records(source: typing.Union[str, os.PathLike, typing.Iterable[Record]]) -> typing.Iterator[Record]:
+    """Records of a JSONL file ("-" for stdin, blank lines skipped), or of an iterable as they are."""
+    if not isinstance(source, (str, os.PathLike)):
+        yield from source
+        return
+    if source == "-":
+        yield from (line for line in sys.stdin.buffer if line.strip())
+        return
+    with open(source, "rb") as records_file:
+        yield from (line for line in records_file if line.strip())
+
+
+def load(
+    cache: RidantCache,
+    model: typing.Type[BaseModel],
+    source: typing.Union[str, os.PathLike, typing.Iterable[Record]],
+    uid_field: str,
+    batch_size: typing.Optional[int] = None,
+    workers: int = 0,
+    hash: bool = False,
+    ttl: typing.Optional[TTL] = None,
+    skip_invalid: bool = False,
+    progress: typing.Optional[typing.Callable[[LoadReport], None]] = None,
+    progress_interval: float = 1.0,
+) -> LoadReport:
+    """Validate records against `model` and cache them, one pipelined batch at a time.
+
+    Args:
+        cache (RidantCache): the cache to fill.
+        model (typing.Type[BaseModel]): model class every record is validated against.
+        source (typing.Union[str, os.PathLike, typing.Iterable[Record]]): JSONL file path ("-" for stdin),
+            or an iterable of JSON strings, dicts or model instances.
+        uid_field (str): field holding each record's uid, dotted for nested fields ("metadata.cart_id").
+        batch_size (typing.Optional[int], optional): records per pipeline. Defaults to the cache's bulk_batch_size.
+        workers (int, optional): processes validating and serializing batches while this one writes. Defaults to 0,
+            everything in this process.
+        hash (bool, optional): cache records as hashes. Defaults to False.
+        ttl (typing.Optional[TTL], optional): TTL of the keys, the model's default TTL when None.
+        skip_invalid (bool, optional): count and log invalid records instead of raising. Defaults to False.
+        progress (typing.Optional[typing.Callable[[LoadReport], None]], optional): called every `progress_interval`
+            seconds and once at the end.
+        progress_interval (float, optional): seconds between progress calls. Defaults to 1.0.
+
+    Raises:
+        ValueError: a record is invalid and `skip_invalid` is not set. Batches before it were written.
+
+    Returns:
+        LoadReport: records read, loaded and failed, and the throughput.
+    """
+    _metadata = get_model_metadata(model)
+    _ttl = ttl_milliseconds(ttl) if ttl is not None else cache._model_ttl(model)
+    _encoder = ModelEncoder.from_cache(cache, model, uid_field, hash)
+    _report = LoadReport()
+    _last_progress = time.monotonic()
+    _batches = chunked(enumerate(read_records(source), start=1), batch_size or cache.bulk_batch_size)
+
+    def _write(encoded: typing.List[EncodedRecord], failures: typing.List[typing.Tuple[int, str]], size: int) -> None:
+        nonlocal _last_progress
+        _report.read += size
+        if failures:
+            if not skip_invalid:
+                raise ValueError(f"Invalid record #{failures[0][0]}: {failures[0][1]}")
+            for number, error in failures:
+                logger.warning(f"Skipping invalid record #{number}: {error}")
+            _report.failed += len(failures)
+        if encoded:
+            _key_prefix = cache._key_prefix(_metadata)
+            _values = {_key_prefix + uid: value for uid, value, _ in encoded}
+            _index_updates = {
+                _key_prefix + uid: cache._index_update(_metadata, uid, index_values, hash=hash)
+                for uid, _, index_values in encoded
+                if index_values
+            }
+            if hash:
+                cache._cache_many_hashes(_values, _ttl, _index_updates)
+            else:
+                cache._cache_many(_values, with_default_ttl({}, _ttl), _index_updates)
+            _report.loaded += len(encoded)
+        _report.batches += 1
+        if progress is not None and time.monotonic() - _last_progress >= progress_interval:
+            _last_progress = time.monotonic()
+            progress(_report)
+
+    if workers <= 0:
+        for batch in _batches:
+            _write(*_encoder.encode_many(batch), len(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(_encoder,)) as executor:
+            # A few batches per worker in flight keeps workers busy without reading the whole source ahead.
+            _pending: typing.Deque[typing.Tuple[Future, int]] = collections.deque()
+            for batch in _batches:
+                _pending.append((executor.submit(_encode_in_worker, batch), len(batch)))
+                if len(_pending) >= workers * 2:
+                    _future, _size = _pending.popleft()
+                    _write(*_future.result(), _size)
+            while _pending:
+                _future, _size = _pending.popleft()
+                _write(*_future.result(), _size)
+
+    if progress is not None:
+        progress(_report)
+    return _report
+
+
+def import_model(path: str) -> typing.Type[BaseModel]:
+    """A model class from "package.module:ClassName"."""
+    _module_name, _, _name = path.partition(":")
+    if not _name:
+        raise ValueError(f"Expected 'package.module:ClassName', got '{path}'.")
+    _model = importlib.import_module(_module_name)
+    for attribute in _name.split("."):
+        _model = getattr(_model, attribute)
+    return _model
+
+
+def _print_progress(report: LoadReport) -> None:
+    print(
+        f"{report.loaded} loaded, {report.failed} invalid, {report.elapsed:.1f}s, {report.rate:,.0f} records/s",
+        file=sys.stderr,
+    )
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    _parser = argparse.ArgumentParser(
+        prog="python -m ridant.load", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    _parser.add_argument("model", help="model class, as package.module:ClassName")
+    _parser.add_argument("source", help="JSONL file, - for stdin")
+    _parser.add_argument("--uid-field", required=True, help="field holding the uid, dotted for nested fields")
+    _parser.add_argument("--redis-host", default="localhost")
+    _parser.add_argument("--redis-port", type=int, default=6379)
+    _parser.add_argument("--redis-database", type=int, default=0)
+    _parser.add_argument("--hash", action="store_true", help="cache records as hashes")
+    _parser.add_argument("--hash-database", type=int, default=None, help="database of hashes, required with --hash")
+    _parser.add_argument("--ttl", type=float, default=None, help="TTL in seconds, the model's default when omitted")
+    _parser.add_argument("--batch-size", type=int, default=500)
+    _parser.add_argument("--workers", type=int, default=0, help="processes validating and serializing records")
+    _parser.add_argument("--serializer", default=None, help="json (default), orjson or msgpack")
+    _parser.add_argument("--compression", default=None, help="zlib, lz4 or zstd")
+    _parser.add_argument("--trusted-decode", action="store_true", help="write schema fingerprints, see trusted_decode")
+    _parser.add_argument("--skip-invalid", action="store_true", help="skip invalid records instead of stopping")
+    _parser.add_argument("--quiet", action="store_true", help="only print the final report")
+    _args = _parser.parse_args(argv)
+    if _args.hash and _args.hash_database is None:
+        _parser.error("--hash needs --hash-database")
+
+    # ridant logs every call at DEBUG, keep warnings (skipped records) only.
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    _cache = RidantCache(
+        redis_host=_args.redis_host,
+        redis_port=_args.redis_port,
+        redis_database=_args.redis_database,
+        redis_database_for_hash=_args.hash_database,
+        serializer=_args.serializer,
+        compression=_args.compression,
+        trusted_decode=_args.trusted_decode,
+    )
+    try:
+        _report = load(
+            _cache,
+            import_model(_args.model),
+            _args.source,
+            uid_field=_args.uid_field,
+            batch_size=_args.batch_size,
+            workers=_args.workers,
+            hash=_args.hash,
+            ttl=_args.ttl,
+            skip_invalid=_args.skip_invalid,
+            progress=None if _args.quiet else _print_progress,
+        )
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    if _args.quiet:
+        _print_progress(_report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,104 @@
 import typing
-from ridant.utils.convert_model_to_string_key import get_name_from_model
+from ridant.utils.model_registry import ModelMetadata, get_model_metadata
 from loguru import logger
 from redis import Redis, ConnectionPool
+from redis.exceptions import ResponseError
+from redis.cluster import RedisCluster
 from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
 from collections.abc import Awaitable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import functools
 import json
-from ridant.utils.caching_tools import flatten_dict_for_caching
+import os
+import threading
+import time
+import uuid
+from ridant.utils.caching_tools import (
+    flatten_dict_for_caching,
+    chunked,
+    escape_hash_string,
+    escape_scan_pattern,
+)
+from ridant.utils.hash_plans import flatten_model, unflatten_model
+from ridant.utils.local_cache import LocalCache
+from ridant.utils.indexes import (
+    INDEX_SCRIPT,
+    PATCH,
+    PRUNE,
+    RANGE_INDEX,
+    REPLACE,
+    IndexUpdate,
+    entries_key,
+    field_value,
+    index_arguments,
+    index_key_prefix,
+    index_value,
+    indexed_values_below,
+    range_index_key,
+    score_bounds,
+    set_index_key,
+)
+from ridant.utils.partial_update import (
+    APPEND,
+    HASH_UPDATE_SCRIPT,
+    INCREMENT,
+    JSON_UPDATE_SCRIPT,
+    MERGE,
+    SET,
+    Path,
+    decode_hash_reply,
+    decode_json_reply,
+    partial_update_arguments,
+    script_arguments,
+    split_path,
+)
+from ridant.utils.projection import (
+    PROJECTION_SCRIPT,
+    below_hash_leaf,
+    decode_hash_value,
+    is_hash_leaf,
+    model_field,
+    project_model,
+    projection_arguments,
+    split_field,
+    validate_field,
+)
+from ridant.utils.sharding import ConsistentHashRing, shard_name
+from ridant.utils.serializers import Serializer, get_serializer, encode_model, decode_model, to_jsonable
+from ridant.utils.cluster import WRITE_HASH_SCRIPT, flatten_mapping_arguments, hash_tag
+from ridant.utils.compression import Compressor, ValueCompressor, decompress_value
+from ridant.utils.namespaces import (
+    GenerationCache,
+    generation_key,
+    is_reclaimable,
+    reclaim_patterns,
+    versioned_prefix,
+)
+from ridant.utils.purge import PurgeProgress, Throttle
+from ridant.utils.expiry import KEEP_TTL, TTL, hash_expiry, ttl_milliseconds, with_default_ttl
+from ridant.utils.pools import pool_stats, shared_pools
+from ridant.utils.snapshot import NO_TTL, SnapshotEntry, SnapshotReader, SnapshotStats, SnapshotWriter, remaining_ttl
+from ridant.utils.trusted_decode import (
+    MISS,
+    VALIDATE,
+    add_fingerprint,
+    schema_fingerprint,
+    split_fingerprint,
+    supports_trusted_decode,
+)
+from ridant.utils.metrics import MetricsCollector, NETWORK, SERIALIZE, DESERIALIZE
+from ridant.utils.read_through import (
+    DELTA_PREFIX,
+    LOCK_PREFIX,
+    RELEASE_LOCK_SCRIPT,
+    KeyBuilder,
+    ReadThroughPolicy,
+    SingleFlight,
+    key_resolver,
+    should_recompute_early,
+)
 
 if typing.TYPE_CHECKING:
     from odmantic import Model
@@ -23,12 +116,50 @@ class RidantCache(object):
         default_hset_uid_key: typing.Optional[str] = None,
         use_different_db_for_hash: bool = False,
         redis_database_for_hash: typing.Optional[int] = None,
+        bulk_batch_size: int = 500,
+        local_cache: typing.Optional[LocalCache] = None,
+        invalidation_channel: typing.Optional[str] = None,
+        scan_count: int = 1000,
+        serializer: typing.Union[str, Serializer, None] = None,
+        compression: typing.Union[str, Compressor, None] = None,
+        compression_threshold: int = 1024,
+        hash_field_batch_size: int = 1000,
+        metrics: typing.Optional[MetricsCollector] = None,
+        redis_cluster: typing.Optional[RedisCluster] = None,
+        hash_tag_groups: bool = False,
+        redis_shards: typing.Union[typing.Sequence[ConnectionPool], typing.Dict[str, ConnectionPool], None] = None,
+        shard_virtual_nodes: int = 160,
+        trusted_decode: bool = False,
+        schema_mismatch: str = VALIDATE,
+        versioned_namespaces: bool = False,
+        generation_ttl: float = 1.0,
+        ttls: typing.Optional[typing.Dict[typing.Union[type, str], typing.Optional[TTL]]] = None,
+        sliding_expiration: bool = False,
+        blocking_pool: bool = False,
+        max_connections: typing.Optional[int] = None,
+        pool_timeout: float = 20.0,
         **kwargs,
     ) -> None:
-        if redis_connection_pool is None:
-            logger.warning(
-                "No redis connection pool provided, this is recommended. Using arguments provided (if any)"
-            )
+        if redis_shards and redis_cluster is not None:
+            raise ValueError("Use either redis_cluster or redis_shards, not both.")
+        if schema_mismatch not in (VALIDATE, MISS):
+            raise ValueError(f"schema_mismatch must be '{VALIDATE}' or '{MISS}', not '{schema_mismatch}'.")
+        self._shards: typing.Dict[str, Redis] = {}
+        self._shard_ring = None
+        self._shard_executor = None
+        if redis_shards:
+            if not isinstance(redis_shards, dict):
+                redis_shards = {shard_name(pool.connection_kwargs): pool for pool in redis_shards}
+            self._shards = {name: Redis(connection_pool=pool) for name, pool in redis_shards.items()}
+            self._shard_ring = ConsistentHashRing(self._shards, virtual_nodes=shard_virtual_nodes)
+            self._shard_executor = ThreadPoolExecutor(max_workers=len(self._shards), thread_name_prefix="ridant-shard")
+            # Everything not tied to a key (pub/sub, scripts) goes through the first shard.
+            redis_connection_pool = next(iter(redis_shards.values()))
+
+        if redis_cluster is not None:
+            logger.debug("Using redis cluster client provided")
+        elif redis_connection_pool is None:
+            logger.debug("No redis connection pool provided, using the process's shared pool of the arguments provided (if any)")
             if redis_host is None:
                 logger.warning("No redis host provided, using default: localhost")
                 redis_host = "localhost"
@@ -37,26 +168,58 @@ class RidantCache(object):
                 redis_port = 6379
             if redis_database is None:
                 logger.warning("No redis database provided, using default: 0")
-                redis_host = 0
+                redis_database = 0
 
             self.redis_host, self.redis_port, self.redis_database = (
                 redis_host,
                 redis_port,
                 redis_database,
             )
+            redis_connection_pool = shared_pools.get_pool(
+                host=redis_host,
+                port=redis_port,
+                db=redis_database,
+                blocking=blocking_pool,
+                max_connections=max_connections,
+                timeout=pool_timeout,
+            )
         else:
             logger.debug("Using redis connection pool provided")
 
         self.default_hset_uid_key = default_hset_uid_key
+        self.bulk_batch_size = bulk_batch_size
+        self.scan_count = scan_count
+        self.hash_field_batch_size = hash_field_batch_size
+        self._metrics = metrics
+        self.serializer = get_serializer(serializer)
+        self._value_compressor = (
+            ValueCompressor(compression, threshold=compression_threshold) if compression is not None else None
+        )
+        # Values are written with their model's schema fingerprint, and read without full validation while it matches.
+        self.trusted_decode = trusted_decode
+        self.schema_mismatch = schema_mismatch
+        self._local_cache = local_cache
+        self.invalidation_channel = invalidation_channel
+        self._invalidation_listener = None
+        self.hash_tag_groups = hash_tag_groups
+        self.is_cluster = redis_cluster is not None
+        # Key prefixes carry a per group generation, invalidating a group moves it to a new one.
+        self.versioned_namespaces = versioned_namespaces
+        self._generations = GenerationCache(ttl=generation_ttl)
+        # Default TTLs registered on this cache by group, in milliseconds, see set_ttl.
+        self._ttls: typing.Dict[str, typing.Optional[int]] = {}
+        for _model_or_group, _ttl in (ttls or {}).items():
+            self.set_ttl(_model_or_group, _ttl)
+        # find_one pushes the expiry of keys with a TTL back on every read.
+        self.sliding_expiration = sliding_expiration
 
-        if redis_database_for_hash:
+        if redis_cluster is not None:
+            # A cluster only has database 0, hash mode goes through the same client.
+            self._redis_connection_hash_only = redis_cluster
+        elif redis_database_for_hash:
+            # A client given a pool ignores its db argument, hash mode needs a pool of its own database.
             self._redis_connection_hash_only = Redis(
-                connection_pool=redis_connection_pool,
-                port=redis_port,
-                host=redis_host,
-                db=redis_database_for_hash
-                if redis_database_for_hash
-                else redis_database,
+                connection_pool=shared_pools.pool_for_database(redis_connection_pool, redis_database_for_hash)
             )
             logger.debug(
                 f"Redis Hashed Connection Information: <host: {redis_host}, port: {redis_port}, db: {redis_database_for_hash if redis_database_for_hash else redis_database}>"
@@ -65,9 +228,18 @@ class RidantCache(object):
             self._redis_connection_hash_only = None
             logger.debug(f"Redis Hashed Connection Information: <none>")
 
-        self._redis_connection = Redis(
-            connection_pool=redis_connection_pool,
+        self._redis_connection = (
+            redis_cluster if redis_cluster is not None else Redis(connection_pool=redis_connection_pool)
+        )
+        self._write_hash_script = (
+            self._redis_connection.register_script(WRITE_HASH_SCRIPT) if redis_cluster is not None else None
         )
+        self._json_update_script = self._redis_connection.register_script(JSON_UPDATE_SCRIPT)
+        self._hash_update_script = self._redis_connection.register_script(HASH_UPDATE_SCRIPT)
+        self._index_script = self._redis_connection.register_script(INDEX_SCRIPT)
+        self._projection_script = self._redis_connection.register_script(PROJECTION_SCRIPT)
+        self._single_flight = SingleFlight()
+        self._release_lock_script = self._redis_connection.register_script(RELEASE_LOCK_SCRIPT)
         logger.debug(
             f"Redis Connection Information: <host: {redis_host}, port: {redis_port}, db: {redis_database}>"
         )
@@ -76,6 +248,97 @@ class RidantCache(object):
     def redis(self) -> Redis:
         return self._redis_connection
 
+    @property
+    def local_cache(self) -> typing.Optional[LocalCache]:
+        return self._local_cache
+
+    @property
+    def metrics(self) -> typing.Optional[MetricsCollector]:
+        return self._metrics
+
+    def pool_stats(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """Connection stats of the pools this cache uses ("redis", "redis_hashed"), see PoolStats.
+
+        Only pools from a PoolManager (the ones built when no pool is passed) keep stats.
+        """
+        _stats = {}
+        for name, client in (("redis", self._redis_connection), ("redis_hashed", self._redis_connection_hash_only)):
+            _pool_stats = pool_stats(getattr(client, "connection_pool", None))
+            if _pool_stats is not None:
+                _stats[name] = _pool_stats
+        return _stats
+
+    def _observe(
+        self, operation: str, group: str, phase: str, started: float, size: typing.Optional[int] = None
+    ) -> float:
+        # Only called when metrics are enabled, returns the time to start the next phase from.
+        _now = time.perf_counter()
+        self._metrics.observe_latency(operation, group, phase, _now - started)
+        if size is not None:
+            self._metrics.observe_payload(operation, group, size)
+        return _now
+
+    def _observe_many(
+        self, operation: str, group: str, started: float, fetched_items: typing.List[typing.Optional[bytes]]
+    ) -> float:
+        _now = self._observe(operation, group, NETWORK, started)
+        self._metrics.observe_pipeline(operation, group, len(fetched_items))
+        for item in fetched_items:
+            if item is not None:
+                self._metrics.observe_payload(operation, group, len(item))
+            self._metrics.record_lookup(operation, group, item is not None)
+        return _now
+
+    def _invalidate_local(self, *key_names_provided: str) -> None:
+        if self._local_cache is not None:
+            self._local_cache.discard(*key_names_provided)
+        # Other clients may hold a local copy even when this one has none.
+        if self.invalidation_channel is not None:
+            self.redis.publish(self.invalidation_channel, json.dumps(key_names_provided))
+
+    def _handle_invalidation_message(self, message: dict) -> None:
+        if self._local_cache is None:
+            return
+        try:
+            self._local_cache.discard(*json.loads(message["data"]))
+        except Exception:
+            logger.exception("Unable to process invalidation message, clearing local cache")
+            self._local_cache.clear()
+
+    def start_invalidation_listener(self, sleep_time: float = 0.1) -> None:
+        if self.invalidation_channel is None:
+            raise ValueError("No invalidation channel provided.")
+        if self._invalidation_listener is not None:
+            return
+
+        _pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        _pubsub.subscribe(**{self.invalidation_channel: self._handle_invalidation_message})
+        self._invalidation_listener = _pubsub.run_in_thread(sleep_time=sleep_time, daemon=True)
+
+    def stop_invalidation_listener(self) -> None:
+        if self._invalidation_listener is None:
+            return
+        self._invalidation_listener.stop()
+        self._invalidation_listener.join()
+        self._invalidation_listener = None
+
+    def _remember_locally(
+        self,
+        key_name_provided: str,
+        value: typing.Any,
+        fetched_item: typing.Optional[bytes],
+        epoch: typing.Optional[int],
+        ttl: typing.Optional[int] = None,
+    ) -> typing.Any:
+        if self._local_cache is not None and value is not None:
+            # A key cached with a default TTL is gone from redis by then at the latest.
+            if self._local_cache.set(
+                key_name_provided, value, size=len(fetched_item), epoch=epoch, ttl=ttl / 1000 if ttl else None
+            ):
+                # Callers get their own copy, changing it must not change the cached one.
+                return copy.deepcopy(value)
+        return value
+
     @staticmethod
     def generate_key_name(model: typing.Union[ModelPassed, str], uid: str, *extra_items) -> str:
         if isinstance(model, str):
@@ -85,7 +348,74 @@ class RidantCache(object):
                 _key.extend(_extra_keys)
             return ":".join(_key)
         else:
-            return ":".join([get_name_from_model(model), uid])
+            return get_model_metadata(model).key_prefix + uid
+
+    def _key_prefix(self, metadata: ModelMetadata) -> str:
+        _key_prefix = metadata.tagged_key_prefix if self.hash_tag_groups else metadata.key_prefix
+        if self.versioned_namespaces:
+            return versioned_prefix(_key_prefix, self._generation(metadata.group_name))
+        return _key_prefix
+
+    def _model_key(self, model: ModelPassed, uid: str) -> str:
+        return self._key_prefix(get_model_metadata(model)) + uid
+
+    def _unversioned_group_prefix(self, group: str) -> str:
+        if self.hash_tag_groups:
+            return hash_tag(group) + ":"
+        return group + ":"
+
+    def _group_key(self, group: str, uid: str) -> str:
+        _key_prefix = self._unversioned_group_prefix(group)
+        if self.versioned_namespaces:
+            _key_prefix = versioned_prefix(_key_prefix, self._generation(group))
+        return _key_prefix + uid
+
+    def _generation(self, group: str) -> int:
+        _generation = self._generations.get(group)
+        if _generation is None:
+            _key_name = generation_key(group)
+            _generation = self._generations.set(group, int(self._redis_for(_key_name).get(_key_name) or 0))
+        return _generation
+
+    def _indexes_for(self, metadata: ModelMetadata) -> typing.Dict[str, str]:
+        if metadata.indexes and self.is_cluster and not self.hash_tag_groups:
+            raise ValueError("Indexed models need hash_tag_groups=True on a cluster, so their indexes share the group's slot.")
+        return metadata.indexes
+
+    def _index_update(
+        self,
+        metadata: ModelMetadata,
+        uid: str,
+        values: typing.Dict[str, typing.Any],
+        mode: str = REPLACE,
+        hash: bool = False,
+    ) -> IndexUpdate:
+        # Index keys are written next to the value (same shard, same slot), never routed on their own.
+        _key_prefix = self._key_prefix(metadata)
+        _prefix = index_key_prefix(_key_prefix, hash)
+        _keys = [entries_key(_prefix, uid)]
+        if mode == PRUNE:
+            _keys.append(_key_prefix + uid)
+        return _keys, index_arguments(_prefix, uid, metadata.indexes, values, mode)
+
+    def _model_index_update(self, model: ModelPassed, uid: str, hash: bool = False) -> typing.Optional[IndexUpdate]:
+        _metadata = get_model_metadata(model)
+        _indexes = self._indexes_for(_metadata)
+        if not _indexes:
+            return None
+        return self._index_update(_metadata, uid, {field: field_value(model, field) for field in _indexes}, hash=hash)
+
+    def _queue_index_update(self, pipe: typing.Any, index_update: IndexUpdate) -> None:
+        _keys, _arguments = index_update
+        if self.is_cluster:
+            # Cluster pipelines do not load scripts, EVAL sends the source along.
+            pipe.execute_command("EVAL", INDEX_SCRIPT, len(_keys), *_keys, *_arguments)
+        else:
+            self._index_script(keys=_keys, args=_arguments, client=pipe)
+
+    def _run_index_update(self, redis_instance: Redis, index_update: IndexUpdate) -> None:
+        _keys, _arguments = index_update
+        self._index_script(keys=_keys, args=_arguments, client=redis_instance)
 
     def _item_be_converted_to_dict(self, item: typing.Any) -> typing.TypeVar("item"):
         if isinstance(self._convert_object_to_safe_redis_type(item), dict):
@@ -98,22 +428,224 @@ class RidantCache(object):
             return self._redis_connection_hash_only
         raise ValueError("Hashed redis client is not available.")
 
-    def _get(self, key_name_provided: str) -> bytes:
-        return self.redis.get(key_name_provided)
+    @property
+    def shards(self) -> typing.Dict[str, Redis]:
+        return self._shards
+
+    def _redis_for(self, key_name_provided: str) -> Redis:
+        if self._shard_ring is None:
+            return self._redis_connection
+        return self._shards[self._shard_ring.node_for(key_name_provided)]
+
+    def _redis_hashed_for(self, key_name_provided: str) -> Redis:
+        if self._shard_ring is None:
+            return self.redis_hashed
+        # Shards have no separate hash database, hash mode shares the shard's client.
+        return self._shards[self._shard_ring.node_for(key_name_provided)]
+
+    def _shard_partitions(self, key_names_provided: typing.List[str]) -> typing.List[typing.Tuple[Redis, typing.List[int]]]:
+        return [
+            (self._shards[name], indexes) for name, indexes in self._shard_ring.partition(key_names_provided).items()
+        ]
+
+    @staticmethod
+    def _merge_shard_results(
+        size: int, partitions: typing.List[typing.Tuple[Redis, typing.List[int]]], results: typing.List[list]
+    ) -> list:
+        _merged = [None] * size
+        for (_, indexes), values in zip(partitions, results):
+            for index, value in zip(indexes, values):
+                _merged[index] = value
+        return _merged
+
+    def _fan_out(self, calls: typing.List[typing.Callable[[], typing.Any]]) -> typing.List[typing.Any]:
+        if len(calls) == 1:
+            return [calls[0]()]
+        return list(self._shard_executor.map(lambda call: call(), calls))
+
+    def _get(self, key_name_provided: str, ttl: typing.Optional[int] = None) -> bytes:
+        if ttl is not None:
+            # Sliding expiration, GETEX reads the value and pushes its expiry back at once.
+            return self._redis_for(key_name_provided).getex(key_name_provided, px=ttl)
+        return self._redis_for(key_name_provided).get(key_name_provided)
+
+    def _hget(self, key_name_provided: str, attr: str, ttl: typing.Optional[int] = None) -> bytes:
+        _redis = self._redis_hashed_for(key_name_provided)
+        if ttl is not None:
+            return self._read_and_expire(_redis, key_name_provided, ttl, "hget", attr)
+        return _redis.hget(key_name_provided, attr)
+
+    def _hgetall(self, key_name_provided: str, ttl: typing.Optional[int] = None) -> typing.Dict[bytes, bytes]:
+        _redis = self._redis_hashed_for(key_name_provided)
+        if ttl is not None:
+            return self._read_and_expire(_redis, key_name_provided, ttl, "hgetall")
+        return _redis.hgetall(key_name_provided)
 
-    def _hget(self, key_name_provided: str, attr: str) -> bytes:
-        return self.redis_hashed.hget(key_name_provided, attr)
+    @staticmethod
+    def _read_and_expire(redis_instance: Redis, key_name_provided: str, ttl: int, command: str, *args) -> typing.Any:
+        # Hashes have no GETEX, the read and a PEXPIRE share one round trip.
+        with redis_instance.pipeline(transaction=False) as pipe:
+            getattr(pipe, command)(key_name_provided, *args)
+            pipe.pexpire(key_name_provided, ttl)
+            return pipe.execute()[0]
+
+    def set_ttl(self, model_or_group: typing.Union[ModelPassed, str], ttl: typing.Optional[TTL]) -> None:
+        """Set the default TTL of a model's (or group's) keys on this cache, over the model's `cacheable_ttl`.
+
+        Args:
+            model_or_group (typing.Union[ModelPassed, str]): model class or group name.
+            ttl (typing.Optional[TTL]): seconds or a timedelta, None for keys that never expire.
+        """
+        _group = model_or_group if isinstance(model_or_group, str) else get_model_metadata(model_or_group).group_name
+        self._ttls[_group] = ttl_milliseconds(ttl)
+
+    def _ttl_for(self, group: str, metadata: typing.Optional[ModelMetadata] = None) -> typing.Optional[int]:
+        if group in self._ttls:
+            return self._ttls[group]
+        return metadata.ttl if metadata is not None else None
+
+    def _model_ttl(self, model: ModelPassed) -> typing.Optional[int]:
+        _metadata = get_model_metadata(model)
+        return self._ttl_for(_metadata.group_name, _metadata)
+
+    def _sliding_ttl(self, model: ModelPassed) -> typing.Optional[int]:
+        if not self.sliding_expiration:
+            return None
+        return self._model_ttl(model)
+
+    @staticmethod
+    def _parse_fetched_hash(
+        model: ModelPassed, fetched_item: typing.Dict[bytes, bytes]
+    ) -> typing.Optional[ModelPassed]:
+        if not fetched_item:
+            return None
+        return model.parse_obj(unflatten_model(model, fetched_item))
 
     def _get_all(
-        self, key_name_provided: str
-    ) -> Coroutine[typing.Iterator[typing.Any]]:
-        return self.redis.scan_iter(key_name_provided)
+        self, key_name_provided: str, count: typing.Optional[int] = None
+    ) -> typing.Iterator[bytes]:
+        return self.redis.scan_iter(match=key_name_provided, count=count or self.scan_count)
+
+    def _iter_scanned_values(
+        self, key_name_provided: str, count: typing.Optional[int] = None, batch_size: typing.Optional[int] = None
+    ) -> typing.Iterator[bytes]:
+        if self._shard_ring is not None:
+            yield from self._iter_scanned_shard_values(key_name_provided, count=count, batch_size=batch_size)
+            return
+
+        for _chunk in chunked(self._get_all(key_name_provided, count=count), batch_size or self.bulk_batch_size):
+            for _fetched_item in self._mget(_chunk):
+                # Hash-mode keys in the same database come back as None from MGET.
+                if _fetched_item is not None:
+                    yield _fetched_item
+
+    def _iter_scanned_shard_values(
+        self, key_name_provided: str, count: typing.Optional[int] = None, batch_size: typing.Optional[int] = None
+    ) -> typing.Iterator[bytes]:
+        # One SCAN cursor per shard, each round fetches the next batch of every shard in parallel.
+        # Keys are read back from the shard they were scanned on, wherever the ring maps them now.
+        _cursors = [
+            (
+                shard,
+                chunked(
+                    shard.scan_iter(match=key_name_provided, count=count or self.scan_count),
+                    batch_size or self.bulk_batch_size,
+                ),
+            )
+            for shard in self._shards.values()
+        ]
+        while _cursors:
+            _batches = self._fan_out([functools.partial(self._next_scanned_batch, shard, batches) for shard, batches in _cursors])
+            _cursors = [cursor for cursor, batch in zip(_cursors, _batches) if batch is not None]
+            for _batch in _batches:
+                for _fetched_item in _batch or ():
+                    if _fetched_item is not None:
+                        yield _fetched_item
+
+    def _iter_scanned_hashes(
+        self, key_name_provided: str, count: typing.Optional[int] = None, batch_size: typing.Optional[int] = None
+    ) -> typing.Iterator[typing.Dict[bytes, bytes]]:
+        _clients = list(self._shards.values()) if self._shard_ring is not None else [self.redis_hashed]
+        for _client in _clients:
+            # String-mode keys may share the database (always on shards), SCAN TYPE (redis 6+) skips them.
+            _key_names = _client.scan_iter(match=key_name_provided, count=count or self.scan_count, _type="hash")
+            for _chunk in chunked(_key_names, batch_size or self.bulk_batch_size):
+                with _client.pipeline(transaction=False) as pipe:
+                    for _key_name in _chunk:
+                        pipe.hgetall(_key_name)
+                    yield from pipe.execute()
+
+    @staticmethod
+    def _next_scanned_batch(shard: Redis, batches: typing.Iterator[typing.List[bytes]]) -> typing.Optional[typing.List[bytes]]:
+        _keys = next(batches, None)
+        if _keys is None:
+            return None
+        return shard.mget(_keys)
+
+    def _mget(self, key_names_provided: typing.List[str]) -> typing.List[bytes]:
+        if self._shard_ring is not None:
+            _partitions = self._shard_partitions(key_names_provided)
+            _fetched = self._fan_out(
+                [
+                    functools.partial(shard.mget, [key_names_provided[index] for index in indexes])
+                    for shard, indexes in _partitions
+                ]
+            )
+            return self._merge_shard_results(len(key_names_provided), _partitions, _fetched)
+        if self.is_cluster:
+            # Splits the keys per slot, one MGET per slot.
+            return self.redis.mget_nonatomic(key_names_provided)
+        return self.redis.mget(key_names_provided)
+
+    def _serializer_for(self, model: ModelPassed) -> Serializer:
+        _model_serializer = get_model_metadata(model).serializer
+        if _model_serializer is not None:
+            return get_serializer(_model_serializer)
+        return self.serializer
+
+    def compression_stats(self, group: typing.Optional[str] = None) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        if self._value_compressor is None:
+            return {}
+        return self._value_compressor.stats(group)
+
+    def _dump_model(self, model: ModelPassed) -> bytes:
+        _payload = encode_model(model, self._serializer_for(model))
+        if self.trusted_decode and supports_trusted_decode(model.__class__):
+            _payload = add_fingerprint(schema_fingerprint(model.__class__), _payload)
+        if self._value_compressor is not None:
+            _payload = self._value_compressor.compress(_payload, get_model_metadata(model).group_name)
+        return _payload
+
+    def _parse_fetched_item(
+        self, model: ModelPassed, fetched_item: typing.Optional[bytes]
+    ) -> typing.Optional[ModelPassed]:
+        if fetched_item is None:
+            return None
+        # Compressed values are readable even when this client does not compress.
+        if self._value_compressor is not None:
+            fetched_item = self._value_compressor.decompress(fetched_item, get_model_metadata(model).group_name)
+        else:
+            fetched_item = decompress_value(fetched_item)
+        _fingerprint, fetched_item = split_fingerprint(fetched_item)
+        _trusted = False
+        if _fingerprint is not None:
+            _trusted = _fingerprint == schema_fingerprint(model)
+            if not _trusted and self.schema_mismatch == MISS:
+                logger.debug(f"{model.__name__} value was cached for another schema, reading it as a miss")
+                return None
+        return decode_model(model, fetched_item, self._serializer_for(model), trusted=_trusted and self.trusted_decode)
+
+    @staticmethod
+    def _decode_group_item(fetched_item: typing.Optional[bytes]) -> typing.Optional[str]:
+        if fetched_item and isinstance(fetched_item, bytes):
+            return fetched_item.decode("utf-8")
+        return fetched_item
 
     @staticmethod
     def _convert_object_to_safe_redis_type(val: typing.Union[BaseModel, typing.Any]):
         if hasattr(val, "dict") and callable(val.dict):
             # Just to make sure that all values can be set in redis
-            val: dict = json.loads(val.json())
+            val: dict = to_jsonable(val.dict(), getattr(val, "__json_encoder__", pydantic_encoder))
         else:
 
             if isinstance(val, (int, float, str, bool)):
@@ -141,24 +673,19 @@ class RidantCache(object):
         redis_instance: Redis = None,
         uid: typing.Optional[str] = None,
     ) -> typing.Any:
-        if redis_instance is None:
-            redis_instance = self.redis_hashed
-
         if model is None and key_name is not None:
             logger.debug(f"Using provided key name: '{key_name}' for hset")
-            return redis_instance.hset(key_name, attr, value)
+            return (redis_instance or self._redis_hashed_for(key_name)).hset(key_name, attr, value)
 
         if uid is None and self.default_hset_uid_key is None:
             raise ValueError("No uid provided and no default uid key provided")
         else:
 
-            _generated_key_name = [
-                get_name_from_model(model),
-                uid if uid is not None else self.default_hset_uid_key,
-            ]
-            _generated_key_name = ":".join(_generated_key_name)
+            _generated_key_name = self._model_key(
+                model, uid if uid is not None else self.default_hset_uid_key
+            )
 
-        return redis_instance.hset(_generated_key_name, attr, value)
+        return (redis_instance or self._redis_hashed_for(_generated_key_name)).hset(_generated_key_name, attr, value)
 
     @staticmethod
     def _determine_pipeline_commands_needed(model: dict, base_uid_key: str = None) -> typing.List[typing.Tuple[str, str]]:
@@ -178,47 +705,242 @@ class RidantCache(object):
         return _commands
     
     
-    def _hash_cache(
+    def _hash_mapping(self, value_provided: typing.Union[BaseModel, typing.Any]) -> dict:
+        if isinstance(value_provided, BaseModel):
+            return flatten_model(value_provided)
+        return flatten_dict_for_caching(self._convert_object_to_safe_redis_type(val=value_provided))
+
+    def _write_hash(
         self,
         key_name_provided: str,
-        value_provided: typing.Union[BaseModel, typing.Any],
-        extra_redis_arguments: typing.Optional[dict] = {},
+        mapping: dict,
+        replace: bool = False,
+        index_update: typing.Optional[IndexUpdate] = None,
+        ttl: typing.Optional[int] = None,
     ) -> bool:
-        _values = self._convert_object_to_safe_redis_type(val=value_provided)
+        logger.debug(f"Caching {len(mapping)} fields to '{key_name_provided}' with hset")
+        _redis = self._redis_hashed_for(key_name_provided)
         try:
-            with self.redis_hashed.pipeline() as pipe:
-                _determine_commands_for_pipe = self._determine_pipeline_commands_needed(_values)
-                for piped_command in _determine_commands_for_pipe:
-                    logger.debug(f"Piping command {piped_command[0]} with a value of {piped_command[1]}")
-                    self._hash_cache_attribute(
-                        key_name=key_name_provided, attr=piped_command[0], value=piped_command[1], redis_instance=pipe
-                    )
-
-                logger.debug(f"Running pipeline with {len(_determine_commands_for_pipe)} ==> {iter(pipe.command_stack)} commands")
-                pipe.execute()
+            if (
+                not replace
+                and index_update is None
+                and ttl in (None, KEEP_TTL)
+                and 0 < len(mapping) <= self.hash_field_batch_size
+            ):
+                _redis.hset(key_name_provided, mapping=mapping)
+            elif self._write_hash_script is not None:
+                self._write_hash_script(
+                    keys=[key_name_provided],
+                    args=["1" if replace else "0", ttl or 0] + flatten_mapping_arguments(mapping),
+                )
+                if index_update is not None:
+                    self._run_index_update(_redis, index_update)
+            else:
+                # Replacing (or writing a very wide model) has to be atomic, so it goes through MULTI.
+                with _redis.pipeline() as pipe:
+                    self._queue_hash_write(pipe, key_name_provided, mapping, replace, ttl)
+                    if index_update is not None:
+                        self._queue_index_update(pipe, index_update)
+                    pipe.execute()
         except Exception:
             logger.exception("Unable to cache with hset")
             raise ValueError("Unable to cache with hset")
+        self._invalidate_local(key_name_provided)
+        return True
+
+    def _queue_hash_write(
+        self, pipe: typing.Any, key_name_provided: str, mapping: dict, replace: bool, ttl: typing.Optional[int]
+    ) -> None:
+        if replace and ttl == KEEP_TTL:
+            # DEL drops the TTL, it has to be read in the same atomic step.
+            pipe.eval(WRITE_HASH_SCRIPT, 1, key_name_provided, "1", KEEP_TTL, *flatten_mapping_arguments(mapping))
+            return
+        if replace:
+            pipe.delete(key_name_provided)
+        for _chunk in chunked(mapping.items(), self.hash_field_batch_size):
+            pipe.hset(key_name_provided, mapping=dict(_chunk))
+        if ttl is not None and ttl != KEEP_TTL:
+            pipe.pexpire(key_name_provided, ttl)
+
+    def _hash_cache(
+        self,
+        key_name_provided: str,
+        value_provided: typing.Union[BaseModel, typing.Any],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        replace: bool = False,
+        ttl: typing.Optional[int] = None,
+    ) -> bool:
+        return self._write_hash(
+            key_name_provided,
+            self._hash_mapping(value_provided),
+            replace=replace,
+            ttl=hash_expiry(extra_redis_arguments, ttl),
+        )
 
     def _cache(
         self,
         key_name_provided: str,
         value_provided: typing.Union[BaseModel, typing.Any],
         extra_redis_arguments: typing.Optional[dict] = {},
+        index_update: typing.Optional[IndexUpdate] = None,
     ) -> typing.Optional[typing.Coroutine]:
         if isinstance(value_provided, BaseModel):
-            value_provided = value_provided.json()
-        return self.redis.set(
-            key_name_provided, value_provided, **extra_redis_arguments
-        )
+            value_provided = self._dump_model(value_provided)
+        _redis = self._redis_for(key_name_provided)
+        if index_update is None:
+            _res = _redis.set(key_name_provided, value_provided, **extra_redis_arguments)
+        elif extra_redis_arguments.get("nx") or extra_redis_arguments.get("xx"):
+            # A conditional SET may not happen, so the index follows only once it did.
+            _res = _redis.set(key_name_provided, value_provided, **extra_redis_arguments)
+            if _res:
+                self._run_index_update(_redis, index_update)
+        else:
+            with _redis.pipeline(transaction=not self.is_cluster) as pipe:
+                pipe.set(key_name_provided, value_provided, **extra_redis_arguments)
+                self._queue_index_update(pipe, index_update)
+                _res = pipe.execute()[0]
+        self._invalidate_local(key_name_provided)
+        return _res
+
+    def _cache_many(
+        self,
+        values_provided: typing.Dict[str, typing.Any],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        index_updates: typing.Optional[typing.Dict[str, IndexUpdate]] = None,
+    ) -> bool:
+        if self._shard_ring is None:
+            _res = self._cache_many_on(self.redis, values_provided, extra_redis_arguments, index_updates)
+        else:
+            _key_names = list(values_provided)
+            _res = all(
+                self._fan_out(
+                    [
+                        functools.partial(
+                            self._cache_many_on,
+                            shard,
+                            {_key_names[index]: values_provided[_key_names[index]] for index in indexes},
+                            extra_redis_arguments,
+                            index_updates,
+                        )
+                        for shard, indexes in self._shard_partitions(_key_names)
+                    ]
+                )
+            )
+        self._invalidate_local(*values_provided)
+        return _res
+
+    def _cache_many_on(
+        self,
+        redis_instance: Redis,
+        values_provided: typing.Dict[str, typing.Any],
+        extra_redis_arguments: dict,
+        index_updates: typing.Optional[typing.Dict[str, IndexUpdate]] = None,
+    ) -> bool:
+        if index_updates:
+            # Each value is written together with its indexes.
+            with redis_instance.pipeline(transaction=not self.is_cluster) as pipe:
+                for key_name, value in values_provided.items():
+                    pipe.set(key_name, value, **extra_redis_arguments)
+                    if key_name in index_updates:
+                        self._queue_index_update(pipe, index_updates[key_name])
+                return all(pipe.execute())
+
+        if not extra_redis_arguments:
+            if self.is_cluster:
+                return redis_instance.mset_nonatomic(values_provided)
+            return redis_instance.mset(values_provided)
+
+        # MSET has no expiry options, so every key gets its own SET in one round trip.
+        with redis_instance.pipeline(transaction=False) as pipe:
+            for key_name, value in values_provided.items():
+                pipe.set(key_name, value, **extra_redis_arguments)
+            return all(pipe.execute())
+
+    def _cache_many_hashes(
+        self,
+        mappings_provided: typing.Dict[str, dict],
+        ttl: typing.Optional[int] = None,
+        index_updates: typing.Optional[typing.Dict[str, IndexUpdate]] = None,
+    ) -> bool:
+        """Replace many hashes, each with its TTL and indexes, in one MULTI per client."""
+        index_updates = index_updates or {}
+        if self._write_hash_script is not None:
+            # Cluster keys live on different nodes, each hash is replaced by the write script.
+            for key_name, mapping in mappings_provided.items():
+                self._write_hash(key_name, mapping, replace=True, index_update=index_updates.get(key_name), ttl=ttl)
+            return True
+
+        _by_client: typing.Dict[int, typing.Tuple[Redis, typing.List[str]]] = {}
+        for key_name in mappings_provided:
+            _redis = self._redis_hashed_for(key_name)
+            _by_client.setdefault(id(_redis), (_redis, []))[1].append(key_name)
+        for _redis, key_names in _by_client.values():
+            with _redis.pipeline() as pipe:
+                for key_name in key_names:
+                    pipe.delete(key_name)
+                    for _chunk in chunked(mappings_provided[key_name].items(), self.hash_field_batch_size):
+                        pipe.hset(key_name, mapping=dict(_chunk))
+                    if ttl is not None:
+                        pipe.pexpire(key_name, ttl)
+                    if key_name in index_updates:
+                        self._queue_index_update(pipe, index_updates[key_name])
+                pipe.execute()
+        self._invalidate_local(*mappings_provided)
+        return True
 
     def find_one_by_group(self, group: str, uid: str) -> typing.Optional[str]:
-        _res = self._get(key_name_provided=self.generate_key_name(model=group, uid=uid))
-        if _res and isinstance(_res, bytes):
-            return _res.decode("utf-8")
-        elif _res is not None:
-            return _res
-        return None
+        _key_name = self._group_key(group, uid)
+        _epoch = None
+        if self._local_cache is not None:
+            _local_item = self._local_cache.get(_key_name)
+            if _local_item is not None:
+                if self._metrics is not None:
+                    self._metrics.record_lookup("find_one_by_group", group, True)
+                return _local_item
+            _epoch = self._local_cache.epoch
+
+        if self._metrics is not None:
+            _started = time.perf_counter()
+        _res = self._get(key_name_provided=_key_name)
+        if self._metrics is not None:
+            self._observe("find_one_by_group", group, NETWORK, _started, len(_res or b""))
+            self._metrics.record_lookup("find_one_by_group", group, _res is not None)
+        return self._remember_locally(_key_name, self._decode_group_item(_res), _res, _epoch, self._ttl_for(group))
+
+    def find_many_by_group(
+        self, group: str, uids: typing.Iterable[str], batch_size: typing.Optional[int] = None
+    ) -> typing.List[typing.Optional[str]]:
+        _results = []
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _fetched = self._mget([self._group_key(group, uid) for uid in _chunk])
+            if self._metrics is not None:
+                self._observe_many("find_many_by_group", group, _started, _fetched)
+            _results.extend(self._decode_group_item(item) for item in _fetched)
+        return _results
+
+    def cache_many_by_group(
+        self,
+        group: str,
+        items: typing.Iterable[typing.Tuple[str, typing.Union[BaseModel, typing.Any]]],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        batch_size: typing.Optional[int] = None,
+    ) -> bool:
+        for _chunk in chunked(items, batch_size or self.bulk_batch_size):
+            _values = {}
+            for uid, value in _chunk:
+                value = self._convert_object_to_safe_redis_type(val=value)
+                if isinstance(value, dict):
+                    value = json.dumps(value)
+                _values[self._group_key(group, uid)] = value
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            self._cache_many(_values, with_default_ttl(extra_redis_arguments, self._ttl_for(group)))
+            if self._metrics is not None:
+                self._observe("cache_many_by_group", group, NETWORK, _started)
+                self._metrics.observe_pipeline("cache_many_by_group", group, len(_values))
+        return True
 
     def cache_by_group(
         self,
@@ -228,7 +950,9 @@ class RidantCache(object):
         extra_redis_arguments: typing.Optional[dict] = {},
         hash: bool = False,
     ) -> bool:
-        _generated_key_name = [group, uid]
+        _key_name = self._group_key(group, uid)
+        if self._metrics is not None:
+            _started = time.perf_counter()
 
         if hash:
             logger.debug(f"hash argument provided, using hset instead of set")
@@ -237,18 +961,24 @@ class RidantCache(object):
             if _can_item_be_hashsed == False:
                 raise TypeError("Item passed cannot be broken down and hashed.")
 
-            return self._hash_cache(
-                key_name_provided=":".join(_generated_key_name),
+            _res = self._hash_cache(
+                key_name_provided=_key_name,
                 value_provided=_can_item_be_hashsed,
                 extra_redis_arguments=extra_redis_arguments,
+                replace=True,
+                ttl=self._ttl_for(group),
             )
         else:
-            return self._cache(
-                ":".join(_generated_key_name),
+            _res = self._cache(
+                _key_name,
                 self._convert_object_to_safe_redis_type(val=value),
-                extra_redis_arguments,
+                with_default_ttl(extra_redis_arguments, self._ttl_for(group)),
             )
 
+        if self._metrics is not None:
+            self._observe("cache_by_group", group, NETWORK, _started)
+        return _res
+
     def cache(
         self,
         model: ModelPassed,
@@ -256,60 +986,872 @@ class RidantCache(object):
         extra_redis_arguments: typing.Optional[dict] = {},
         hash: bool = False,
     ) -> bool:
-        _retrieve_model_name_for_cache = get_name_from_model(model)
-        _generated_key_name = [_retrieve_model_name_for_cache, uid]
+        _key_name = self._model_key(model, uid)
+        if self._metrics is not None:
+            _group, _started = get_model_metadata(model).group_name, time.perf_counter()
 
+        _index_update = self._model_index_update(model, uid, hash=hash)
+        _ttl = self._model_ttl(model)
         if hash:
             logger.debug(f"hash argument provided, using hset instead of set")
-            return self._hash_cache(
-                key_name_provided=":".join(_generated_key_name),
-                value_provided=model,
-                extra_redis_arguments=extra_redis_arguments,
+            _mapping = self._hash_mapping(model)
+            if self._metrics is not None:
+                _started = self._observe("cache", _group, SERIALIZE, _started)
+            _res = self._write_hash(
+                _key_name,
+                _mapping,
+                replace=True,
+                index_update=_index_update,
+                ttl=hash_expiry(extra_redis_arguments, _ttl),
             )
         else:
-            return self._cache(
-                ":".join(_generated_key_name), model.json(), extra_redis_arguments
+            _payload = self._dump_model(model)
+            if self._metrics is not None:
+                _started = self._observe("cache", _group, SERIALIZE, _started, len(_payload))
+            _res = self._cache(
+                _key_name, _payload, with_default_ttl(extra_redis_arguments, _ttl), index_update=_index_update
             )
 
+        if self._metrics is not None:
+            self._observe("cache", _group, NETWORK, _started)
+        return _res
+
     def find_one(
         self,
         model: ModelPassed,
         uid: str,
         specific_attribute: typing.Optional[str] = None,
+        hash: bool = False,
+        fields: typing.Optional[typing.Sequence[str]] = None,
     ) -> typing.Union[ModelPassed, typing.Any]:
+        """Fetch one cached model, or None.
+
+        `fields` (e.g. ["name", "metadata.cart_id"], nested parts separated by "." or ":")
+        fetches only those fields in one round trip, HMGET for hashes and a Lua JSON
+        extraction for string keys, and returns them as a dict of values validated
+        against the model's field types.
+        """
+        if self._metrics is not None:
+            _group, _started = get_model_metadata(model).group_name, time.perf_counter()
+
+        if fields:
+            _res = self._find_fields(model, uid, fields, hash=hash)
+            if self._metrics is not None:
+                self._observe("find_one", _group, NETWORK, _started)
+                self._metrics.record_lookup("find_one", _group, _res is not None)
+            return _res
 
         if specific_attribute:
             logger.debug("Attribute args provided, using hget")
-            return self._hget(
-                key_name_provided=get_name_from_model(model) + ":" + uid,
+            _res = self._hget(
+                key_name_provided=self._model_key(model, uid),
                 attr=specific_attribute,
+                ttl=self._sliding_ttl(model),
             )
+            if self._metrics is not None:
+                self._observe("find_one", _group, NETWORK, _started)
+                self._metrics.record_lookup("find_one", _group, _res is not None)
+            return _res
 
-        _retrieve_model_name_for_cache = get_name_from_model(model)
-        _generated_key_name = [_retrieve_model_name_for_cache, uid]
+        if hash:
+            logger.debug("hash argument provided, using hgetall instead of get")
+            _fetched_hash = self._hgetall(self._model_key(model, uid), ttl=self._sliding_ttl(model))
+            if self._metrics is not None:
+                _started = self._observe("find_one", _group, NETWORK, _started)
+            _res = self._parse_fetched_hash(model, _fetched_hash)
+            if self._metrics is not None:
+                self._observe("find_one", _group, DESERIALIZE, _started)
+                self._metrics.record_lookup("find_one", _group, _res is not None)
+            return _res
+
+        _key_name = self._model_key(model, uid)
+        _epoch = None
+        if self._local_cache is not None:
+            _local_item = self._local_cache.get(_key_name)
+            if _local_item is not None:
+                if self._metrics is not None:
+                    self._metrics.record_lookup("find_one", _group, True)
+                return copy.deepcopy(_local_item)
+            _epoch = self._local_cache.epoch
+
+        _fetched_item = self._get(_key_name, ttl=self._sliding_ttl(model))
+        if self._metrics is not None:
+            _started = self._observe("find_one", _group, NETWORK, _started, len(_fetched_item or b""))
+        _res = self._parse_fetched_item(model, _fetched_item)
+        if self._metrics is not None:
+            self._observe("find_one", _group, DESERIALIZE, _started)
+            self._metrics.record_lookup("find_one", _group, _res is not None)
+        return self._remember_locally(_key_name, _res, _fetched_item, _epoch, self._model_ttl(model))
+
+    def _find_fields(
+        self, model: ModelPassed, uid: str, fields: typing.Sequence[str], hash: bool = False
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        _key_name = self._model_key(model, uid)
+        _paths = [split_field(field) for field in fields]
+        if hash:
+            if all(is_hash_leaf(model, path) for path in _paths):
+                _values = self._redis_hashed_for(_key_name).hmget(_key_name, [":".join(path) for path in _paths])
+                return self._project_hash_values(model, fields, _paths, _values)
+            return self._project_hash(model, fields, self._hgetall(_key_name))
+
+        if self._local_cache is not None:
+            _local_item = self._local_cache.get(_key_name)
+            if _local_item is not None:
+                return copy.deepcopy(project_model(_local_item, fields))
+        _reply = self._projection_script(
+            keys=[_key_name], args=projection_arguments(_paths), client=self._redis_for(_key_name)
+        )
+        return self._project_json(model, fields, _paths, _reply)
 
-        _fetched_item = self._get(":".join(_generated_key_name))
-        if _fetched_item is None:
+    def _project_json(
+        self, model: ModelPassed, fields: typing.Sequence[str], paths: typing.List[typing.List[str]], reply: typing.Optional[list]
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        if reply is None:
             return None
+        if reply[0] == b"0":
+            # Compressed or msgpack, only readable whole.
+            return project_model(self._parse_fetched_item(model, reply[1]), fields)
+        return {
+            field: validate_field(model, path, None if value is None else json.loads(value))
+            for field, path, value in zip(fields, paths, reply[1:])
+        }
 
-        if not hasattr(model, "parse_raw"):
-            logger.warning(
-                "Older version of pydantic detected, using json.loads instead of parse_raw"
-            )
-            return model(**json.loads(_fetched_item.decode("utf-8")))
-        return model.parse_raw(_fetched_item)
+    @staticmethod
+    def _project_hash_values(
+        model: ModelPassed, fields: typing.Sequence[str], paths: typing.List[typing.List[str]], values: typing.List[typing.Optional[bytes]]
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        # HMGET cannot tell a missing key from missing fields, a key without any of them counts as missing.
+        if all(value is None for value in values):
+            return None
+        return {
+            field: validate_field(model, path, decode_hash_value(value, model_field(model, path)))
+            for field, path, value in zip(fields, paths, values)
+        }
+
+    @staticmethod
+    def _project_hash(
+        model: ModelPassed, fields: typing.Sequence[str], fetched_item: typing.Dict[bytes, bytes]
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        if not fetched_item:
+            return None
+        _item = unflatten_model(model, fetched_item)
+        return {
+            field: validate_field(model, split_field(field), value) for field, value in project_model(_item, fields).items()
+        }
+
+    def cache_many(
+        self,
+        items: typing.Iterable[typing.Tuple[ModelPassed, str]],
+        extra_redis_arguments: typing.Optional[dict] = {},
+        batch_size: typing.Optional[int] = None,
+    ) -> bool:
+        for _chunk in chunked(items, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _group, _started = get_model_metadata(_chunk[0][0]).group_name, time.perf_counter()
+            _values = {}
+            _ttls = {}
+            _index_updates = {}
+            for model, uid in _chunk:
+                _key_name = self._model_key(model, uid)
+                _values[_key_name] = self._dump_model(model)
+                _ttls[_key_name] = self._model_ttl(model)
+                _index_update = self._model_index_update(model, uid)
+                if _index_update is not None:
+                    _index_updates[_key_name] = _index_update
+            if self._metrics is not None:
+                _started = self._observe("cache_many", _group, SERIALIZE, _started)
+                for _payload in _values.values():
+                    self._metrics.observe_payload("cache_many", _group, len(_payload))
+            # Keys sharing a TTL share a pipeline, usually the whole chunk.
+            _distinct_ttls = set(_ttls.values())
+            for _ttl in _distinct_ttls:
+                _batch = (
+                    _values
+                    if len(_distinct_ttls) == 1
+                    else {key: value for key, value in _values.items() if _ttls[key] == _ttl}
+                )
+                self._cache_many(_batch, with_default_ttl(extra_redis_arguments, _ttl), _index_updates)
+            if self._metrics is not None:
+                self._observe("cache_many", _group, NETWORK, _started)
+                self._metrics.observe_pipeline("cache_many", _group, len(_values))
+        return True
+
+    def find_many(
+        self,
+        model: ModelPassed,
+        uids: typing.Iterable[str],
+        batch_size: typing.Optional[int] = None,
+    ) -> typing.List[typing.Optional[ModelPassed]]:
+        _metadata = get_model_metadata(model)
+        _key_prefix = self._key_prefix(_metadata)
+        _results = []
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _fetched = self._mget([_key_prefix + uid for uid in _chunk])
+            if self._metrics is not None:
+                _started = self._observe_many("find_many", _metadata.group_name, _started, _fetched)
+            _results.extend(self._parse_fetched_item(model, item) for item in _fetched)
+            if self._metrics is not None:
+                self._observe("find_many", _metadata.group_name, DESERIALIZE, _started)
+        return _results
+
+    def find(
+        self,
+        model: ModelPassed,
+        count: typing.Optional[int] = None,
+        batch_size: typing.Optional[int] = None,
+        hash: bool = False,
+        **filters: typing.Any,
+    ) -> typing.Iterator[ModelPassed]:
+        """Stream every cached instance of `model`, or the ones matching `filters`.
+
+        Keys are SCANned with `count` as the COUNT hint and fetched with one MGET
+        per `batch_size` keys, so memory use stays bounded by the batch size.
+        SCAN may return a key more than once, in which case it is yielded again.
+
+        Filters on indexed fields (`restaurant_id="r1"`, `total=(10, None)` for a
+        range, `metadata__cart_id=...` for "metadata.cart_id") read the matching
+        uids from the indexes instead of scanning. Set `hash` for models cached as hashes,
+        their keys are then SCANned in the hash database and read with pipelined HGETALLs.
+        """
+        if filters:
+            yield from self._find_indexed(model, filters, batch_size=batch_size, hash=hash)
+            return
+
+        _pattern = escape_scan_pattern(self._key_prefix(get_model_metadata(model))) + "*"
+        if hash:
+            for _fetched_hash in self._iter_scanned_hashes(_pattern, count=count, batch_size=batch_size):
+                _item = self._parse_fetched_hash(model, _fetched_hash)
+                # Expired between the SCAN and the HGETALL.
+                if _item is not None:
+                    yield _item
+            return
+        for _fetched_item in self._iter_scanned_values(_pattern, count=count, batch_size=batch_size):
+            yield self._parse_fetched_item(model, _fetched_item)
+
+    def _index_queries(
+        self, model: ModelPassed, filters: typing.Dict[str, typing.Any], hash: bool = False
+    ) -> typing.List[typing.Tuple[str, str, typing.Any]]:
+        _metadata = get_model_metadata(model)
+        _indexes = self._indexes_for(_metadata)
+        _prefix = index_key_prefix(self._key_prefix(_metadata), hash)
+        _queries = []
+        for name, value in filters.items():
+            _field = name.replace("__", ".")
+            if _field not in _indexes:
+                raise ValueError(f"{_metadata.model.__name__} has no index on '{_field}'.")
+            if _indexes[_field] == RANGE_INDEX:
+                _queries.append((RANGE_INDEX, range_index_key(_prefix, _field), score_bounds(value)))
+            else:
+                _queries.append((_indexes[_field], set_index_key(_prefix, _field, index_value(value)), None))
+        return _queries
 
-    def find(self, model: ModelPassed) -> typing.Iterator[ModelPassed]:
-        raise NotImplementedError
+    def _indexed_uids(
+        self, redis_instance: Redis, queries: typing.List[typing.Tuple[str, str, typing.Any]]
+    ) -> typing.List[str]:
+        with redis_instance.pipeline(transaction=False) as pipe:
+            for kind, index_key, bounds in queries:
+                if kind == RANGE_INDEX:
+                    pipe.zrangebyscore(index_key, *bounds)
+                else:
+                    pipe.smembers(index_key)
+            _matches = pipe.execute()
+        # Range matches come in score order, set matches in uid order.
+        _uids = _matches[0] if isinstance(_matches[0], list) else sorted(_matches[0])
+        for _other in _matches[1:]:
+            _other = set(_other)
+            _uids = [uid for uid in _uids if uid in _other]
+        return [uid.decode("utf-8") for uid in _uids]
 
-    def _clear_key(self, key_name_provided: str) -> bool:
-        return self.redis.delete(key_name_provided)
+    def _find_indexed(
+        self,
+        model: ModelPassed,
+        filters: typing.Dict[str, typing.Any],
+        batch_size: typing.Optional[int] = None,
+        hash: bool = False,
+    ) -> typing.Iterator[ModelPassed]:
+        _metadata = get_model_metadata(model)
+        _key_prefix = self._key_prefix(_metadata)
+        _queries = self._index_queries(model, filters, hash=hash)
+        # Each shard indexes the values it holds, so every shard is asked and reads back its own matches.
+        if self._shard_ring is not None:
+            _clients = list(self._shards.values())
+        else:
+            _clients = [self.redis_hashed if hash else self.redis]
+        _uids = self._fan_out([functools.partial(self._indexed_uids, client, _queries) for client in _clients])
+
+        for _client, _client_uids in zip(_clients, _uids):
+            for _chunk in chunked(_client_uids, batch_size or self.bulk_batch_size):
+                _key_names = [_key_prefix + uid for uid in _chunk]
+                if hash:
+                    with _client.pipeline(transaction=False) as pipe:
+                        for _key_name in _key_names:
+                            pipe.hgetall(_key_name)
+                        _found = [self._parse_fetched_hash(model, fetched) for fetched in pipe.execute()]
+                else:
+                    _fetched = _client.mget_nonatomic(_key_names) if self.is_cluster else _client.mget(_key_names)
+                    _found = [self._parse_fetched_item(model, fetched) for fetched in _fetched]
+
+                _stale = []
+                for uid, item in zip(_chunk, _found):
+                    if item is None:
+                        _stale.append(uid)
+                    else:
+                        yield item
+                if _stale:
+                    self._prune_index_entries(_client, _metadata, _stale, hash=hash)
+
+    def _prune_index_entries(
+        self, redis_instance: Redis, metadata: ModelMetadata, uids: typing.List[str], hash: bool = False
+    ) -> None:
+        # Values that expired (or were deleted elsewhere) leave their uids in the indexes until a lookup finds them gone.
+        with redis_instance.pipeline(transaction=False) as pipe:
+            for uid in uids:
+                self._queue_index_update(pipe, self._index_update(metadata, uid, {}, mode=PRUNE, hash=hash))
+            pipe.execute()
+
+    def find_by_group(
+        self,
+        group: str,
+        count: typing.Optional[int] = None,
+        batch_size: typing.Optional[int] = None,
+    ) -> typing.Iterator[str]:
+        _pattern = escape_scan_pattern(self._group_key(group, "")) + "*"
+        for _fetched_item in self._iter_scanned_values(_pattern, count=count, batch_size=batch_size):
+            yield self._decode_group_item(_fetched_item)
 
-    def delete(self, model: ModelPassed, uid: str) -> bool:
-        return self._clear_key(":".join([get_name_from_model(model), uid]))
+    def _clear_key(
+        self,
+        key_name_provided: str,
+        index_update: typing.Optional[IndexUpdate] = None,
+        redis_instance: typing.Optional[Redis] = None,
+    ) -> bool:
+        _redis = redis_instance or self._redis_for(key_name_provided)
+        # UNLINK frees the value in the background, large values never block the server.
+        if index_update is None:
+            _res = _redis.unlink(key_name_provided)
+        else:
+            with _redis.pipeline(transaction=not self.is_cluster) as pipe:
+                pipe.unlink(key_name_provided)
+                self._queue_index_update(pipe, index_update)
+                _res = pipe.execute()[0]
+        self._invalidate_local(key_name_provided)
+        return _res
+
+    def _delete_model(self, model: ModelPassed, uid: str, hash: bool = False) -> bool:
+        _metadata = get_model_metadata(model)
+        _key_name = self._key_prefix(_metadata) + uid
+        _redis = self._redis_hashed_for(_key_name) if hash else self._redis_for(_key_name)
+        if not self._indexes_for(_metadata):
+            return self._clear_key(_key_name, redis_instance=_redis)
+        return self._clear_key(_key_name, self._index_update(_metadata, uid, {}, hash=hash), redis_instance=_redis)
+
+    def delete(self, model: ModelPassed, uid: str, hash: bool = False) -> bool:
+        if self._metrics is None:
+            return self._delete_model(model, uid, hash=hash)
+
+        _started = time.perf_counter()
+        _res = self._delete_model(model, uid, hash=hash)
+        self._observe("delete", get_model_metadata(model).group_name, NETWORK, _started)
+        return _res
 
     def delete_by_group(self, group: str, uid: str) -> bool:
-        return self._clear_key(self.generate_key_name(model=group, uid=uid))
+        if self._metrics is None:
+            return self._clear_key(self._group_key(group, uid))
+
+        _started = time.perf_counter()
+        _res = self._clear_key(self._group_key(group, uid))
+        self._observe("delete_by_group", group, NETWORK, _started)
+        return _res
+
+    def _clear_keys(
+        self,
+        key_names_provided: typing.List[str],
+        index_updates: typing.Optional[typing.List[IndexUpdate]] = None,
+        hash: bool = False,
+    ) -> int:
+        if self._shard_ring is None:
+            _res = self._clear_keys_on(
+                self.redis_hashed if hash else self.redis, key_names_provided, index_updates
+            )
+        else:
+            _res = sum(
+                self._fan_out(
+                    [
+                        functools.partial(
+                            self._clear_keys_on,
+                            shard,
+                            [key_names_provided[index] for index in indexes],
+                            [index_updates[index] for index in indexes] if index_updates else None,
+                        )
+                        for shard, indexes in self._shard_partitions(key_names_provided)
+                    ]
+                )
+            )
+        self._invalidate_local(*key_names_provided)
+        return _res
+
+    def _clear_keys_on(
+        self,
+        redis_instance: Redis,
+        key_names_provided: typing.List[str],
+        index_updates: typing.Optional[typing.List[IndexUpdate]] = None,
+    ) -> int:
+        if not index_updates:
+            return redis_instance.unlink(*key_names_provided)
+        with redis_instance.pipeline(transaction=not self.is_cluster) as pipe:
+            pipe.unlink(*key_names_provided)
+            for _index_update in index_updates:
+                self._queue_index_update(pipe, _index_update)
+            return pipe.execute()[0]
+
+    def delete_many(
+        self,
+        model: ModelPassed,
+        uids: typing.Iterable[str],
+        batch_size: typing.Optional[int] = None,
+        hash: bool = False,
+    ) -> int:
+        _metadata = get_model_metadata(model)
+        _key_prefix = self._key_prefix(_metadata)
+        _indexed = bool(self._indexes_for(_metadata))
+        _deleted = 0
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _deleted += self._clear_keys(
+                [_key_prefix + uid for uid in _chunk],
+                [self._index_update(_metadata, uid, {}, hash=hash) for uid in _chunk] if _indexed else None,
+                hash=hash,
+            )
+            if self._metrics is not None:
+                self._observe("delete_many", _metadata.group_name, NETWORK, _started)
+                self._metrics.observe_pipeline("delete_many", _metadata.group_name, len(_chunk))
+        return _deleted
+
+    def delete_many_by_group(
+        self, group: str, uids: typing.Iterable[str], batch_size: typing.Optional[int] = None
+    ) -> int:
+        _deleted = 0
+        for _chunk in chunked(uids, batch_size or self.bulk_batch_size):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _deleted += self._clear_keys([self._group_key(group, uid) for uid in _chunk])
+            if self._metrics is not None:
+                self._observe("delete_many_by_group", group, NETWORK, _started)
+                self._metrics.observe_pipeline("delete_many_by_group", group, len(_chunk))
+        return _deleted
+
+    def purge(
+        self,
+        model: ModelPassed,
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        max_ops_per_second: typing.Optional[float] = None,
+        progress: typing.Optional[typing.Callable[[PurgeProgress], typing.Any]] = None,
+        cursor: typing.Optional[str] = None,
+        max_keys: typing.Optional[int] = None,
+    ) -> PurgeProgress:
+        """Remove every cached instance of a model (string and hash mode), or those whose uid matches `pattern`.
+
+        Purging the whole model removes its index keys as well, a partial purge leaves the removed
+        uids in the indexes until a lookup prunes them.
+
+        Args:
+            model (ModelPassed): model class.
+            pattern (str): SCAN pattern the uids must match.
+            See `purge_group` for the other arguments.
+
+        Returns:
+            PurgeProgress: the purge's progress, `cursor` resumes it when it was stopped by `max_keys`.
+        """
+        _metadata = get_model_metadata(model)
+        _patterns = self._model_scan_patterns(_metadata, pattern)
+        return self._purge(_metadata.group_name, _patterns, batch_size, max_ops_per_second, progress, cursor, max_keys)
+
+    def purge_group(
+        self,
+        group: str,
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        max_ops_per_second: typing.Optional[float] = None,
+        progress: typing.Optional[typing.Callable[[PurgeProgress], typing.Any]] = None,
+        cursor: typing.Optional[str] = None,
+        max_keys: typing.Optional[int] = None,
+    ) -> PurgeProgress:
+        """Remove every key of a group, or those whose uid matches `pattern`, without blocking Redis.
+
+        Keys are found with one SCAN step at a time (per shard or cluster node) and each step's keys
+        are removed with UNLINK, which frees values in the background.
+
+        Args:
+            group (str): group name.
+            pattern (str): SCAN pattern the uids must match.
+            batch_size (typing.Optional[int]): SCAN COUNT of each step, defaults to `scan_count`.
+            max_ops_per_second (typing.Optional[float]): budget of SCAN steps plus removed keys per second.
+            progress (typing.Optional[typing.Callable[[PurgeProgress], typing.Any]]): called after every step.
+            cursor (typing.Optional[str]): `PurgeProgress.cursor` of an earlier call to resume.
+            max_keys (typing.Optional[int]): stop once this many keys were removed.
+
+        Returns:
+            PurgeProgress: the purge's progress, `cursor` resumes it when it was stopped by `max_keys`.
+        """
+        _patterns = [escape_scan_pattern(self._group_key(group, "")) + pattern]
+        return self._purge(group, _patterns, batch_size, max_ops_per_second, progress, cursor, max_keys)
+
+    def _model_scan_patterns(self, metadata: ModelMetadata, pattern: str = "*") -> typing.List[str]:
+        """SCAN patterns of a model's values whose uid matches `pattern`, and of all its index keys when it is "*"."""
+        _key_prefix = self._key_prefix(metadata)
+        _patterns = [escape_scan_pattern(_key_prefix) + pattern]
+        if pattern == "*" and self._indexes_for(metadata):
+            _patterns.extend(escape_scan_pattern(index_key_prefix(_key_prefix, hash)) + "*" for hash in (False, True))
+        return _patterns
+
+    def _purge(
+        self,
+        group: str,
+        patterns: typing.List[str],
+        batch_size: typing.Optional[int],
+        max_ops_per_second: typing.Optional[float],
+        progress: typing.Optional[typing.Callable[[PurgeProgress], typing.Any]],
+        cursor: typing.Optional[str],
+        max_keys: typing.Optional[int],
+    ) -> PurgeProgress:
+        _targets = self._scan_targets()
+        _progress = PurgeProgress(patterns, list(_targets), cursor)
+        _throttle = Throttle(max_ops_per_second)
+        while not _progress.done and (max_keys is None or _progress.removed < max_keys):
+            if self._metrics is not None:
+                _started = time.perf_counter()
+            _target, _cursor = _progress.next_target()
+            _redis, _node = _targets[_target]
+            _cursor, _keys = self._scan_step(_redis, _node, _cursor, _progress.pattern, batch_size or self.scan_count)
+            _removed = self._unlink(_redis, _keys) if _keys else 0
+            if _keys:
+                self._invalidate_local(*(self._decode_group_item(key) for key in _keys))
+            _progress.advance(_target, _cursor, len(_keys), _removed)
+            if self._metrics is not None:
+                self._observe("purge", group, NETWORK, _started)
+                self._metrics.observe_pipeline("purge", group, len(_keys))
+            if progress is not None:
+                progress(_progress)
+            _delay = _throttle.delay(1 + _removed)
+            if _delay:
+                time.sleep(_delay)
+        return _progress
+
+    def _scan_targets(self) -> typing.Dict[str, typing.Tuple[Redis, typing.Any]]:
+        """Every client (or cluster node) holding keys by name, with the cluster node to SCAN or None."""
+        if self.is_cluster:
+            return {node.name: (self.redis, node) for node in self.redis.get_primaries()}
+        if self._shard_ring is not None:
+            return {name: (shard, None) for name, shard in self._shards.items()}
+        _targets = {"redis": (self.redis, None)}
+        if self._redis_connection_hash_only is not None and self._redis_connection_hash_only is not self.redis:
+            _targets["redis_hashed"] = (self._redis_connection_hash_only, None)
+        return _targets
+
+    @staticmethod
+    def _scan_step(
+        redis_instance: Redis, node: typing.Any, cursor: int, pattern: str, count: int
+    ) -> typing.Tuple[int, typing.List[bytes]]:
+        if node is None:
+            return redis_instance.scan(cursor=cursor, match=pattern, count=count)
+        # Cluster clients return the cursor of every node they scanned.
+        _cursors, _keys = redis_instance.scan(cursor=cursor, match=pattern, count=count, target_nodes=node)
+        return _cursors[node.name], _keys
+
+    def _unlink(self, redis_instance: Redis, key_names_provided: typing.List[bytes]) -> int:
+        if not self.is_cluster:
+            return redis_instance.unlink(*key_names_provided)
+        # One UNLINK per key, the pipeline sends them to each node in one round trip.
+        with redis_instance.pipeline() as pipe:
+            for key_name in key_names_provided:
+                pipe.unlink(key_name)
+            return sum(pipe.execute())
+
+    def export_snapshot(
+        self,
+        model: ModelPassed,
+        path: typing.Union[str, os.PathLike],
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        raw: bool = False,
+        chunk_size: int = 1 << 20,
+    ) -> SnapshotStats:
+        """Write every cached instance of a model (string and hash mode, with its index keys) to a snapshot file.
+
+        See `export_group_snapshot`.
+        """
+        _metadata = get_model_metadata(model)
+        _patterns = self._model_scan_patterns(_metadata, pattern)
+        return self._export_snapshot(_metadata.group_name, _patterns, path, batch_size, raw, chunk_size)
+
+    def export_group_snapshot(
+        self,
+        group: str,
+        path: typing.Union[str, os.PathLike],
+        pattern: str = "*",
+        batch_size: typing.Optional[int] = None,
+        raw: bool = False,
+        chunk_size: int = 1 << 20,
+    ) -> SnapshotStats:
+        """Write the keys of a group, with their remaining TTLs, to a snapshot file for `import_snapshot`.
+
+        Keys are found one SCAN step at a time and read with DUMP and PTTL in one pipeline per step,
+        so memory stays bounded by a step and a chunk whatever the size of the group.
+
+        Args:
+            group (str): group name.
+            path (typing.Union[str, os.PathLike]): snapshot file, replaced once the export is complete.
+            pattern (str): SCAN pattern the uids must match.
+            batch_size (typing.Optional[int]): SCAN COUNT of each step, defaults to `scan_count`.
+            raw (bool): store string values as they are (restored with SET) rather than DUMPed, for a
+                Redis whose DUMP format differs. Other keys (hashes, indexes) are DUMPed either way.
+            chunk_size (int): approximate size of the file's chunks in bytes.
+
+        Returns:
+            SnapshotStats: keys and chunks written, file size.
+        """
+        _patterns = [escape_scan_pattern(self._group_key(group, "")) + pattern]
+        return self._export_snapshot(group, _patterns, path, batch_size, raw, chunk_size)
+
+    def _export_snapshot(
+        self,
+        group: str,
+        patterns: typing.List[str],
+        path: typing.Union[str, os.PathLike],
+        batch_size: typing.Optional[int],
+        raw: bool,
+        chunk_size: int,
+    ) -> SnapshotStats:
+        _metadata = {"group": group, "patterns": patterns, "exported_at": int(time.time() * 1000), "raw": raw}
+        with SnapshotWriter(path, _metadata, chunk_size=chunk_size) as writer:
+            for _target, (_redis, _node) in self._scan_targets().items():
+                for _pattern in patterns:
+                    _cursor = None
+                    while _cursor != 0:
+                        _cursor, _keys = self._scan_step(_redis, _node, _cursor or 0, _pattern, batch_size or self.scan_count)
+                        if _keys:
+                            self._export_keys(writer, _redis, _keys, raw, _target == "redis_hashed")
+            if self.versioned_namespaces:
+                # Restored keys are only read again with the generation they were written in.
+                _key_name = generation_key(group)
+                self._export_keys(writer, self._redis_for(_key_name), [_key_name.encode("utf-8")], raw, False)
+        return writer.stats
+
+    def _export_keys(
+        self, writer: SnapshotWriter, redis_instance: Redis, key_names: typing.List[bytes], raw: bool, hash_database: bool
+    ) -> None:
+        with redis_instance.pipeline(transaction=False) as pipe:
+            for key_name in key_names:
+                pipe.pttl(key_name)
+                if raw:
+                    pipe.get(key_name)
+                else:
+                    pipe.dump(key_name)
+            _replies = pipe.execute(raise_on_error=False)
+        _not_strings = []
+        for key_name, ttl, value in zip(key_names, _replies[::2], _replies[1::2]):
+            if isinstance(value, ResponseError) and raw:
+                _not_strings.append(key_name)
+            elif isinstance(value, Exception) or isinstance(ttl, Exception):
+                raise value if isinstance(value, Exception) else ttl
+            elif value is not None and ttl != -2:
+                # Keys removed since they were scanned are left out.
+                writer.add(key_name, value, ttl if ttl >= 0 else NO_TTL, dumped=not raw, hash_database=hash_database)
+        if _not_strings:
+            self._export_keys(writer, redis_instance, _not_strings, False, hash_database)
+
+    def import_snapshot(
+        self,
+        path: typing.Union[str, os.PathLike],
+        workers: int = 1,
+        replace: bool = True,
+        expire_elapsed: bool = False,
+    ) -> SnapshotStats:
+        """Restore a snapshot written by `export_snapshot` / `export_group_snapshot`, one pipeline per chunk.
+
+        The file is memory-mapped and read chunk by chunk. Keys are routed like any other key of the
+        cache (shards, cluster slots), so the target may be laid out differently from the source.
+
+        Args:
+            path (typing.Union[str, os.PathLike]): snapshot file.
+            workers (int): chunks restored at once, each over its own connection.
+            replace (bool): overwrite existing keys, else keep them and count them as skipped.
+            expire_elapsed (bool): take the time since the export off the TTLs, leaving out the keys
+                that expired since. By default keys get the TTL they had left when exported.
+
+        Raises:
+            ValueError: the file is not a complete snapshot.
+
+        Returns:
+            SnapshotStats: keys restored, skipped and left out as expired.
+        """
+        _stats = SnapshotStats()
+        _lock = threading.Lock()
+        with SnapshotReader(path) as reader:
+            _elapsed = int(time.time() * 1000) - reader.metadata["exported_at"] if expire_elapsed else 0
+
+            def _import_chunk(index: int) -> None:
+                _restored, _skipped, _expired = self._restore_entries(reader.read_chunk(index), replace, _elapsed)
+                with _lock:
+                    _stats.keys += _restored
+                    _stats.skipped += _skipped
+                    _stats.expired += _expired
+                    _stats.chunks += 1
+
+            if workers <= 1:
+                for index in range(len(reader.chunks)):
+                    _import_chunk(index)
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ridant-snapshot") as executor:
+                    list(executor.map(_import_chunk, range(len(reader.chunks))))
+            self._generations.discard(reader.metadata["group"])
+        _stats.bytes = os.path.getsize(path)
+        _stats.finished = time.monotonic()
+        return _stats
+
+    def _snapshot_batches(
+        self, entries: typing.List[SnapshotEntry], elapsed_ms: int
+    ) -> typing.Tuple[typing.List[typing.Tuple[Redis, typing.List[typing.Tuple[SnapshotEntry, int]]]], int]:
+        """Entries to restore grouped by client with their TTL, and how many expired since the export."""
+        _by_client: typing.Dict[int, typing.Tuple[Redis, typing.List[typing.Tuple[SnapshotEntry, int]]]] = {}
+        _expired = 0
+        for entry in entries:
+            _ttl = remaining_ttl(entry, elapsed_ms)
+            if _ttl is None:
+                _expired += 1
+                continue
+            _key_name = entry.key.decode("utf-8")
+            _redis = self._redis_hashed_for(_key_name) if entry.hash_database else self._redis_for(_key_name)
+            _by_client.setdefault(id(_redis), (_redis, []))[1].append((entry, _ttl))
+        return list(_by_client.values()), _expired
+
+    @staticmethod
+    def _queue_restore(pipe: typing.Any, entry: SnapshotEntry, ttl: int, replace: bool) -> None:
+        if entry.dumped:
+            pipe.restore(entry.key, ttl, entry.value, replace=replace)
+        else:
+            pipe.set(entry.key, entry.value, px=ttl or None, nx=not replace)
+
+    @staticmethod
+    def _count_restored(replies: typing.List[typing.Any]) -> typing.Tuple[int, int]:
+        _restored = _skipped = 0
+        for reply in replies:
+            if isinstance(reply, ResponseError) and str(reply).startswith("BUSYKEY"):
+                _skipped += 1
+            elif isinstance(reply, Exception):
+                raise reply
+            elif reply is None:
+                # SET NX of a raw value found the key.
+                _skipped += 1
+            else:
+                _restored += 1
+        return _restored, _skipped
+
+    def _restore_entries(
+        self, entries: typing.List[SnapshotEntry], replace: bool, elapsed_ms: int
+    ) -> typing.Tuple[int, int, int]:
+        _batches, _expired = self._snapshot_batches(entries, elapsed_ms)
+        _restored = _skipped = 0
+        for _redis, items in _batches:
+            with _redis.pipeline(transaction=False) as pipe:
+                for entry, ttl in items:
+                    self._queue_restore(pipe, entry, ttl, replace)
+                _counts = self._count_restored(pipe.execute(raise_on_error=False))
+            _restored, _skipped = _restored + _counts[0], _skipped + _counts[1]
+        self._invalidate_local(*(entry.key.decode("utf-8") for entry in entries))
+        return _restored, _skipped, _expired
+
+    def invalidate(self, model: ModelPassed, reclaim: bool = True) -> int:
+        """Invalidate every cached instance of a model at once, see `invalidate_group`."""
+        return self.invalidate_group(get_model_metadata(model).group_name, reclaim=reclaim)
+
+    def invalidate_group(self, group: str, reclaim: bool = True) -> int:
+        """Invalidate a whole group by moving it to a new generation, in one INCR however large the group is.
+
+        Keys of older generations are never read again. They expire on their TTL, and unless
+        `reclaim` is False a background thread removes them right away (see `reclaim_group`).
+        Other processes keep using the generation they know for up to `generation_ttl` seconds.
+
+        Args:
+            group (str): group name.
+            reclaim (bool): remove the keys of older generations in the background.
+
+        Raises:
+            ValueError: the cache does not use versioned namespaces.
+
+        Returns:
+            int: the group's new generation.
+        """
+        if not self.versioned_namespaces:
+            raise ValueError("Invalidating a group needs versioned_namespaces=True.")
+        _key_name = generation_key(group)
+        _generation = self._generations.set(group, self._redis_for(_key_name).incr(_key_name))
+        if reclaim:
+            threading.Thread(
+                target=self._reclaim_in_background, args=(group, _generation), name="ridant-reclaim", daemon=True
+            ).start()
+        return _generation
+
+    def reclaim(self, model: ModelPassed) -> int:
+        """Remove the keys a model left in generations before its current one, see `reclaim_group`."""
+        return self.reclaim_group(get_model_metadata(model).group_name)
+
+    def reclaim_group(self, group: str, generation: typing.Optional[int] = None) -> int:
+        """Remove the values and index keys a group left in generations before `generation`.
+
+        Keys are found with SCAN and removed with UNLINK in batches of `bulk_batch_size`, so Redis
+        is never blocked for long.
+
+        Args:
+            group (str): group name.
+            generation (typing.Optional[int]): keep this generation and later ones, defaults to the current one.
+
+        Returns:
+            int: how many keys were removed.
+        """
+        if generation is None:
+            self._generations.discard(group)
+            generation = self._generation(group)
+        _key_prefix = self._unversioned_group_prefix(group)
+        _patterns = reclaim_patterns(_key_prefix, generation)
+        if not _patterns:
+            return 0
+        _calls = [
+            functools.partial(self._reclaim_on, redis_instance, _key_prefix, generation, _patterns)
+            for redis_instance in self._scan_clients()
+        ]
+        return sum(self._fan_out(_calls) if self._shard_ring is not None else [call() for call in _calls])
+
+    def _reclaim_in_background(self, group: str, generation: int) -> None:
+        try:
+            _reclaimed = self.reclaim_group(group, generation)
+            logger.debug(f"Reclaimed {_reclaimed} keys of '{group}' from before generation {generation}")
+        except Exception:
+            logger.exception(f"Unable to reclaim the keys of '{group}' from before generation {generation}")
+
+    def _reclaim_on(self, redis_instance: Redis, key_prefix: str, generation: int, patterns: typing.List[str]) -> int:
+        _reclaimed = 0
+        for pattern in patterns:
+            _keys = (
+                key
+                for key in redis_instance.scan_iter(match=pattern, count=self.scan_count)
+                if is_reclaimable(self._decode_group_item(key), key_prefix, generation)
+            )
+            for _chunk in chunked(_keys, self.bulk_batch_size):
+                _reclaimed += redis_instance.unlink(*_chunk)
+        return _reclaimed
+
+    def _scan_clients(self) -> typing.List[Redis]:
+        """Every client holding keys: each shard, or the client and the hash mode one."""
+        if self._shard_ring is not None:
+            return list(self._shards.values())
+        if self._redis_connection_hash_only is None or self._redis_connection_hash_only is self.redis:
+            return [self.redis]
+        return [self.redis, self._redis_connection_hash_only]
 
     def update(
         self,
@@ -320,25 +1862,285 @@ class RidantCache(object):
             typing.Union[str, int, bytes]
         ],
         extra_redis_arguments: typing.Optional[dict] = {},
+    ) -> bool:
+        if self._metrics is not None:
+            _started = time.perf_counter()
+            _res = self._update(model, uid, attribute_to_update, attribute_value_to_be_updated_to, extra_redis_arguments)
+            self._observe("update", get_model_metadata(model).group_name, NETWORK, _started)
+            return _res
+        return self._update(model, uid, attribute_to_update, attribute_value_to_be_updated_to, extra_redis_arguments)
+
+    def _update(
+        self,
+        model: ModelPassed,
+        uid: str,
+        attribute_to_update: typing.Optional[str],
+        attribute_value_to_be_updated_to: typing.Optional[
+            typing.Union[str, int, bytes]
+        ],
+        extra_redis_arguments: typing.Optional[dict] = {},
     ) -> bool:
         if attribute_to_update and attribute_value_to_be_updated_to is not None:
             if isinstance(attribute_value_to_be_updated_to, (list, dict)):
-                logger.warning(
-                    f"Please avoid using lists or dicts, You will need to overwrite the entire key in order to update. Key: {attribute_to_update}, Value: {attribute_value_to_be_updated_to}"
+                # Lists become one JSON field and dicts flattened fields, the way cache(..., hash=True) writes them.
+                _res = self._partial_update(
+                    "update", model, uid, SET, attribute_to_update, attribute_value_to_be_updated_to, hash=True
                 )
-                return self._hash_cache(
-                    key_name_provided=get_name_from_model(model) + ":" + uid,
-                    value_provided=json.dumps(attribute_value_to_be_updated_to),
-                    extra_redis_arguments=extra_redis_arguments,
+                return _res is not None
+            _key_name = self._model_key(model, uid)
+            _index_update = self._attribute_index_update(model, uid, attribute_to_update, attribute_value_to_be_updated_to)
+            _stored_value = attribute_value_to_be_updated_to
+            if isinstance(_stored_value, str):
+                _stored_value = escape_hash_string(_stored_value)
+            if _index_update is None:
+                _res = self._hash_cache_attribute(
+                    key_name=_key_name,
+                    attr=attribute_to_update,
+                    value=_stored_value,
+                    # extra_redis_arguments=extra_redis_arguments,
                 )
-            return self._hash_cache_attribute(
-                key_name=get_name_from_model(model) + ":" + uid,
-                attr=attribute_to_update,
-                value=attribute_value_to_be_updated_to,
-                # extra_redis_arguments=extra_redis_arguments,
-            )
+            else:
+                with self._redis_hashed_for(_key_name).pipeline(transaction=not self.is_cluster) as pipe:
+                    pipe.hset(_key_name, attribute_to_update, _stored_value)
+                    self._queue_index_update(pipe, _index_update)
+                    _res = pipe.execute()[0]
+            self._invalidate_local(_key_name)
+            return _res
         else:
             logger.warning("If you're not updating a specific attribute, use cache()")
             return self.cache(
                 model=model, uid=uid, extra_redis_arguments=extra_redis_arguments
             )
+
+    def _attribute_index_update(
+        self, model: ModelPassed, uid: str, attribute: str, value: typing.Any
+    ) -> typing.Optional[IndexUpdate]:
+        _metadata = get_model_metadata(model)
+        # Hash fields are flattened with ":", indexes are declared with ".".
+        _field = attribute.replace(":", ".")
+        if _field not in self._indexes_for(_metadata):
+            return None
+        return self._index_update(_metadata, uid, {_field: value}, mode=PATCH, hash=True)
+
+    def update_field(
+        self, model: typing.Type[ModelPassed], uid: str, path: Path, value: typing.Any, hash: bool = False
+    ) -> typing.Any:
+        """Set the field at `path` ("a.b", "items.0.quantity" or a list of keys) and return its new value.
+
+        Runs as one Lua script, so concurrent partial updates of the same key never lose each other's
+        changes. String-mode values must be plain JSON (not compressed, not msgpack), everything outside
+        the updated field is kept as stored. Returns None when the key does not exist.
+        Indexed fields inside `path` are re-indexed right after, in a second round trip.
+        """
+        return self._partial_update("update_field", model, uid, SET, path, value, hash=hash)
+
+    def merge_fields(
+        self, model: typing.Type[ModelPassed], uid: str, path: Path, values: dict, hash: bool = False
+    ) -> typing.Any:
+        return self._partial_update("merge_fields", model, uid, MERGE, path, values, hash=hash)
+
+    def increment(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        path: Path,
+        amount: typing.Union[int, float] = 1,
+        hash: bool = False,
+    ) -> typing.Union[int, float, None]:
+        return self._partial_update("increment", model, uid, INCREMENT, path, amount, hash=hash)
+
+    def append(
+        self, model: typing.Type[ModelPassed], uid: str, path: Path, *values: typing.Any, hash: bool = False
+    ) -> typing.Optional[list]:
+        return self._partial_update("append", model, uid, APPEND, path, values, hash=hash)
+
+    def _partial_update(
+        self,
+        operation_name: str,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        operation: str,
+        path: Path,
+        value: typing.Any,
+        hash: bool = False,
+    ) -> typing.Any:
+        _key_name = self._model_key(model, uid)
+        _path = split_path(path)
+        if hash and below_hash_leaf(model, _path):
+            raise ValueError(
+                f"Unable to {operation} {_path} of '{_key_name}': hash mode stores the field it is in as one JSON value"
+            )
+        _arguments = script_arguments(operation, _path, partial_update_arguments(operation, _path, value, hash))
+        if self._metrics is not None:
+            _started = time.perf_counter()
+
+        try:
+            if hash:
+                _reply = self._hash_update_script(
+                    keys=[_key_name], args=_arguments, client=self._redis_hashed_for(_key_name)
+                )
+            else:
+                _reply = self._json_update_script(keys=[_key_name], args=_arguments, client=self._redis_for(_key_name))
+        except ResponseError as error:
+            logger.exception(f"Unable to {operation} {_path} of '{_key_name}'")
+            raise ValueError(f"Unable to {operation} {_path} of '{_key_name}': {error}")
+
+        if self._metrics is not None:
+            self._observe(operation_name, get_model_metadata(model).group_name, NETWORK, _started)
+        self._invalidate_local(_key_name)
+        _res = decode_hash_reply(_path, operation, _reply) if hash else decode_json_reply(_reply)
+        _metadata = get_model_metadata(model)
+        if _res is not None and self._indexes_for(_metadata):
+            _values = indexed_values_below(_metadata.indexes, _path, _res)
+            if _values:
+                self._run_index_update(
+                    self._redis_hashed_for(_key_name) if hash else self._redis_for(_key_name),
+                    self._index_update(_metadata, uid, _values, mode=PATCH, hash=hash),
+                )
+        return _res
+
+    def cached(
+        self,
+        model: typing.Type[ModelPassed],
+        key: KeyBuilder,
+        ttl: typing.Optional[float] = None,
+        lock_timeout: float = 10.0,
+        lock_wait: typing.Optional[float] = None,
+        lock_poll_interval: float = 0.05,
+        early_recompute: typing.Optional[float] = None,
+    ) -> typing.Callable[[typing.Callable[..., ModelPassed]], typing.Callable[..., ModelPassed]]:
+        """Read-through caching decorator for a function loading a `model` instance.
+
+        `key` is a format string over the function's parameters (e.g. "{user_id}")
+        or a callable taking the same arguments, and gives the uid the result is
+        cached under for `ttl` seconds. On a miss only one call per key runs the
+        function: concurrent callers in this process wait for it, other processes
+        wait on a redis lock held for at most `lock_timeout` seconds, and give up
+        waiting after `lock_wait` seconds (defaults to `lock_timeout`).
+
+        With `early_recompute` (the XFetch beta, 1.0 is a good start) a caller may
+        refresh the value shortly before it expires while others keep reading it.
+        A function returning None is not cached.
+        """
+        _policy = ReadThroughPolicy(
+            ttl=ttl,
+            lock_timeout=lock_timeout,
+            lock_wait=lock_wait,
+            lock_poll_interval=lock_poll_interval,
+            early_recompute=early_recompute,
+        )
+
+        def _decorator(func: typing.Callable[..., ModelPassed]) -> typing.Callable[..., ModelPassed]:
+            _resolve_key = key_resolver(key, func)
+
+            @functools.wraps(func)
+            def _wrapper(*args, **kwargs) -> ModelPassed:
+                return self._read_through(model, _resolve_key(args, kwargs), lambda: func(*args, **kwargs), _policy)
+
+            return _wrapper
+
+        return _decorator
+
+    def _acquire_lock(self, key_name_provided: str, timeout: float) -> typing.Optional[str]:
+        _token = uuid.uuid4().hex
+        if self._redis_for(key_name_provided).set(LOCK_PREFIX + key_name_provided, _token, nx=True, px=int(timeout * 1000)):
+            return _token
+        return None
+
+    def _release_lock(self, key_name_provided: str, token: str) -> None:
+        self._release_lock_script(
+            keys=[LOCK_PREFIX + key_name_provided], args=[token], client=self._redis_for(key_name_provided)
+        )
+
+    def _get_with_expiry(
+        self, key_name_provided: str
+    ) -> typing.Tuple[typing.Optional[bytes], int, typing.Optional[float]]:
+        with self._redis_for(key_name_provided).pipeline(transaction=False) as pipe:
+            pipe.get(key_name_provided)
+            pipe.pttl(key_name_provided)
+            pipe.get(DELTA_PREFIX + key_name_provided)
+            _fetched_item, _remaining_ms, _delta_ms = pipe.execute()
+        return _fetched_item, _remaining_ms, float(_delta_ms) if _delta_ms is not None else None
+
+    def _load_and_cache(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        loader: typing.Callable[[], typing.Any],
+        policy: ReadThroughPolicy,
+    ) -> typing.Optional[ModelPassed]:
+        _started = time.perf_counter()
+        _res = loader()
+        if _res is None:
+            return None
+        if not isinstance(_res, model):
+            _res = model.parse_obj(_res)
+
+        self.cache(_res, uid, extra_redis_arguments=policy.extra_redis_arguments)
+        if policy.early_recompute is not None:
+            _key_name = self._model_key(model, uid)
+            self._redis_for(_key_name).set(
+                DELTA_PREFIX + _key_name,
+                (time.perf_counter() - _started) * 1000,
+                **policy.extra_redis_arguments,
+            )
+        return _res
+
+    def _load_on_miss(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        loader: typing.Callable[[], typing.Any],
+        policy: ReadThroughPolicy,
+    ) -> typing.Optional[ModelPassed]:
+        _key_name = self._model_key(model, uid)
+        _deadline = time.monotonic() + policy.lock_wait
+        _waited = False
+        while True:
+            _token = self._acquire_lock(_key_name, policy.lock_timeout)
+            if _token is not None:
+                try:
+                    # Whoever held the lock before us has most likely filled the key.
+                    _res = self.find_one(model, uid) if _waited else None
+                    return _res if _res is not None else self._load_and_cache(model, uid, loader, policy)
+                finally:
+                    self._release_lock(_key_name, _token)
+
+            if time.monotonic() >= _deadline:
+                logger.warning(f"Gave up waiting for the lock on '{_key_name}', loading it anyway")
+                return self._load_and_cache(model, uid, loader, policy)
+
+            time.sleep(policy.lock_poll_interval)
+            _waited = True
+            _res = self.find_one(model, uid)
+            if _res is not None:
+                return _res
+
+    def _read_through(
+        self,
+        model: typing.Type[ModelPassed],
+        uid: str,
+        loader: typing.Callable[[], typing.Any],
+        policy: ReadThroughPolicy,
+    ) -> typing.Optional[ModelPassed]:
+        _key_name = self._model_key(model, uid)
+        if policy.early_recompute is None:
+            _res = self.find_one(model, uid)
+            if _res is not None:
+                return _res
+        else:
+            _fetched_item, _remaining_ms, _delta_ms = self._get_with_expiry(_key_name)
+            if _fetched_item is not None:
+                _res = self._parse_fetched_item(model, _fetched_item)
+                if not should_recompute_early(_remaining_ms, _delta_ms, policy.early_recompute):
+                    return _res
+                # Only the caller winning the lock refreshes, the rest keep serving the current value.
+                _token = self._acquire_lock(_key_name, policy.lock_timeout)
+                if _token is None:
+                    return _res
+                try:
+                    return self._load_and_cache(model, uid, loader, policy) or _res
+                finally:
+                    self._release_lock(_key_name, _token)
+
+        return self._single_flight.do(_key_name, lambda: self._load_on_miss(model, uid, loader, policy))
@@ -1,10 +1,22 @@
-import flatdict
+import typing
 import json
 
 
+# Value of a hash field set to None. A missing field reads back as the model's default, which
+# is not what a field explicitly set to None holds.
+NONE_VALUE = "\x00"
+# Only lists and dicts are stored starting like JSON. Strings starting like JSON, or with NONE_VALUE,
+# are stored behind an extra NONE_VALUE so they read back as they were (see escape_hash_string).
+_ESCAPED_STARTS = (NONE_VALUE, "[", "{")
+
+
 def flatten_dict_for_caching(d: dict) -> dict:
     """Flatten a dictionary for caching purposes.
 
+    Nested dicts become "parent:child" fields, except empty ones and the ones with a ":" in a
+    key, which are stored whole as one JSON field. None is stored as NONE_VALUE, and strings are
+    escaped with escape_hash_string.
+
     Args:
         d (dict): Dictionary to flatten.
 
@@ -13,11 +25,112 @@ def flatten_dict_for_caching(d: dict) -> dict:
         ```"parent:child": "value"
         ```
     """    
-    _parse_flattened_dict = flatdict.FlatDict(d)
     _returned_dict = {}
-    for key, value in _parse_flattened_dict.items():
-        if isinstance(value, (list, dict, set, tuple)):
-            _returned_dict[key] = json.dumps(value)
+    _flatten_into(_returned_dict, "", d)
+    return _returned_dict
+
+
+def _flatten_into(flattened: dict, prefix: str, d: dict) -> None:
+    for key, value in d.items():
+        _field = prefix + str(key)
+        if isinstance(value, dict) and value and not any(":" in str(child) for child in value):
+            _flatten_into(flattened, _field + ":", value)
+        elif value is None:
+            flattened[_field] = NONE_VALUE
+        elif isinstance(value, str):
+            flattened[_field] = escape_hash_string(value)
+        elif isinstance(value, (list, dict, set, tuple, bool)):
+            flattened[_field] = json.dumps(value)
         else:
-            _returned_dict[key] = value
-    return _returned_dict
\ No newline at end of file
+            flattened[_field] = value
+
+
+def escape_hash_string(value: str) -> str:
+    """A string as stored in a hash field, so it does not read back as None or as JSON."""
+    if value.startswith(_ESCAPED_STARTS):
+        return NONE_VALUE + value
+    return value
+
+
+def cached_hash_value(value: typing.Any) -> typing.Any:
+    """A value read from a hash field, decoded as utf-8 and as JSON when it holds a list or an object."""
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if not isinstance(value, str):
+        return value
+    if value[:1] == NONE_VALUE:
+        return cached_hash_string(value)
+    if value[:1] in ("[", "{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def cached_hash_string(value: typing.Union[str, bytes]) -> typing.Optional[str]:
+    """A value read from the hash field of a str field, decoded as utf-8 and never as JSON."""
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if value[:1] == NONE_VALUE:
+        return None if value == NONE_VALUE else value[1:]
+    return value
+
+
+def unflatten_dict_from_cache(d: dict, into: typing.Optional[dict] = None) -> dict:
+    """Rebuild a nested dictionary from the output of `flatten_dict_for_caching`.
+
+    Args:
+        d (dict): flattened dictionary, e.g. the result of HGETALL. bytes are decoded as utf-8.
+        into (typing.Optional[dict]): dictionary to add the fields to, a new one by default.
+
+    Returns:
+        dict: nested dictionary. values holding JSON lists or objects are decoded.
+    """
+    _returned_dict = {} if into is None else into
+    for key, value in d.items():
+        if isinstance(key, bytes):
+            key = key.decode("utf-8")
+        value = cached_hash_value(value)
+
+        *_parents, _leaf = key.split(":")
+        _node = _returned_dict
+        for parent in _parents:
+            _node = _node.setdefault(parent, {})
+        _node[_leaf] = value
+    return _returned_dict
+
+def chunked(iterable: typing.Iterable, size: int) -> typing.Iterator[list]:
+    """Split an iterable into lists of at most `size` items.
+
+    Args:
+        iterable (typing.Iterable): items to split.
+        size (int): maximum amount of items per chunk.
+
+    Yields:
+        list: the next chunk, in input order.
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    _chunk = []
+    for item in iterable:
+        _chunk.append(item)
+        if len(_chunk) >= size:
+            yield _chunk
+            _chunk = []
+    if _chunk:
+        yield _chunk
+
+
+def escape_scan_pattern(s: str) -> str:
+    """Escape glob characters so `s` only matches itself in SCAN/KEYS patterns.
+
+    Args:
+        s (str): literal part of a pattern, e.g. a group name.
+
+    Returns:
+        str: escaped string.
+    """
+    for char in ("\\", "*", "?", "[", "]"):
+        s = s.replace(char, "\\" + char)
+    return s
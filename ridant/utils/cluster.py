@@ -0,0 +1,42 @@
+import typing
+
+# Cluster clients have no MULTI, so replacing (or writing a very wide) hash
+# atomically happens in one script instead. ARGV[1] is "1" to DEL first,
+# ARGV[2] the TTL in milliseconds ("0" for none, "-1" to keep the one the hash
+# had), the rest are field / value pairs, HSET in chunks small enough for unpack().
+WRITE_HASH_SCRIPT = """
+local ttl = ARGV[2]
+if ttl == "-1" then
+    ttl = tostring(redis.call("PTTL", KEYS[1]))
+end
+if ARGV[1] == "1" then
+    redis.call("DEL", KEYS[1])
+end
+for i = 3, #ARGV, 1000 do
+    redis.call("HSET", KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+if tonumber(ttl) > 0 then
+    redis.call("PEXPIRE", KEYS[1], ttl)
+end
+return 1
+"""
+
+
+def hash_tag(value: str) -> str:
+    """Wrap a value in a redis cluster hash tag, so every key containing it maps to the same slot.
+
+    Args:
+        value (str): the group name, tenant id, ... to tag.
+
+    Returns:
+        str: "{value}"
+    """
+    return "{" + value + "}"
+
+
+def flatten_mapping_arguments(mapping: dict) -> typing.List[typing.Any]:
+    _arguments = []
+    for field, value in mapping.items():
+        _arguments.append(field)
+        _arguments.append(value)
+    return _arguments
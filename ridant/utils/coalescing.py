@@ -0,0 +1,79 @@
+import asyncio
+import typing
+
+
+class ReadCoalescer(object):
+    """Batches single-key reads made close together into one multi-key read.
+
+    Keys requested with `load` are collected until the end of the current
+    event loop iteration (or for `window` seconds when it is positive), then
+    fetched with a single `load_many(keys)` call, e.g. MGET. A key requested
+    several times in one batch is fetched once and every caller gets the value.
+    A batch is sent early once it holds `max_batch_size` distinct keys.
+    """
+
+    def __init__(
+        self,
+        load_many: typing.Callable[[typing.List[str]], typing.Awaitable[typing.List[typing.Any]]],
+        window: float = 0.0,
+        max_batch_size: int = 500,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self.requests = 0
+        self.batches = 0
+        self.keys_loaded = 0
+
+        self._load_many = load_many
+        self._pending: typing.Dict[str, asyncio.Future] = {}
+        self._scheduled: typing.Optional[asyncio.Handle] = None
+        # The loop only keeps weak references to tasks, and only this one resolves a batch's futures.
+        self._tasks: typing.Set[asyncio.Task] = set()
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {"requests": self.requests, "batches": self.batches, "keys_loaded": self.keys_loaded}
+
+    async def load(self, key: str) -> typing.Any:
+        self.requests += 1
+        _future = self._pending.get(key)
+        if _future is None:
+            _loop = asyncio.get_running_loop()
+            _future = self._pending[key] = _loop.create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._scheduled is None:
+                if self.window > 0:
+                    self._scheduled = _loop.call_later(self.window, self._dispatch)
+                else:
+                    self._scheduled = _loop.call_soon(self._dispatch)
+        # Shared by every caller of this key, one of them being cancelled must not cancel the rest.
+        return await asyncio.shield(_future)
+
+    def _dispatch(self) -> None:
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        _batch, self._pending = self._pending, {}
+        if _batch:
+            _task = asyncio.ensure_future(self._load_batch(_batch))
+            self._tasks.add(_task)
+            _task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, batch: typing.Dict[str, asyncio.Future]) -> None:
+        self.batches += 1
+        self.keys_loaded += len(batch)
+        try:
+            _values = await self._load_many(list(batch))
+        except Exception as error:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for future, value in zip(batch.values(), _values):
+            if not future.done():
+                future.set_result(value)
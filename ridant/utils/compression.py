@@ -0,0 +1,225 @@
+import threading
+import time
+import typing
+import zlib
+
+LZ4_AVAILABLE = False
+ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+
+    LZ4_AVAILABLE = True
+except Exception:
+    pass
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except Exception:
+    pass
+
+# Compressed values start with this byte followed by the compressor's tag.
+# Neither JSON nor stamped serializer output (see serializers.FORMAT_HEADER)
+# can start with it, so compressed and plain values can share a namespace.
+COMPRESSION_HEADER = b"\x01"
+
+
+class Compressor(object):
+    name: str = ""
+    tag: bytes = b""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: typing.Union[bytes, memoryview]) -> bytes:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self.name!r}>"
+
+
+class ZlibCompressor(Compressor):
+    name = "zlib"
+    tag = b"z"
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: typing.Union[bytes, memoryview]) -> bytes:
+        return zlib.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    name = "lz4"
+    tag = b"4"
+
+    def __init__(self, level: int = 0) -> None:
+        if not LZ4_AVAILABLE:
+            raise ImportError("lz4 is not installed, install it to use lz4 compression.")
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4.frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data: typing.Union[bytes, memoryview]) -> bytes:
+        return lz4.frame.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    name = "zstd"
+    tag = b"s"
+
+    def __init__(self, level: int = 3) -> None:
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is not installed, install it to use zstd compression.")
+        self.level = level
+        # zstandard contexts are not thread safe, keep one pair per thread.
+        self._local = threading.local()
+
+    def _contexts(self) -> typing.Tuple["zstandard.ZstdCompressor", "zstandard.ZstdDecompressor"]:
+        if not hasattr(self._local, "contexts"):
+            self._local.contexts = (
+                zstandard.ZstdCompressor(level=self.level),
+                zstandard.ZstdDecompressor(),
+            )
+        return self._local.contexts
+
+    def compress(self, data: bytes) -> bytes:
+        return self._contexts()[0].compress(data)
+
+    def decompress(self, data: typing.Union[bytes, memoryview]) -> bytes:
+        return self._contexts()[1].decompress(data)
+
+
+_COMPRESSOR_CLASSES: typing.Dict[str, typing.Type[Compressor]] = {
+    ZlibCompressor.name: ZlibCompressor,
+    Lz4Compressor.name: Lz4Compressor,
+    ZstdCompressor.name: ZstdCompressor,
+}
+_COMPRESSORS: typing.Dict[bytes, Compressor] = {}
+
+
+def get_compressor(compressor: typing.Union[str, Compressor, None]) -> typing.Optional[Compressor]:
+    """Resolve a compressor name (or instance) to a compressor.
+
+    Args:
+        compressor (typing.Union[str, Compressor, None]): "zlib", "lz4", "zstd", an instance or None.
+
+    Returns:
+        typing.Optional[Compressor]: the compressor, None when compression is disabled.
+    """
+    if compressor is None or isinstance(compressor, Compressor):
+        return compressor
+    if compressor not in _COMPRESSOR_CLASSES:
+        raise ValueError(f"Unknown compressor '{compressor}', expected one of {list(_COMPRESSOR_CLASSES)}")
+    return _compressor_for_tag(_COMPRESSOR_CLASSES[compressor].tag)
+
+
+def _compressor_for_tag(tag: bytes) -> Compressor:
+    if tag not in _COMPRESSORS:
+        for compressor_class in _COMPRESSOR_CLASSES.values():
+            if compressor_class.tag == tag:
+                _COMPRESSORS[tag] = compressor_class()
+                break
+        else:
+            raise ValueError(f"Unknown compression tag {tag!r}")
+    return _COMPRESSORS[tag]
+
+
+class CompressionStats(object):
+    """Running totals for one model group, used to tune the size threshold."""
+
+    __slots__ = (
+        "values",
+        "compressed_values",
+        "bytes_in",
+        "bytes_out",
+        "compress_seconds",
+        "decompressed_values",
+        "decompress_seconds",
+    )
+
+    def __init__(self) -> None:
+        self.values = 0
+        self.compressed_values = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_seconds = 0.0
+        self.decompressed_values = 0
+        self.decompress_seconds = 0.0
+
+    @property
+    def ratio(self) -> typing.Optional[float]:
+        """Compressed size over original size for the values that were compressed."""
+        if not self.bytes_in:
+            return None
+        return self.bytes_out / self.bytes_in
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        _stats = {name: getattr(self, name) for name in self.__slots__}
+        _stats["ratio"] = self.ratio
+        return _stats
+
+
+class ValueCompressor(object):
+    """Applies a compressor to values at or above `threshold` bytes and keeps per-group stats."""
+
+    def __init__(self, compressor: typing.Union[str, Compressor], threshold: int = 1024) -> None:
+        self.compressor = get_compressor(compressor)
+        self.threshold = threshold
+        self._stats: typing.Dict[str, CompressionStats] = {}
+        self._lock = threading.Lock()
+
+    def stats(self, group: typing.Optional[str] = None) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        return {
+            name: stats.as_dict()
+            for name, stats in self._stats.items()
+            if group is None or name == group
+        }
+
+    def _stats_for(self, group: str) -> CompressionStats:
+        _stats = self._stats.get(group)
+        if _stats is None:
+            with self._lock:
+                _stats = self._stats.setdefault(group, CompressionStats())
+        return _stats
+
+    def compress(self, data: bytes, group: str) -> bytes:
+        _stats = self._stats_for(group)
+        _stats.values += 1
+        if len(data) < self.threshold:
+            return data
+
+        _started = time.perf_counter()
+        _compressed = self.compressor.compress(data)
+        _stats.compress_seconds += time.perf_counter() - _started
+        if len(_compressed) + 2 >= len(data):
+            # Incompressible payloads are stored as-is rather than grown.
+            return data
+        _stats.compressed_values += 1
+        _stats.bytes_in += len(data)
+        _stats.bytes_out += len(_compressed) + 2
+        return COMPRESSION_HEADER + self.compressor.tag + _compressed
+
+    def decompress(self, data: bytes, group: str) -> bytes:
+        if data[:1] != COMPRESSION_HEADER:
+            return data
+
+        _stats = self._stats_for(group)
+        _started = time.perf_counter()
+        _decompressed = decompress_value(data)
+        _stats.decompress_seconds += time.perf_counter() - _started
+        _stats.decompressed_values += 1
+        return _decompressed
+
+
+def decompress_value(data: bytes) -> bytes:
+    """Decompress a value written by `ValueCompressor`, returning other values untouched."""
+    if data[:1] != COMPRESSION_HEADER:
+        return data
+    return _compressor_for_tag(data[1:2]).decompress(memoryview(data)[2:])
@@ -0,0 +1,76 @@
+import datetime
+import time
+import typing
+
+TTL = typing.Union[int, float, datetime.timedelta]
+
+# SET options that already decide the key's expiry.
+EXPIRY_ARGUMENTS = ("ex", "px", "exat", "pxat", "keepttl")
+
+# hash_expiry for keepttl: a replaced hash gets the TTL it had before the write.
+KEEP_TTL = -1
+
+
+def ttl_milliseconds(ttl: typing.Optional[TTL]) -> typing.Optional[int]:
+    """A TTL in seconds (or a timedelta) as whole milliseconds, None for no TTL."""
+    if ttl is None:
+        return None
+    if isinstance(ttl, datetime.timedelta):
+        ttl = ttl.total_seconds()
+    if ttl <= 0:
+        raise ValueError(f"TTLs must be positive, got {ttl}.")
+    return max(1, int(ttl * 1000))
+
+
+def with_default_ttl(extra_redis_arguments: typing.Optional[dict], ttl: typing.Optional[int]) -> dict:
+    """SET arguments expiring the key after `ttl` milliseconds, unless they already decide its expiry.
+
+    Args:
+        extra_redis_arguments (typing.Optional[dict]): arguments passed to a cache call.
+        ttl (typing.Optional[int]): default TTL of the key's model or group in milliseconds.
+
+    Returns:
+        dict: the arguments to pass to SET.
+    """
+    extra_redis_arguments = extra_redis_arguments or {}
+    if ttl is None or any(extra_redis_arguments.get(name) for name in EXPIRY_ARGUMENTS):
+        return extra_redis_arguments
+    return {**extra_redis_arguments, "px": ttl}
+
+
+def _timestamp(value: typing.Union[int, float, datetime.datetime]) -> float:
+    return value.timestamp() if isinstance(value, datetime.datetime) else value
+
+
+def expiry_milliseconds(extra_redis_arguments: typing.Optional[dict]) -> typing.Optional[int]:
+    """The expiry SET arguments (ex / px / exat / pxat) ask for, in milliseconds from now.
+
+    Hashes are written with HSET, which takes no expiry, so it is applied with PEXPIRE next to it.
+    """
+    if not extra_redis_arguments:
+        return None
+    if extra_redis_arguments.get("ex") is not None:
+        return ttl_milliseconds(extra_redis_arguments["ex"])
+    if extra_redis_arguments.get("px") is not None:
+        _px = extra_redis_arguments["px"]
+        return ttl_milliseconds(_px if isinstance(_px, datetime.timedelta) else _px / 1000)
+    if extra_redis_arguments.get("exat") is not None:
+        return max(1, int((_timestamp(extra_redis_arguments["exat"]) - time.time()) * 1000))
+    if extra_redis_arguments.get("pxat") is not None:
+        _pxat = extra_redis_arguments["pxat"]
+        _at = _pxat.timestamp() if isinstance(_pxat, datetime.datetime) else _pxat / 1000
+        return max(1, int((_at - time.time()) * 1000))
+    return None
+
+
+def hash_expiry(extra_redis_arguments: typing.Optional[dict], ttl: typing.Optional[int]) -> typing.Optional[int]:
+    """TTL in milliseconds to give a hash written with `extra_redis_arguments`, `ttl` unless they ask for another one.
+
+    keepttl gives KEEP_TTL: HSET keeps the TTL, but replacing a hash deletes it first.
+    """
+    _expiry = expiry_milliseconds(extra_redis_arguments)
+    if _expiry is not None:
+        return _expiry
+    if extra_redis_arguments and extra_redis_arguments.get("keepttl"):
+        return KEEP_TTL
+    return ttl
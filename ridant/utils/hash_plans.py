@@ -0,0 +1,215 @@
+import json
+import threading
+import typing
+
+from pydantic import BaseModel, Extra
+from pydantic.fields import (
+    SHAPE_DEQUE,
+    SHAPE_FROZENSET,
+    SHAPE_LIST,
+    SHAPE_SEQUENCE,
+    SHAPE_SET,
+    SHAPE_SINGLETON,
+    SHAPE_TUPLE,
+    SHAPE_TUPLE_ELLIPSIS,
+    ModelField,
+)
+from pydantic.json import pydantic_encoder
+from pydantic.utils import lenient_issubclass
+
+from ridant.utils.caching_tools import (
+    NONE_VALUE,
+    cached_hash_string,
+    cached_hash_value,
+    escape_hash_string,
+    flatten_dict_for_caching,
+    unflatten_dict_from_cache,
+)
+from ridant.utils.serializers import to_jsonable
+
+# How a field is written to (and read from) a hash, see flatten_model.
+_SCALAR = 0  # str, int and float fields, written as they are (strings escaped with escape_hash_string)
+_BOOL = 1  # "true" / "false", as json.dumps writes them
+_JSON = 2  # lists, sets and tuples, one JSON array field
+_MODEL = 3  # nested models, flattened below "name:"
+_ENCODE = 4  # anything else JSON encodes to a scalar (dates, UUIDs, enums...), or walked like _GENERIC
+_GENERIC = 5  # dicts, unions: the generic walker, below "name:"
+
+_JSON_SHAPES = (SHAPE_LIST, SHAPE_SET, SHAPE_TUPLE, SHAPE_TUPLE_ELLIPSIS, SHAPE_SEQUENCE, SHAPE_FROZENSET, SHAPE_DEQUE)
+
+FlattenPlan = typing.List[typing.Tuple[str, str, int, typing.Any]]
+# Hash field (str and bytes) -> (parent path, leaf name, decoder).
+UnflattenPlan = typing.Dict[typing.Union[str, bytes], typing.Tuple[typing.Tuple[str, ...], str, typing.Callable]]
+
+_FLATTEN_PLANS: typing.Dict[type, FlattenPlan] = {}
+_UNFLATTEN_PLANS: typing.Dict[type, UnflattenPlan] = {}
+_LOCK = threading.Lock()
+
+
+def supports_flatten_plan(model: type) -> bool:
+    """Whether `model.dict()` holds exactly the model's fields, so a plan can write it field by field."""
+    return (
+        lenient_issubclass(model, BaseModel)
+        and "__root__" not in model.__fields__
+        and model.dict is BaseModel.dict
+        and model.__config__.extra != Extra.allow
+        and not model.__exclude_fields__
+        and not model.__include_fields__
+    )
+
+
+def _field_kind(field: ModelField) -> int:
+    if field.shape in _JSON_SHAPES:
+        return _JSON
+    if field.shape != SHAPE_SINGLETON or field.sub_fields:
+        return _GENERIC
+    if field.type_ is bool:
+        return _BOOL
+    if field.type_ in (str, int, float):
+        return _SCALAR
+    if lenient_issubclass(field.type_, BaseModel) and supports_flatten_plan(field.type_):
+        return _MODEL
+    return _ENCODE
+
+
+def _compile(model: type, prefix: str) -> FlattenPlan:
+    _plan = []
+    for name, field in model.__fields__.items():
+        _kind = _field_kind(field)
+        _nested = (field.type_, _compile(field.type_, prefix + name + ":")) if _kind == _MODEL else field.type_
+        _plan.append((name, prefix + name, _kind, _nested))
+    return _plan
+
+
+def flatten_plan(model: type) -> FlattenPlan:
+    """A model class's fields as (attribute, hash field, kind, field type or (model, plan) when nested), compiled once."""
+    _plan = _FLATTEN_PLANS.get(model)
+    if _plan is None:
+        _plan = _compile(model, "")
+        with _LOCK:
+            _FLATTEN_PLANS[model] = _plan
+    return _plan
+
+
+def _flatten(plan: FlattenPlan, model: BaseModel, encoder: typing.Callable, flattened: dict) -> None:
+    _values = model.__dict__
+    for name, key, kind, nested in plan:
+        value = _values.get(name)
+        if value is None:
+            flattened[key] = NONE_VALUE
+        elif kind == _SCALAR and value.__class__ is not bool:
+            flattened[key] = escape_hash_string(value) if isinstance(value, str) else value
+        elif kind == _BOOL:
+            flattened[key] = "true" if value else "false"
+        elif kind == _JSON:
+            flattened[key] = json.dumps(to_jsonable(value, encoder))
+        elif kind == _MODEL and type(value) is nested[0]:
+            _flatten(nested[1], value, encoder, flattened)
+        else:
+            # Dicts, unions, encoded values and subclasses of nested models take the generic walk.
+            _jsonable = to_jsonable(value, encoder)
+            if kind == _ENCODE and isinstance(_jsonable, str):
+                flattened[key] = escape_hash_string(_jsonable)
+            elif kind == _ENCODE and isinstance(_jsonable, (int, float)) and not isinstance(_jsonable, bool):
+                flattened[key] = _jsonable
+            else:
+                flattened.update(flatten_dict_for_caching({key: _jsonable}))
+
+
+def flatten_model(model: BaseModel) -> dict:
+    """Flatten a model for HSET with its class's compiled plan, as flatten_dict_for_caching does with its dict.
+
+    Args:
+        model (BaseModel): model instance.
+
+    Returns:
+        dict: "parent:child" fields and their values.
+    """
+    _model_class = type(model)
+    if not supports_flatten_plan(_model_class):
+        return flatten_dict_for_caching(to_jsonable(model.dict(), getattr(model, "__json_encoder__", pydantic_encoder)))
+    _flattened: dict = {}
+    _flatten(flatten_plan(_model_class), model, _model_class.__json_encoder__, _flattened)
+    return _flattened
+
+
+def _decode_bool(value: typing.Union[str, bytes]) -> typing.Union[bool, str]:
+    if value in (b"true", "true"):
+        return True
+    if value in (b"false", "false"):
+        return False
+    return cached_hash_value(value)
+
+
+_NONE_BYTES = NONE_VALUE.encode("utf-8")
+
+_DECODERS = {
+    _SCALAR: {str: cached_hash_string, int: int, float: float},
+    _BOOL: _decode_bool,
+    _JSON: json.loads,
+}
+
+
+def _compile_unflatten(plan: FlattenPlan, parents: typing.Tuple[str, ...], compiled: UnflattenPlan) -> None:
+    for name, key, kind, nested in plan:
+        if kind == _MODEL:
+            _compile_unflatten(nested[1], parents + (name,), compiled)
+            continue
+        if kind == _SCALAR:
+            _decoder = _DECODERS[_SCALAR][nested]
+        elif kind in _DECODERS:
+            _decoder = _DECODERS[kind]
+        else:
+            _decoder = cached_hash_value
+        compiled[key] = compiled[key.encode("utf-8")] = (parents, name, _decoder)
+
+
+def unflatten_plan(model: type) -> UnflattenPlan:
+    """Where each hash field of a model class goes back in its dict, and how its value is decoded."""
+    _plan = _UNFLATTEN_PLANS.get(model)
+    if _plan is None:
+        _plan = {}
+        _compile_unflatten(flatten_plan(model), (), _plan)
+        with _LOCK:
+            _UNFLATTEN_PLANS[model] = _plan
+    return _plan
+
+
+def unflatten_model(model: type, fetched: typing.Dict[typing.Union[str, bytes], typing.Any]) -> dict:
+    """Rebuild the dict of a model from its hash (HGETALL) with its class's compiled plan.
+
+    Fields the plan does not know (dict fields, fields of another version of the model) are read
+    as unflatten_dict_from_cache reads them.
+
+    Args:
+        model (type): model class the hash was written from.
+        fetched (typing.Dict[typing.Union[str, bytes], typing.Any]): hash fields and values.
+
+    Returns:
+        dict: nested dict to validate with `model.parse_obj`.
+    """
+    if not supports_flatten_plan(model):
+        return unflatten_dict_from_cache(fetched)
+    _plan = unflatten_plan(model)
+    _unflattened: dict = {}
+    _unknown = {}
+    for key, value in fetched.items():
+        _entry = _plan.get(key)
+        if _entry is None:
+            _unknown[key] = value
+            continue
+        _parents, _leaf, _decoder = _entry
+        _node = _unflattened
+        for parent in _parents:
+            _node = _node.setdefault(parent, {})
+        if value in (NONE_VALUE, _NONE_BYTES):
+            _node[_leaf] = None
+            continue
+        try:
+            _node[_leaf] = _decoder(value)
+        except ValueError:
+            # Written by another version of the model, validation has the last word.
+            _node[_leaf] = cached_hash_value(value)
+    if _unknown:
+        unflatten_dict_from_cache(_unknown, into=_unflattened)
+    return _unflattened
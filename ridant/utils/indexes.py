@@ -0,0 +1,231 @@
+import datetime
+import decimal
+import json
+import typing
+
+from pydantic import BaseModel
+
+from ridant.utils.serializers import to_jsonable
+
+# Index kinds: uids per exact value, or uids scored by a numeric value.
+SET_INDEX = "set"
+RANGE_INDEX = "range"
+_REMOVED = "none"
+
+# INDEX_SCRIPT modes, see below.
+REPLACE = "replace"
+PATCH = "patch"
+PRUNE = "prune"
+
+# Index keys live next to the other bookkeeping keys, so SCANning a group never sees them.
+# The group's key prefix is kept inside, which keeps its hash tag (and cluster slot) when groups are tagged.
+INDEX_PREFIX = "__ridant__:index:"
+
+# Keeps the indexes of one uid in step with its latest values.
+# KEYS[1]: the uid's entries hash (field -> "kind:value"), which records what the uid is indexed under.
+# ARGV: index key prefix, uid, mode, then field, kind, value triples. Kind "none" removes the field.
+# In "replace" mode every indexed field missing from the triples is removed too; with no triples
+# at all this drops the uid from every index. "prune" does the same only while the value at KEYS[2]
+# is missing, so a lookup dropping an expired uid never races a write caching it again.
+INDEX_SCRIPT = r"""
+local entries_key, prefix, uid, mode = KEYS[1], ARGV[1], ARGV[2], ARGV[3]
+if mode == "prune" and redis.call("EXISTS", KEYS[2]) == 1 then
+    return 0
+end
+
+local function add(field, kind, value)
+    if kind == "set" then
+        redis.call("SADD", prefix .. "set:" .. field .. ":" .. value, uid)
+    else
+        redis.call("ZADD", prefix .. "range:" .. field, value, uid)
+    end
+end
+
+local function drop(field, entry)
+    local kind, value = string.match(entry, "^(%a+):(.*)$")
+    if kind == "set" then
+        redis.call("SREM", prefix .. "set:" .. field .. ":" .. value, uid)
+    else
+        redis.call("ZREM", prefix .. "range:" .. field, uid)
+    end
+end
+
+local old = {}
+local stored = redis.call("HGETALL", entries_key)
+for n = 1, #stored, 2 do
+    old[stored[n]] = stored[n + 1]
+end
+
+local seen = {}
+for n = 4, #ARGV, 3 do
+    local field, kind, value = ARGV[n], ARGV[n + 1], ARGV[n + 2]
+    seen[field] = true
+    if kind == "none" then
+        if old[field] then
+            drop(field, old[field])
+            redis.call("HDEL", entries_key, field)
+        end
+    else
+        local entry = kind .. ":" .. value
+        if old[field] ~= entry then
+            if old[field] then
+                drop(field, old[field])
+            end
+            add(field, kind, value)
+            redis.call("HSET", entries_key, field, entry)
+        end
+    end
+end
+
+if mode ~= "patch" then
+    for field, entry in pairs(old) do
+        if not seen[field] then
+            drop(field, entry)
+            redis.call("HDEL", entries_key, field)
+        end
+    end
+end
+return 1
+"""
+
+# Entries key (and the value's key when pruning), then INDEX_SCRIPT arguments.
+IndexUpdate = typing.Tuple[typing.List[str], typing.List[str]]
+
+_RANGE_TYPES = (int, float, decimal.Decimal, datetime.datetime, datetime.date)
+
+
+def index_key_prefix(key_prefix: str, hash: bool = False) -> str:
+    # Hash-mode and string-mode values of a group can share a database, their indexes must not mix.
+    if hash:
+        return INDEX_PREFIX + "hash:" + key_prefix
+    return INDEX_PREFIX + key_prefix
+
+
+def set_index_key(prefix: str, field: str, value: str) -> str:
+    return prefix + "set:" + field + ":" + value
+
+
+def range_index_key(prefix: str, field: str) -> str:
+    return prefix + "range:" + field
+
+
+def entries_key(prefix: str, uid: str) -> str:
+    return prefix + "entries:" + uid
+
+
+def _field_type(model: type, path: typing.List[str]) -> typing.Any:
+    _type = model
+    for segment in path:
+        _fields = getattr(_type, "__fields__", None)
+        if not _fields or segment not in _fields:
+            raise ValueError(f"{model.__name__} has no field '{'.'.join(path)}' to index.")
+        _type = _fields[segment].outer_type_
+    return _type
+
+
+def resolve_indexes(
+    model: type, declared: typing.Union[typing.Iterable[str], typing.Dict[str, str], None]
+) -> typing.Dict[str, str]:
+    """Resolve a model's declared indexes to their kinds.
+
+    Args:
+        model (type): model class.
+        declared (typing.Union[typing.Iterable[str], typing.Dict[str, str], None]): field paths ("restaurant_id",
+            "metadata.cart_id"), or a dict of field path -> "set" / "range". Numeric and date fields
+            listed without a kind get a range index, everything else a set index.
+
+    Returns:
+        typing.Dict[str, str]: field path -> index kind.
+    """
+    if not declared:
+        return {}
+    if not isinstance(declared, dict):
+        declared = {field: None for field in declared}
+
+    _indexes = {}
+    for field, kind in declared.items():
+        _type = _field_type(model, field.split("."))
+        if kind is None:
+            _is_range = isinstance(_type, type) and issubclass(_type, _RANGE_TYPES) and not issubclass(_type, bool)
+            kind = RANGE_INDEX if _is_range else SET_INDEX
+        if kind not in (SET_INDEX, RANGE_INDEX):
+            raise ValueError(f"Unknown index kind '{kind}' for '{field}', use '{SET_INDEX}' or '{RANGE_INDEX}'.")
+        _indexes[field] = kind
+    return _indexes
+
+
+def field_value(item: typing.Any, field: str) -> typing.Any:
+    """Value at a dotted path of a model, dict or list, None when any part of it is missing."""
+    for segment in field.split("."):
+        if item is None:
+            return None
+        if isinstance(item, dict):
+            item = item.get(segment)
+        elif isinstance(item, (list, tuple)):
+            item = item[int(segment)] if segment.isdigit() and int(segment) < len(item) else None
+        else:
+            item = getattr(item, segment, None)
+    return item
+
+
+def indexed_values_below(indexes: typing.Dict[str, str], path: typing.List[str], value: typing.Any) -> typing.Dict[str, typing.Any]:
+    """Indexed fields inside the new value of `path` after a partial update, with their values."""
+    _prefix = ".".join(path)
+    _values = {}
+    for field in indexes:
+        if field == _prefix:
+            _values[field] = value
+        elif not _prefix or field.startswith(_prefix + "."):
+            _values[field] = field_value(value, field[len(_prefix) + 1 :] if _prefix else field)
+    return _values
+
+
+def index_value(value: typing.Any) -> str:
+    """Text a value is indexed under: strings as they are, anything else as JSON."""
+    if isinstance(value, str):
+        return value
+    _value = to_jsonable(value.dict() if isinstance(value, BaseModel) else value)
+    if isinstance(_value, str):
+        return _value
+    return json.dumps(_value, sort_keys=True)
+
+
+def index_score(value: typing.Any) -> float:
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, datetime.date):
+        return float(value.toordinal())
+    return float(value)
+
+
+def index_entry(kind: str, value: typing.Any) -> typing.Tuple[str, str]:
+    if value is None and kind == RANGE_INDEX:
+        return _REMOVED, ""
+    if kind == RANGE_INDEX:
+        return kind, repr(index_score(value))
+    return kind, index_value(value)
+
+
+def index_arguments(
+    prefix: str, uid: str, indexes: typing.Dict[str, str], values: typing.Dict[str, typing.Any], mode: str = REPLACE
+) -> typing.List[str]:
+    """INDEX_SCRIPT arguments indexing `uid` under `values` (field path -> value) for the given indexes."""
+    _arguments = [prefix, uid, mode]
+    for field, value in values.items():
+        _arguments.append(field)
+        _arguments.extend(index_entry(indexes[field], value))
+    return _arguments
+
+
+def score_bounds(value: typing.Any) -> typing.Tuple[str, str]:
+    """ZRANGEBYSCORE bounds of a range query: (low, high) with None for open ends, or one exact value."""
+    if isinstance(value, (tuple, list)):
+        if len(value) != 2:
+            raise ValueError("A range query takes a (low, high) pair, use None for an open end.")
+        _low, _high = value
+        return (
+            "-inf" if _low is None else repr(index_score(_low)),
+            "+inf" if _high is None else repr(index_score(_high)),
+        )
+    _score = repr(index_score(value))
+    return _score, _score
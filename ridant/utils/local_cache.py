@@ -0,0 +1,124 @@
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+# Seconds an entry is served for by default. The local copy is not told when its redis key
+# expires, so it should not outlive it by much.
+DEFAULT_TTL = 5.0
+
+
+class LocalCache(object):
+    """Bounded in-process cache for already decoded values.
+
+    Entries are evicted least-recently-used first once `max_entries` or
+    `max_bytes` is exceeded, and are dropped on read once older than `ttl`
+    seconds (DEFAULT_TTL by default, None keeps them until evicted), or than
+    the `ttl` given to `set` when it is shorter. Sizes are whatever the caller reports for an entry (ridant uses
+    the length of the raw payload fetched from redis).
+
+    Every `discard` bumps `epoch`; pass the epoch read before a redis fetch to
+    `set` so a value fetched while an invalidation was in flight is not stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: typing.Optional[float] = DEFAULT_TTL,
+        max_bytes: typing.Optional[int] = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, typing.Tuple[typing.Any, int, typing.Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def get(self, key: str) -> typing.Any:
+        with self._lock:
+            _entry = self._entries.get(key)
+            if _entry is None:
+                self.misses += 1
+                return None
+
+            if _entry[2] is not None and _entry[2] <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _entry[0]
+
+    def set(
+        self,
+        key: str,
+        value: typing.Any,
+        size: int = 0,
+        epoch: typing.Optional[int] = None,
+        ttl: typing.Optional[float] = None,
+    ) -> bool:
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return False
+
+            if key in self._entries:
+                self._pop(key)
+
+            if ttl is None or (self.ttl is not None and self.ttl < ttl):
+                ttl = self.ttl
+            _expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._entries[key] = (value, size, _expires_at)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def discard(self, *keys: str) -> None:
+        with self._lock:
+            self._epoch += 1
+            for key in keys:
+                if key in self._entries:
+                    self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _pop(self, key: str) -> None:
+        _value, _size, _expires_at = self._entries.pop(key)
+        self._bytes -= _size
@@ -0,0 +1,147 @@
+import bisect
+import threading
+import typing
+
+# Phases a latency observation can belong to.
+NETWORK = "network"
+SERIALIZE = "serialize"
+DESERIALIZE = "deserialize"
+
+
+class MetricsCollector(object):
+    """Receives measurements from `RidantCache`. Every hook is a no-op, override the ones you need.
+
+    `operation` is the public method being measured (e.g. "find_one", "cache_many"),
+    `group` the model group name (or the group passed to the *_by_group methods).
+    """
+
+    def observe_latency(self, operation: str, group: str, phase: str, seconds: float) -> None:
+        pass
+
+    def observe_payload(self, operation: str, group: str, size: int) -> None:
+        pass
+
+    def observe_pipeline(self, operation: str, group: str, length: int) -> None:
+        pass
+
+    def record_lookup(self, operation: str, group: str, hit: bool) -> None:
+        pass
+
+
+class CallbackMetrics(MetricsCollector):
+    """Forwards every measurement to `callback(name, value, tags)`, e.g. to feed Prometheus or StatsD.
+
+    Names are "ridant.latency" (seconds, tagged with the phase), "ridant.payload_bytes",
+    "ridant.pipeline_length", "ridant.hit" and "ridant.miss".
+    """
+
+    def __init__(self, callback: typing.Callable[[str, float, typing.Dict[str, str]], None]) -> None:
+        self.callback = callback
+
+    def observe_latency(self, operation: str, group: str, phase: str, seconds: float) -> None:
+        self.callback("ridant.latency", seconds, {"operation": operation, "group": group, "phase": phase})
+
+    def observe_payload(self, operation: str, group: str, size: int) -> None:
+        self.callback("ridant.payload_bytes", size, {"operation": operation, "group": group})
+
+    def observe_pipeline(self, operation: str, group: str, length: int) -> None:
+        self.callback("ridant.pipeline_length", length, {"operation": operation, "group": group})
+
+    def record_lookup(self, operation: str, group: str, hit: bool) -> None:
+        self.callback("ridant.hit" if hit else "ridant.miss", 1, {"operation": operation, "group": group})
+
+
+class Histogram(object):
+    """Fixed exponential buckets, so memory stays constant however many values are observed."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self, start: float, factor: float = 2.0, buckets: int = 48) -> None:
+        self.bounds = [start * factor ** i for i in range(buckets)]
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum: typing.Optional[float] = None
+        self.maximum: typing.Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def quantile(self, q: float) -> typing.Optional[float]:
+        """Upper bound of the bucket holding the `q` quantile, capped at the largest value seen."""
+        if not self.count:
+            return None
+        _rank = q * self.count
+        _seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            _seen += bucket_count
+            if _seen >= _rank and bucket_count:
+                if index >= len(self.bounds):
+                    return self.maximum
+                return min(self.bounds[index], self.maximum)
+        return self.maximum
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class InMemoryMetrics(MetricsCollector):
+    """Keeps histograms and hit/miss counters in memory, see `snapshot()`."""
+
+    def __init__(self) -> None:
+        self.latencies: typing.Dict[typing.Tuple[str, str, str], Histogram] = {}
+        self.payload_sizes: typing.Dict[typing.Tuple[str, str], Histogram] = {}
+        self.pipeline_lengths: typing.Dict[typing.Tuple[str, str], Histogram] = {}
+        self.hits: typing.Dict[typing.Tuple[str, str], int] = {}
+        self.misses: typing.Dict[typing.Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, histograms: dict, key: tuple, start: float) -> Histogram:
+        _histogram = histograms.get(key)
+        if _histogram is None:
+            with self._lock:
+                _histogram = histograms.setdefault(key, Histogram(start=start))
+        return _histogram
+
+    def observe_latency(self, operation: str, group: str, phase: str, seconds: float) -> None:
+        self._histogram(self.latencies, (operation, group, phase), start=1e-6).observe(seconds)
+
+    def observe_payload(self, operation: str, group: str, size: int) -> None:
+        self._histogram(self.payload_sizes, (operation, group), start=1).observe(size)
+
+    def observe_pipeline(self, operation: str, group: str, length: int) -> None:
+        self._histogram(self.pipeline_lengths, (operation, group), start=1).observe(length)
+
+    def record_lookup(self, operation: str, group: str, hit: bool) -> None:
+        _counters = self.hits if hit else self.misses
+        with self._lock:
+            _counters[(operation, group)] = _counters.get((operation, group), 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            for store in (self.latencies, self.payload_sizes, self.pipeline_lengths, self.hits, self.misses):
+                store.clear()
+
+    def snapshot(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """Current measurements, keyed as "operation:group" (plus ":phase" for latencies)."""
+        return {
+            "latency": {":".join(key): histogram.as_dict() for key, histogram in list(self.latencies.items())},
+            "payload_bytes": {":".join(key): histogram.as_dict() for key, histogram in list(self.payload_sizes.items())},
+            "pipeline_length": {":".join(key): histogram.as_dict() for key, histogram in list(self.pipeline_lengths.items())},
+            "hits": {":".join(key): count for key, count in list(self.hits.items())},
+            "misses": {":".join(key): count for key, count in list(self.misses.items())},
+        }
@@ -0,0 +1,121 @@
+import threading
+import typing
+
+from ridant.utils.cluster import hash_tag
+from ridant.utils.convert_model_to_string_key import get_name_from_model
+from ridant.utils.expiry import TTL, ttl_milliseconds
+from ridant.utils.indexes import resolve_indexes
+
+if typing.TYPE_CHECKING:
+    from pydantic import BaseModel
+    from ridant.utils.serializers import Serializer
+
+ModelClass = typing.TypeVar("ModelClass")
+
+
+class ModelMetadata(object):
+    """Everything ridant needs to know about a model class, resolved once."""
+
+    __slots__ = ("model", "group_name", "key_prefix", "tagged_key_prefix", "serializer", "indexes", "ttl")
+
+    def __init__(
+        self,
+        model: type,
+        group_name: str,
+        serializer: typing.Union[str, "Serializer", None] = None,
+        indexes: typing.Union[typing.Iterable[str], typing.Dict[str, str], None] = None,
+        ttl: typing.Optional[TTL] = None,
+    ) -> None:
+        self.model = model
+        self.group_name = group_name
+        self.key_prefix = group_name + ":"
+        # Used when the cache hash-tags groups, so a group's keys share a cluster slot.
+        self.tagged_key_prefix = hash_tag(group_name) + ":"
+        self.serializer = serializer
+        # Field path -> "set" / "range", see ridant.utils.indexes.
+        self.indexes = resolve_indexes(model, indexes)
+        # Default TTL of the model's keys in milliseconds, None when they do not expire.
+        self.ttl = ttl_milliseconds(ttl)
+
+    def __repr__(self) -> str:
+        return f"<ModelMetadata model={self.model.__name__} group_name={self.group_name!r}>"
+
+
+_REGISTRY: typing.Dict[type, ModelMetadata] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _model_class(model: typing.Any) -> type:
+    return model if isinstance(model, type) else model.__class__
+
+
+def get_model_metadata(model: typing.Union[type, "BaseModel"]) -> ModelMetadata:
+    """Return the metadata of a model class (or instance), resolving it on first use.
+
+    Args:
+        model (typing.Union[type, BaseModel]): pydantic / odmantic model class or instance.
+
+    Returns:
+        ModelMetadata: the memoized metadata.
+    """
+    _model = _model_class(model)
+    _metadata = _REGISTRY.get(_model)
+    if _metadata is None:
+        with _REGISTRY_LOCK:
+            _metadata = _REGISTRY.get(_model)
+            if _metadata is None:
+                _metadata = _REGISTRY[_model] = ModelMetadata(
+                    model=_model,
+                    group_name=get_name_from_model(_model),
+                    serializer=getattr(_model.__config__, "cacheable_serializer", None),
+                    indexes=getattr(_model.__config__, "cacheable_indexes", None),
+                    ttl=getattr(_model.__config__, "cacheable_ttl", None),
+                )
+    return _metadata
+
+
+def register_model(
+    model: type,
+    group_name: typing.Optional[str] = None,
+    serializer: typing.Union[str, "Serializer", None] = None,
+    indexes: typing.Union[typing.Iterable[str], typing.Dict[str, str], None] = None,
+    ttl: typing.Optional[TTL] = None,
+) -> ModelMetadata:
+    """Resolve and store the metadata of a model class, overriding its Config if arguments are given.
+
+    Args:
+        model (type): model class.
+        group_name (typing.Optional[str]): group name to use instead of the one from the model's Config.
+        serializer (typing.Union[str, Serializer, None]): serializer to use instead of the one from the model's Config.
+        indexes (typing.Union[typing.Iterable[str], typing.Dict[str, str], None]): indexed fields to use instead
+            of the model's `cacheable_indexes`.
+        ttl (typing.Optional[TTL]): default TTL in seconds (or a timedelta) instead of the model's `cacheable_ttl`.
+
+    Returns:
+        ModelMetadata: the registered metadata.
+    """
+    _model = _model_class(model)
+    with _REGISTRY_LOCK:
+        _metadata = _REGISTRY[_model] = ModelMetadata(
+            model=_model,
+            group_name=group_name or get_name_from_model(_model),
+            serializer=serializer or getattr(_model.__config__, "cacheable_serializer", None),
+            indexes=indexes if indexes is not None else getattr(_model.__config__, "cacheable_indexes", None),
+            ttl=ttl if ttl is not None else getattr(_model.__config__, "cacheable_ttl", None),
+        )
+    return _metadata
+
+
+def cacheable(
+    group_name: typing.Optional[str] = None,
+    serializer: typing.Union[str, "Serializer", None] = None,
+    indexes: typing.Union[typing.Iterable[str], typing.Dict[str, str], None] = None,
+    ttl: typing.Optional[TTL] = None,
+) -> typing.Callable[[ModelClass], ModelClass]:
+    """Class decorator registering a model up front, see `register_model`."""
+
+    def _decorator(model: ModelClass) -> ModelClass:
+        register_model(model, group_name=group_name, serializer=serializer, indexes=indexes, ttl=ttl)
+        return model
+
+    return _decorator
@@ -0,0 +1,103 @@
+import threading
+import time
+import typing
+
+from ridant.utils.caching_tools import escape_scan_pattern
+from ridant.utils.indexes import index_key_prefix
+
+# Generation counters of versioned groups live next to the other bookkeeping keys.
+GENERATION_PREFIX = "__ridant__:generation:"
+
+# Keys of generation n > 0 are written under "group@n:uid", generation 0 (never invalidated)
+# keeps the plain "group:uid" keys, so turning versioning on does not drop what is cached.
+GENERATION_SEPARATOR = "@"
+
+
+def generation_key(group: str) -> str:
+    return GENERATION_PREFIX + group
+
+
+def versioned_prefix(key_prefix: str, generation: int) -> str:
+    """Key prefix of a generation of a group.
+
+    Args:
+        key_prefix (str): the group's unversioned prefix, "group:" or "{group}:" when hash-tagged.
+        generation (int): the group's generation.
+
+    Returns:
+        str: "group:" for generation 0, "group@3:" for generation 3.
+    """
+    if not generation:
+        return key_prefix
+    return key_prefix[:-1] + GENERATION_SEPARATOR + str(generation) + ":"
+
+
+def key_generation(key: str, key_prefix: str) -> typing.Optional[int]:
+    """Generation a key was written in, None when it does not belong to the group of `key_prefix`."""
+    if key.startswith(key_prefix):
+        return 0
+    _versioned = key_prefix[:-1] + GENERATION_SEPARATOR
+    if not key.startswith(_versioned):
+        return None
+    _generation, _, _ = key[len(_versioned) :].partition(":")
+    return int(_generation) if _generation.isdigit() else None
+
+
+def reclaim_prefixes(key_prefix: str) -> typing.List[str]:
+    """Unversioned prefixes of everything a group writes: its values and both kinds of its indexes."""
+    return [key_prefix, index_key_prefix(key_prefix), index_key_prefix(key_prefix, hash=True)]
+
+
+def reclaim_patterns(key_prefix: str, generation: int) -> typing.List[str]:
+    """SCAN patterns matching the keys of the generations of a group before `generation`."""
+    if not generation:
+        return []
+    _patterns = []
+    for prefix in reclaim_prefixes(key_prefix):
+        _patterns.append(escape_scan_pattern(prefix) + "*")
+        if generation > 1:
+            _patterns.append(escape_scan_pattern(prefix[:-1] + GENERATION_SEPARATOR) + "*")
+    return _patterns
+
+
+def is_reclaimable(key: str, key_prefix: str, generation: int) -> bool:
+    """Whether a key found by a reclaim_patterns SCAN belongs to a generation before `generation`."""
+    for prefix in reclaim_prefixes(key_prefix):
+        _generation = key_generation(key, prefix)
+        if _generation is not None:
+            return _generation < generation
+    return False
+
+
+class GenerationCache(object):
+    """Generations of versioned groups as last read from redis, trusted for `ttl` seconds.
+
+    A process keeps writing and reading the generation it knows for up to `ttl`
+    seconds after another process invalidated the group.
+    """
+
+    def __init__(self, ttl: float = 1.0) -> None:
+        self.ttl = ttl
+        self._generations: typing.Dict[str, typing.Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, group: str, stale: bool = False) -> typing.Optional[int]:
+        """The known generation of a group, None when unknown or (unless `stale`) older than `ttl`."""
+        _entry = self._generations.get(group)
+        if _entry is None or (not stale and _entry[1] <= time.monotonic()):
+            return None
+        return _entry[0]
+
+    def set(self, group: str, generation: int) -> int:
+        """Remember a generation read from redis, returns the generation now known for the group."""
+        with self._lock:
+            _entry = self._generations.get(group)
+            # An older read finishing late never moves a group back to an earlier generation.
+            if _entry is not None and _entry[0] > generation and _entry[1] > time.monotonic():
+                generation = _entry[0]
+            self._generations[group] = (generation, time.monotonic() + self.ttl)
+            return generation
+
+    def discard(self, group: str) -> None:
+        with self._lock:
+            self._generations.pop(group, None)
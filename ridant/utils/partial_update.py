@@ -0,0 +1,493 @@
+import json
+import typing
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+from ridant.utils.caching_tools import flatten_dict_for_caching, unflatten_dict_from_cache
+from ridant.utils.serializers import to_jsonable
+
+Path = typing.Union[str, typing.Sequence[typing.Union[str, int]], None]
+
+# Partial update operations, the first script argument.
+SET = "set"
+MERGE = "merge"
+INCREMENT = "incr"
+APPEND = "append"
+
+# Locates values inside JSON text without decoding it, so everything outside
+# the updated span is kept byte for byte. Re-encoding with cjson would turn
+# empty lists into objects and round numbers to 14 significant digits.
+JSON_HELPERS = r"""
+local function skip_ws(s, i)
+    return string.find(s, "[^ \t\r\n]", i) or (#s + 1)
+end
+
+local function skip_string(s, i)
+    local j = i + 1
+    while true do
+        local k = string.find(s, '["\\]', j)
+        if not k then
+            error("unterminated JSON string")
+        end
+        if string.sub(s, k, k) == '"' then
+            return k + 1
+        end
+        j = k + 2
+    end
+end
+
+local function skip_value(s, i)
+    local c = string.sub(s, i, i)
+    if c == '"' then
+        return skip_string(s, i)
+    end
+    if c == "{" or c == "[" then
+        local depth, j = 0, i
+        while true do
+            local k = string.find(s, '[%[%]{}"]', j)
+            if not k then
+                error("unbalanced JSON")
+            end
+            local ch = string.sub(s, k, k)
+            if ch == '"' then
+                j = skip_string(s, k)
+            else
+                if ch == "{" or ch == "[" then
+                    depth = depth + 1
+                else
+                    depth = depth - 1
+                end
+                j = k + 1
+                if depth == 0 then
+                    return j
+                end
+            end
+        end
+    end
+    return string.find(s, "[,}%] \t\r\n]", i) or (#s + 1)
+end
+
+-- Value span (start, end exclusive) of a member, or nil plus the closing brace and whether the object has members.
+local function find_member(s, i, name)
+    local j = skip_ws(s, i + 1)
+    if string.sub(s, j, j) == "}" then
+        return nil, j, false
+    end
+    while true do
+        local key_end = skip_string(s, j)
+        local value_start = skip_ws(s, skip_ws(s, key_end) + 1)
+        local value_end = skip_value(s, value_start)
+        if cjson.decode(string.sub(s, j, key_end - 1)) == name then
+            return value_start, value_end
+        end
+        local after = skip_ws(s, value_end)
+        if string.sub(s, after, after) == "}" then
+            return nil, after, true
+        end
+        j = skip_ws(s, after + 1)
+    end
+end
+
+local function find_element(s, i, index)
+    local j = skip_ws(s, i + 1)
+    local position = 0
+    while string.sub(s, j, j) ~= "]" do
+        local value_end = skip_value(s, j)
+        if position == index then
+            return j, value_end
+        end
+        position = position + 1
+        j = skip_ws(s, value_end)
+        if string.sub(s, j, j) == "," then
+            j = skip_ws(s, j + 1)
+        end
+    end
+    error("list index out of range")
+end
+
+-- Span of the value at path, or nil plus where to insert a missing last member.
+local function locate(s, path)
+    local start = skip_ws(s, 1)
+    local finish = skip_value(s, start)
+    for n = 1, #path do
+        local container = string.sub(s, start, start)
+        if container == "[" then
+            start, finish = find_element(s, start, tonumber(path[n]))
+        elseif container == "{" then
+            local value_start, value_end, has_members = find_member(s, start, path[n])
+            if not value_start then
+                if n < #path then
+                    error("no field '" .. path[n] .. "'")
+                end
+                return nil, value_end, has_members
+            end
+            start, finish = value_start, value_end
+        else
+            error("'" .. path[n] .. "' is not inside an object or a list")
+        end
+    end
+    return start, finish
+end
+
+local function set_at(s, path, value)
+    local start, finish, has_members = locate(s, path)
+    if start then
+        return string.sub(s, 1, start - 1) .. value .. string.sub(s, finish)
+    end
+    local member = cjson.encode(path[#path]) .. ":" .. value
+    if has_members then
+        member = "," .. member
+    end
+    return string.sub(s, 1, finish - 1) .. member .. string.sub(s, finish)
+end
+
+local function value_at(s, path)
+    local start, finish = locate(s, path)
+    if not start then
+        return nil
+    end
+    return string.sub(s, start, finish - 1)
+end
+
+-- Lua numbers are doubles, integers are added digit by digit to stay exact past 2^53.
+-- nth digit from the right, 0 past the most significant one.
+local function digit_at(digits, n)
+    if n >= #digits then
+        return 0
+    end
+    return string.byte(digits, #digits - n) - 48
+end
+
+local function add_magnitudes(a, b)
+    local digits, carry = {}, 0
+    for n = 0, math.max(#a, #b) - 1 do
+        local sum = digit_at(a, n) + digit_at(b, n) + carry
+        digits[#digits + 1] = sum % 10
+        carry = math.floor(sum / 10)
+    end
+    if carry > 0 then
+        digits[#digits + 1] = carry
+    end
+    return string.reverse(table.concat(digits))
+end
+
+-- a - b for magnitudes with a >= b.
+local function subtract_magnitudes(a, b)
+    local digits, borrow = {}, 0
+    for n = 0, #a - 1 do
+        local difference = digit_at(a, n) - digit_at(b, n) - borrow
+        borrow = 0
+        if difference < 0 then
+            difference = difference + 10
+            borrow = 1
+        end
+        digits[#digits + 1] = difference
+    end
+    return (string.gsub(string.reverse(table.concat(digits)), "^0+(%d)", "%1"))
+end
+
+local function add_integers(a, b)
+    local a_negative, a_digits = string.match(a, "^(-?)0*(%d+)$")
+    local b_negative, b_digits = string.match(b, "^(-?)0*(%d+)$")
+    if a_negative == b_negative then
+        local sum = add_magnitudes(a_digits, b_digits)
+        if sum ~= "0" then
+            return a_negative .. sum
+        end
+        return sum
+    end
+    local a_larger = #a_digits > #b_digits or (#a_digits == #b_digits and a_digits >= b_digits)
+    if a_larger then
+        local difference = subtract_magnitudes(a_digits, b_digits)
+        return (difference ~= "0" and a_negative or "") .. difference
+    end
+    local difference = subtract_magnitudes(b_digits, a_digits)
+    return (difference ~= "0" and b_negative or "") .. difference
+end
+
+local function increment(current, amount)
+    current = current or "0"
+    if string.match(current, "^-?%d+$") and string.match(amount, "^-?%d+$") then
+        return add_integers(current, amount)
+    end
+    local number = tonumber(current)
+    if not number then
+        error("value is not a number")
+    end
+    return string.format("%.17g", number + tonumber(amount))
+end
+
+local function append_to(current, values)
+    if not current then
+        return "[" .. table.concat(values, ",") .. "]"
+    end
+    local start = skip_ws(current, 1)
+    local finish = skip_value(current, start)
+    if string.sub(current, start, start) ~= "[" then
+        error("value is not a list")
+    end
+    local separator = ","
+    if skip_ws(current, start + 1) == finish - 1 then
+        separator = ""
+    end
+    return string.sub(current, 1, finish - 2) .. separator .. table.concat(values, ",") .. string.sub(current, finish - 1)
+end
+
+local function split_arguments()
+    local path_length = tonumber(ARGV[2])
+    local path, rest = {}, {}
+    for n = 1, path_length do
+        path[n] = ARGV[2 + n]
+    end
+    for n = 3 + path_length, #ARGV do
+        rest[#rest + 1] = ARGV[n]
+    end
+    return path, rest
+end
+"""
+
+# KEYS[1]: a string-mode key holding plain JSON, fingerprinted or not (see trusted_decode).
+# ARGV: operation, path length, path..., then the operation's arguments (JSON encoded):
+#   set: value / merge: field, value, field, value... / incr: amount / append: values...
+# Returns the new value at path as JSON text, or nil when the key does not exist.
+JSON_UPDATE_SCRIPT = JSON_HELPERS + r"""
+local document = redis.call("GET", KEYS[1])
+if not document then
+    return nil
+end
+if string.sub(document, 1, 1) == "\2" then
+    -- The updated value may no longer fit the schema, it is stored without its fingerprint.
+    document = string.sub(document, 10)
+end
+local first = string.sub(document, 1, 1)
+if first == "\0" or first == "\1" then
+    return redis.error_reply("partial updates need uncompressed JSON values")
+end
+
+local operation = ARGV[1]
+local path, arguments = split_arguments()
+if operation == "set" then
+    document = set_at(document, path, arguments[1])
+elseif operation == "merge" then
+    if #path > 0 and not locate(document, path) then
+        document = set_at(document, path, "{}")
+    end
+    for n = 1, #arguments, 2 do
+        local member = {}
+        for _, name in ipairs(path) do
+            member[#member + 1] = name
+        end
+        member[#member + 1] = arguments[n]
+        document = set_at(document, member, arguments[n + 1])
+    end
+elseif operation == "incr" then
+    document = set_at(document, path, increment(value_at(document, path), arguments[1]))
+elseif operation == "append" then
+    document = set_at(document, path, append_to(value_at(document, path), arguments))
+else
+    return redis.error_reply("unknown partial update '" .. operation .. "'")
+end
+
+redis.call("SET", KEYS[1], document, "KEEPTTL")
+return value_at(document, path)
+"""
+
+# KEYS[1]: a hash-mode key, fields flattened with ":" (see flatten_dict_for_caching), "\0" for None.
+# ARGV: operation, path length, path..., then the operation's arguments:
+#   set / merge: field, value pairs (already flattened) / incr: amount / append: JSON values...
+# set removes the fields below path first, every operation the None or {} stored for a parent
+# of what it writes, and fails when a parent holds a JSON value. Returns the new value: the flattened
+# field / value pairs below path for set and merge, the field value otherwise.
+HASH_UPDATE_SCRIPT = JSON_HELPERS + r"""
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return nil
+end
+
+local operation = ARGV[1]
+local path, arguments = split_arguments()
+local field = table.concat(path, ":")
+local NONE = "\0"
+
+local function fields_below(prefix)
+    local found = {}
+    local all = redis.call("HGETALL", KEYS[1])
+    for n = 1, #all, 2 do
+        local name = all[n]
+        if prefix == "" or name == prefix or string.sub(name, 1, #prefix + 1) == prefix .. ":" then
+            found[#found + 1] = name
+            found[#found + 1] = all[n + 1]
+        end
+    end
+    return found
+end
+
+local function parents_of(name)
+    local parents, start = {}, 1
+    while true do
+        local at = string.find(name, ":", start, true)
+        if not at then
+            return parents
+        end
+        parents[#parents + 1] = string.sub(name, 1, at - 1)
+        start = at + 1
+    end
+end
+
+-- The fields written replace what they overlap: None or {} stored for one of their parents, and
+-- the fields below them. Nothing is removed and the blocking parent is returned when a parent holds
+-- a JSON value (a list, a dict with ":" in its keys...), a field cannot be written inside it.
+local function clear_overlaps(names)
+    local existing, written, stale = {}, {}, {}
+    for _, name in ipairs(redis.call("HKEYS", KEYS[1])) do
+        existing[name] = true
+    end
+    for _, name in ipairs(names) do
+        written[name] = true
+        for _, parent in ipairs(parents_of(name)) do
+            if existing[parent] then
+                local stored = redis.call("HGET", KEYS[1], parent)
+                if stored ~= NONE and stored ~= "{}" then
+                    return parent
+                end
+                existing[parent] = nil
+                stale[#stale + 1] = parent
+            end
+        end
+    end
+    for name in pairs(existing) do
+        for _, parent in ipairs(parents_of(name)) do
+            if written[parent] then
+                stale[#stale + 1] = name
+                break
+            end
+        end
+    end
+    for n = 1, #stale, 1000 do
+        redis.call("HDEL", KEYS[1], unpack(stale, n, math.min(n + 999, #stale)))
+    end
+    return nil
+end
+
+local names = {field}
+if operation == "merge" then
+    names = {}
+    for n = 1, #arguments, 2 do
+        names[#names + 1] = arguments[n]
+    end
+end
+local blocking = clear_overlaps(names)
+if blocking then
+    return redis.error_reply("'" .. blocking .. "' is stored as one JSON value, it cannot be updated inside")
+end
+
+if operation == "set" or operation == "merge" then
+    if operation == "set" then
+        local stale = fields_below(field)
+        for n = 1, #stale, 2 do
+            redis.call("HDEL", KEYS[1], stale[n])
+        end
+    end
+    for n = 1, #arguments, 1000 do
+        redis.call("HSET", KEYS[1], unpack(arguments, n, math.min(n + 999, #arguments)))
+    end
+    return fields_below(field)
+elseif operation == "incr" then
+    if redis.call("HGET", KEYS[1], field) == NONE then
+        redis.call("HDEL", KEYS[1], field)
+    end
+    if string.find(arguments[1], "[%.eE]") then
+        return redis.call("HINCRBYFLOAT", KEYS[1], field, arguments[1])
+    end
+    return redis.call("HINCRBY", KEYS[1], field, arguments[1])
+elseif operation == "append" then
+    local current = redis.call("HGET", KEYS[1], field)
+    if current == NONE then
+        current = false
+    end
+    local updated = append_to(current or nil, arguments)
+    redis.call("HSET", KEYS[1], field, updated)
+    return updated
+end
+return redis.error_reply("unknown partial update '" .. operation .. "'")
+"""
+
+
+def split_path(path: Path) -> typing.List[str]:
+    """Normalize a field path: "a.b.0" or ["a", "b", 0], None or "" for the whole model."""
+    if not path:
+        return []
+    if isinstance(path, str):
+        return path.split(".")
+    return [str(segment) for segment in path]
+
+
+def jsonable(value: typing.Any) -> typing.Any:
+    if isinstance(value, BaseModel):
+        return to_jsonable(value.dict(), getattr(value, "__json_encoder__", pydantic_encoder))
+    return to_jsonable(value)
+
+
+def dump_json(value: typing.Any) -> str:
+    return json.dumps(jsonable(value))
+
+
+def hash_field_pairs(path: typing.List[str], value: typing.Any) -> typing.List[typing.Any]:
+    """Flatten `value` into hash field / value pairs below `path`, the way whole models are written."""
+    _value = jsonable(value)
+    if path:
+        _mapping = flatten_dict_for_caching({":".join(path): _value})
+    elif isinstance(_value, dict):
+        _mapping = flatten_dict_for_caching(_value)
+    else:
+        raise ValueError("Only a dict can be written to the root of a hash.")
+    _pairs = []
+    for field, field_value in _mapping.items():
+        _pairs.append(field)
+        _pairs.append(field_value)
+    return _pairs
+
+
+def script_arguments(operation: str, path: typing.List[str], arguments: typing.Iterable[typing.Any]) -> list:
+    return [operation, len(path), *path, *arguments]
+
+
+def decode_json_reply(reply: typing.Optional[bytes]) -> typing.Any:
+    if reply is None:
+        return None
+    return json.loads(reply)
+
+
+def decode_hash_reply(path: typing.List[str], operation: str, reply: typing.Any) -> typing.Any:
+    if reply is None:
+        return None
+    if operation == INCREMENT:
+        return float(reply) if isinstance(reply, bytes) else reply
+    if operation == APPEND:
+        return json.loads(reply)
+
+    _fields = unflatten_dict_from_cache(dict(zip(reply[::2], reply[1::2])))
+    for segment in path:
+        if not isinstance(_fields, dict) or segment not in _fields:
+            return None
+        _fields = _fields[segment]
+    return _fields
+
+
+def partial_update_arguments(operation: str, path: typing.List[str], value: typing.Any, hash: bool) -> list:
+    """Script arguments following the path for an operation, see the scripts above."""
+    if operation == INCREMENT:
+        return [repr(value)]
+    if operation == APPEND:
+        return [dump_json(item) for item in value]
+    if hash:
+        if operation == MERGE and not path and not isinstance(value, dict):
+            raise ValueError("Only a dict can be merged into a hash.")
+        return hash_field_pairs(path, value)
+    if operation == MERGE:
+        _arguments = []
+        for field, field_value in jsonable(value).items():
+            _arguments.append(field)
+            _arguments.append(json.dumps(field_value))
+        return _arguments
+    return [dump_json(value)]
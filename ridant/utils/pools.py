@@ -0,0 +1,307 @@
+import asyncio
+import os
+import threading
+import time
+import typing
+import weakref
+
+from redis.asyncio.connection import BlockingConnectionPool as AsyncBlockingConnectionPool
+from redis.asyncio.connection import ConnectionPool as AsyncConnectionPool
+from redis.connection import BlockingConnectionPool, ConnectionPool
+
+PoolKey = typing.Tuple[typing.Optional[str], typing.Optional[int], int]
+
+
+class PoolStats(object):
+    """Connection counters of one pool since it was created (or rebuilt after a fork)."""
+
+    __slots__ = ("created", "in_use", "acquired", "wait_seconds", "max_wait_seconds", "failures", "started", "_lock")
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.in_use = 0
+        self.acquired = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.failures = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def idle(self) -> int:
+        """Connections made by the pool and not checked out."""
+        return max(0, self.created - self.in_use)
+
+    @property
+    def average_wait_seconds(self) -> typing.Optional[float]:
+        """Average time to check a connection out, connecting included."""
+        if not self.acquired:
+            return None
+        return self.wait_seconds / self.acquired
+
+    @property
+    def creation_rate(self) -> float:
+        """Connections made per second since the pool started."""
+        return self.created / max(time.monotonic() - self.started, 1e-9)
+
+    def record_created(self) -> None:
+        with self._lock:
+            self.created += 1
+
+    def record_acquired(self, seconds: float) -> None:
+        with self._lock:
+            self.acquired += 1
+            self.in_use += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_failure(self, seconds: float) -> None:
+        """A checkout that failed: no free connection within the timeout, or connecting failed."""
+        with self._lock:
+            self.failures += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_released(self) -> None:
+        with self._lock:
+            # Connections checked out before a fork come back to the rebuilt pool.
+            self.in_use = max(0, self.in_use - 1)
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "created": self.created,
+            "in_use": self.in_use,
+            "idle": self.idle,
+            "acquired": self.acquired,
+            "failures": self.failures,
+            "wait_seconds": self.wait_seconds,
+            "average_wait_seconds": self.average_wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+            "creation_rate": self.creation_rate,
+        }
+
+
+class _StatsPool(object):
+    """Keeps PoolStats for a redis-py pool. The pool resets them itself when it notices a fork."""
+
+    stats: PoolStats
+
+    def reset(self) -> None:
+        self.stats = PoolStats()
+        super().reset()
+
+    def make_connection(self):
+        _connection = super().make_connection()
+        self.stats.record_created()
+        return _connection
+
+    def get_connection(self, command_name, *keys, **options):
+        _started = time.perf_counter()
+        try:
+            _connection = super().get_connection(command_name, *keys, **options)
+        except Exception:
+            self.stats.record_failure(time.perf_counter() - _started)
+            raise
+        self.stats.record_acquired(time.perf_counter() - _started)
+        return _connection
+
+    def release(self, connection) -> None:
+        super().release(connection)
+        self.stats.record_released()
+
+
+class _AsyncStatsPool(_StatsPool):
+    async def get_connection(self, command_name, *keys, **options):
+        _started = time.perf_counter()
+        try:
+            _connection = await super(_StatsPool, self).get_connection(command_name, *keys, **options)
+        except Exception:
+            self.stats.record_failure(time.perf_counter() - _started)
+            raise
+        self.stats.record_acquired(time.perf_counter() - _started)
+        return _connection
+
+    async def release(self, connection) -> None:
+        await super(_StatsPool, self).release(connection)
+        self.stats.record_released()
+
+
+class StatsConnectionPool(_StatsPool, ConnectionPool):
+    pass
+
+
+class StatsBlockingConnectionPool(_StatsPool, BlockingConnectionPool):
+    pass
+
+
+class AsyncStatsConnectionPool(_AsyncStatsPool, AsyncConnectionPool):
+    pass
+
+
+class AsyncStatsBlockingConnectionPool(_AsyncStatsPool, AsyncBlockingConnectionPool):
+    pass
+
+
+def pool_key(connection_kwargs: typing.Dict[str, typing.Any]) -> PoolKey:
+    """(host, port, db) of a pool's connection arguments, unix socket pools use their path as host."""
+    return (
+        connection_kwargs.get("host") or connection_kwargs.get("path"),
+        connection_kwargs.get("port"),
+        connection_kwargs.get("db") or 0,
+    )
+
+
+def pool_stats(pool: typing.Any) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """Stats of a pool made by a PoolManager, None for other pools."""
+    _stats = getattr(pool, "stats", None)
+    return _stats.as_dict() if isinstance(_stats, PoolStats) else None
+
+
+_MANAGERS: "weakref.WeakSet[PoolManager]" = weakref.WeakSet()
+
+
+class PoolManager(object):
+    """One connection pool per (host, port, db) and process.
+
+    Every cache created without a pool gets the manager's pool for its server, instead of opening
+    its own connections. In a forked child (gunicorn, multiprocessing workers) the manager forgets
+    the parent's pools and builds new ones on demand; pools already handed out rebuild themselves
+    on first use, as redis-py pools do, and never touch the parent's sockets.
+
+    With `blocking=True` a pool holds at most `max_connections` connections (50 by default) and
+    callers wait up to `timeout` seconds for a free one, then get a ConnectionError, instead of
+    opening more connections under load.
+
+    The first call for a (host, port, db) decides the pool's options, later calls share it.
+    Asyncio connections belong to an event loop, so an asynchronous manager keeps one pool per
+    (host, port, db) and running loop.
+    """
+
+    def __init__(self, asynchronous: bool = False) -> None:
+        self.asynchronous = asynchronous
+        self._lock = threading.Lock()
+        self.reset()
+        _MANAGERS.add(self)
+
+    def _pool_class(self, blocking: bool) -> type:
+        if self.asynchronous:
+            return AsyncStatsBlockingConnectionPool if blocking else AsyncStatsConnectionPool
+        return StatsBlockingConnectionPool if blocking else StatsConnectionPool
+
+    def _shared(self) -> typing.Dict[PoolKey, ConnectionPool]:
+        self._check_fork()
+        if not self.asynchronous:
+            return self._pools
+        try:
+            _loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._pools
+        _pools = self._loop_pools.get(_loop)
+        if _pools is None:
+            with self._lock:
+                _pools = self._loop_pools.setdefault(_loop, {})
+        return _pools
+
+    def _new_pool(
+        self, options: typing.Dict[str, typing.Any], blocking: bool, max_connections: typing.Optional[int], timeout: float
+    ) -> ConnectionPool:
+        if max_connections is not None:
+            options["max_connections"] = max_connections
+        if blocking:
+            options["timeout"] = timeout
+        return self._pool_class(blocking)(**options)
+
+    def get_pool(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        blocking: bool = False,
+        max_connections: typing.Optional[int] = None,
+        timeout: float = 20.0,
+        **connection_kwargs,
+    ) -> ConnectionPool:
+        """The process's pool for a server and database, created on first use.
+
+        Args:
+            host (str, optional): redis host, ignored when a unix socket `path` is given. Defaults to "localhost".
+            port (int, optional): redis port. Defaults to 6379.
+            db (int, optional): redis database. Defaults to 0.
+            blocking (bool, optional): wait for a free connection instead of opening more. Defaults to False.
+            max_connections (typing.Optional[int], optional): connection cap, the redis-py default when None.
+            timeout (float, optional): seconds a blocking pool waits for a free connection. Defaults to 20.0.
+            **connection_kwargs: any other connection argument (password, ssl, socket timeouts...).
+
+        Returns:
+            ConnectionPool: the shared pool, with a `stats` attribute (see PoolStats).
+        """
+        _options: typing.Dict[str, typing.Any] = {"db": db, **connection_kwargs}
+        if "path" not in connection_kwargs:
+            _options.update(host=host, port=port)
+        _key = pool_key(_options)
+        _pools = self._shared()
+        _pool = _pools.get(_key)
+        if _pool is not None:
+            return _pool
+        with self._lock:
+            _pool = _pools.get(_key)
+            if _pool is None:
+                _pool = _pools[_key] = self._new_pool(_options, blocking, max_connections, timeout)
+            return _pool
+
+    def pool_for_database(self, pool: ConnectionPool, db: int) -> ConnectionPool:
+        """A pool like `pool` connecting to database `db`, `pool` itself when it already does.
+
+        A Redis client given a pool ignores its own `db` argument, this is how a cache reaches
+        another database of the server of the pool it was given. The pool for a pool of the
+        manager is shared as well, the one for a pool made elsewhere lives as long as that pool.
+        """
+        _options = dict(pool.connection_kwargs)
+        if (_options.get("db") or 0) == db:
+            return pool
+        _options.update(db=db, connection_class=pool.connection_class)
+        _blocking = isinstance(pool, (BlockingConnectionPool, AsyncBlockingConnectionPool))
+        _timeout = pool.timeout if _blocking else 20.0
+        if any(shared is pool for shared in self._shared().values()):
+            return self.get_pool(blocking=_blocking, max_connections=pool.max_connections, timeout=_timeout, **_options)
+        with self._lock:
+            _pools = self._derived.setdefault(pool, {})
+            if db not in _pools:
+                _pools[db] = self._new_pool(_options, _blocking, pool.max_connections, _timeout)
+            return _pools[db]
+
+    def stats(self) -> typing.Dict[PoolKey, typing.Dict[str, typing.Any]]:
+        """Stats of every shared pool of the manager (of the running loop when asynchronous), by (host, port, db)."""
+        return {key: pool.stats.as_dict() for key, pool in list(self._shared().items())}
+
+    def reset(self) -> None:
+        """Forget every pool, the next get_pool calls build new ones. Pools are not disconnected."""
+        with self._lock:
+            self._pools: typing.Dict[PoolKey, ConnectionPool] = {}
+            self._loop_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, typing.Dict[PoolKey, ConnectionPool]]" = (
+                weakref.WeakKeyDictionary()
+            )
+            self._derived: "weakref.WeakKeyDictionary[ConnectionPool, typing.Dict[int, ConnectionPool]]" = (
+                weakref.WeakKeyDictionary()
+            )
+            self._pid = os.getpid()
+
+    def _check_fork(self) -> None:
+        # Forks that skip the at-fork hooks (os.fork called from C) are caught here.
+        if self._pid != os.getpid():
+            self.reset()
+
+
+def _reset_after_fork() -> None:
+    for manager in list(_MANAGERS):
+        # The parent may have forked while holding the lock.
+        manager._lock = threading.Lock()
+        manager.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+# Pools shared by every cache of the process created without a connection pool.
+shared_pools = PoolManager()
+async_shared_pools = PoolManager(asynchronous=True)
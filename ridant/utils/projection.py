@@ -0,0 +1,131 @@
+import re
+import typing
+
+from pydantic import BaseModel, ValidationError
+from pydantic.fields import MAPPING_LIKE_SHAPES, SHAPE_SINGLETON, ModelField
+from pydantic.utils import lenient_issubclass
+
+from ridant.utils.caching_tools import cached_hash_string, cached_hash_value
+from ridant.utils.indexes import field_value
+from ridant.utils.partial_update import JSON_HELPERS
+
+# KEYS[1]: a string-mode key. ARGV: for each requested field, its path length then the path.
+# Returns nil when the key does not exist, {"1", value JSON text or false per field} for plain
+# JSON values, and {"0", value} for compressed / msgpack values, which the client decodes whole.
+PROJECTION_SCRIPT = JSON_HELPERS + r"""
+local stored = redis.call("GET", KEYS[1])
+if not stored then
+    return nil
+end
+local document = stored
+if string.sub(document, 1, 1) == "\2" then
+    -- Skip the schema fingerprint, see trusted_decode.
+    document = string.sub(document, 10)
+end
+local first = string.sub(document, 1, 1)
+if first == "\0" or first == "\1" then
+    return {"0", stored}
+end
+
+local values = {"1"}
+local n = 1
+while n <= #ARGV do
+    local path = {}
+    for segment = 1, tonumber(ARGV[n]) do
+        path[segment] = ARGV[n + segment]
+    end
+    n = n + #path + 1
+    local found, value = pcall(value_at, document, path)
+    values[#values + 1] = (found and value) or false
+end
+return values
+"""
+
+
+def split_field(field: str) -> typing.List[str]:
+    """Path of a requested field, nested parts separated by "." or by ":" like hash fields."""
+    return re.split(r"[.:]", field)
+
+
+def projection_arguments(paths: typing.List[typing.List[str]]) -> typing.List[typing.Any]:
+    _arguments = []
+    for path in paths:
+        _arguments.append(len(path))
+        _arguments.extend(path)
+    return _arguments
+
+
+def model_field(model: type, path: typing.List[str]) -> typing.Optional[ModelField]:
+    """The pydantic field at `path`, None when the path leaves the model's declared fields."""
+    _field = None
+    for segment in path:
+        if _field is not None and _field.shape != SHAPE_SINGLETON:
+            # A list index or a mapping key, every item shares the same field.
+            if not _field.sub_fields or (_field.shape not in MAPPING_LIKE_SHAPES and not segment.isdigit()):
+                return None
+            _field = _field.sub_fields[0]
+            continue
+        _fields = getattr(model if _field is None else _field.type_, "__fields__", None)
+        if not _fields or segment not in _fields:
+            return None
+        _field = _fields[segment]
+    return _field
+
+
+def is_hash_leaf(model: type, path: typing.List[str]) -> bool:
+    """Whether a field is stored as one hash field (see flatten_dict_for_caching), rather than flattened below its name.
+
+    Items of lists are not, lists are stored whole as one JSON field.
+    """
+    for depth in range(1, len(path)):
+        _parent = model_field(model, path[:depth])
+        if _parent is not None and _parent.shape != SHAPE_SINGLETON and _parent.shape not in MAPPING_LIKE_SHAPES:
+            return False
+    field = model_field(model, path)
+    if field is None or field.shape in MAPPING_LIKE_SHAPES:
+        return False
+    if field.shape != SHAPE_SINGLETON:
+        return True
+    return not (lenient_issubclass(field.type_, (BaseModel, dict)) or field.type_ is typing.Any)
+
+
+def below_hash_leaf(model: type, path: typing.List[str]) -> bool:
+    """Whether a path goes inside a field stored as one hash field, e.g. an item of a list, which hash mode cannot address."""
+    return any(is_hash_leaf(model, path[:depth]) for depth in range(1, len(path)))
+
+
+def validate_field(model: type, path: typing.List[str], value: typing.Any) -> typing.Any:
+    """Validate a projected value against its field, so it has the type the whole model would give it.
+
+    Args:
+        model (type): model class.
+        path (typing.List[str]): the field's path.
+        value (typing.Any): JSON decoded value, or the text of a hash field.
+
+    Raises:
+        ValidationError: the value does not fit the field.
+
+    Returns:
+        typing.Any: the validated value, `value` unchanged outside the model's declared fields.
+    """
+    _field = model_field(model, path)
+    if value is None or _field is None:
+        return value
+    _value, _errors = _field.validate(value, {}, loc=".".join(path), cls=model)
+    if _errors:
+        raise ValidationError([_errors], model)
+    return _value
+
+
+def decode_hash_value(value: typing.Optional[bytes], field: typing.Optional[ModelField] = None) -> typing.Any:
+    """A hash field's value, read as the declared `field` reads it: str fields never as JSON."""
+    if value is None:
+        return None
+    if field is not None and field.shape == SHAPE_SINGLETON and not field.sub_fields and field.type_ is str:
+        return cached_hash_string(value)
+    return cached_hash_value(value)
+
+
+def project_model(item: typing.Any, fields: typing.Sequence[str]) -> typing.Dict[str, typing.Any]:
+    """Pick fields out of an already decoded model (or nested dict)."""
+    return {field: field_value(item, ".".join(split_field(field))) for field in fields}
@@ -0,0 +1,84 @@
+import json
+import time
+import typing
+
+
+class PurgeProgress(object):
+    """Where a purge is: which SCAN pattern, the SCAN cursor of every client (or cluster node) not done
+    with it yet, and how many keys were scanned and removed so far.
+
+    `cursor` is an opaque string, pass it back as `cursor=` to resume an interrupted purge.
+    """
+
+    __slots__ = ("patterns", "targets", "phase", "cursors", "scanned", "removed", "started")
+
+    def __init__(self, patterns: typing.List[str], targets: typing.List[str], cursor: typing.Optional[str] = None) -> None:
+        self.patterns = patterns
+        self.targets = targets
+        self.phase = 0
+        self.cursors = {target: 0 for target in targets}
+        self.scanned = 0
+        self.removed = 0
+        self.started = time.monotonic()
+        if cursor is not None:
+            _state = json.loads(cursor)
+            if _state["patterns"] != patterns or not set(_state["cursors"]) <= set(targets):
+                raise ValueError("The cursor belongs to another purge, or the clients changed since.")
+            self.phase = _state["phase"]
+            self.cursors = dict(_state["cursors"])
+
+    @property
+    def done(self) -> bool:
+        return self.phase >= len(self.patterns)
+
+    @property
+    def pattern(self) -> str:
+        return self.patterns[self.phase]
+
+    @property
+    def cursor(self) -> typing.Optional[str]:
+        """Resume token, None once the purge is done."""
+        if self.done:
+            return None
+        return json.dumps({"patterns": self.patterns, "phase": self.phase, "cursors": self.cursors})
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def next_target(self) -> typing.Tuple[str, int]:
+        """The client (or cluster node) to SCAN next, with its cursor."""
+        return next(iter(self.cursors.items()))
+
+    def advance(self, target: str, cursor: int, scanned: int, removed: int) -> None:
+        """Record one SCAN step of `target` and the keys it removed."""
+        self.scanned += scanned
+        self.removed += removed
+        if cursor:
+            self.cursors[target] = cursor
+            return
+        del self.cursors[target]
+        if not self.cursors:
+            self.phase += 1
+            self.cursors = {} if self.done else {target: 0 for target in self.targets}
+
+    def __repr__(self) -> str:
+        return f"<PurgeProgress removed={self.removed} scanned={self.scanned} done={self.done}>"
+
+
+class Throttle(object):
+    """Keeps a loop under `ops_per_second` on average, no limit when it is None."""
+
+    def __init__(self, ops_per_second: typing.Optional[float] = None) -> None:
+        if ops_per_second is not None and ops_per_second <= 0:
+            raise ValueError("ops_per_second must be positive.")
+        self.ops_per_second = ops_per_second
+        self._ops = 0
+        self._started = time.monotonic()
+
+    def delay(self, ops: int) -> float:
+        """Record `ops` operations, returns how long to sleep before the next ones."""
+        if self.ops_per_second is None:
+            return 0.0
+        self._ops += ops
+        return max(0.0, self._ops / self.ops_per_second - (time.monotonic() - self._started))
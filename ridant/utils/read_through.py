@@ -0,0 +1,162 @@
+import asyncio
+import inspect
+import math
+import random
+import threading
+import typing
+
+# Bookkeeping keys live outside every model group, so SCANs of a group never see them.
+LOCK_PREFIX = "__ridant__:lock:"
+DELTA_PREFIX = "__ridant__:delta:"
+
+# Deletes the lock only if it still holds our token, so a loader that overran
+# its lock never releases one taken by another process since.
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+KeyBuilder = typing.Union[str, typing.Callable[..., str]]
+
+
+def key_resolver(key: KeyBuilder, func: typing.Callable) -> typing.Callable[[tuple, dict], str]:
+    """Build a function turning a call's arguments into a cache uid.
+
+    Args:
+        key (KeyBuilder): either a format string using the decorated function's
+            parameter names (e.g. "{user_id}"), or a callable taking the same
+            arguments as the decorated function.
+        func (typing.Callable): the decorated function.
+
+    Returns:
+        typing.Callable[[tuple, dict], str]: resolver taking (args, kwargs).
+    """
+    if callable(key):
+        return lambda args, kwargs: str(key(*args, **kwargs))
+
+    _signature = inspect.signature(func)
+
+    def _resolve(args: tuple, kwargs: dict) -> str:
+        _bound = _signature.bind(*args, **kwargs)
+        _bound.apply_defaults()
+        return key.format(**_bound.arguments)
+
+    return _resolve
+
+
+def should_recompute_early(remaining_ms: int, delta_ms: typing.Optional[float], beta: float) -> bool:
+    """XFetch: recompute before expiry with a probability rising as expiry gets closer.
+
+    Args:
+        remaining_ms (int): remaining TTL of the cached value (PTTL).
+        delta_ms (typing.Optional[float]): how long the last recompute took.
+        beta (float): > 1 favours earlier recomputes, < 1 later ones.
+
+    Returns:
+        bool: whether this caller should recompute now.
+    """
+    if delta_ms is None or remaining_ms < 0:
+        return False
+    return delta_ms * beta * -math.log(1.0 - random.random()) >= remaining_ms
+
+
+class _Call(object):
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result = None
+        self.error: typing.Optional[BaseException] = None
+
+
+class SingleFlight(object):
+    """Runs at most one call per key at a time, concurrent callers share its outcome."""
+
+    def __init__(self) -> None:
+        self._calls: typing.Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: str, func: typing.Callable[[], typing.Any]) -> typing.Any:
+        with self._lock:
+            _call = self._calls.get(key)
+            _leader = _call is None
+            if _leader:
+                _call = self._calls[key] = _Call()
+
+        if not _leader:
+            _call.event.wait()
+            if _call.error is not None:
+                raise _call.error
+            return _call.result
+
+        try:
+            _call.result = func()
+        except BaseException as error:
+            _call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            _call.event.set()
+        return _call.result
+
+
+class AsyncSingleFlight(object):
+    """`SingleFlight` for coroutines running on one event loop."""
+
+    def __init__(self) -> None:
+        self._calls: typing.Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, func: typing.Callable[[], typing.Awaitable]) -> typing.Any:
+        _future = self._calls.get(key)
+        if _future is not None:
+            # Shielded so one cancelled waiter does not cancel the call for everyone.
+            return await asyncio.shield(_future)
+
+        _future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            _result = await func()
+        except BaseException as error:
+            _future.set_exception(error)
+            # Nobody may be waiting, do not let asyncio report it as never retrieved.
+            _future.exception()
+            raise
+        else:
+            _future.set_result(_result)
+            return _result
+        finally:
+            del self._calls[key]
+
+
+class ReadThroughPolicy(object):
+    """Settings of one `RidantCache.cached` decorator."""
+
+    __slots__ = ("ttl", "lock_timeout", "lock_wait", "lock_poll_interval", "early_recompute")
+
+    def __init__(
+        self,
+        ttl: typing.Optional[float] = None,
+        lock_timeout: float = 10.0,
+        lock_wait: typing.Optional[float] = None,
+        lock_poll_interval: float = 0.05,
+        early_recompute: typing.Optional[float] = None,
+    ) -> None:
+        if early_recompute is not None and ttl is None:
+            raise ValueError("early_recompute needs a ttl to recompute ahead of.")
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_timeout if lock_wait is None else lock_wait
+        self.lock_poll_interval = lock_poll_interval
+        self.early_recompute = early_recompute
+
+    @property
+    def extra_redis_arguments(self) -> dict:
+        return {"px": int(self.ttl * 1000)} if self.ttl else {}
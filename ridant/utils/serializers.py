@@ -0,0 +1,209 @@
+import json
+import typing
+
+from loguru import logger
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+from ridant.utils.trusted_decode import trusted_construct
+
+ORJSON_AVAILABLE = False
+MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except Exception:
+    pass
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except Exception:
+    pass
+
+# Stamped values start with this byte followed by the serializer's format tag.
+# Plain JSON can never start with a NUL byte, so values written before
+# stamping existed (and values written by the json serializers) stay readable.
+FORMAT_HEADER = b"\x00"
+
+
+def to_jsonable(value: typing.Any, encoder: typing.Callable = pydantic_encoder) -> typing.Any:
+    """Convert a value (usually `model.dict()`) to JSON-compatible python types.
+
+    Args:
+        value (typing.Any): value to convert.
+        encoder (typing.Callable): fallback for non-JSON types, defaults to pydantic's encoder.
+
+    Returns:
+        typing.Any: the same structure made of dicts, lists, str, int, float, bool and None.
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {_jsonable_key(key, encoder): to_jsonable(item, encoder) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_jsonable(item, encoder) for item in value]
+    if isinstance(value, BaseModel):
+        return to_jsonable(value.dict(), getattr(value, "__json_encoder__", encoder))
+    return to_jsonable(encoder(value), encoder)
+
+
+def _jsonable_key(key: typing.Any, encoder: typing.Callable) -> str:
+    # Mirror json.dumps, which writes non-string keys as their JSON form.
+    if isinstance(key, str):
+        return key
+    key = to_jsonable(key, encoder)
+    return key if isinstance(key, str) else json.dumps(key)
+
+
+def _model_encoder(model: BaseModel) -> typing.Callable:
+    return getattr(model, "__json_encoder__", pydantic_encoder)
+
+
+class Serializer(object):
+    name: str = ""
+    format_tag: bytes = b""
+
+    def dumps(self, value: typing.Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: typing.Union[bytes, memoryview]) -> typing.Any:
+        raise NotImplementedError
+
+    def dump_model(self, model: BaseModel) -> bytes:
+        return self.dumps(to_jsonable(model.dict(), _model_encoder(model)))
+
+    def load_model(self, model: typing.Type[BaseModel], data: typing.Union[bytes, memoryview]) -> BaseModel:
+        return model.parse_obj(self.loads(data))
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self.name!r}>"
+
+
+class JsonSerializer(Serializer):
+    name = "json"
+    format_tag = b"j"
+
+    def dumps(self, value: typing.Any) -> bytes:
+        return json.dumps(value, default=pydantic_encoder).encode("utf-8")
+
+    def loads(self, data: typing.Union[bytes, memoryview]) -> typing.Any:
+        return json.loads(bytes(data))
+
+    def dump_model(self, model: BaseModel) -> bytes:
+        return model.json().encode("utf-8")
+
+    def load_model(self, model: typing.Type[BaseModel], data: typing.Union[bytes, memoryview]) -> BaseModel:
+        if not hasattr(model, "parse_raw"):
+            logger.warning(
+                "Older version of pydantic detected, using json.loads instead of parse_raw"
+            )
+            return model(**self.loads(data))
+        return model.parse_raw(bytes(data))
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+    format_tag = b"j"
+
+    def __init__(self) -> None:
+        if not ORJSON_AVAILABLE:
+            raise ImportError("orjson is not installed, install it to use the orjson serializer.")
+
+    def dumps(self, value: typing.Any) -> bytes:
+        return orjson.dumps(value, default=pydantic_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: typing.Union[bytes, memoryview]) -> typing.Any:
+        return orjson.loads(data)
+
+    def dump_model(self, model: BaseModel) -> bytes:
+        # orjson natively handles datetimes, uuids, enums and dataclasses, and
+        # falls back to the model's encoder for everything else.
+        return orjson.dumps(model.dict(), default=_model_encoder(model), option=orjson.OPT_NON_STR_KEYS)
+
+
+class MsgpackSerializer(Serializer):
+    name = "msgpack"
+    format_tag = b"m"
+
+    def __init__(self) -> None:
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack is not installed, install it to use the msgpack serializer.")
+
+    def dumps(self, value: typing.Any) -> bytes:
+        return msgpack.packb(value, default=pydantic_encoder, use_bin_type=True)
+
+    def loads(self, data: typing.Union[bytes, memoryview]) -> typing.Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+    def dump_model(self, model: BaseModel) -> bytes:
+        return msgpack.packb(model.dict(), default=_model_encoder(model), use_bin_type=True)
+
+
+_SERIALIZER_CLASSES: typing.Dict[str, typing.Type[Serializer]] = {
+    JsonSerializer.name: JsonSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+    MsgpackSerializer.name: MsgpackSerializer,
+}
+_SERIALIZERS: typing.Dict[str, Serializer] = {}
+
+
+def get_serializer(serializer: typing.Union[str, Serializer, None] = None) -> Serializer:
+    """Resolve a serializer name (or instance) to a shared serializer instance.
+
+    Args:
+        serializer (typing.Union[str, Serializer, None]): "json", "orjson", "msgpack" or an instance. Defaults to json.
+
+    Returns:
+        Serializer: the serializer.
+    """
+    if isinstance(serializer, Serializer):
+        return serializer
+    _name = serializer or JsonSerializer.name
+    if _name not in _SERIALIZERS:
+        if _name not in _SERIALIZER_CLASSES:
+            raise ValueError(f"Unknown serializer '{_name}', expected one of {list(_SERIALIZER_CLASSES)}")
+        _SERIALIZERS[_name] = _SERIALIZER_CLASSES[_name]()
+    return _SERIALIZERS[_name]
+
+
+def encode_model(model: BaseModel, serializer: Serializer) -> bytes:
+    """Serialize a model, stamping the format unless it is plain JSON."""
+    _payload = serializer.dump_model(model)
+    if serializer.format_tag == JsonSerializer.format_tag:
+        return _payload
+    return FORMAT_HEADER + serializer.format_tag + _payload
+
+
+def decode_model(
+    model: typing.Type[BaseModel], data: bytes, serializer: Serializer, trusted: bool = False
+) -> BaseModel:
+    """Deserialize a value written by `encode_model` with any serializer.
+
+    Plain JSON values are read with `serializer` when it speaks JSON, so an
+    orjson-configured cache reads legacy values with orjson as well. Trusted
+    values skip most of validation, see trusted_decode.trusted_construct.
+    """
+    if data[:1] != FORMAT_HEADER:
+        if serializer.format_tag != JsonSerializer.format_tag:
+            serializer = get_serializer(JsonSerializer.name)
+        if trusted:
+            return trusted_construct(model, serializer.loads(data))
+        return serializer.load_model(model, data)
+
+    _format_tag = data[1:2]
+    if _format_tag != serializer.format_tag:
+        serializer = _serializer_for_tag(_format_tag)
+    if trusted:
+        return trusted_construct(model, serializer.loads(memoryview(data)[2:]))
+    return serializer.load_model(model, memoryview(data)[2:])
+
+
+def _serializer_for_tag(format_tag: bytes) -> Serializer:
+    for name, serializer_class in _SERIALIZER_CLASSES.items():
+        if serializer_class.format_tag == format_tag:
+            return get_serializer(name)
+    raise ValueError(f"Unknown serialization format tag {format_tag!r}")
@@ -0,0 +1,85 @@
+import bisect
+import hashlib
+import threading
+import typing
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing(object):
+    """Maps keys to nodes by consistent hashing with `virtual_nodes` points per node.
+
+    Adding or removing a node only moves the keys falling between its points
+    and their predecessors, roughly 1/N of them, instead of rehashing everything.
+    """
+
+    def __init__(self, nodes: typing.Iterable[str] = (), virtual_nodes: int = 160) -> None:
+        if virtual_nodes < 1:
+            raise ValueError("virtual_nodes must be at least 1")
+
+        self.virtual_nodes = virtual_nodes
+        self._points: typing.List[int] = []
+        self._point_nodes: typing.List[str] = []
+        self._nodes: typing.Set[str] = set()
+        self._lock = threading.Lock()
+        for node in nodes:
+            self.add_node(node)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def nodes(self) -> typing.List[str]:
+        return sorted(self._nodes)
+
+    def add_node(self, node: str) -> None:
+        with self._lock:
+            if node in self._nodes:
+                return
+            _points, _point_nodes = list(self._points), list(self._point_nodes)
+            for replica in range(self.virtual_nodes):
+                _point = _hash(f"{node}#{replica}")
+                _index = bisect.bisect_left(_points, _point)
+                _points.insert(_index, _point)
+                _point_nodes.insert(_index, node)
+            # Swapped in together, so readers never see half a node.
+            self._points, self._point_nodes = _points, _point_nodes
+            self._nodes.add(node)
+
+    def remove_node(self, node: str) -> None:
+        with self._lock:
+            if node not in self._nodes:
+                return
+            _kept = [(point, owner) for point, owner in zip(self._points, self._point_nodes) if owner != node]
+            self._points = [point for point, _ in _kept]
+            self._point_nodes = [owner for _, owner in _kept]
+            self._nodes.discard(node)
+
+    def node_for(self, key: str) -> str:
+        _points, _point_nodes = self._points, self._point_nodes
+        if not _points:
+            raise ValueError("The hash ring has no nodes.")
+        return _point_nodes[bisect.bisect(_points, _hash(key)) % len(_points)]
+
+    def partition(self, keys: typing.Iterable[str]) -> typing.Dict[str, typing.List[int]]:
+        """Group keys by node.
+
+        Args:
+            keys (typing.Iterable[str]): key names.
+
+        Returns:
+            typing.Dict[str, typing.List[int]]: node -> positions of its keys in `keys`.
+        """
+        _partitions: typing.Dict[str, typing.List[int]] = {}
+        for index, key in enumerate(keys):
+            _partitions.setdefault(self.node_for(key), []).append(index)
+        return _partitions
+
+
+def shard_name(connection_kwargs: typing.Dict[str, typing.Any]) -> str:
+    """Stable name of a shard from its connection settings, so ring positions survive restarts and reordering."""
+    if connection_kwargs.get("path"):
+        return f"unix://{connection_kwargs['path']}/{connection_kwargs.get('db', 0)}"
+    return f"{connection_kwargs.get('host', 'localhost')}:{connection_kwargs.get('port', 6379)}/{connection_kwargs.get('db', 0)}"
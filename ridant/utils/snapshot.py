@@ -0,0 +1,197 @@
+import json
+import mmap
+import os
+import struct
+import time
+import typing
+
+# A snapshot file is MAGIC, then chunks, then a JSON index of the chunks and the trailer:
+#
+#   chunk:   CHUNK_HEADER (entry count), then the chunk's entries
+#   entry:   ENTRY_HEADER (flags, TTL in ms or -1, key length, value length), key, value
+#   trailer: TRAILER (offset and length of the JSON index), TRAILER_MAGIC
+#
+# Chunks are found through the index, so a reader maps the file and decodes any chunk on its own,
+# which lets imports spread chunks over several connections without reading the whole file.
+MAGIC = b"RIDSNAP\x01"
+TRAILER_MAGIC = b"RIDSNAPE"
+CHUNK_HEADER = struct.Struct("<I")
+ENTRY_HEADER = struct.Struct("<BqII")
+TRAILER = struct.Struct("<QQ")
+FORMAT_VERSION = 1
+
+# Entry flags. Without DUMPED the value is a raw string value, restored with SET.
+DUMPED = 1
+HASH_DATABASE = 2
+
+NO_TTL = -1
+
+
+class SnapshotEntry(typing.NamedTuple):
+    key: bytes
+    value: bytes
+    ttl: int
+    flags: int
+
+    @property
+    def dumped(self) -> bool:
+        return bool(self.flags & DUMPED)
+
+    @property
+    def hash_database(self) -> bool:
+        return bool(self.flags & HASH_DATABASE)
+
+
+class SnapshotStats(object):
+    """What an export wrote or an import restored."""
+
+    __slots__ = ("keys", "skipped", "expired", "chunks", "bytes", "started", "finished")
+
+    def __init__(self) -> None:
+        self.keys = 0
+        self.skipped = 0
+        self.expired = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self.finished: typing.Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        _stats = {name: getattr(self, name) for name in ("keys", "skipped", "expired", "chunks", "bytes")}
+        _stats["elapsed"] = self.elapsed
+        return _stats
+
+    def __repr__(self) -> str:
+        return f"<SnapshotStats keys={self.keys} chunks={self.chunks} bytes={self.bytes} elapsed={self.elapsed:.2f}s>"
+
+
+class SnapshotWriter(object):
+    """Writes entries to a snapshot file in chunks of about `chunk_size` bytes.
+
+    The file is written next to `path` and moved over it on close, so an interrupted export
+    never leaves a truncated snapshot behind.
+    """
+
+    def __init__(self, path: typing.Union[str, os.PathLike], metadata: dict, chunk_size: int = 1 << 20) -> None:
+        self.path = os.fspath(path)
+        self.metadata = dict(metadata)
+        self.chunk_size = chunk_size
+        self.stats = SnapshotStats()
+        self._temporary_path = self.path + ".partial"
+        self._file = open(self._temporary_path, "wb")
+        self._file.write(MAGIC)
+        self._chunks: typing.List[typing.Tuple[int, int]] = []
+        self._buffer: typing.List[bytes] = []
+        self._buffered = 0
+        self._count = 0
+
+    def add(self, key: bytes, value: bytes, ttl: int = NO_TTL, dumped: bool = True, hash_database: bool = False) -> None:
+        _flags = (DUMPED if dumped else 0) | (HASH_DATABASE if hash_database else 0)
+        self._buffer.append(ENTRY_HEADER.pack(_flags, ttl, len(key), len(value)))
+        self._buffer.append(key)
+        self._buffer.append(value)
+        self._buffered += ENTRY_HEADER.size + len(key) + len(value)
+        self._count += 1
+        self.stats.keys += 1
+        if self._buffered >= self.chunk_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._count:
+            return
+        self._chunks.append((self._file.tell(), self._count))
+        self._file.write(CHUNK_HEADER.pack(self._count))
+        self._file.writelines(self._buffer)
+        self._buffer, self._buffered, self._count = [], 0, 0
+        self.stats.chunks += 1
+
+    def close(self) -> SnapshotStats:
+        self._flush()
+        _index = json.dumps(
+            {**self.metadata, "version": FORMAT_VERSION, "keys": self.stats.keys, "chunks": self._chunks}
+        ).encode("utf-8")
+        _index_offset = self._file.tell()
+        self._file.write(_index)
+        self._file.write(TRAILER.pack(_index_offset, len(_index)))
+        self._file.write(TRAILER_MAGIC)
+        self.stats.bytes = self._file.tell()
+        self._file.close()
+        os.replace(self._temporary_path, self.path)
+        self.stats.finished = time.monotonic()
+        return self.stats
+
+    def abort(self) -> None:
+        self._file.close()
+        os.unlink(self._temporary_path)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SnapshotReader(object):
+    """Memory-maps a snapshot file, chunks are decoded on demand and only the pages they use are read."""
+
+    def __init__(self, path: typing.Union[str, os.PathLike]) -> None:
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as snapshot_file:
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _size = len(self._map)
+        _trailer_size = TRAILER.size + len(TRAILER_MAGIC)
+        if (
+            _size < len(MAGIC) + _trailer_size
+            or self._map[: len(MAGIC)] != MAGIC
+            or self._map[_size - len(TRAILER_MAGIC) :] != TRAILER_MAGIC
+        ):
+            self._map.close()
+            raise ValueError(f"{self.path} is not a ridant snapshot, or was not fully written.")
+        _index_offset, _index_length = TRAILER.unpack_from(self._map, _size - _trailer_size)
+        self.metadata: typing.Dict[str, typing.Any] = json.loads(self._map[_index_offset : _index_offset + _index_length])
+        if self.metadata["version"] > FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} was written by a newer version of ridant.")
+        self.chunks: typing.List[typing.Tuple[int, int]] = [tuple(chunk) for chunk in self.metadata["chunks"]]
+
+    def read_chunk(self, index: int) -> typing.List[SnapshotEntry]:
+        _offset, _ = self.chunks[index]
+        (_count,) = CHUNK_HEADER.unpack_from(self._map, _offset)
+        _offset += CHUNK_HEADER.size
+        _entries = []
+        for _ in range(_count):
+            _flags, _ttl, _key_length, _value_length = ENTRY_HEADER.unpack_from(self._map, _offset)
+            _offset += ENTRY_HEADER.size
+            _key = self._map[_offset : _offset + _key_length]
+            _offset += _key_length
+            _entries.append(SnapshotEntry(_key, self._map[_offset : _offset + _value_length], _ttl, _flags))
+            _offset += _value_length
+        return _entries
+
+    def __iter__(self) -> typing.Iterator[SnapshotEntry]:
+        for index in range(len(self.chunks)):
+            yield from self.read_chunk(index)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+
+def remaining_ttl(entry: SnapshotEntry, elapsed_ms: int = 0) -> typing.Optional[int]:
+    """TTL to restore an entry with in ms, 0 for none, None when it expired `elapsed_ms` after the export."""
+    if entry.ttl == NO_TTL:
+        return 0
+    _ttl = entry.ttl - elapsed_ms
+    return _ttl if _ttl > 0 else None
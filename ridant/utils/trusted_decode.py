@@ -0,0 +1,164 @@
+import hashlib
+import threading
+import typing
+
+from pydantic import BaseModel, Extra, ValidationError
+from pydantic.fields import SHAPE_DICT, SHAPE_LIST, SHAPE_SINGLETON, ModelField
+from pydantic.utils import lenient_issubclass
+
+# Fingerprinted values start with this byte and the fingerprint of their model's schema, followed by
+# the value as encode_model wrote it. Neither JSON, stamped serializer output nor compressed values
+# (see serializers.FORMAT_HEADER and compression.COMPRESSION_HEADER) start with it. Compression wraps
+# the whole of it.
+FINGERPRINT_HEADER = b"\x02"
+FINGERPRINT_SIZE = 8
+
+# What a read does with a value fingerprinted for another schema of its model.
+VALIDATE = "validate"
+MISS = "miss"
+
+# How a field's stored value becomes its attribute, see trusted_construct.
+_PASS = 0
+_MODEL = 1
+_MODEL_LIST = 2
+_MODEL_DICT = 3
+_VALIDATE = 4
+
+# Types JSON (and msgpack) decoding already gives back exactly as validation would.
+_NATIVE_TYPES = (str, int, bool, typing.Any)
+
+_FINGERPRINTS: typing.Dict[type, bytes] = {}
+_PLANS: typing.Dict[type, typing.List[typing.Tuple[str, str, int, ModelField]]] = {}
+_LOCK = threading.Lock()
+
+
+def _nested_models(field: ModelField) -> typing.Iterator[type]:
+    if lenient_issubclass(field.type_, BaseModel):
+        yield field.type_
+    for sub_field in field.sub_fields or ():
+        yield from _nested_models(sub_field)
+
+
+def _describe(model: type, seen: typing.Set[type]) -> typing.List[typing.Any]:
+    _name = f"{model.__module__}.{model.__qualname__}"
+    if model in seen:
+        return [_name]
+    seen.add(model)
+    _description: typing.List[typing.Any] = [_name]
+    for name, field in model.__fields__.items():
+        _description.append([name, field.alias, str(field.outer_type_), field.required, field.allow_none])
+        for nested in _nested_models(field):
+            _description.append(_describe(nested, seen))
+    return _description
+
+
+def schema_fingerprint(model: type) -> bytes:
+    """Fingerprint of a model class's schema: its fields, their types and those of nested models.
+
+    Args:
+        model (type): pydantic model class.
+
+    Returns:
+        bytes: FINGERPRINT_SIZE bytes, the same in every process running the same model definitions.
+    """
+    _fingerprint = _FINGERPRINTS.get(model)
+    if _fingerprint is None:
+        _description = repr(_describe(model, set())).encode("utf-8")
+        _fingerprint = hashlib.blake2b(_description, digest_size=FINGERPRINT_SIZE).digest()
+        with _LOCK:
+            _FINGERPRINTS[model] = _fingerprint
+    return _fingerprint
+
+
+def add_fingerprint(fingerprint: bytes, payload: bytes) -> bytes:
+    return FINGERPRINT_HEADER + fingerprint + payload
+
+
+def split_fingerprint(data: bytes) -> typing.Tuple[typing.Optional[bytes], bytes]:
+    """Split a value into its fingerprint (None when it has none) and the value encode_model wrote."""
+    if data[:1] != FINGERPRINT_HEADER:
+        return None, data
+    return data[1 : 1 + FINGERPRINT_SIZE], data[1 + FINGERPRINT_SIZE :]
+
+
+def supports_trusted_decode(model: type) -> bool:
+    return lenient_issubclass(model, BaseModel)
+
+
+def _field_kind(field: ModelField) -> int:
+    if field.shape == SHAPE_SINGLETON:
+        if field.sub_fields:
+            # Unions
+            return _VALIDATE
+        if lenient_issubclass(field.type_, BaseModel):
+            return _MODEL
+        return _PASS if field.type_ in _NATIVE_TYPES else _VALIDATE
+    if field.shape not in (SHAPE_LIST, SHAPE_DICT) or not field.sub_fields:
+        return _VALIDATE
+    if field.shape == SHAPE_DICT and field.key_field is not None and field.key_field.type_ not in (str, typing.Any):
+        return _VALIDATE
+    _item_kind = _field_kind(field.sub_fields[0])
+    if _item_kind == _PASS:
+        return _PASS
+    if _item_kind == _MODEL:
+        return _MODEL_LIST if field.shape == SHAPE_LIST else _MODEL_DICT
+    return _VALIDATE
+
+
+def _decode_plan(model: type) -> typing.List[typing.Tuple[str, str, int, ModelField]]:
+    _plan = _PLANS.get(model)
+    if _plan is None:
+        _plan = [(name, field.alias, _field_kind(field), field) for name, field in model.__fields__.items()]
+        with _LOCK:
+            _PLANS[model] = _plan
+    return _plan
+
+
+def _validate(model: type, field: ModelField, value: typing.Any) -> typing.Any:
+    _value, _errors = field.validate(value, {}, loc=field.alias, cls=model)
+    if _errors:
+        raise ValidationError([_errors], model)
+    return _value
+
+
+def trusted_construct(model: typing.Type[BaseModel], data: typing.Dict[str, typing.Any]) -> BaseModel:
+    """Build a model from a decoded value that was written from a valid instance of the same schema.
+
+    Nested models are built the same way and values JSON already decodes to their final type are
+    used as they are. Only the other fields (dates, UUIDs, enums, floats, sets...) are validated,
+    and validators of the model are not run.
+
+    Args:
+        model (typing.Type[BaseModel]): model class, whose schema_fingerprint the value was written with.
+        data (typing.Dict[str, typing.Any]): the decoded value, `model.dict()` made JSON compatible.
+
+    Raises:
+        ValidationError: a validated field does not fit.
+
+    Returns:
+        BaseModel: the model instance.
+    """
+    _values = {}
+    for name, alias, kind, field in _decode_plan(model):
+        if name in data:
+            value = data[name]
+        elif alias in data:
+            value = data[alias]
+        else:
+            # construct fills in the default.
+            continue
+        if value is None or kind == _PASS:
+            pass
+        elif kind == _MODEL:
+            value = trusted_construct(field.type_, value)
+        elif kind == _MODEL_LIST:
+            value = [None if item is None else trusted_construct(field.type_, item) for item in value]
+        elif kind == _MODEL_DICT:
+            value = {key: None if item is None else trusted_construct(field.type_, item) for key, item in value.items()}
+        else:
+            value = _validate(model, field, value)
+        _values[name] = value
+    if model.__config__.extra == Extra.allow:
+        _known = {key for name, alias, _, _ in _decode_plan(model) for key in (name, alias)}
+        _values.update((key, value) for key, value in data.items() if key not in _known)
+    return model.construct(**_values)
@@ -0,0 +1,185 @@
+import asyncio
+import inspect
+import typing
+
+from loguru import logger
+
+# What a buffered write does to its key once flushed.
+SET_VALUE = 0  # SET the value with its arguments
+REPLACE_HASH = 1  # replace the hash with the mapping, then PEXPIRE it when it has a TTL
+UNLINK = 2  # UNLINK the key
+
+BufferKey = typing.Hashable
+
+
+class PendingWrite(typing.NamedTuple):
+    kind: int
+    key_name: str
+    value: typing.Any = None
+    arguments: typing.Optional[dict] = None
+    ttl: typing.Optional[int] = None
+    index_update: typing.Optional[typing.Any] = None
+    hash: bool = False
+
+
+ErrorCallback = typing.Callable[[Exception, typing.Dict[BufferKey, PendingWrite]], typing.Any]
+
+
+class WriteBehindBuffer(object):
+    """Holds writes in memory and hands them to `flush_many` in batches, from a background task.
+
+    A key written again before its write was flushed keeps only the last write. Batches are
+    flushed once `batch_size` keys are pending, or `interval` seconds after the first write of a
+    batch. At most `max_size` keys are held, flushing included: writing another key then waits
+    for a flush to make room, which slows producers down to the speed of Redis.
+
+    A batch `flush_many` fails on is dropped and given to `on_error(error, batch)` (which may
+    return an awaitable, e.g. to write the batch somewhere else or put it back), or logged.
+    """
+
+    def __init__(
+        self,
+        flush_many: typing.Callable[[typing.Dict[BufferKey, PendingWrite]], typing.Awaitable[typing.Any]],
+        max_size: int = 10_000,
+        batch_size: int = 500,
+        interval: float = 0.05,
+        on_error: typing.Optional[ErrorCallback] = None,
+    ) -> None:
+        if batch_size < 1 or max_size < batch_size:
+            raise ValueError("batch_size must be at least 1, and max_size at least batch_size.")
+
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_error = on_error
+
+        self.writes = 0
+        self.overwritten = 0
+        self.flushes = 0
+        self.flushed = 0
+        self.failed = 0
+        self.waits = 0
+
+        self._flush_many = flush_many
+        self._pending: typing.Dict[BufferKey, PendingWrite] = {}
+        self._flushing = 0
+        self._closed = False
+        self._task: typing.Optional[asyncio.Task] = None
+        # Made on first use, before python 3.10 they bind to the loop current when they are made.
+        self._flush_lock: typing.Optional[asyncio.Lock] = None
+        self._has_pending: typing.Optional[asyncio.Event] = None
+        self._full: typing.Optional[asyncio.Event] = None
+        self._room: typing.Optional[asyncio.Condition] = None
+
+    def __len__(self) -> int:
+        """Writes not flushed yet, the batch being flushed included."""
+        return len(self._pending) + self._flushing
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {
+            "writes": self.writes,
+            "overwritten": self.overwritten,
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "waits": self.waits,
+            "pending": len(self),
+        }
+
+    def _start(self) -> None:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+            self._has_pending = asyncio.Event()
+            self._full = asyncio.Event()
+            self._room = asyncio.Condition()
+
+    async def put(self, key: BufferKey, write: PendingWrite) -> None:
+        if self._closed:
+            raise RuntimeError("The write-behind buffer is closed.")
+        self._start()
+        if key not in self._pending and len(self) >= self.max_size:
+            self.waits += 1
+            self._full.set()
+            async with self._room:
+                await self._room.wait_for(lambda: self._closed or key in self._pending or len(self) < self.max_size)
+            if self._closed:
+                raise RuntimeError("The write-behind buffer is closed.")
+
+        self.writes += 1
+        # Moved to the end, so the batch keeps the order of the last writes.
+        if self._pending.pop(key, None) is not None:
+            self.overwritten += 1
+        self._pending[key] = write
+        self._has_pending.set()
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while not self._closed:
+            await self._has_pending.wait()
+            if not self._closed and len(self._pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every write made before the call, returns how many were flushed."""
+        self._start()
+        async with self._flush_lock:
+            _batch, self._pending = self._pending, {}
+            self._has_pending.clear()
+            self._full.clear()
+            if not _batch:
+                return 0
+            self._flushing = len(_batch)
+            _error = None
+            try:
+                await self._flush_many(_batch)
+            except Exception as error:
+                _error = error
+            finally:
+                self._flushing = 0
+                async with self._room:
+                    self._room.notify_all()
+        if _error is not None:
+            # Outside of the lock, the callback may put the batch back.
+            self.failed += len(_batch)
+            await self._report(_error, _batch)
+            return 0
+        self.flushes += 1
+        self.flushed += len(_batch)
+        return len(_batch)
+
+    async def _report(self, error: Exception, batch: typing.Dict[BufferKey, PendingWrite]) -> None:
+        if self.on_error is None:
+            logger.opt(exception=error).error(f"Unable to flush {len(batch)} buffered writes, they are lost")
+            return
+        try:
+            _res = self.on_error(error, batch)
+            if inspect.isawaitable(_res):
+                await _res
+        except Exception:
+            logger.exception("The write-behind error callback failed")
+
+    async def aclose(self) -> None:
+        """Flush what is pending and stop the background task, writing afterwards raises RuntimeError."""
+        if self._closed:
+            return
+        self._closed = True
+        self._start()
+        self._has_pending.set()
+        self._full.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        async with self._room:
+            self._room.notify_all()
@@ -4,6 +4,10 @@ from ridant.asyncio.main import RidantCache
 from pydantic import BaseModel
 import pytest
 from redis.asyncio import Redis
+from ridant.utils.local_cache import LocalCache
+from ridant.utils.metrics import InMemoryMetrics
+import asyncio
+import typing
 
 class SamplePydanticModel(BaseModel):        
     name: str
@@ -58,4 +62,401 @@ async def test_hash_update_cache_item(return_connection_pool_for_async_redis):
     await cache.cache_by_group("testing-group", "sample-uid", 2)
     assert await cache.find_one_by_group("testing-group", "sample-uid") == "2"
     
-    
\ No newline at end of file
+    
+async def test_cache_many_and_find_many(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, bulk_batch_size=2)
+    _models = [(SamplePydanticModel(name=f"test-{i}", age=i), f"uid-{i}") for i in range(5)]
+    assert await cache.cache_many(_models, extra_redis_arguments={"ex": 100}) == True
+    _found = await cache.find_many(SamplePydanticModel, ["uid-3", "missing", "uid-0", "uid-4"])
+    assert _found == [_models[3][0], None, _models[0][0], _models[4][0]]
+    assert 0 < await cache.redis.ttl("sample_pydantic_model:uid-3") <= 100
+
+
+async def test_delete_many(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, bulk_batch_size=2)
+    await cache.cache_many([(SamplePydanticModel(name="test", age=i), f"uid-{i}") for i in range(3)])
+    await cache.cache_many_by_group("testing-group", [("a", "coolValue"), ("b", 2)])
+    assert await cache.find_many_by_group("testing-group", ["b", "c", "a"]) == ["2", None, "coolValue"]
+    assert await cache.delete_many(SamplePydanticModel, ["uid-0", "uid-1", "uid-2", "missing"]) == 3
+    assert await cache.delete_many_by_group("testing-group", ["a", "b"]) == 2
+
+
+async def test_local_cache_invalidation_channel(return_connection_pool_for_async_redis):
+    reader = RidantCache(
+        redis_connection_pool=return_connection_pool_for_async_redis,
+        local_cache=LocalCache(),
+        invalidation_channel="ridant-invalidation",
+    )
+    writer = RidantCache(
+        redis_connection_pool=return_connection_pool_for_async_redis,
+        invalidation_channel="ridant-invalidation",
+        local_cache=LocalCache(),
+    )
+    await writer.cache(SamplePydanticModel(name="test", age=1), "test")
+    await reader.start_invalidation_listener()
+    try:
+        assert (await reader.find_one(SamplePydanticModel, "test")).age == 1
+        assert (await reader.find_one(SamplePydanticModel, "test")).age == 1
+        assert reader.local_cache.hits == 1
+        await writer.cache(SamplePydanticModel(name="test", age=2), "test")
+        for _ in range(100):
+            if len(reader.local_cache) == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert (await reader.find_one(SamplePydanticModel, "test")).age == 2
+    finally:
+        await reader.stop_invalidation_listener()
+
+
+async def test_invalidation_channel_without_local_cache(return_connection_pool_for_async_redis):
+    reader = RidantCache(
+        redis_connection_pool=return_connection_pool_for_async_redis,
+        local_cache=LocalCache(),
+        invalidation_channel="ridant-invalidation",
+    )
+    writer = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, invalidation_channel="ridant-invalidation")
+    await writer.cache(SamplePydanticModel(name="test", age=1), "test")
+    await reader.start_invalidation_listener()
+    try:
+        (await reader.find_one(SamplePydanticModel, "test")).age = 3
+        assert (await reader.find_one(SamplePydanticModel, "test")).age == 1
+        await writer.cache(SamplePydanticModel(name="test", age=2), "test")
+        for _ in range(100):
+            if len(reader.local_cache) == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert (await reader.find_one(SamplePydanticModel, "test")).age == 2
+    finally:
+        await reader.stop_invalidation_listener()
+
+
+async def test_find_streams_all_instances(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis)
+    await cache.cache_many([(SamplePydanticModel(name="test", age=i), f"uid-{i}") for i in range(25)])
+    await cache.cache_by_group("testing-group", "sample-uid", "coolValue")
+    _found = [item.age async for item in cache.find(SamplePydanticModel, count=5, batch_size=4)]
+    assert sorted(_found) == list(range(25))
+    assert [item async for item in cache.find_by_group("testing-group")] == ["coolValue"]
+
+
+async def test_find_hashes(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, redis_database_for_hash=1)
+    for i in range(10):
+        await cache.cache(SamplePydanticModel(name="test", age=i), f"uid-{i}", hash=True)
+    # A string-mode key in the hash database is skipped.
+    await cache.redis_hashed.set("sample_pydantic_model:stray", b"{}")
+    _found = [item.age async for item in cache.find(SamplePydanticModel, count=3, batch_size=4, hash=True)]
+    assert sorted(_found) == list(range(10))
+
+
+class SampleNestedPydanticModel(BaseModel):
+    tags: typing.List[str]
+    child: SamplePydanticModel
+
+
+async def test_hash_cache_full_model(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, redis_database_for_hash=1)
+    _model = SampleNestedPydanticModel(tags=["a"], child=SamplePydanticModel(name="test", age=1))
+    await cache.cache(_model, "test", hash=True)
+    assert await cache.find_one(SampleNestedPydanticModel, "test", hash=True) == _model
+    assert await cache.find_one(SampleNestedPydanticModel, "missing", hash=True) == None
+
+
+async def test_metrics(return_connection_pool_for_async_redis):
+    _metrics = InMemoryMetrics()
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, metrics=_metrics)
+    await cache.cache(SamplePydanticModel(name="test", age=1), "test")
+    await cache.find_one(SamplePydanticModel, "test")
+    await cache.cache_by_group("testing-group", "sample-uid", "coolValue")
+    await cache.find_one_by_group("testing-group", "missing")
+    _snapshot = _metrics.snapshot()
+    assert _snapshot["latency"]["find_one:sample_pydantic_model:deserialize"]["count"] == 1
+    assert _snapshot["latency"]["cache_by_group:testing-group:network"]["count"] == 1
+    assert _snapshot["hits"] == {"find_one:sample_pydantic_model": 1}
+    assert _snapshot["misses"] == {"find_one_by_group:testing-group": 1}
+
+
+async def test_cached_read_through(return_connection_pool_for_async_redis, monkeypatch):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis)
+    _calls = []
+    # The XFetch draw, -log(1 - random()), is 0 until the test forces a refresh.
+    monkeypatch.setattr("ridant.utils.read_through.random.random", lambda: 0.0)
+
+    @cache.cached(SamplePydanticModel, key="{name}", ttl=10)
+    async def load(name: str) -> SamplePydanticModel:
+        _calls.append(name)
+        await asyncio.sleep(0.05)
+        return SamplePydanticModel(name=name, age=len(_calls))
+
+    _results = await asyncio.gather(*[load("test") for _ in range(8)])
+    assert _calls == ["test"]
+    assert _results == [SamplePydanticModel(name="test", age=1)] * 8
+    assert await load(name="test") == SamplePydanticModel(name="test", age=1)
+    assert 0 < await cache.redis.ttl("sample_pydantic_model:test") <= 10
+    assert await cache.redis.keys("__ridant__:lock:*") == []
+
+    @cache.cached(SamplePydanticModel, key="{name}", ttl=10, early_recompute=1.0)
+    def load_sync(name: str) -> dict:
+        _calls.append(name)
+        return {"name": name, "age": len(_calls)}
+
+    assert await load_sync("other") == SamplePydanticModel(name="other", age=2)
+    await cache.redis.set("__ridant__:delta:sample_pydantic_model:other", 60_000)
+    assert await load_sync("other") == SamplePydanticModel(name="other", age=2)
+    monkeypatch.setattr("ridant.utils.read_through.random.random", lambda: 0.5)
+    assert await load_sync("other") == SamplePydanticModel(name="other", age=3)
+
+
+async def test_coalesced_reads(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, coalesce_reads=True)
+    await cache.cache_many([(SamplePydanticModel(name=name, age=1), name) for name in ("a", "b")])
+    await cache.cache_by_group("testing-group", "sample-uid", "coolValue")
+
+    _results = await asyncio.gather(
+        cache.find_one(SamplePydanticModel, "a"),
+        cache.find_one(SamplePydanticModel, "b"),
+        cache.find_one(SamplePydanticModel, "a"),
+        cache.find_one(SamplePydanticModel, "missing"),
+        cache.find_one_by_group("testing-group", "sample-uid"),
+    )
+    assert _results == [
+        SamplePydanticModel(name="a", age=1),
+        SamplePydanticModel(name="b", age=1),
+        SamplePydanticModel(name="a", age=1),
+        None,
+        "coolValue",
+    ]
+    assert cache.coalescing_stats() == {"requests": 5, "batches": 1, "keys_loaded": 4}
+    assert await cache.find_one(SamplePydanticModel, "b") == SamplePydanticModel(name="b", age=1)
+    assert cache.coalescing_stats()["batches"] == 2
+
+
+async def test_redis_cluster(return_async_redis_cluster):
+    cache = RidantCache(redis_cluster=return_async_redis_cluster, hash_tag_groups=True)
+    _models = [SamplePydanticModel(name=str(index), age=index) for index in range(20)]
+    await cache.cache_many([(model, model.name) for model in _models], extra_redis_arguments={"ex": 60})
+    assert await return_async_redis_cluster.get("{sample_pydantic_model}:1") is not None
+    assert await cache.find_many(SamplePydanticModel, [model.name for model in _models]) == _models
+    assert await cache.delete_many(SamplePydanticModel, [model.name for model in _models]) == 20
+
+    _nested = SampleNestedPydanticModel(tags=["a", "b"], child=SamplePydanticModel(name="test", age=1))
+    await cache.cache(_nested, "test", hash=True)
+    assert await cache.find_one(SampleNestedPydanticModel, "test", hash=True) == _nested
+
+    cache = RidantCache(redis_cluster=return_async_redis_cluster)
+    await cache.cache_many([(model, model.name) for model in _models])
+    assert await cache.find_many(SamplePydanticModel, [model.name for model in _models]) == _models
+
+
+async def test_sharded_cache(return_connection_pools_for_async_shards):
+    cache = RidantCache(redis_shards=return_connection_pools_for_async_shards)
+    _models = [SamplePydanticModel(name=str(index), age=index) for index in range(100)]
+    await cache.cache_many([(model, model.name) for model in _models], extra_redis_arguments={"ex": 60})
+    assert all([await shard.dbsize() > 10 for shard in cache.shards.values()])
+    assert await cache.find_many(SamplePydanticModel, [model.name for model in _models]) == _models
+    assert await cache.find_one(SamplePydanticModel, "42") == _models[42]
+    assert sorted([model async for model in cache.find(SamplePydanticModel, batch_size=7)], key=lambda model: model.age) == _models
+    assert await cache.delete_many(SamplePydanticModel, [model.name for model in _models]) == 100
+
+
+async def test_partial_updates(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, redis_database_for_hash=1)
+    _model = SampleNestedPydanticModel(tags=[], child=SamplePydanticModel(name="test", age=1))
+    await cache.cache(_model, "test")
+    assert await cache.update_field(SampleNestedPydanticModel, "test", "child.name", "other") == "other"
+    assert await cache.increment(SampleNestedPydanticModel, "test", "child.age", 2) == 3
+    assert await cache.append(SampleNestedPydanticModel, "test", "tags", "a") == ["a"]
+    assert await cache.merge_fields(SampleNestedPydanticModel, "test", "child", {"age": 10}) == {"name": "other", "age": 10}
+    assert await cache.find_one(SampleNestedPydanticModel, "test") == SampleNestedPydanticModel(
+        tags=["a"], child=SamplePydanticModel(name="other", age=10)
+    )
+    assert await cache.increment(SampleNestedPydanticModel, "missing", "child.age", 1) is None
+
+    await cache.cache(_model, "hashed", hash=True)
+    assert await cache.increment(SampleNestedPydanticModel, "hashed", "child.age", 2, hash=True) == 3
+    assert await cache.append(SampleNestedPydanticModel, "hashed", "tags", "a", "b", hash=True) == ["a", "b"]
+    assert await cache.update_field(SampleNestedPydanticModel, "hashed", "child", {"name": "other", "age": 5}, hash=True) == {
+        "name": "other",
+        "age": "5",
+    }
+    assert await cache.find_one(SampleNestedPydanticModel, "hashed", hash=True) == SampleNestedPydanticModel(
+        tags=["a", "b"], child=SamplePydanticModel(name="other", age=5)
+    )
+
+
+class SampleIndexedPydanticModel(BaseModel):
+    name: str
+    age: int
+    child: SamplePydanticModel
+
+    class Config:
+        cacheable_indexes = ["name", "age", "child.name"]
+
+
+async def test_indexed_find(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, redis_database_for_hash=1)
+    _models = [
+        SampleIndexedPydanticModel(name=f"name-{index % 2}", age=index, child=SamplePydanticModel(name="child", age=index))
+        for index in range(4)
+    ]
+    await cache.cache_many([(model, str(index)) for index, model in enumerate(_models)])
+    assert [model async for model in cache.find(SampleIndexedPydanticModel, name="name-0")] == [_models[0], _models[2]]
+    assert [model async for model in cache.find(SampleIndexedPydanticModel, age=(1, 2), child__name="child")] == _models[1:3]
+
+    await cache.update_field(SampleIndexedPydanticModel, "0", "child", {"name": "other", "age": 0})
+    assert [model.age async for model in cache.find(SampleIndexedPydanticModel, child__name="other")] == [0]
+    assert await cache.delete_many(SampleIndexedPydanticModel, ["1", "2"]) == 2
+    assert [model.age async for model in cache.find(SampleIndexedPydanticModel, age=(None, None))] == [0, 3]
+
+    await cache.cache(_models[1], "hashed", hash=True)
+    await cache.update(SampleIndexedPydanticModel, "hashed", "age", 10)
+    assert [model.age async for model in cache.find(SampleIndexedPydanticModel, hash=True, age=10)] == [10]
+    assert await cache.delete(SampleIndexedPydanticModel, "hashed", hash=True) == True
+    assert [model async for model in cache.find(SampleIndexedPydanticModel, hash=True, age=10)] == []
+
+
+async def test_find_one_fields(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, redis_database_for_hash=1)
+    _model = SampleNestedPydanticModel(tags=["a"], child=SamplePydanticModel(name="test", age=1))
+    await cache.cache(_model, "string")
+    await cache.cache(_model, "hash", hash=True)
+    _expected = {"tags": ["a"], "child.age": 1}
+    assert await cache.find_one(SampleNestedPydanticModel, "string", fields=["tags", "child.age"]) == _expected
+    assert await cache.find_one(SampleNestedPydanticModel, "hash", hash=True, fields=["tags", "child.age"]) == _expected
+    assert await cache.find_one(SampleNestedPydanticModel, "hash", hash=True, fields=["child"]) == {"child": _model.child}
+    assert await cache.find_one(SampleNestedPydanticModel, "missing", fields=["tags"]) is None
+
+
+async def test_trusted_decode(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, trusted_decode=True)
+    _model = SampleNestedPydanticModel(tags=["a"], child=SamplePydanticModel(name="test", age=1))
+    await cache.cache(_model, "trusted")
+    assert (await cache.redis.get("sample_nested_pydantic_model:trusted"))[:1] == b"\x02"
+    _found = await cache.find_one(SampleNestedPydanticModel, "trusted")
+    assert _found == _model and isinstance(_found.child, SamplePydanticModel)
+    assert await cache.find_many(SampleNestedPydanticModel, ["trusted", "missing"]) == [_model, None]
+
+
+async def test_versioned_namespaces(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, versioned_namespaces=True)
+    _model = SamplePydanticModel(name="test", age=1)
+    await cache.cache(_model, "a")
+    assert await cache.redis.exists("sample_pydantic_model:a")
+    assert await cache.invalidate(SamplePydanticModel, reclaim=False) == 1
+    assert await cache.find_one(SamplePydanticModel, "a") is None
+
+    await cache.cache(_model, "b")
+    assert await cache.redis.exists("sample_pydantic_model@1:b")
+    assert [item async for item in cache.find(SamplePydanticModel)] == [_model]
+    assert await cache.reclaim(SamplePydanticModel) == 1
+
+    assert await cache.invalidate_group("sample_pydantic_model") == 2
+    await asyncio.gather(*cache._background_tasks)
+    assert not await cache.redis.exists("sample_pydantic_model@1:b")
+    with pytest.raises(ValueError):
+        await RidantCache(redis_connection_pool=return_connection_pool_for_async_redis).invalidate(SamplePydanticModel)
+
+
+async def test_purge(return_connection_pool_for_async_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis)
+    await cache.cache_many([(SamplePydanticModel(name=str(index), age=index), str(index)) for index in range(20)])
+    await cache.cache_by_group("other", "1", "value")
+
+    _steps = []
+
+    async def _record(progress):
+        _steps.append(progress.removed)
+
+    _progress = await cache.purge(SamplePydanticModel, batch_size=5, max_keys=5, progress=_record)
+    assert not _progress.done and _steps
+    _progress = await cache.purge(SamplePydanticModel, cursor=_progress.cursor)
+    assert _progress.done
+    assert await cache.redis.keys("*") == [b"other:1"]
+    assert (await cache.purge_group("other")).removed == 1
+
+
+async def test_default_ttls(return_connection_pool_for_async_redis):
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_async_redis,
+        redis_database_for_hash=1,
+        ttls={SamplePydanticModel: 10},
+        sliding_expiration=True,
+    )
+    await cache.cache(SamplePydanticModel(name="test", age=1), "test")
+    await cache.cache(SamplePydanticModel(name="hash", age=2), "hash", hash=True)
+    await cache.cache_by_group("other", "1", "value")
+    assert 9_000 < await cache.redis.pttl("sample_pydantic_model:test") <= 10_000
+    assert 9_000 < await cache.redis_hashed.pttl("sample_pydantic_model:hash") <= 10_000
+    assert await cache.redis.pttl("other:1") == -1
+
+    await cache.redis.pexpire("sample_pydantic_model:test", 1_000)
+    await cache.redis_hashed.pexpire("sample_pydantic_model:hash", 1_000)
+    assert await cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=1)
+    assert await cache.find_one(SamplePydanticModel, "hash", hash=True) == SamplePydanticModel(name="hash", age=2)
+    assert 9_000 < await cache.redis.pttl("sample_pydantic_model:test") <= 10_000
+    assert 9_000 < await cache.redis_hashed.pttl("sample_pydantic_model:hash") <= 10_000
+
+
+async def test_shared_connection_pools(return_connection_pool_for_async_redis):
+    from tests.fixtures.redis_connection import REDIS_HOST, REDIS_PORT
+
+    cache = RidantCache(redis_host=REDIS_HOST, redis_port=REDIS_PORT, blocking_pool=True, max_connections=4)
+    other = RidantCache(redis_host=REDIS_HOST, redis_port=REDIS_PORT)
+    assert cache.redis.connection_pool is other.redis.connection_pool
+    await cache.cache(SamplePydanticModel(name="test", age=1), "test")
+    assert await other.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=1)
+    assert cache.pool_stats()["redis"]["created"] == 1
+
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, redis_database_for_hash=1)
+    assert cache.redis_hashed.connection_pool.connection_kwargs["db"] == 1
+
+
+async def test_snapshot(return_connection_pool_for_async_redis, tmp_path):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_async_redis, versioned_namespaces=True)
+    await cache.cache_many([(SamplePydanticModel(name=str(index), age=index), str(index)) for index in range(20)])
+    await cache.invalidate(SamplePydanticModel, reclaim=False)
+    await cache.cache(SamplePydanticModel(name="new", age=1), "new")
+    _stats = await cache.export_snapshot(SamplePydanticModel, tmp_path / "models.snapshot", raw=True)
+    assert _stats.keys == 2
+    await cache.redis.flushall()
+
+    _stats = await cache.import_snapshot(tmp_path / "models.snapshot", workers=2)
+    assert _stats.keys == 2
+    assert await cache.find_one(SamplePydanticModel, "new") == SamplePydanticModel(name="new", age=1)
+    assert await cache.find_one(SamplePydanticModel, "1") is None
+
+
+async def test_write_behind(return_connection_pool_for_async_redis):
+    _failed = []
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_async_redis,
+        redis_database_for_hash=1,
+        write_behind=True,
+        write_behind_batch_size=50,
+        write_behind_interval=0.01,
+        on_write_behind_error=lambda error, writes: _failed.append(writes),
+    )
+    for age in range(3):
+        assert await cache.cache(SamplePydanticModel(name="test", age=age), "test") is True
+    await cache.cache(SamplePydanticModel(name="hash", age=1), "hash", hash=True)
+    await cache.cache_by_group("group", "1", "value")
+    await cache.delete_by_group("group", "1")
+    assert await cache.find_one(SamplePydanticModel, "test") is None
+
+    await asyncio.sleep(0.05)
+    assert await cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=2)
+    assert await cache.find_one(SamplePydanticModel, "hash", hash=True) == SamplePydanticModel(name="hash", age=1)
+    assert await cache.find_one_by_group("group", "1") is None
+    assert cache.write_behind_stats()["overwritten"] == 3
+
+    await cache.delete(SamplePydanticModel, "test")
+    # Bulk writes go after the buffered ones.
+    await cache.cache_many([(SamplePydanticModel(name="test", age=5), "test")])
+    assert await cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=5)
+
+    await cache.cache(SamplePydanticModel(name="last", age=1), "last")
+    await cache.aclose()
+    assert await cache.find_one(SamplePydanticModel, "last") == SamplePydanticModel(name="last", age=1)
+    assert not _failed
+    with pytest.raises(RuntimeError):
+        await cache.cache(SamplePydanticModel(name="closed", age=1), "closed")
@@ -15,3 +15,46 @@ def return_connection_pool_for_sync_redis():
     conn = SyncConnectionPool(host=REDIS_HOST, port=REDIS_PORT, db=0)
     yield conn
 
+
+REDIS_CLUSTER_HOST = os.getenv("REDIS_CLUSTER_HOST", "localhost")
+REDIS_CLUSTER_PORT = int(os.getenv("REDIS_CLUSTER_PORT", 7000))
+
+@pytest.fixture
+def return_sync_redis_cluster():
+    from redis.cluster import RedisCluster
+    try:
+        cluster = RedisCluster(host=REDIS_CLUSTER_HOST, port=REDIS_CLUSTER_PORT)
+    except Exception:
+        pytest.skip("No redis cluster available")
+    cluster.flushall()
+    yield cluster
+    cluster.close()
+
+@pytest.fixture
+async def return_async_redis_cluster():
+    from redis.asyncio.cluster import RedisCluster
+    cluster = RedisCluster(host=REDIS_CLUSTER_HOST, port=REDIS_CLUSTER_PORT)
+    try:
+        await cluster.initialize()
+    except Exception:
+        pytest.skip("No redis cluster available")
+    await cluster.flushall()
+    yield cluster
+    await cluster.close()
+
+# Separate databases stand in for separate servers, the ring only sees distinct connection settings.
+REDIS_SHARD_DATABASES = [int(db) for db in os.getenv("REDIS_SHARD_DATABASES", "2,3,4").split(",")]
+
+@pytest.fixture
+def return_connection_pools_for_sync_shards():
+    pools = [SyncConnectionPool(host=REDIS_HOST, port=REDIS_PORT, db=db) for db in REDIS_SHARD_DATABASES]
+    yield pools
+    for pool in pools:
+        pool.disconnect()
+
+@pytest.fixture
+async def return_connection_pools_for_async_shards():
+    pools = [AsyncConnectionPool(host=REDIS_HOST, port=REDIS_PORT, db=db) for db in REDIS_SHARD_DATABASES]
+    yield pools
+    for pool in pools:
+        await pool.disconnect()
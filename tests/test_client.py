@@ -4,6 +4,12 @@ from ridant.main import RidantCache
 from pydantic import BaseModel
 import pytest
 from redis import Redis
+from ridant.utils.local_cache import LocalCache
+from ridant.utils.metrics import InMemoryMetrics
+import threading
+import datetime
+import time
+import typing
 
 class SamplePydanticModel(BaseModel):        
     name: str
@@ -56,3 +62,850 @@ async def test_hash_update_cache_item(return_connection_pool_for_sync_redis):
     assert cache.find_one_by_group("testing-group", "sample-uid") == "coolValue"
     cache.cache_by_group("testing-group", "sample-uid", 2)
     assert cache.find_one_by_group("testing-group", "sample-uid") == "2"
+
+
+def test_cache_many_and_find_many(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, bulk_batch_size=2)
+    _models = [(SamplePydanticModel(name=f"test-{i}", age=i), f"uid-{i}") for i in range(5)]
+    assert cache.cache_many(_models) == True
+    _found = cache.find_many(SamplePydanticModel, ["uid-3", "missing", "uid-0", "uid-4"])
+    assert _found == [_models[3][0], None, _models[0][0], _models[4][0]]
+
+
+def test_cache_many_with_ttl(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    cache.cache_many(
+        [(SamplePydanticModel(name="test", age=1), "test")], extra_redis_arguments={"ex": 100}
+    )
+    assert 0 < cache.redis.ttl("sample_pydantic_model:test") <= 100
+
+
+def test_delete_many(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, bulk_batch_size=2)
+    cache.cache_many([(SamplePydanticModel(name="test", age=i), f"uid-{i}") for i in range(3)])
+    cache.cache_many_by_group("testing-group", [("a", "coolValue"), ("b", 2)])
+    assert cache.find_many_by_group("testing-group", ["b", "c", "a"]) == ["2", None, "coolValue"]
+    assert cache.delete_many(SamplePydanticModel, ["uid-0", "uid-1", "uid-2", "missing"]) == 3
+    assert cache.delete_many_by_group("testing-group", ["a", "b"]) == 2
+    assert cache.find_many(SamplePydanticModel, ["uid-0"]) == [None]
+
+
+def test_local_cache_serves_and_invalidates(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, local_cache=LocalCache())
+    cache.cache(SamplePydanticModel(name="test", age=1), "test")
+    assert cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=1)
+    cache.redis.delete("sample_pydantic_model:test")
+    assert cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=1)
+    assert cache.local_cache.hits == 1 and cache.local_cache.misses == 1
+
+    cache.cache(SamplePydanticModel(name="test", age=2), "test")
+    assert cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=2)
+    cache.delete(SamplePydanticModel, "test")
+    assert cache.find_one(SamplePydanticModel, "test") == None
+
+    # Callers get their own copy of the cached model.
+    cache.cache(SamplePydanticModel(name="test", age=4), "test")
+    cache.find_one(SamplePydanticModel, "test").age = 5
+    cache.find_one(SamplePydanticModel, "test").age = 6
+    assert cache.find_one(SamplePydanticModel, "test").age == 4
+    cache.find_one(SamplePydanticModel, "test", fields=["age"])["age"] = 7
+    assert cache.find_one(SamplePydanticModel, "test").age == 4
+
+    # Local copies expire with the model's default TTL.
+    cache.set_ttl(SamplePydanticModel, 0.05)
+    cache.cache(SamplePydanticModel(name="test", age=3), "test")
+    assert cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=3)
+    time.sleep(0.1)
+    assert cache.find_one(SamplePydanticModel, "test") == None
+
+
+def test_local_cache_invalidation_channel(return_connection_pool_for_sync_redis):
+    reader = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis,
+        local_cache=LocalCache(),
+        invalidation_channel="ridant-invalidation",
+    )
+    writer = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis,
+        local_cache=LocalCache(),
+        invalidation_channel="ridant-invalidation",
+    )
+    writer.cache(SamplePydanticModel(name="test", age=1), "test")
+    reader.start_invalidation_listener(sleep_time=0.01)
+    try:
+        assert reader.find_one(SamplePydanticModel, "test").age == 1
+        writer.cache(SamplePydanticModel(name="test", age=2), "test")
+        for _ in range(100):
+            if len(reader.local_cache) == 0:
+                break
+            time.sleep(0.01)
+        assert reader.find_one(SamplePydanticModel, "test").age == 2
+    finally:
+        reader.stop_invalidation_listener()
+
+
+def test_invalidation_channel_without_local_cache(return_connection_pool_for_sync_redis):
+    reader = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis,
+        local_cache=LocalCache(),
+        invalidation_channel="ridant-invalidation",
+    )
+    # Writes from a client without a local cache still reach the readers holding one.
+    writer = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, invalidation_channel="ridant-invalidation")
+    writer.cache(SamplePydanticModel(name="test", age=1), "test")
+    reader.start_invalidation_listener(sleep_time=0.01)
+    try:
+        assert reader.find_one(SamplePydanticModel, "test").age == 1
+        writer.cache(SamplePydanticModel(name="test", age=2), "test")
+        for _ in range(100):
+            if len(reader.local_cache) == 0:
+                break
+            time.sleep(0.01)
+        assert reader.find_one(SamplePydanticModel, "test").age == 2
+    finally:
+        reader.stop_invalidation_listener()
+
+
+def test_find_streams_all_instances(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    _models = [(SamplePydanticModel(name="test", age=i), f"uid-{i}") for i in range(25)]
+    cache.cache_many(_models)
+    cache.cache_by_group("testing-group", "sample-uid", "coolValue")
+    _found = cache.find(SamplePydanticModel, count=5, batch_size=4)
+    assert not isinstance(_found, list)
+    assert sorted(item.age for item in _found) == list(range(25))
+    assert list(cache.find_by_group("testing-group")) == ["coolValue"]
+
+
+class SampleMsgpackModel(BaseModel):
+    class Config:
+        cacheable_serializer = "msgpack"
+    name: str
+    age: int
+
+
+def test_mixed_serializers(return_connection_pool_for_sync_redis):
+    pytest.importorskip("msgpack")
+    pytest.importorskip("orjson")
+    json_cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    orjson_cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, serializer="orjson")
+    msgpack_cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, serializer="msgpack")
+    json_cache.cache(SamplePydanticModel(name="test", age=1), "json")
+    msgpack_cache.cache(SamplePydanticModel(name="test", age=2), "msgpack")
+    orjson_cache.cache(SamplePydanticModel(name="test", age=3), "orjson")
+    assert [item.age for item in json_cache.find_many(SamplePydanticModel, ["json", "msgpack", "orjson"])] == [1, 2, 3]
+    assert [item.age for item in msgpack_cache.find_many(SamplePydanticModel, ["json", "msgpack", "orjson"])] == [1, 2, 3]
+
+    json_cache.cache(SampleMsgpackModel(name="test", age=1), "test")
+    assert json_cache.redis.get("sample_msgpack_model:test")[:2] == b"\x00m"
+    assert json_cache.find_one(SampleMsgpackModel, "test") == SampleMsgpackModel(name="test", age=1)
+
+
+def test_compression(return_connection_pool_for_sync_redis):
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis, compression="zlib", compression_threshold=64
+    )
+    plain_cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    _large = SamplePydanticModel(name="test" * 100, age=1)
+    cache.cache(_large, "large")
+    cache.cache(SamplePydanticModel(name="test", age=1), "small")
+    assert cache.redis.get("sample_pydantic_model:large")[:2] == b"\x01z"
+    assert cache.redis.get("sample_pydantic_model:small")[:1] == b"{"
+    assert cache.find_many(SamplePydanticModel, ["large", "small"]) == [_large, SamplePydanticModel(name="test", age=1)]
+    assert plain_cache.find_one(SamplePydanticModel, "large") == _large
+    assert cache.compression_stats()["sample_pydantic_model"]["compressed_values"] == 1
+
+
+class SampleCartMetadata(BaseModel):
+    cart_id: str
+    restaurant_id: typing.Optional[str] = None
+    is_open: bool
+
+
+class SampleCart(BaseModel):
+    items: typing.List[str]
+    metadata: SampleCartMetadata
+    extras: typing.Dict[str, int] = {}
+
+
+def test_hash_cache_full_model(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    _cart = SampleCart(items=["a", "b"], metadata=SampleCartMetadata(cart_id="cart", is_open=True))
+    cache.cache(_cart, "cart", hash=True)
+    assert cache.redis_hashed.hgetall("sample_cart:cart") == {
+        b"items": b'["a", "b"]',
+        b"metadata:cart_id": b"cart",
+        b"metadata:is_open": b"true",
+        b"metadata:restaurant_id": b"\x00",
+        b"extras": b"{}",
+    }
+    assert cache.find_one(SampleCart, "cart", hash=True) == _cart
+    assert cache.find_one(SampleCart, "missing", hash=True) == None
+
+    _cart.metadata.restaurant_id = "restaurant"
+    _cart.extras = {"a": 1}
+    cache.cache(_cart, "cart", hash=True)
+    assert cache.find_one(SampleCart, "cart", hash=True) == _cart
+
+
+class SampleOptionalModel(BaseModel):
+    opt: typing.Optional[str] = "d"
+    count: typing.Optional[int] = 1
+    extra: typing.Dict[str, str] = {}
+
+
+def test_hash_cache_none_and_colon_keys(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    _model = SampleOptionalModel(opt=None, count=None, extra={"x:y": "1", "a": "null"})
+    cache.cache(_model, "test", hash=True)
+    assert cache.find_one(SampleOptionalModel, "test", hash=True) == _model
+    assert cache.find_one(SampleOptionalModel, "test", hash=True, fields=["opt", "extra"]) == {
+        "opt": None,
+        "extra": {"x:y": "1", "a": "null"},
+    }
+
+    assert cache.update_field(SampleOptionalModel, "test", "opt", "v", hash=True) == "v"
+    assert cache.update_field(SampleOptionalModel, "test", "opt", None, hash=True) is None
+    assert cache.increment(SampleOptionalModel, "test", "count", 2, hash=True) == 2
+    assert cache.find_one(SampleOptionalModel, "test", hash=True) == SampleOptionalModel(
+        opt=None, count=2, extra={"x:y": "1", "a": "null"}
+    )
+
+
+class SampleNoteModel(BaseModel):
+    note: str
+    extra: typing.Dict[str, str] = {}
+
+
+def test_hash_cache_strings_like_json(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    _model = SampleNoteModel(note='["x"]', extra={"k": '{"a": 1}', "none": "\x00", "list": "[1]"})
+    cache.cache(_model, "test", hash=True)
+    assert cache.find_one(SampleNoteModel, "test", hash=True) == _model
+    assert cache.find_one(SampleNoteModel, "test", hash=True, fields=["note", "extra.k"]) == {
+        "note": '["x"]',
+        "extra.k": '{"a": 1}',
+    }
+    assert cache.find_one(SampleNoteModel, "test", hash=True, fields=["extra"]) == {"extra": _model.extra}
+    assert cache.update_field(SampleNoteModel, "test", "extra.k", "{}", hash=True) == "{}"
+    cache.update(SampleNoteModel, "test", "note", "[y]")
+    assert cache.find_one(SampleNoteModel, "test", hash=True) == SampleNoteModel(
+        note="[y]", extra={"k": "{}", "none": "\x00", "list": "[1]"}
+    )
+
+    # A str field holding the NUL byte stored for None.
+    cache.cache(SampleNoteModel(note="\x00"), "nul", hash=True)
+    assert cache.find_one(SampleNoteModel, "nul", hash=True) == SampleNoteModel(note="\x00")
+    assert cache.find_one(SampleNoteModel, "nul", hash=True, fields=["note"]) == {"note": "\x00"}
+
+
+def test_hash_cache_wide_model(return_connection_pool_for_sync_redis):
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1, hash_field_batch_size=1
+    )
+    _cart = SampleCart(items=["a"], metadata=SampleCartMetadata(cart_id="cart", is_open=False), extras={"a": 1, "b": 2})
+    cache.cache(_cart, "cart", hash=True)
+    assert cache.find_one(SampleCart, "cart", hash=True) == _cart
+
+
+def test_metrics(return_connection_pool_for_sync_redis):
+    _metrics = InMemoryMetrics()
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, metrics=_metrics)
+    cache.cache(SamplePydanticModel(name="test", age=1), "test")
+    cache.find_one(SamplePydanticModel, "test")
+    cache.find_one(SamplePydanticModel, "missing")
+    cache.find_many(SamplePydanticModel, ["test", "missing"])
+    cache.delete(SamplePydanticModel, "test")
+    _snapshot = _metrics.snapshot()
+    assert set(_snapshot["latency"]) == {
+        "cache:sample_pydantic_model:serialize",
+        "cache:sample_pydantic_model:network",
+        "find_one:sample_pydantic_model:network",
+        "find_one:sample_pydantic_model:deserialize",
+        "find_many:sample_pydantic_model:network",
+        "find_many:sample_pydantic_model:deserialize",
+        "delete:sample_pydantic_model:network",
+    }
+    assert _snapshot["hits"] == {"find_one:sample_pydantic_model": 1, "find_many:sample_pydantic_model": 1}
+    assert _snapshot["misses"] == {"find_one:sample_pydantic_model": 1, "find_many:sample_pydantic_model": 1}
+    assert _snapshot["pipeline_length"]["find_many:sample_pydantic_model"]["max"] == 2
+    assert _snapshot["payload_bytes"]["cache:sample_pydantic_model"]["max"] == len(b'{"name": "test", "age": 1}')
+
+
+def test_cached_read_through(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    _calls = []
+
+    @cache.cached(SamplePydanticModel, key="{name}", ttl=10)
+    def load(name: str) -> SamplePydanticModel:
+        _calls.append(name)
+        time.sleep(0.05)
+        return SamplePydanticModel(name=name, age=len(_calls))
+
+    _results = []
+    _threads = [threading.Thread(target=lambda: _results.append(load("test"))) for _ in range(8)]
+    for thread in _threads:
+        thread.start()
+    for thread in _threads:
+        thread.join()
+
+    assert _calls == ["test"]
+    assert _results == [SamplePydanticModel(name="test", age=1)] * 8
+    assert load(name="test") == SamplePydanticModel(name="test", age=1)
+    assert 0 < cache.redis.ttl("sample_pydantic_model:test") <= 10
+    assert cache.redis.keys("__ridant__:lock:*") == []
+
+
+def test_cached_waits_for_lock_held_elsewhere(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    _calls = []
+
+    @cache.cached(SamplePydanticModel, key=lambda name: name, lock_wait=2)
+    def load(name: str) -> SamplePydanticModel:
+        _calls.append(name)
+        return SamplePydanticModel(name=name, age=1)
+
+    # Another process is loading the key and fills it shortly.
+    cache.redis.set("__ridant__:lock:sample_pydantic_model:test", "elsewhere", px=5000)
+    _filler = threading.Timer(0.1, lambda: cache.cache(SamplePydanticModel(name="test", age=2), "test"))
+    _filler.start()
+    assert load("test") == SamplePydanticModel(name="test", age=2)
+    _filler.join()
+    assert _calls == []
+
+
+def test_cached_early_recompute(return_connection_pool_for_sync_redis, monkeypatch):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    _calls = []
+    # The XFetch draw, -log(1 - random()), is 0 until the test forces a refresh.
+    monkeypatch.setattr("ridant.utils.read_through.random.random", lambda: 0.0)
+
+    @cache.cached(SamplePydanticModel, key="{name}", ttl=10, early_recompute=1.0)
+    def load(name: str) -> SamplePydanticModel:
+        _calls.append(name)
+        return SamplePydanticModel(name=name, age=len(_calls))
+
+    assert load("test") == SamplePydanticModel(name="test", age=1)
+    assert load("test") == SamplePydanticModel(name="test", age=1)
+    assert len(_calls) == 1
+
+    cache.redis.set("__ridant__:delta:sample_pydantic_model:test", 60_000)
+    assert load("test") == SamplePydanticModel(name="test", age=1)
+    monkeypatch.setattr("ridant.utils.read_through.random.random", lambda: 0.5)
+    assert load("test") == SamplePydanticModel(name="test", age=2)
+    assert cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=2)
+
+
+def test_redis_cluster(return_sync_redis_cluster):
+    from redis.cluster import key_slot
+
+    cache = RidantCache(redis_cluster=return_sync_redis_cluster)
+    _models = [SamplePydanticModel(name=str(index), age=index) for index in range(50)]
+    cache.cache_many([(model, model.name) for model in _models])
+    assert len({key_slot(f"sample_pydantic_model:{model.name}".encode()) for model in _models}) > 1
+    assert cache.find_many(SamplePydanticModel, [model.name for model in _models]) == _models
+    assert sorted(cache.find(SamplePydanticModel), key=lambda model: model.age) == _models
+    cache.cache_many([(model, model.name) for model in _models], extra_redis_arguments={"ex": 60})
+    assert cache.delete_many(SamplePydanticModel, [model.name for model in _models]) == 50
+
+    _cart = SampleCart(items=["a"], metadata=SampleCartMetadata(cart_id="cart", is_open=True), extras={"a": 1})
+    cache.cache(_cart, "cart", hash=True)
+    assert cache.find_one(SampleCart, "cart", hash=True) == _cart
+
+    _calls = []
+
+    @cache.cached(SamplePydanticModel, key="{name}", ttl=10)
+    def load(name: str) -> SamplePydanticModel:
+        _calls.append(name)
+        return SamplePydanticModel(name=name, age=1)
+
+    assert load("test") == load("test") == SamplePydanticModel(name="test", age=1)
+    assert _calls == ["test"]
+
+
+def test_redis_cluster_hash_tags(return_sync_redis_cluster):
+    cache = RidantCache(redis_cluster=return_sync_redis_cluster, hash_tag_groups=True)
+    _models = [SamplePydanticModel(name=str(index), age=index) for index in range(10)]
+    cache.cache_many([(model, model.name) for model in _models])
+    assert return_sync_redis_cluster.get("{sample_pydantic_model}:1") is not None
+    assert cache.find_many(SamplePydanticModel, ["1", "2"]) == _models[1:3]
+    assert len(list(cache.find(SamplePydanticModel))) == 10
+
+    cache.cache_by_group("testing-group", "sample-uid", "coolValue")
+    assert return_sync_redis_cluster.get("{testing-group}:sample-uid") == b"coolValue"
+    assert list(cache.find_by_group("testing-group")) == ["coolValue"]
+
+
+def test_sharded_cache(return_connection_pools_for_sync_shards):
+    cache = RidantCache(redis_shards=return_connection_pools_for_sync_shards)
+    _models = [SamplePydanticModel(name=str(index), age=index) for index in range(100)]
+    cache.cache_many([(model, model.name) for model in _models], batch_size=30)
+    assert all(shard.dbsize() > 10 for shard in cache.shards.values())
+    assert sum(shard.dbsize() for shard in cache.shards.values()) == 100
+    assert cache.find_many(SamplePydanticModel, [model.name for model in _models]) == _models
+    assert cache.find_one(SamplePydanticModel, "42") == _models[42]
+    assert sorted(cache.find(SamplePydanticModel, batch_size=7), key=lambda model: model.age) == _models
+
+    _cart = SampleCart(items=["a"], metadata=SampleCartMetadata(cart_id="cart", is_open=True), extras={"a": 1})
+    cache.cache(_cart, "cart", hash=True)
+    assert cache.find_one(SampleCart, "cart", hash=True) == _cart
+
+    assert cache.delete_many(SamplePydanticModel, [model.name for model in _models]) == 100
+    assert cache.delete(SampleCart, "cart") == True
+    assert sum(shard.dbsize() for shard in cache.shards.values()) == 0
+
+
+class SampleCounter(BaseModel):
+    items: typing.List[str]
+    empty: typing.List[int] = []
+    metadata: SampleCartMetadata
+    extras: typing.Dict[str, typing.Any] = {}
+    total: int = 12345678901234567
+    price: float = 1.5
+
+
+def test_partial_updates(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    cache.cache(
+        SampleCounter(items=["a"], metadata=SampleCartMetadata(cart_id="cart", is_open=True), extras={"k": {"n": 1}}),
+        "counter",
+        extra_redis_arguments={"ex": 100},
+    )
+    assert cache.update_field(SampleCounter, "counter", "metadata.cart_id", "other") == "other"
+    assert cache.increment(SampleCounter, "counter", "total", 3) == 12345678901234570
+    assert cache.increment(SampleCounter, "counter", "price", 0.25) == 1.75
+    assert cache.append(SampleCounter, "counter", "items", "b", "c") == ["a", "b", "c"]
+    assert cache.append(SampleCounter, "counter", "empty", 1) == [1]
+    assert cache.merge_fields(SampleCounter, "counter", "extras", {"k": {"m": 2}, "z": []}) == {"k": {"m": 2}, "z": []}
+    assert cache.update_field(SampleCounter, "counter", ["items", 1], "B") == "B"
+
+    assert cache.find_one(SampleCounter, "counter") == SampleCounter(
+        items=["a", "B", "c"],
+        empty=[1],
+        metadata=SampleCartMetadata(cart_id="other", is_open=True),
+        extras={"k": {"m": 2}, "z": []},
+        total=12345678901234570,
+        price=1.75,
+    )
+    assert 0 < cache.redis.ttl("sample_counter:counter") <= 100
+    assert cache.update_field(SampleCounter, "missing", "items", []) is None
+    with pytest.raises(ValueError):
+        cache.update_field(SampleCounter, "counter", "missing.field", 1)
+
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, serializer="msgpack")
+    cache.cache(SamplePydanticModel(name="test", age=1), "msgpack")
+    with pytest.raises(ValueError):
+        cache.increment(SamplePydanticModel, "msgpack", "age", 1)
+
+
+def test_hash_partial_updates(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    cache.cache(SampleCounter(items=["a"], metadata=SampleCartMetadata(cart_id="cart", is_open=True), extras={"k": {"n": "1"}}), "counter", hash=True)
+    # Hash fields come back as stored, like find_one(..., attribute).
+    assert cache.update_field(SampleCounter, "counter", "metadata", {"cart_id": "other", "is_open": False}, hash=True) == {
+        "cart_id": "other",
+        "is_open": "false",
+    }
+    assert cache.increment(SampleCounter, "counter", "total", 3, hash=True) == 12345678901234570
+    assert cache.increment(SampleCounter, "counter", "price", 0.5, hash=True) == 2.0
+    assert cache.append(SampleCounter, "counter", "empty", 7, hash=True) == [7]
+    assert cache.merge_fields(SampleCounter, "counter", "extras", {"z": [1]}, hash=True) == {"k": {"n": "1"}, "z": [1]}
+    assert cache.update(SampleCounter, "counter", "items", ["x", "y"]) == True
+
+    assert cache.find_one(SampleCounter, "counter", hash=True) == SampleCounter(
+        items=["x", "y"],
+        empty=[7],
+        metadata=SampleCartMetadata(cart_id="other", is_open=False),
+        extras={"k": {"n": "1"}, "z": [1]},
+        total=12345678901234570,
+        price=2.0,
+    )
+    assert cache.increment(SampleCounter, "missing", "total", 1, hash=True) is None
+
+    # Lists, and dicts with ":" in their keys, are stored as one JSON field, nothing is written inside them.
+    cache.merge_fields(SampleCounter, "counter", "extras", {"a:b": {"c": 1}}, hash=True)
+    with pytest.raises(ValueError):
+        cache.update_field(SampleCounter, "counter", "items.0", 9, hash=True)
+    with pytest.raises(ValueError):
+        cache.increment(SampleCounter, "counter", "empty.0", 1, hash=True)
+    with pytest.raises(ValueError):
+        cache.update_field(SampleCounter, "counter", ["extras", "a:b", "c"], 2, hash=True)
+    assert cache.find_one(SampleCounter, "counter", hash=True).items == ["x", "y"]
+    assert cache.find_one(SampleCounter, "counter", hash=True).extras["a:b"] == {"c": 1}
+
+
+class SampleOrder(BaseModel):
+    restaurant_id: str
+    total: float
+    metadata: SampleCartMetadata
+
+    class Config:
+        cacheable_indexes = ["restaurant_id", "total", "metadata.is_open"]
+
+
+def _sample_orders() -> typing.List[SampleOrder]:
+    return [
+        SampleOrder(
+            restaurant_id=f"r{index % 2}",
+            total=index * 10,
+            metadata=SampleCartMetadata(cart_id=str(index), is_open=index < 3),
+        )
+        for index in range(5)
+    ]
+
+
+def test_indexed_find(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis)
+    _orders = _sample_orders()
+    cache.cache(_orders[0], "0", extra_redis_arguments={"ex": 100})
+    cache.cache_many([(order, str(index)) for index, order in enumerate(_orders)][1:])
+
+    assert list(cache.find(SampleOrder, restaurant_id="r0")) == [_orders[0], _orders[2], _orders[4]]
+    assert list(cache.find(SampleOrder, total=(15, 35))) == [_orders[2], _orders[3]]
+    assert list(cache.find(SampleOrder, total=(None, 10), metadata__is_open=True)) == [_orders[0], _orders[1]]
+    assert list(cache.find(SampleOrder, restaurant_id="r1", total=30)) == [_orders[3]]
+    assert list(cache.find(SampleOrder, restaurant_id="missing")) == []
+    with pytest.raises(ValueError):
+        list(cache.find(SampleOrder, metadata__cart_id="1"))
+
+    # Re-caching moves the uid to its new index entries.
+    _moved = SampleOrder(restaurant_id="r1", total=5, metadata=SampleCartMetadata(cart_id="0", is_open=False))
+    cache.cache(_moved, "0")
+    assert list(cache.find(SampleOrder, restaurant_id="r0")) == [_orders[2], _orders[4]]
+    assert list(cache.find(SampleOrder, total=(None, 10))) == [_moved, _orders[1]]
+
+    assert cache.delete(SampleOrder, "1") == True
+    assert cache.delete_many(SampleOrder, ["2"]) == 1
+    assert list(cache.find(SampleOrder, total=(None, 25))) == [_moved]
+    assert not cache.redis.exists("__ridant__:index:sample_order:entries:1")
+
+    assert cache.increment(SampleOrder, "0", "total", 100) == 105
+    assert list(cache.find(SampleOrder, total=(100, None))) == [
+        SampleOrder(restaurant_id="r1", total=105, metadata=_moved.metadata)
+    ]
+
+    # Values gone without going through the cache (expired, deleted elsewhere) are pruned on lookup.
+    cache.redis.delete("sample_order:3")
+    assert list(cache.find(SampleOrder, restaurant_id="r1")) == [
+        SampleOrder(restaurant_id="r1", total=105, metadata=_moved.metadata)
+    ]
+    assert cache.redis.smembers("__ridant__:index:sample_order:set:restaurant_id:r1") == {b"0"}
+    assert list(cache.find(SampleOrder)) != []
+
+
+def test_indexed_find_hash(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    _orders = _sample_orders()
+    for index, order in enumerate(_orders):
+        cache.cache(order, str(index), hash=True)
+
+    assert list(cache.find(SampleOrder, hash=True, restaurant_id="r1")) == [_orders[1], _orders[3]]
+    cache.update(SampleOrder, "1", "restaurant_id", "r0")
+    assert list(cache.find(SampleOrder, hash=True, restaurant_id="r1")) == [_orders[3]]
+    cache.update_field(SampleOrder, "3", "metadata", {"cart_id": "3", "is_open": True}, hash=True)
+    assert [order.metadata.cart_id for order in cache.find(SampleOrder, hash=True, metadata__is_open=True)] == [
+        "0",
+        "1",
+        "2",
+        "3",
+    ]
+    assert cache.delete(SampleOrder, "3", hash=True) == True
+    assert list(cache.find(SampleOrder, hash=True, restaurant_id="r1")) == []
+    assert not cache.redis_hashed.exists("__ridant__:index:hash:sample_order:entries:3")
+
+
+def test_indexed_find_sharded(return_connection_pools_for_sync_shards):
+    cache = RidantCache(redis_shards=return_connection_pools_for_sync_shards)
+    _orders = [
+        SampleOrder(restaurant_id=f"r{index % 3}", total=index, metadata=SampleCartMetadata(cart_id=str(index), is_open=True))
+        for index in range(60)
+    ]
+    cache.cache_many([(order, str(index)) for index, order in enumerate(_orders)])
+    assert sorted(order.total for order in cache.find(SampleOrder, restaurant_id="r1")) == list(range(1, 60, 3))
+    assert cache.delete_many(SampleOrder, [str(index) for index in range(30)]) == 30
+    assert sorted(order.total for order in cache.find(SampleOrder, total=(None, 40))) == list(range(30, 41))
+
+
+def test_indexed_find_cluster(return_sync_redis_cluster):
+    cache = RidantCache(redis_cluster=return_sync_redis_cluster)
+    with pytest.raises(ValueError):
+        cache.cache(_sample_orders()[0], "0")
+
+    cache = RidantCache(redis_cluster=return_sync_redis_cluster, hash_tag_groups=True)
+    _orders = _sample_orders()
+    cache.cache_many([(order, str(index)) for index, order in enumerate(_orders)])
+    cache.cache(_orders[0], "hashed", hash=True)
+    assert list(cache.find(SampleOrder, restaurant_id="r1")) == [_orders[1], _orders[3]]
+    assert list(cache.find(SampleOrder, hash=True, total=0)) == [_orders[0]]
+    assert cache.delete(SampleOrder, "1") == True
+    assert list(cache.find(SampleOrder, restaurant_id="r1")) == [_orders[3]]
+
+
+def test_find_one_fields(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    _cart = SampleCart(items=["a", "b"], metadata=SampleCartMetadata(cart_id="cart", is_open=False), extras={"a": 1})
+    cache.cache(_cart, "string")
+    cache.cache(_cart, "hash", hash=True)
+
+    _fields = ["items", "metadata:is_open", "metadata.cart_id", "extras.a", "missing"]
+    _expected = {"items": ["a", "b"], "metadata:is_open": False, "metadata.cart_id": "cart", "extras.a": 1, "missing": None}
+    assert cache.find_one(SampleCart, "string", fields=_fields) == _expected
+    assert cache.find_one(SampleCart, "hash", hash=True, fields=_fields) == _expected
+    assert cache.find_one(SampleCart, "string", fields=["metadata", "items.1"]) == {"metadata": _cart.metadata, "items.1": "b"}
+    assert cache.find_one(SampleCart, "hash", hash=True, fields=["metadata", "items.1"]) == {
+        "metadata": _cart.metadata,
+        "items.1": "b",
+    }
+    assert cache.find_one(SampleCart, "hash", hash=True, fields=["items.0"]) == {"items.0": "a"}
+    assert cache.find_one(SampleCart, "missing", fields=_fields) is None
+    assert cache.find_one(SampleCart, "missing", hash=True, fields=_fields) is None
+
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, serializer="msgpack")
+    cache.cache(_cart, "msgpack")
+    assert cache.find_one(SampleCart, "msgpack", fields=_fields) == _expected
+
+
+class SampleTrustedOrder(BaseModel):
+    cart: SampleCart
+    previous: typing.List[SampleCart] = []
+    created_at: datetime.datetime
+    total: float
+
+
+def test_trusted_decode(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, trusted_decode=True)
+    _cart = SampleCart(items=["a"], metadata=SampleCartMetadata(cart_id="cart", is_open=True), extras={"a": 1})
+    _order = SampleTrustedOrder(cart=_cart, previous=[_cart], created_at=datetime.datetime(2024, 1, 2, 3, 4, 5), total=3)
+    cache.cache(_order, "order")
+    assert Redis(connection_pool=return_connection_pool_for_sync_redis).get("sample_trusted_order:order")[:1] == b"\x02"
+
+    _found = cache.find_one(SampleTrustedOrder, "order")
+    assert _found == _order
+    assert isinstance(_found.previous[0].metadata, SampleCartMetadata)
+    assert isinstance(_found.created_at, datetime.datetime) and isinstance(_found.total, float)
+    # Clients without trusted decoding read fingerprinted values with full validation.
+    assert RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis).find_one(SampleTrustedOrder, "order") == _order
+    assert cache.find_one(SampleTrustedOrder, "order", fields=["cart.items", "total"]) == {"cart.items": ["a"], "total": 3.0}
+
+    # Partial updates drop the fingerprint, the next read validates the value.
+    assert cache.update_field(SampleTrustedOrder, "order", "total", 4) == 4
+    assert Redis(connection_pool=return_connection_pool_for_sync_redis).get("sample_trusted_order:order")[:1] == b"{"
+    assert cache.find_one(SampleTrustedOrder, "order").total == 4.0
+
+
+def test_trusted_decode_schema_mismatch(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, trusted_decode=True)
+    _cart = SampleCart(items=[], metadata=SampleCartMetadata(cart_id="cart", is_open=True))
+    cache.cache(SampleTrustedOrder(cart=_cart, created_at=datetime.datetime(2024, 1, 1), total=1), "order")
+
+    # The same model (and group) after a schema change.
+    class ChangedOrder(BaseModel):
+        created_at: datetime.datetime
+        total: int
+
+        class Config:
+            cacheable_group_name = "sample_trusted_order"
+
+    assert cache.find_one(ChangedOrder, "order") == ChangedOrder(created_at=datetime.datetime(2024, 1, 1), total=1)
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, trusted_decode=True, schema_mismatch="miss")
+    assert cache.find_one(ChangedOrder, "order") is None
+    with pytest.raises(ValueError):
+        RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, schema_mismatch="ignore")
+
+
+def test_versioned_namespaces(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, versioned_namespaces=True)
+    _redis = Redis(connection_pool=return_connection_pool_for_sync_redis)
+    _first, _second = SamplePydanticModel(name="a", age=1), SamplePydanticModel(name="b", age=2)
+    cache.cache(_first, "a")
+    cache.cache_many([(order, order.metadata.cart_id) for order in _sample_orders()])
+    assert _redis.exists("sample_pydantic_model:a")
+
+    # Another process keeps the generation it knows for generation_ttl seconds.
+    _other = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, versioned_namespaces=True, generation_ttl=60)
+    assert _other.find_one(SamplePydanticModel, "a") == _first
+
+    assert cache.invalidate(SamplePydanticModel, reclaim=False) == 1
+    assert cache.invalidate(SampleOrder, reclaim=False) == 1
+    assert cache.find_one(SamplePydanticModel, "a") is None
+    assert list(cache.find(SampleOrder, restaurant_id="r0")) == []
+    assert _other.find_one(SamplePydanticModel, "a") == _first
+
+    cache.cache(_second, "b")
+    assert list(cache.find(SamplePydanticModel)) == [_second]
+    cache.cache_by_group("sample_pydantic_model", "c", "c")
+    assert _redis.exists("sample_pydantic_model@1:b", "sample_pydantic_model@1:c") == 2
+    assert cache.find_one_by_group("sample_pydantic_model", "c") == "c"
+
+    assert cache.reclaim(SamplePydanticModel) == 1
+    assert cache.reclaim(SampleOrder) > 5
+    assert not _redis.exists("sample_pydantic_model:a")
+    assert _redis.keys("__ridant__:index:*") == []
+
+    # Reclaimed in the background by default.
+    assert cache.invalidate_group("sample_pydantic_model") == 2
+    for _ in range(100):
+        if not _redis.exists("sample_pydantic_model@1:b"):
+            break
+        time.sleep(0.01)
+    assert not _redis.exists("sample_pydantic_model@1:b", "sample_pydantic_model@1:c")
+    assert cache.find_one(SamplePydanticModel, "b") is None
+
+    with pytest.raises(ValueError):
+        RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis).invalidate(SamplePydanticModel)
+
+
+def test_purge(return_connection_pool_for_sync_redis):
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1, local_cache=LocalCache()
+    )
+    _redis = Redis(connection_pool=return_connection_pool_for_sync_redis)
+    cache.cache_many([(SamplePydanticModel(name=str(index), age=index), str(index)) for index in range(50)])
+    cache.cache(SamplePydanticModel(name="hash", age=1), "hash", hash=True)
+    cache.cache_by_group("other", "1", "value")
+    assert cache.find_one(SamplePydanticModel, "1") is not None
+
+    _steps = []
+    _progress = cache.purge_group("sample_pydantic_model", pattern="1*", batch_size=10, progress=_steps.append)
+    assert _progress.done and _progress.cursor is None
+    assert _progress.removed == 11 and _steps[-1] is _progress
+    assert cache.find_one(SamplePydanticModel, "1") is None
+    assert cache.find_one(SamplePydanticModel, "2") is not None
+
+    _progress = cache.purge(SamplePydanticModel, batch_size=5, max_keys=10)
+    assert not _progress.done and _progress.removed >= 10
+    _started = time.monotonic()
+    _progress = cache.purge(SamplePydanticModel, cursor=_progress.cursor, max_ops_per_second=1000)
+    assert _progress.done and time.monotonic() - _started >= _progress.removed / 1000
+    assert _redis.keys("sample_pydantic_model:*") == []
+    assert cache.find_one_by_group("other", "1") == "value"
+    with pytest.raises(ValueError):
+        cache.purge_group("other", cursor=cache.purge(SamplePydanticModel, max_keys=0).cursor)
+
+    cache.cache_many([(order, order.metadata.cart_id) for order in _sample_orders()])
+    assert cache.purge(SampleOrder).removed > 5
+    assert _redis.keys("*") == [b"other:1"]
+
+
+def test_default_ttls(return_connection_pool_for_sync_redis):
+    class ExpiringModel(BaseModel):
+        name: str
+
+        class Config:
+            cacheable_ttl = 100
+
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis,
+        redis_database_for_hash=1,
+        ttls={"short-lived": datetime.timedelta(seconds=10)},
+    )
+    _redis = Redis(connection_pool=return_connection_pool_for_sync_redis)
+    _hashed = cache.redis_hashed
+    cache.cache(ExpiringModel(name="a"), "a")
+    cache.cache(ExpiringModel(name="b"), "b", hash=True)
+    cache.cache(ExpiringModel(name="c"), "c", extra_redis_arguments={"ex": 5})
+    cache.cache_many([(ExpiringModel(name="d"), "d"), (SamplePydanticModel(name="e", age=1), "e")])
+    cache.cache_by_group("short-lived", "1", "value")
+    assert 99_000 < _redis.pttl("expiring_model:a") <= 100_000
+    assert 99_000 < _hashed.pttl("expiring_model:b") <= 100_000
+    assert 4_000 < _redis.pttl("expiring_model:c") <= 5_000
+    assert 99_000 < _redis.pttl("expiring_model:d") <= 100_000
+    assert _redis.pttl("sample_pydantic_model:e") == -1
+    assert 9_000 < _redis.pttl("short-lived:1") <= 10_000
+
+    # Replacing a hash with keepttl keeps the TTL it had.
+    _hashed.pexpire("expiring_model:b", 50_000)
+    cache.cache(ExpiringModel(name="b2"), "b", hash=True, extra_redis_arguments={"keepttl": True})
+    assert 49_000 < _hashed.pttl("expiring_model:b") <= 50_000
+    assert cache.find_one(ExpiringModel, "b", hash=True) == ExpiringModel(name="b2")
+    cache.cache(ExpiringModel(name="f"), "f", hash=True, extra_redis_arguments={"keepttl": True})
+    assert _hashed.pttl("expiring_model:f") == -1
+
+    cache.set_ttl(SamplePydanticModel, 20)
+    cache.set_ttl(ExpiringModel, None)
+    cache.cache(SamplePydanticModel(name="e", age=1), "e", hash=True)
+    cache.cache(ExpiringModel(name="a"), "a")
+    assert 19_000 < _hashed.pttl("sample_pydantic_model:e") <= 20_000
+    assert _redis.pttl("expiring_model:a") == -1
+    with pytest.raises(ValueError):
+        cache.set_ttl("short-lived", 0)
+
+
+def test_sliding_expiration(return_connection_pool_for_sync_redis):
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis,
+        redis_database_for_hash=1,
+        ttls={SamplePydanticModel: 10},
+        sliding_expiration=True,
+    )
+    _redis = Redis(connection_pool=return_connection_pool_for_sync_redis)
+    cache.cache(SamplePydanticModel(name="test", age=1), "test")
+    cache.cache(SamplePydanticModel(name="hash", age=2), "hash", hash=True)
+    _redis.pexpire("sample_pydantic_model:test", 1_000)
+    cache.redis_hashed.pexpire("sample_pydantic_model:hash", 1_000)
+
+    assert cache.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=1)
+    assert cache.find_one(SamplePydanticModel, "hash", hash=True) == SamplePydanticModel(name="hash", age=2)
+    assert 9_000 < _redis.pttl("sample_pydantic_model:test") <= 10_000
+    assert 9_000 < cache.redis_hashed.pttl("sample_pydantic_model:hash") <= 10_000
+    cache.redis_hashed.pexpire("sample_pydantic_model:hash", 1_000)
+    assert cache.find_one(SamplePydanticModel, "hash", hash=True, specific_attribute="age") == b"2"
+    assert 9_000 < cache.redis_hashed.pttl("sample_pydantic_model:hash") <= 10_000
+    assert cache.find_one(SamplePydanticModel, "missing") is None
+    assert _redis.exists("sample_pydantic_model:missing") == 0
+
+
+def test_shared_connection_pools(return_connection_pool_for_sync_redis):
+    from tests.fixtures.redis_connection import REDIS_HOST, REDIS_PORT
+
+    cache = RidantCache(redis_host=REDIS_HOST, redis_port=REDIS_PORT, redis_database_for_hash=1)
+    other = RidantCache(redis_host=REDIS_HOST, redis_port=REDIS_PORT)
+    assert cache.redis.connection_pool is other.redis.connection_pool
+    assert cache.redis.connection_pool.connection_kwargs["db"] == 0
+    cache.cache(SamplePydanticModel(name="test", age=1), "test")
+    assert other.find_one(SamplePydanticModel, "test") == SamplePydanticModel(name="test", age=1)
+    assert set(cache.pool_stats()) == {"redis", "redis_hashed"}
+    assert cache.pool_stats()["redis"]["acquired"] >= 2
+
+    # Hash mode uses database 1 of the server of the pool passed, not database 0 of the pool itself.
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    cache.cache(SamplePydanticModel(name="hash", age=2), "hash", hash=True)
+    assert cache.redis_hashed.connection_pool.connection_kwargs["db"] == 1
+    assert Redis(connection_pool=return_connection_pool_for_sync_redis).exists("sample_pydantic_model:hash") == 0
+    assert cache.find_one(SamplePydanticModel, "hash", hash=True) == SamplePydanticModel(name="hash", age=2)
+
+
+def test_snapshot(return_connection_pool_for_sync_redis, tmp_path):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1)
+    _redis = Redis(connection_pool=return_connection_pool_for_sync_redis)
+    cache.cache_many([(SamplePydanticModel(name=str(index), age=index), str(index)) for index in range(50)], {"ex": 100})
+    cache.cache(SamplePydanticModel(name="hash", age=1), "hash", hash=True)
+    cache.cache_by_group("other", "1", "value")
+    cache.cache_many([(order, order.metadata.cart_id) for order in _sample_orders()])
+
+    _stats = cache.export_snapshot(SamplePydanticModel, tmp_path / "models.snapshot", chunk_size=256)
+    assert _stats.keys == 51 and _stats.chunks > 1
+    _orders = cache.export_snapshot(SampleOrder, tmp_path / "orders.snapshot")
+    assert _orders.keys > len(_sample_orders())
+    assert cache.export_group_snapshot("other", tmp_path / "other.snapshot", raw=True).keys == 1
+    _redis.flushall()
+
+    _stats = cache.import_snapshot(tmp_path / "models.snapshot", workers=3)
+    assert (_stats.keys, _stats.skipped, _stats.expired) == (51, 0, 0)
+    assert cache.find_one(SamplePydanticModel, "7") == SamplePydanticModel(name="7", age=7)
+    assert cache.find_one(SamplePydanticModel, "hash", hash=True) == SamplePydanticModel(name="hash", age=1)
+    assert 95_000 < _redis.pttl("sample_pydantic_model:7") <= 100_000
+    assert cache.redis_hashed.pttl("sample_pydantic_model:hash") == -1
+    cache.import_snapshot(tmp_path / "orders.snapshot")
+    assert len(list(cache.find(SampleOrder, restaurant_id="r1"))) == len(
+        [order for order in _sample_orders() if order.restaurant_id == "r1"]
+    )
+    cache.import_snapshot(tmp_path / "other.snapshot")
+    assert cache.find_one_by_group("other", "1") == "value"
+
+    cache.cache(SamplePydanticModel(name="changed", age=7), "7")
+    assert cache.import_snapshot(tmp_path / "models.snapshot", replace=False).skipped == 51
+    assert cache.find_one(SamplePydanticModel, "7").name == "changed"
+    with pytest.raises(ValueError):
+        (tmp_path / "broken.snapshot").write_bytes((tmp_path / "other.snapshot").read_bytes()[:-4])
+        cache.import_snapshot(tmp_path / "broken.snapshot")
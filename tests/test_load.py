@@ -0,0 +1,78 @@
+from ridant.load import load, main
+from ridant.main import RidantCache
+from pydantic import BaseModel
+from redis import Redis
+import json
+import pytest
+
+
+class LoadedItem(BaseModel):
+    item_id: str
+    quantity: int
+
+
+class LoadedCart(BaseModel):
+    cart_id: str
+    items: list
+
+    class Config:
+        cacheable_ttl = 60
+
+
+def _lines(count: int, start: int = 0):
+    return [json.dumps({"item_id": f"item-{index}", "quantity": index}) for index in range(start, start + count)]
+
+
+def test_load_iterable(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, bulk_batch_size=7)
+    _reports = []
+    _report = load(cache, LoadedItem, _lines(20), uid_field="item_id", progress=_reports.append, progress_interval=0)
+    assert (_report.read, _report.loaded, _report.failed, _report.batches) == (20, 20, 0, 3)
+    assert len(_reports) == 4 and _report.rate > 0
+    assert cache.find_one(LoadedItem, "item-3") == LoadedItem(item_id="item-3", quantity=3)
+
+    _report = load(cache, LoadedCart, [{"cart_id": "c1", "items": []}, LoadedCart(cart_id="c2", items=[1])], uid_field="cart_id")
+    assert _report.loaded == 2
+    assert 59_000 < cache.redis.pttl("loaded_cart:c1") <= 60_000
+    assert cache.find_one(LoadedCart, "c2") == LoadedCart(cart_id="c2", items=[1])
+
+
+def test_load_invalid_records(return_connection_pool_for_sync_redis):
+    cache = RidantCache(redis_connection_pool=return_connection_pool_for_sync_redis, bulk_batch_size=5)
+    _records = _lines(5) + ['{"item_id": "broken"}'] + _lines(5, start=5)
+    with pytest.raises(ValueError, match="#6"):
+        load(cache, LoadedItem, _records, uid_field="item_id")
+    assert cache.find_one(LoadedItem, "item-4") is not None
+    assert cache.find_one(LoadedItem, "item-9") is None
+
+    _report = load(cache, LoadedItem, _records, uid_field="item_id", skip_invalid=True)
+    assert (_report.loaded, _report.failed) == (10, 1)
+
+
+def test_load_file_with_workers(return_connection_pool_for_sync_redis, tmp_path):
+    _path = tmp_path / "items.jsonl"
+    _path.write_text("\n".join(_lines(50)) + "\n\n")
+    cache = RidantCache(
+        redis_connection_pool=return_connection_pool_for_sync_redis, redis_database_for_hash=1, compression="zlib"
+    )
+    _report = load(cache, LoadedItem, _path, uid_field="item_id", workers=2, batch_size=10, hash=True, ttl=30)
+    assert (_report.loaded, _report.batches) == (50, 5)
+    assert cache.find_one(LoadedItem, "item-42", hash=True) == LoadedItem(item_id="item-42", quantity=42)
+    assert 29_000 < cache.redis_hashed.pttl("loaded_item:item-42") <= 30_000
+
+    _report = load(cache, LoadedItem, str(_path), uid_field="item_id", workers=2, batch_size=10)
+    assert _report.loaded == 50
+    assert cache.find_one(LoadedItem, "item-7") == LoadedItem(item_id="item-7", quantity=7)
+
+
+def test_load_command(return_connection_pool_for_sync_redis, tmp_path, capsys):
+    from tests.fixtures.redis_connection import REDIS_HOST, REDIS_PORT
+
+    _path = tmp_path / "items.jsonl"
+    _path.write_text("\n".join(_lines(3)))
+    _arguments = ["tests.test_load:LoadedItem", str(_path), "--uid-field", "item_id", "--quiet"]
+    assert main(_arguments + ["--redis-host", REDIS_HOST, "--redis-port", str(REDIS_PORT)]) == 0
+    assert "3 loaded" in capsys.readouterr().err
+    assert Redis(connection_pool=return_connection_pool_for_sync_redis).exists("loaded_item:item-2") == 1
+    with pytest.raises(SystemExit):
+        main(_arguments + ["--hash"])
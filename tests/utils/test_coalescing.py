@@ -0,0 +1,60 @@
+from ridant.utils.coalescing import ReadCoalescer
+import asyncio
+import pytest
+
+
+async def test_read_coalescer_batches_and_deduplicates():
+    _batches = []
+
+    async def _load_many(keys):
+        _batches.append(keys)
+        return [key.upper() for key in keys]
+
+    _coalescer = ReadCoalescer(_load_many, max_batch_size=2)
+    assert await asyncio.gather(*[_coalescer.load(key) for key in ("a", "a", "b", "c")]) == ["A", "A", "B", "C"]
+    assert _batches == [["a", "b"], ["c"]]
+    assert _coalescer.stats() == {"requests": 4, "batches": 2, "keys_loaded": 3}
+
+
+async def test_read_coalescer_window():
+    _batches = []
+
+    async def _load_many(keys):
+        _batches.append(keys)
+        return keys
+
+    _coalescer = ReadCoalescer(_load_many, window=0.02)
+
+    async def _late_load():
+        await asyncio.sleep(0.005)
+        return await _coalescer.load("b")
+
+    assert await asyncio.gather(_coalescer.load("a"), _late_load()) == ["a", "b"]
+    assert _batches == [["a", "b"]]
+
+
+async def test_read_coalescer_propagates_errors():
+    async def _load_many(keys):
+        raise ConnectionError("down")
+
+    _coalescer = ReadCoalescer(_load_many)
+    with pytest.raises(ConnectionError):
+        await asyncio.gather(_coalescer.load("a"), _coalescer.load("b"))
+
+
+async def test_read_coalescer_holds_batch_tasks():
+    _release = asyncio.Event()
+
+    async def _load_many(keys):
+        await _release.wait()
+        return keys
+
+    _coalescer = ReadCoalescer(_load_many)
+    _load = asyncio.ensure_future(_coalescer.load("a"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert len(_coalescer._tasks) == 1
+    _release.set()
+    assert await _load == "a"
+    await asyncio.sleep(0)
+    assert not _coalescer._tasks
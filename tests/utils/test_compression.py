@@ -0,0 +1,28 @@
+from ridant.utils.compression import COMPRESSION_HEADER, ValueCompressor, decompress_value
+import pytest
+
+PAYLOAD = b'{"item_id": "123455", "quantity": 5}' * 100
+
+
+@pytest.mark.parametrize("name,module", [("zlib", "zlib"), ("lz4", "lz4"), ("zstd", "zstandard")])
+def test_value_compressor_round_trip(name, module):
+    pytest.importorskip(module)
+    _compressor = ValueCompressor(name, threshold=100)
+    _compressed = _compressor.compress(PAYLOAD, "group")
+    assert _compressed[:1] == COMPRESSION_HEADER
+    assert len(_compressed) < len(PAYLOAD)
+    assert _compressor.decompress(_compressed, "group") == PAYLOAD
+    assert decompress_value(_compressed) == PAYLOAD
+
+
+def test_value_compressor_threshold_and_stats():
+    _compressor = ValueCompressor("zlib", threshold=100)
+    assert _compressor.compress(b'{"small": 1}', "group") == b'{"small": 1}'
+    assert decompress_value(b'{"small": 1}') == b'{"small": 1}'
+    _compressor.compress(PAYLOAD, "group")
+    _stats = _compressor.stats("group")["group"]
+    assert _stats["values"] == 2
+    assert _stats["compressed_values"] == 1
+    assert _stats["bytes_in"] == len(PAYLOAD)
+    assert 0 < _stats["ratio"] < 1
+    assert _stats["compress_seconds"] > 0
@@ -0,0 +1,30 @@
+from ridant.utils.expiry import KEEP_TTL, expiry_milliseconds, hash_expiry, ttl_milliseconds, with_default_ttl
+import datetime
+import time
+import pytest
+
+
+def test_ttl_milliseconds():
+    assert ttl_milliseconds(None) is None
+    assert ttl_milliseconds(1.5) == 1500
+    assert ttl_milliseconds(datetime.timedelta(minutes=1)) == 60_000
+    assert ttl_milliseconds(0.0001) == 1
+    with pytest.raises(ValueError):
+        ttl_milliseconds(0)
+
+
+def test_with_default_ttl():
+    assert with_default_ttl(None, None) == {}
+    assert with_default_ttl(None, 100) == {"px": 100}
+    assert with_default_ttl({"nx": True}, 100) == {"nx": True, "px": 100}
+    assert with_default_ttl({"ex": 5}, 100) == {"ex": 5}
+    assert with_default_ttl({"keepttl": True}, 100) == {"keepttl": True}
+
+
+def test_hash_expiry():
+    assert expiry_milliseconds({"ex": 5}) == 5000
+    assert expiry_milliseconds({"px": 250}) == 250
+    assert 9_000 < expiry_milliseconds({"exat": int(time.time()) + 10}) <= 10_000
+    assert hash_expiry(None, 100) == 100
+    assert hash_expiry({"px": 50}, 100) == 50
+    assert hash_expiry({"keepttl": True}, 100) == KEEP_TTL
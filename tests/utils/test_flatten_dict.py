@@ -1,4 +1,4 @@
-from ridant.utils.caching_tools import flatten_dict_for_caching
+from ridant.utils.caching_tools import NONE_VALUE, flatten_dict_for_caching, unflatten_dict_from_cache
 import json
 from ridant.main import RidantCache
 
@@ -82,4 +82,38 @@ def test_determine_pipeline_commands_needed_heavily_nested(ridant_client: Ridant
     )
     assert len(_results) == 3
     for item in _results:
-        assert item[0][0:12] == "testing_uid:"
\ No newline at end of file
+        assert item[0][0:12] == "testing_uid:"
+
+def test_unflatten_dict_from_cache():
+    assert unflatten_dict_from_cache(flatten_dict_for_caching(SAMPLE)) == SAMPLE
+    assert unflatten_dict_from_cache(flatten_dict_for_caching(SAMPLE_HEAVILY_NESTED)) == SAMPLE_HEAVILY_NESTED
+
+
+def test_unflatten_dict_from_hgetall():
+    assert unflatten_dict_from_cache(
+        {b"cart-metadata:cart_id": b"testing-cart-id", b"tags": b'["a"]', b"empty": b"{}", b"note": b"[not json"}
+    ) == {"cart-metadata": {"cart_id": "testing-cart-id"}, "tags": ["a"], "empty": {}, "note": "[not json"}
+
+
+def test_flatten_dict_none_and_colon_keys():
+    _flattened = flatten_dict_for_caching({"opt": None, "extra": {"x:y": 1}, "nested": {"a": None, "b": "null"}})
+    assert _flattened == {"opt": NONE_VALUE, "extra": '{"x:y": 1}', "nested:a": NONE_VALUE, "nested:b": "null"}
+    assert unflatten_dict_from_cache({key.encode(): str(value).encode() for key, value in _flattened.items()}) == {
+        "opt": None,
+        "extra": {"x:y": 1},
+        "nested": {"a": None, "b": "null"},
+    }
+
+
+def test_flatten_dict_escapes_strings():
+    _strings = {"json": '{"a": 1}', "list": '["x"]', "none": NONE_VALUE, "nul": "\x00a", "plain": "a[b"}
+    _flattened = flatten_dict_for_caching({"strings": _strings, "list": ["x"], "dict": {"a:b": 1}})
+    assert _flattened["strings:json"] == '\x00{"a": 1}'
+    assert _flattened["strings:none"] == "\x00\x00"
+    assert _flattened["strings:plain"] == "a[b"
+    assert _flattened["list"] == '["x"]'
+    assert unflatten_dict_from_cache({key.encode(): str(value).encode() for key, value in _flattened.items()}) == {
+        "strings": _strings,
+        "list": ["x"],
+        "dict": {"a:b": 1},
+    }
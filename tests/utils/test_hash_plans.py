@@ -0,0 +1,119 @@
+from ridant.utils.caching_tools import flatten_dict_for_caching, unflatten_dict_from_cache
+from ridant.utils.hash_plans import flatten_model, flatten_plan, supports_flatten_plan, unflatten_model, unflatten_plan
+from ridant.utils.serializers import to_jsonable
+from pydantic import BaseModel, Extra
+import datetime
+import enum
+import typing
+import uuid
+
+
+class Color(str, enum.Enum):
+    red = "red"
+    blue = "blue"
+
+
+class Address(BaseModel):
+    street: str
+    number: int = 1
+    verified: bool = False
+
+
+class Office(Address):
+    floor: int = 0
+
+
+class Person(BaseModel):
+    id: int
+    name: str
+    score: float = 0.5
+    active: bool = True
+    nickname: typing.Optional[str] = None
+    born: datetime.date = datetime.date(1990, 1, 1)
+    uid: uuid.UUID = uuid.UUID(int=1)
+    color: Color = Color.red
+    tags: typing.List[str] = []
+    address: Address = Address(street="Main")
+    work: typing.Optional[Address] = None
+    labels: typing.Dict[str, typing.Any] = {}
+    code: typing.Union[int, str] = 0
+
+
+class Loose(BaseModel, extra=Extra.allow):
+    id: int
+
+
+def _generic(model: BaseModel) -> dict:
+    return flatten_dict_for_caching(to_jsonable(model.dict(), model.__json_encoder__))
+
+
+def test_flatten_model_matches_generic_walk():
+    people = [
+        Person(id=1, name="a"),
+        Person(
+            id=2,
+            name="b",
+            active=False,
+            nickname="bee",
+            tags=["x", "y"],
+            work=Office(street="Side", number=3, verified=True, floor=2),
+            labels={"team": {"name": "core", "size": 3}, "empty": {}},
+            code="x1",
+        ),
+    ]
+    for person in people:
+        assert flatten_model(person) == _generic(person)
+    assert flatten_model(Loose(id=1, other={"a": 1})) == _generic(Loose(id=1, other={"a": 1}))
+
+
+def test_unflatten_model_round_trip():
+    person = Person(
+        id=2,
+        name="123",
+        tags=["x"],
+        work=Address(street="Side", verified=True),
+        labels={"team": {"name": "core"}},
+        color=Color.blue,
+    )
+    # As redis-py encodes them.
+    fetched = {
+        key.encode(): value.encode() if isinstance(value, str) else repr(value).encode()
+        for key, value in flatten_model(person).items()
+    }
+    assert unflatten_model(Person, fetched)["address"] == {"street": "Main", "number": 1, "verified": False}
+    assert Person.parse_obj(unflatten_model(Person, fetched)) == person
+    assert Person.parse_obj(unflatten_dict_from_cache(fetched)) == person
+
+    # Fields another version of the model wrote are left to validation.
+    fetched[b"id"] = b"not a number"
+    fetched[b"gone:field"] = b"1"
+    assert unflatten_model(Person, fetched)["id"] == "not a number"
+    assert unflatten_model(Person, fetched)["gone"] == {"field": "1"}
+
+
+class Note(BaseModel):
+    text: str
+    other: typing.Optional[str] = None
+    color: typing.Optional[Color] = None
+    labels: typing.Dict[str, str] = {}
+
+
+def test_strings_like_json_or_none():
+    note = Note(text="\x00", other='["x"]', labels={"k": '{"a": 1}', "none": "\x00", "nul": "\x00a"})
+    assert flatten_model(note) == _generic(note)
+    assert flatten_model(note)["text"] == "\x00\x00"
+    fetched = {key.encode(): value.encode() for key, value in flatten_model(note).items()}
+    assert unflatten_model(Note, fetched) == unflatten_dict_from_cache(fetched) == note.dict()
+    assert Note.parse_obj(unflatten_model(Note, fetched)) == note
+
+    # None is only the NUL byte alone.
+    fetched[b"other"] = b"\x00"
+    assert unflatten_model(Note, fetched)["other"] is None
+
+
+def test_plans_are_compiled_once():
+    assert supports_flatten_plan(Person)
+    assert not supports_flatten_plan(Loose)
+    assert flatten_plan(Person) is flatten_plan(Person)
+    assert unflatten_plan(Person) is unflatten_plan(Person)
+    assert unflatten_plan(Person)[b"address:street"] == unflatten_plan(Person)["address:street"]
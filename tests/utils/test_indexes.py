@@ -0,0 +1,80 @@
+from ridant.utils.indexes import (
+    RANGE_INDEX,
+    SET_INDEX,
+    index_arguments,
+    index_key_prefix,
+    index_value,
+    indexed_values_below,
+    resolve_indexes,
+    score_bounds,
+)
+from pydantic import BaseModel
+import datetime
+import pytest
+import typing
+
+
+class SampleChild(BaseModel):
+    name: str
+    created_at: datetime.datetime
+
+
+class SampleIndexed(BaseModel):
+    name: str
+    age: int
+    is_active: bool
+    tags: typing.List[str]
+    child: SampleChild
+
+
+def test_resolve_indexes():
+    assert resolve_indexes(SampleIndexed, None) == {}
+    assert resolve_indexes(SampleIndexed, ["name", "age", "is_active", "child.created_at"]) == {
+        "name": SET_INDEX,
+        "age": RANGE_INDEX,
+        "is_active": SET_INDEX,
+        "child.created_at": RANGE_INDEX,
+    }
+    assert resolve_indexes(SampleIndexed, {"age": SET_INDEX}) == {"age": SET_INDEX}
+    with pytest.raises(ValueError):
+        resolve_indexes(SampleIndexed, ["child.missing"])
+    with pytest.raises(ValueError):
+        resolve_indexes(SampleIndexed, {"name": "hash"})
+
+
+def test_index_values():
+    assert index_value("a") == "a"
+    assert index_value(True) == "true"
+    assert index_value(1) == "1"
+    assert index_value(None) == "null"
+    assert index_value(["b", "a"]) == '["b", "a"]'
+    assert score_bounds(3) == ("3.0", "3.0")
+    assert score_bounds((None, 5)) == ("-inf", "5.0")
+    assert score_bounds((datetime.date(2020, 1, 1), None))[1] == "+inf"
+    with pytest.raises(ValueError):
+        score_bounds((1, 2, 3))
+
+
+def test_index_arguments():
+    _indexes = {"name": SET_INDEX, "age": RANGE_INDEX}
+    assert index_key_prefix("{group}:") == "__ridant__:index:{group}:"
+    assert index_key_prefix("group:", hash=True) == "__ridant__:index:hash:group:"
+    assert index_arguments("prefix:", "uid", _indexes, {"name": "a", "age": None}) == [
+        "prefix:",
+        "uid",
+        "replace",
+        "name",
+        SET_INDEX,
+        "a",
+        "age",
+        "none",
+        "",
+    ]
+
+
+def test_indexed_values_below():
+    _indexes = {"name": SET_INDEX, "child.name": SET_INDEX}
+    assert indexed_values_below(_indexes, [], {"name": "a", "child": {"name": "b"}}) == {"name": "a", "child.name": "b"}
+    assert indexed_values_below(_indexes, ["child"], {"name": "b"}) == {"child.name": "b"}
+    assert indexed_values_below(_indexes, ["child", "name"], "c") == {"child.name": "c"}
+    assert indexed_values_below(_indexes, ["tags"], ["x"]) == {}
@@ -0,0 +1,47 @@
+from ridant.utils.local_cache import DEFAULT_TTL, LocalCache
+import time
+
+
+def test_local_cache_lru_eviction():
+    _cache = LocalCache(max_entries=2)
+    _cache.set("a", 1)
+    _cache.set("b", 2)
+    assert _cache.get("a") == 1
+    _cache.set("c", 3)
+    assert _cache.get("b") is None
+    assert _cache.get("a") == 1 and _cache.get("c") == 3
+    assert _cache.stats() == {"hits": 3, "misses": 1, "evictions": 1, "entries": 2, "bytes": 0}
+
+
+def test_local_cache_memory_cap():
+    _cache = LocalCache(max_bytes=10)
+    _cache.set("a", 1, size=6)
+    _cache.set("b", 2, size=6)
+    assert _cache.get("a") is None
+    assert _cache.get("b") == 2
+    assert _cache.set("c", 3, size=11) == False
+
+
+def test_local_cache_ttl():
+    _cache = LocalCache(ttl=0.01)
+    _cache.set("a", 1)
+    time.sleep(0.02)
+    assert _cache.get("a") is None
+    assert len(_cache) == 0
+
+    # Entries expire by default, and never outlive the TTL given to set.
+    _cache = LocalCache()
+    assert _cache.ttl == DEFAULT_TTL
+    _cache.set("a", 1, ttl=0.01)
+    _cache.set("b", 2, ttl=60)
+    time.sleep(0.02)
+    assert _cache.get("a") is None
+    assert _cache._entries["b"][2] <= time.monotonic() + DEFAULT_TTL
+
+
+def test_local_cache_rejects_stale_epoch():
+    _cache = LocalCache()
+    _epoch = _cache.epoch
+    _cache.discard("a")
+    assert _cache.set("a", 1, epoch=_epoch) == False
+    assert _cache.set("a", 1, epoch=_cache.epoch) == True
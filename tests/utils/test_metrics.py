@@ -0,0 +1,36 @@
+from ridant.utils.metrics import CallbackMetrics, Histogram, InMemoryMetrics
+
+
+def test_histogram_quantiles():
+    _histogram = Histogram(start=1)
+    for value in range(1, 101):
+        _histogram.observe(value)
+    assert _histogram.count == 100
+    assert _histogram.as_dict()["mean"] == 50.5
+    assert 50 <= _histogram.quantile(0.5) <= 64
+    assert _histogram.quantile(0.99) == 100
+    assert Histogram(start=1).quantile(0.5) is None
+
+
+def test_in_memory_metrics_snapshot():
+    _metrics = InMemoryMetrics()
+    _metrics.observe_latency("find_one", "group", "network", 0.001)
+    _metrics.observe_payload("find_one", "group", 120)
+    _metrics.record_lookup("find_one", "group", True)
+    _metrics.record_lookup("find_one", "group", False)
+    _snapshot = _metrics.snapshot()
+    assert _snapshot["latency"]["find_one:group:network"]["count"] == 1
+    assert _snapshot["payload_bytes"]["find_one:group"]["max"] == 120
+    assert _snapshot["hits"] == {"find_one:group": 1}
+    assert _snapshot["misses"] == {"find_one:group": 1}
+
+
+def test_callback_metrics():
+    _events = []
+    _metrics = CallbackMetrics(lambda name, value, tags: _events.append((name, value, tags)))
+    _metrics.observe_latency("cache", "group", "serialize", 0.5)
+    _metrics.record_lookup("find_one", "group", False)
+    assert _events == [
+        ("ridant.latency", 0.5, {"operation": "cache", "group": "group", "phase": "serialize"}),
+        ("ridant.miss", 1, {"operation": "find_one", "group": "group"}),
+    ]
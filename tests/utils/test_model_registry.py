@@ -0,0 +1,36 @@
+from ridant.utils.model_registry import cacheable, get_model_metadata
+from ridant.main import RidantCache
+from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExampleRegistryModel(BaseModel):
+    sample_key: str
+
+
+@cacheable(group_name="decorated-group", serializer="json")
+class ExampleDecoratedModel(BaseModel):
+    sample_key: str
+
+
+def test_get_model_metadata_is_memoized():
+    _metadata = get_model_metadata(ExampleRegistryModel)
+    assert _metadata.group_name == "example_registry_model"
+    assert _metadata.key_prefix == "example_registry_model:"
+    assert get_model_metadata(ExampleRegistryModel(sample_key="a")) is _metadata
+
+
+def test_get_model_metadata_from_threads():
+    class ExampleThreadedModel(BaseModel):
+        sample_key: str
+
+    with ThreadPoolExecutor(8) as executor:
+        _results = list(executor.map(lambda _: get_model_metadata(ExampleThreadedModel), range(32)))
+    assert all(result is _results[0] for result in _results)
+
+
+def test_cacheable_decorator():
+    _metadata = get_model_metadata(ExampleDecoratedModel)
+    assert _metadata.group_name == "decorated-group"
+    assert _metadata.serializer == "json"
+    assert RidantCache.generate_key_name(ExampleDecoratedModel(sample_key="a"), "uid") == "decorated-group:uid"
@@ -0,0 +1,51 @@
+from ridant.utils.namespaces import (
+    GenerationCache,
+    generation_key,
+    is_reclaimable,
+    key_generation,
+    reclaim_patterns,
+    versioned_prefix,
+)
+import time
+
+
+def test_versioned_prefix():
+    assert generation_key("cart") == "__ridant__:generation:cart"
+    assert versioned_prefix("cart:", 0) == "cart:"
+    assert versioned_prefix("cart:", 3) == "cart@3:"
+    assert versioned_prefix("{cart}:", 3) == "{cart}@3:"
+
+
+def test_key_generation():
+    assert key_generation("cart:uid", "cart:") == 0
+    assert key_generation("cart@12:uid", "cart:") == 12
+    assert key_generation("cart@x:uid", "cart:") is None
+    assert key_generation("carts:uid", "cart:") is None
+
+
+def test_reclaim_patterns():
+    assert reclaim_patterns("cart:", 0) == []
+    assert reclaim_patterns("cart:", 1) == ["cart:*", "__ridant__:index:cart:*", "__ridant__:index:hash:cart:*"]
+    assert "cart@*" in reclaim_patterns("cart:", 2)
+    assert "{cart}@*" in reclaim_patterns("{cart}:", 2)
+
+    assert is_reclaimable("cart:uid", "cart:", 1)
+    assert is_reclaimable("cart@1:uid", "cart:", 2)
+    assert not is_reclaimable("cart@2:uid", "cart:", 2)
+    assert is_reclaimable("__ridant__:index:hash:cart@1:set:a:b", "cart:", 2)
+    assert not is_reclaimable("__ridant__:index:cart@2:entries:uid", "cart:", 2)
+    assert not is_reclaimable("other:uid", "cart:", 2)
+
+
+def test_generation_cache():
+    _generations = GenerationCache(ttl=0.05)
+    assert _generations.get("cart") is None
+    assert _generations.set("cart", 2) == 2
+    # A read started before an invalidation does not move the group back.
+    assert _generations.set("cart", 1) == 2
+    assert _generations.get("cart") == 2
+    time.sleep(0.06)
+    assert _generations.get("cart") is None
+    assert _generations.get("cart", stale=True) == 2
+    _generations.discard("cart")
+    assert _generations.get("cart", stale=True) is None
@@ -0,0 +1,45 @@
+from ridant.utils.partial_update import (
+    APPEND,
+    INCREMENT,
+    MERGE,
+    SET,
+    decode_hash_reply,
+    partial_update_arguments,
+    script_arguments,
+    split_path,
+)
+import pytest
+
+
+def test_split_path():
+    assert split_path(None) == []
+    assert split_path("") == []
+    assert split_path("metadata.items.0") == ["metadata", "items", "0"]
+    assert split_path(["metadata", "items", 0]) == ["metadata", "items", "0"]
+
+
+def test_string_arguments():
+    assert partial_update_arguments(SET, ["tags"], [], hash=False) == ["[]"]
+    assert partial_update_arguments(MERGE, [], {"name": "a", "age": 1}, hash=False) == ["name", '"a"', "age", "1"]
+    assert partial_update_arguments(INCREMENT, ["age"], 1.5, hash=False) == ["1.5"]
+    assert partial_update_arguments(APPEND, ["tags"], ("a", 1), hash=False) == ['"a"', "1"]
+    assert script_arguments(SET, ["a", "b"], ["1"]) == [SET, 2, "a", "b", "1"]
+
+
+def test_hash_arguments():
+    assert partial_update_arguments(SET, ["child"], {"name": "a", "tags": [1]}, hash=True) == [
+        "child:name",
+        "a",
+        "child:tags",
+        "[1]",
+    ]
+    with pytest.raises(ValueError):
+        partial_update_arguments(MERGE, [], ["not", "a", "dict"], hash=True)
+
+
+def test_decode_hash_reply():
+    assert decode_hash_reply(["child"], SET, [b"child:name", b"a", b"child:age", b"1"]) == {"name": "a", "age": "1"}
+    assert decode_hash_reply(["age"], INCREMENT, 3) == 3
+    assert decode_hash_reply(["price"], INCREMENT, b"2.5") == 2.5
+    assert decode_hash_reply(["tags"], APPEND, b'["a"]') == ["a"]
+    assert decode_hash_reply(["age"], SET, None) is None
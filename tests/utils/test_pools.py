@@ -0,0 +1,60 @@
+from ridant.utils.pools import PoolManager, StatsBlockingConnectionPool, pool_stats
+from redis import ConnectionPool, Redis
+from redis.exceptions import ConnectionError
+from tests.fixtures.redis_connection import REDIS_HOST, REDIS_PORT
+import os
+import pytest
+
+
+def test_shared_pools():
+    _manager = PoolManager()
+    _pool = _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT, db=0)
+    assert _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT, db=0) is _pool
+    assert _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT, db=1) is not _pool
+    assert _manager.pool_for_database(_pool, 0) is _pool
+    assert _manager.pool_for_database(_pool, 1) is _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT, db=1)
+
+    _other = ConnectionPool(host=REDIS_HOST, port=REDIS_PORT, db=0)
+    _derived = _manager.pool_for_database(_other, 2)
+    assert _derived.connection_kwargs["db"] == 2 and _manager.pool_for_database(_other, 2) is _derived
+    assert pool_stats(_other) is None
+
+
+def test_pool_stats():
+    _manager = PoolManager()
+    _redis = Redis(connection_pool=_manager.get_pool(host=REDIS_HOST, port=REDIS_PORT))
+    _redis.set("key", "value")
+    _redis.get("key")
+    _stats = _manager.stats()[(REDIS_HOST, REDIS_PORT, 0)]
+    assert _stats["created"] == 1 and _stats["acquired"] == 2
+    assert _stats["in_use"] == 0 and _stats["idle"] == 1
+    assert _stats["average_wait_seconds"] > 0 and _stats["creation_rate"] > 0
+
+
+def test_blocking_pool():
+    _manager = PoolManager()
+    _pool = _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT, blocking=True, max_connections=1, timeout=0.05)
+    assert isinstance(_pool, StatsBlockingConnectionPool)
+    _connection = _pool.get_connection("GET")
+    assert _pool.stats.in_use == 1
+    with pytest.raises(ConnectionError):
+        _pool.get_connection("GET")
+    assert _pool.stats.failures == 1 and _pool.stats.max_wait_seconds >= 0.05
+    _pool.release(_connection)
+    assert Redis(connection_pool=_pool).ping()
+
+
+def test_pools_after_fork():
+    _manager = PoolManager()
+    _pool = _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT)
+    Redis(connection_pool=_pool).ping()
+    _pid = os.fork()
+    if _pid == 0:
+        _child_pool = _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT)
+        _ok = _child_pool is not _pool and Redis(connection_pool=_child_pool).ping()
+        _ok = _ok and Redis(connection_pool=_pool).ping() and _pool.stats.created == 1
+        os._exit(0 if _ok else 1)
+    _, _status = os.waitpid(_pid, 0)
+    assert os.waitstatus_to_exitcode(_status) == 0
+    assert _manager.get_pool(host=REDIS_HOST, port=REDIS_PORT) is _pool
+    assert Redis(connection_pool=_pool).ping()
@@ -0,0 +1,64 @@
+from ridant.utils.projection import (
+    decode_hash_value,
+    is_hash_leaf,
+    projection_arguments,
+    split_field,
+    validate_field,
+)
+from pydantic import BaseModel, ValidationError
+import pytest
+import typing
+
+
+class SampleChild(BaseModel):
+    name: str
+    age: int
+
+
+class SampleParent(BaseModel):
+    child: SampleChild
+    tags: typing.List[str]
+    scores: typing.Dict[str, int]
+    extras: typing.Any = None
+
+
+def test_split_field():
+    assert split_field("child.name") == ["child", "name"]
+    assert split_field("child:name") == ["child", "name"]
+    assert projection_arguments([["a"], ["b", "c"]]) == [1, "a", 2, "b", "c"]
+
+
+def test_hash_leaves():
+    assert is_hash_leaf(SampleParent, ["child", "age"])
+    assert is_hash_leaf(SampleParent, ["tags"])
+    assert is_hash_leaf(SampleParent, ["scores", "a"])
+    assert not is_hash_leaf(SampleParent, ["tags", "0"])
+    assert not is_hash_leaf(SampleParent, ["child"])
+    assert not is_hash_leaf(SampleParent, ["scores"])
+    assert not is_hash_leaf(SampleParent, ["extras"])
+    assert not is_hash_leaf(SampleParent, ["missing"])
+
+
+def test_validate_field():
+    assert validate_field(SampleParent, ["child", "age"], "5") == 5
+    assert validate_field(SampleParent, ["child"], {"name": "a", "age": 1}) == SampleChild(name="a", age=1)
+    assert validate_field(SampleParent, ["tags", "0"], 1) == "1"
+    assert validate_field(SampleParent, ["scores", "a"], "2") == 2
+    assert validate_field(SampleParent, ["extras", "a"], "2") == "2"
+    assert validate_field(SampleParent, ["child", "age"], None) is None
+    with pytest.raises(ValidationError):
+        validate_field(SampleParent, ["child", "age"], "not a number")
+
+
+def test_decode_hash_value():
+    assert decode_hash_value(None) is None
+    assert decode_hash_value(b"text") == "text"
+    assert decode_hash_value(b'["a"]') == ["a"]
+    assert decode_hash_value(b"[not json") == "[not json"
+
+    # str fields are read as text, whatever it looks like.
+    _name = SampleChild.__fields__["name"]
+    assert decode_hash_value(b'["a"]', _name) == '["a"]'
+    assert decode_hash_value(b'\x00{"a": 1}', _name) == '{"a": 1}'
+    assert decode_hash_value(b"\x00", _name) is None
+    assert decode_hash_value(b'["a"]', SampleParent.__fields__["tags"]) == ["a"]
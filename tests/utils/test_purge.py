@@ -0,0 +1,32 @@
+from ridant.utils.purge import PurgeProgress, Throttle
+import pytest
+
+
+def test_purge_progress():
+    _progress = PurgeProgress(["a*", "b*"], ["one", "two"])
+    assert _progress.next_target() == ("one", 0) and _progress.pattern == "a*"
+    _progress.advance("one", 12, 10, 3)
+    assert _progress.next_target() == ("one", 12)
+    _progress.advance("one", 0, 5, 1)
+    _progress.advance("two", 0, 5, 0)
+    assert _progress.pattern == "b*" and _progress.next_target() == ("one", 0)
+    assert (_progress.scanned, _progress.removed) == (20, 4)
+
+    _resumed = PurgeProgress(["a*", "b*"], ["one", "two"], cursor=_progress.cursor)
+    assert _resumed.pattern == "b*" and _resumed.cursors == {"one": 0, "two": 0}
+    with pytest.raises(ValueError):
+        PurgeProgress(["c*"], ["one", "two"], cursor=_progress.cursor)
+    with pytest.raises(ValueError):
+        PurgeProgress(["a*", "b*"], ["one"], cursor=_progress.cursor)
+
+    _progress.advance("one", 0, 0, 0)
+    _progress.advance("two", 0, 0, 0)
+    assert _progress.done and _progress.cursor is None
+
+
+def test_throttle():
+    assert Throttle().delay(1000) == 0.0
+    _throttle = Throttle(ops_per_second=100)
+    assert 0.4 < _throttle.delay(50) <= 0.5
+    with pytest.raises(ValueError):
+        Throttle(ops_per_second=0)
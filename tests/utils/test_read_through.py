@@ -0,0 +1,60 @@
+from ridant.utils.read_through import SingleFlight, AsyncSingleFlight, key_resolver, should_recompute_early
+import asyncio
+import threading
+import time
+import pytest
+
+
+def test_key_resolver():
+    def load(user_id: str, region: str = "eu"):
+        pass
+
+    assert key_resolver("{user_id}:{region}", load)(("a",), {}) == "a:eu"
+    assert key_resolver("{user_id}:{region}", load)((), {"user_id": "a", "region": "us"}) == "a:us"
+    assert key_resolver(lambda user_id, region="eu": user_id.upper(), load)(("a",), {}) == "A"
+
+
+def test_should_recompute_early():
+    assert should_recompute_early(1000, None, 1.0) == False
+    assert should_recompute_early(-1, 10.0, 1.0) == False
+    assert should_recompute_early(0, 10.0, 1.0) == True
+    assert not any(should_recompute_early(10_000_000, 1.0, 1.0) for _ in range(100))
+
+
+def test_single_flight_shares_result_and_errors():
+    _flight = SingleFlight()
+    _calls = []
+
+    def _load():
+        _calls.append(1)
+        time.sleep(0.05)
+        return len(_calls)
+
+    _results = []
+    _threads = [threading.Thread(target=lambda: _results.append(_flight.do("key", _load))) for _ in range(5)]
+    for thread in _threads:
+        thread.start()
+    for thread in _threads:
+        thread.join()
+    assert _results == [1] * 5
+    assert len(_flight) == 0
+
+    def _fail():
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        _flight.do("key", _fail)
+    assert _flight.do("key", _load) == 2
+
+
+async def test_async_single_flight():
+    _flight = AsyncSingleFlight()
+    _calls = []
+
+    async def _load():
+        _calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(_calls)
+
+    assert await asyncio.gather(*[_flight.do("key", _load) for _ in range(5)]) == [1] * 5
+    assert len(_flight) == 0
@@ -0,0 +1,66 @@
+from ridant.utils.serializers import (
+    FORMAT_HEADER,
+    decode_model,
+    encode_model,
+    get_serializer,
+    to_jsonable,
+)
+from pydantic import BaseModel
+import datetime
+import pytest
+import typing
+
+
+class SampleNestedModel(BaseModel):
+    item_id: str
+    quantity: int
+
+
+class SampleModel(BaseModel):
+    name: str
+    created_at: datetime.datetime
+    items: typing.List[SampleNestedModel]
+    counts: typing.Dict[int, float]
+
+
+SAMPLE = SampleModel(
+    name="test",
+    created_at=datetime.datetime(2019, 1, 1, 12, 30),
+    items=[SampleNestedModel(item_id="123455", quantity=5)],
+    counts={1: 2.5},
+)
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgpack"])
+def test_serializer_round_trip(name):
+    pytest.importorskip(name)
+    _serializer = get_serializer(name)
+    _encoded = encode_model(SAMPLE, _serializer)
+    assert isinstance(_encoded, bytes)
+    assert decode_model(SampleModel, _encoded, _serializer) == SAMPLE
+    # Any serializer can read values written by any other one.
+    assert decode_model(SampleModel, _encoded, get_serializer("json")) == SAMPLE
+
+
+def test_json_values_are_not_stamped():
+    assert encode_model(SAMPLE, get_serializer("json")) == SAMPLE.json().encode("utf-8")
+    assert decode_model(SampleModel, SAMPLE.json().encode("utf-8"), get_serializer("json")) == SAMPLE
+
+
+def test_msgpack_values_are_stamped():
+    pytest.importorskip("msgpack")
+    assert encode_model(SAMPLE, get_serializer("msgpack"))[:2] == FORMAT_HEADER + b"m"
+
+
+def test_to_jsonable_matches_json():
+    assert to_jsonable(SAMPLE.dict()) == {
+        "name": "test",
+        "created_at": "2019-01-01T12:30:00",
+        "items": [{"item_id": "123455", "quantity": 5}],
+        "counts": {"1": 2.5},
+    }
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError):
+        get_serializer("pickle")
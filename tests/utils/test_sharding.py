@@ -0,0 +1,49 @@
+from ridant.utils.sharding import ConsistentHashRing, shard_name
+import pytest
+
+
+def _assignments(ring, keys):
+    return {key: ring.node_for(key) for key in keys}
+
+
+def test_ring_spreads_keys():
+    _ring = ConsistentHashRing(["a", "b", "c"])
+    _counts = {}
+    for node in _assignments(_ring, [f"group:{index}" for index in range(30000)]).values():
+        _counts[node] = _counts.get(node, 0) + 1
+    assert set(_counts) == {"a", "b", "c"}
+    assert all(7000 < count < 13000 for count in _counts.values())
+
+
+def test_ring_remaps_few_keys():
+    _keys = [f"group:{index}" for index in range(20000)]
+    _ring = ConsistentHashRing(["a", "b", "c"])
+    _before = _assignments(_ring, _keys)
+
+    _ring.add_node("d")
+    _after = _assignments(_ring, _keys)
+    _moved = [key for key in _keys if _before[key] != _after[key]]
+    assert all(_after[key] == "d" for key in _moved)
+    assert 0.15 < len(_moved) / len(_keys) < 0.35
+
+    _ring.remove_node("d")
+    assert _assignments(_ring, _keys) == _before
+    _ring.remove_node("a")
+    assert all(node == _before[key] for key, node in _assignments(_ring, _keys).items() if _before[key] != "a")
+
+
+def test_ring_partition_and_errors():
+    _ring = ConsistentHashRing(["a", "b"], virtual_nodes=10)
+    _keys = ["x", "y", "z", "x"]
+    _partitions = _ring.partition(_keys)
+    assert sorted(index for indexes in _partitions.values() for index in indexes) == [0, 1, 2, 3]
+    assert len(_ring) == 2 and _ring.nodes == ["a", "b"]
+    with pytest.raises(ValueError):
+        ConsistentHashRing().node_for("x")
+    with pytest.raises(ValueError):
+        ConsistentHashRing(virtual_nodes=0)
+
+
+def test_shard_name():
+    assert shard_name({"host": "redis-1", "port": 6380, "db": 2}) == "redis-1:6380/2"
+    assert shard_name({"path": "/tmp/redis.sock"}) == "unix:///tmp/redis.sock/0"
@@ -0,0 +1,38 @@
+from ridant.utils.snapshot import NO_TTL, SnapshotReader, SnapshotWriter, remaining_ttl
+import pytest
+
+
+def test_snapshot_file(tmp_path):
+    _path = tmp_path / "test.snapshot"
+    with SnapshotWriter(_path, {"group": "test", "exported_at": 0}, chunk_size=64) as writer:
+        for index in range(10):
+            writer.add(f"test:{index}".encode(), b"x" * index, ttl=index * 100 or NO_TTL, dumped=index % 2 == 0)
+        writer.add(b"test:hash", b"payload", hash_database=True)
+    assert writer.stats.keys == 11 and writer.stats.chunks > 1
+    assert not (tmp_path / "test.snapshot.partial").exists()
+
+    with SnapshotReader(_path) as reader:
+        assert reader.metadata["group"] == "test" and reader.metadata["keys"] == 11
+        assert len(reader.chunks) == writer.stats.chunks
+        _entries = list(reader)
+        assert [entry.key for entry in _entries] == [f"test:{index}".encode() for index in range(10)] + [b"test:hash"]
+        assert _entries[3].value == b"xxx" and _entries[3].ttl == 300 and not _entries[3].dumped
+        assert _entries[0].ttl == NO_TTL and _entries[0].dumped
+        assert _entries[-1].hash_database and not _entries[0].hash_database
+        assert reader.read_chunk(len(reader.chunks) - 1)[-1].key == b"test:hash"
+
+    assert remaining_ttl(_entries[0]) == 0
+    assert remaining_ttl(_entries[3], elapsed_ms=100) == 200
+    assert remaining_ttl(_entries[3], elapsed_ms=300) is None
+
+
+def test_snapshot_file_errors(tmp_path):
+    with pytest.raises(RuntimeError):
+        with SnapshotWriter(tmp_path / "aborted.snapshot", {}) as writer:
+            writer.add(b"key", b"value")
+            raise RuntimeError()
+    assert list(tmp_path.iterdir()) == []
+
+    (tmp_path / "other.file").write_bytes(b"not a snapshot at all, but long enough")
+    with pytest.raises(ValueError):
+        SnapshotReader(tmp_path / "other.file")
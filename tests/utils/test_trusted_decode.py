@@ -0,0 +1,111 @@
+from ridant.utils.trusted_decode import (
+    FINGERPRINT_HEADER,
+    add_fingerprint,
+    schema_fingerprint,
+    split_fingerprint,
+    trusted_construct,
+)
+from pydantic import BaseModel, Extra, Field, ValidationError
+import datetime
+import enum
+import pytest
+import typing
+import uuid
+
+
+class SampleColor(enum.Enum):
+    RED = "red"
+
+
+class SampleChild(BaseModel):
+    name: str
+    born: datetime.date
+
+
+class SampleParent(BaseModel):
+    child: SampleChild
+    children: typing.List[SampleChild] = []
+    by_name: typing.Dict[str, SampleChild] = {}
+    optional_child: typing.Optional[SampleChild] = None
+    tags: typing.List[str]
+    identifier: uuid.UUID
+    color: SampleColor
+    score: float
+    number: typing.Union[int, str]
+    aliased: int = Field(0, alias="otherName")
+
+
+def _parent_data() -> dict:
+    _child = {"name": "a", "born": "2020-01-02"}
+    return {
+        "child": _child,
+        "children": [_child],
+        "by_name": {"a": _child},
+        "optional_child": None,
+        "tags": ["x"],
+        "identifier": "12345678-1234-5678-1234-567812345678",
+        "color": "red",
+        "score": 1,
+        "number": "2",
+        "otherName": 3,
+    }
+
+
+def test_schema_fingerprint():
+    _fingerprint = schema_fingerprint(SampleParent)
+    assert len(_fingerprint) == 8
+    assert schema_fingerprint(SampleParent) == _fingerprint
+    assert schema_fingerprint(SampleChild) != _fingerprint
+
+    # Changing a nested model changes the fingerprint of its parents.
+    class SampleChild2(BaseModel):
+        name: str
+        born: datetime.date
+
+    class SampleWrapper(BaseModel):
+        child: SampleChild
+
+    class SampleOtherWrapper(BaseModel):
+        child: SampleChild2
+
+    assert schema_fingerprint(SampleWrapper) != schema_fingerprint(SampleOtherWrapper)
+
+
+def test_split_fingerprint():
+    _fingerprint = schema_fingerprint(SampleChild)
+    assert split_fingerprint(add_fingerprint(_fingerprint, b"{}")) == (_fingerprint, b"{}")
+    assert split_fingerprint(b"{}") == (None, b"{}")
+    assert add_fingerprint(_fingerprint, b"{}")[:1] == FINGERPRINT_HEADER
+
+
+def test_trusted_construct():
+    _parent = trusted_construct(SampleParent, _parent_data())
+    assert _parent == SampleParent.parse_obj(_parent_data())
+    assert isinstance(_parent.children[0], SampleChild) and isinstance(_parent.by_name["a"], SampleChild)
+    assert _parent.child.born == datetime.date(2020, 1, 2)
+    assert isinstance(_parent.identifier, uuid.UUID) and _parent.color is SampleColor.RED
+    assert isinstance(_parent.score, float) and _parent.number == 2
+    assert _parent.__fields_set__ == set(SampleParent.__fields__)
+
+    _data = _parent_data()
+    _data["aliased"] = _data.pop("otherName")
+    assert trusted_construct(SampleParent, _data).aliased == 3
+    del _data["children"]
+    assert trusted_construct(SampleParent, _data).children == []
+
+    _data["color"] = "blue"
+    with pytest.raises(ValidationError):
+        trusted_construct(SampleParent, _data)
+
+
+def test_trusted_construct_extra():
+    class SampleExtra(BaseModel):
+        name: str
+
+        class Config:
+            extra = Extra.allow
+
+    assert trusted_construct(SampleExtra, {"name": "a", "other": 1}) == SampleExtra(name="a", other=1)
+    assert trusted_construct(SampleChild, {"name": "a", "born": "2020-01-02", "other": 1}) == SampleChild(
+        name="a", born=datetime.date(2020, 1, 2)
+    )
@@ -0,0 +1,66 @@
+from ridant.utils.write_behind import SET_VALUE, UNLINK, PendingWrite, WriteBehindBuffer
+import asyncio
+import pytest
+
+
+async def test_write_behind_buffer_batches_last_writes():
+    _batches = []
+
+    async def _flush_many(writes):
+        _batches.append({key: write.value for key, write in writes.items()})
+
+    _buffer = WriteBehindBuffer(_flush_many, max_size=10, batch_size=3, interval=10)
+    await _buffer.put("a", PendingWrite(SET_VALUE, "a", 1))
+    await _buffer.put("b", PendingWrite(SET_VALUE, "b", 1))
+    await _buffer.put("a", PendingWrite(SET_VALUE, "a", 2))
+    assert len(_buffer) == 2
+    await _buffer.put("c", PendingWrite(UNLINK, "c"))
+    await asyncio.sleep(0.01)
+    assert _batches == [{"b": 1, "a": 2, "c": None}]
+
+    await _buffer.put("d", PendingWrite(SET_VALUE, "d", 1))
+    assert await _buffer.flush() == 1
+    await _buffer.aclose()
+    assert _buffer.stats() == {
+        "writes": 5, "overwritten": 1, "flushes": 2, "flushed": 4, "failed": 0, "waits": 0, "pending": 0
+    }
+    with pytest.raises(RuntimeError):
+        await _buffer.put("e", PendingWrite(SET_VALUE, "e", 1))
+
+
+async def test_write_behind_buffer_interval_and_backpressure():
+    _flushed = []
+    _release = asyncio.Event()
+
+    async def _flush_many(writes):
+        await _release.wait()
+        _flushed.extend(writes)
+
+    _buffer = WriteBehindBuffer(_flush_many, max_size=2, batch_size=2, interval=0.01)
+    await _buffer.put("a", PendingWrite(SET_VALUE, "a", 1))
+    await _buffer.put("b", PendingWrite(SET_VALUE, "b", 1))
+    _blocked = asyncio.ensure_future(_buffer.put("c", PendingWrite(SET_VALUE, "c", 1)))
+    await asyncio.sleep(0.02)
+    assert not _blocked.done() and _buffer.waits == 1
+
+    _release.set()
+    await _blocked
+    await asyncio.sleep(0.03)
+    assert _flushed == ["a", "b", "c"]
+    await _buffer.aclose()
+
+
+async def test_write_behind_buffer_reports_failed_batches():
+    _failed = []
+
+    async def _flush_many(writes):
+        raise ConnectionError("down")
+
+    async def _on_error(error, writes):
+        _failed.append((str(error), list(writes)))
+
+    _buffer = WriteBehindBuffer(_flush_many, batch_size=1, on_error=_on_error)
+    await _buffer.put("a", PendingWrite(SET_VALUE, "a", 1))
+    await _buffer.aclose()
+    assert _failed == [("down", ["a"])]
+    assert _buffer.failed == 1